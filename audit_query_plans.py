@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+接口查询计划审计
+对各API接口使用的查询执行 EXPLAIN QUERY PLAN，任何查询对表做全表扫描
+（计划中出现不带索引的 SCAN）即判为失败，退出码为1。
+新增或修改接口查询时，把查询加入 hot_queries 并运行本脚本确认命中索引。
+各模块中的查询由模块提供的查询构造函数生成（与接口实际执行的查询相同）；
+只有直接写在 main.py 接口里的查询按接口中的条件列出。
+
+默认在按当前模型新建的临时SQLite库上审计（只看索引设计，与数据量无关）；
+--database 指定已有的数据库文件时审计该库（用于确认旧库已补建索引）。
+
+用法:
+    python audit_query_plans.py
+    python audit_query_plans.py --database ./tender_evaluation.db
+"""
+
+import os
+import re
+import sys
+import shutil
+import argparse
+import datetime
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import (
+    Base,
+    TenderProject,
+    BidDocument,
+    AnalysisResult,
+    AnalysisProgress,
+    ScoringRule,
+    ScoreModificationHistory,
+    ProjectAuditLog,
+    ProjectSummary,
+    RuleScore,
+    ensure_indexes,
+    ensure_search_index,
+)
+from modules.batch_price_recalc import incomplete_bid_counts_query
+from modules.price_candidates import candidate_query, selected_prices_query
+from modules.price_score_calculator import unextracted_price_query
+from modules.project_listing import project_counts_query, project_list_query
+from modules.rule_checkpoints import checkpoint_query, checkpointed_rules_query
+from modules.rule_scores import detailed_scores_query, other_scores_totals_query, score_matrix_query
+from modules.scoring_model import project_signature_queries
+from modules.scoring_rule_cache import cache_entry_query
+
+# 全表扫描：SCAN 表名 后面没有 USING (COVERING) INDEX，也不是带匹配条件的全文索引查询
+_FULL_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?! USING| VIRTUAL TABLE INDEX \d+:\S)(?:\s|$)')
+
+
+def hot_queries(db) -> List[Tuple[str, Any, bool]]:
+    """
+    各接口使用的查询（模块中的查询取自模块的查询构造函数，main.py 中的查询与接口条件一致）
+
+    Returns:
+        List[Tuple[str, Query | Select, bool]]: (名称, 查询, 是否允许全表扫描)
+    """
+    pid, bid, rid = 1, 1, 1
+    signature_results, signature_rules = project_signature_queries(db, pid)
+    return [
+        # 不带筛选条件的项目列表按主键倒序读取一页（LIMIT 截止），不是对全表的扫描
+        ('项目列表首页', project_list_query(db).limit(51), True),
+        ('项目列表翻页', project_list_query(db, cursor=100).limit(51), False),
+        ('按状态筛选项目', project_list_query(db, statuses=['completed']).limit(51), False),
+        (
+            '按日期筛选项目',
+            project_list_query(
+                db, created_from=datetime.date(2024, 1, 1), created_to=datetime.date(2024, 1, 31)
+            ).limit(51),
+            False,
+        ),
+        ('搜索项目', project_list_query(db, q='智慧园区', bidder='建设集团').limit(51), False),
+        ('项目列表计数', project_counts_query([1, 2, 3]), False),
+        ('项目详情', db.query(TenderProject).filter(TenderProject.id == pid), False),
+        ('按编号查项目', db.query(TenderProject).filter(TenderProject.project_code == 'P-1'), False),
+        ('项目投标文件', db.query(BidDocument).filter(BidDocument.project_id == pid), False),
+        ('项目投标文件数', db.query(func.count(BidDocument.id)).filter(BidDocument.project_id == pid), False),
+        (
+            '投标文件状态',
+            db.query(BidDocument.id, BidDocument.processing_status).filter(BidDocument.project_id == pid),
+            False,
+        ),
+        (
+            '待恢复的投标文件',
+            db.query(BidDocument).filter(
+                BidDocument.project_id == pid, BidDocument.processing_status != 'completed'
+            ),
+            False,
+        ),
+        ('未提取价格的投标文件', unextracted_price_query(db, pid), False),
+        ('各项目分析中的投标文件数', incomplete_bid_counts_query(db, [1, 2, 3]), False),
+        ('投标文件详情', db.query(BidDocument).filter(BidDocument.id == bid, BidDocument.project_id == pid), False),
+        (
+            '分析进度快照',
+            db.query(AnalysisProgress)
+            .filter(AnalysisProgress.project_id == pid)
+            .order_by(AnalysisProgress.bid_document_id),
+            False,
+        ),
+        (
+            '项目结果排名',
+            db.query(AnalysisResult)
+            .filter(AnalysisResult.project_id == pid)
+            .order_by(AnalysisResult.total_score.desc()),
+            False,
+        ),
+        ('项目是否有结果', db.query(AnalysisResult.id).filter(AnalysisResult.project_id == pid).limit(1), False),
+        ('投标文件的结果', db.query(AnalysisResult).filter(AnalysisResult.bid_document_id == bid), False),
+        (
+            '更新结果价格',
+            db.query(AnalysisResult).filter(
+                AnalysisResult.project_id == pid, AnalysisResult.bid_document_id == bid
+            ),
+            False,
+        ),
+        ('按ID批量取结果', db.query(AnalysisResult).filter(AnalysisResult.id.in_([1, 2, 3])), False),
+        ('评分模型签名（结果）', signature_results, False),
+        ('评分模型签名（规则）', signature_rules, False),
+        ('结果明细得分', detailed_scores_query(db, [1, 2, 3]), False),
+        ('项目得分矩阵', score_matrix_query(db, pid), False),
+        ('其他分数总和', other_scores_totals_query(db, pid), False),
+        (
+            '未完成的暂定结果',
+            db.query(AnalysisResult.id).filter(
+                AnalysisResult.bid_document_id.in_([1, 2]),
+                ~db.query(RuleScore.id).filter(RuleScore.analysis_result_id == AnalysisResult.id).exists(),
+            ),
+            False,
+        ),
+        ('项目汇总表', db.query(ProjectSummary).filter(ProjectSummary.project_id == pid), False),
+        ('项目评分规则', db.query(ScoringRule).filter(ScoringRule.project_id == pid), False),
+        ('单条评分规则', db.query(ScoringRule).filter(ScoringRule.id == rid, ScoringRule.project_id == pid), False),
+        ('规则检查点', checkpoint_query(db, bid, 'm', 'h'), False),
+        ('项目已有检查点的规则', checkpointed_rules_query(db, [1, 2, 3], 'm'), False),
+        ('价格候选', candidate_query(db, bid, 'h', '1'), False),
+        ('项目选中价格', selected_prices_query(db, pid), False),
+        ('评分规则缓存', cache_entry_query(db, 'h', '1'), False),
+        (
+            '分数修改历史',
+            db.query(ScoreModificationHistory)
+            .filter(ScoreModificationHistory.analysis_result_id == rid)
+            .order_by(ScoreModificationHistory.modified_at),
+            False,
+        ),
+        (
+            '项目审计日志',
+            db.query(ProjectAuditLog)
+            .filter(ProjectAuditLog.project_id == pid)
+            .order_by(ProjectAuditLog.operation_time),
+            False,
+        ),
+    ]
+
+
+def explain(connection, query) -> List[str]:
+    """返回查询计划各步骤的说明文字"""
+    statement = getattr(query, 'statement', query)
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+def audit(database_path: str = None) -> Dict[str, Any]:
+    """
+    审计全部接口查询
+
+    Returns:
+        Dict: queries 为每个查询的计划，failures 为做全表扫描的查询
+    """
+    directory = None
+    if database_path is None:
+        directory = tempfile.mkdtemp(prefix='query_plan_')
+        database_path = os.path.join(directory, 'audit.db')
+    engine = create_engine(f'sqlite:///{database_path}')
+    try:
+        Base.metadata.create_all(bind=engine)
+        ensure_indexes(engine)
+        ensure_search_index(engine)
+        db = sessionmaker(bind=engine)()
+        results, failures = [], []
+        with engine.connect() as connection:
+            # 子查询协程（SCAN anon_1）等不是表，不算全表扫描
+            tables = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+            for name, query, allow_scan in hot_queries(db):
+                plan = explain(connection, query)
+                scans = [m.group(1) for m in map(_FULL_SCAN_RE.match, plan) if m and m.group(1) in tables]
+                results.append({'name': name, 'plan': plan, 'full_scans': scans, 'allowed': allow_scan})
+                if scans and not allow_scan:
+                    failures.append({'name': name, 'plan': plan, 'full_scans': scans})
+        db.close()
+        return {'queries': results, 'failures': failures}
+    finally:
+        engine.dispose()
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='接口查询计划审计')
+    parser.add_argument('--database', help='审计已有的SQLite数据库文件（默认新建临时库）')
+    args = parser.parse_args()
+
+    report = audit(args.database)
+    for item in report['queries']:
+        mark = '全表扫描' if item['full_scans'] else '索引'
+        if item['full_scans'] and item['allowed']:
+            mark += '（允许）'
+        print(f"{item['name']:<16} {mark}")
+        for step in item['plan']:
+            print(f'    {step}')
+    if report['failures']:
+        print(f"\n{len(report['failures'])} 个查询做了全表扫描: " + '、'.join(f['name'] for f in report['failures']))
+        sys.exit(1)
+    print('\n全部查询命中索引')
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+中文金额转换性能基准
+对比原来每次 re.sub 并按亿/万拆分的实现与单遍状态机（带缓存）的实现：
+分别统计首次转换（清空缓存）和重复转换（命中缓存）的耗时，并校验两者在原实现
+支持的输入（亿以下的大写整数金额）上结果一致。
+
+用法: python benchmark_chinese_number.py [金额个数] [重复次数]
+"""
+
+import sys
+import os
+import re
+import time
+import random
+from typing import List, Optional
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.enhanced_price_extractor import ChineseNumberConverter, _parse_chinese_amount
+from modules.price_corpus import to_chinese_uppercase
+
+
+class LegacyChineseNumberConverter:
+    """优化前的实现（每次调用 re.sub 并按亿、万拆分），仅用于对比"""
+
+    def __init__(self):
+        self.num_map = {
+            '零': 0,
+            '一': 1,
+            '二': 2,
+            '三': 3,
+            '四': 4,
+            '五': 5,
+            '六': 6,
+            '七': 7,
+            '八': 8,
+            '九': 9,
+            '壹': 1,
+            '贰': 2,
+            '叁': 3,
+            '肆': 4,
+            '伍': 5,
+            '陆': 6,
+            '柒': 7,
+            '捌': 8,
+            '玖': 9,
+            '两': 2,
+        }
+        self.unit_map = {
+            '十': 10,
+            '百': 100,
+            '千': 1000,
+            '拾': 10,
+            '佰': 100,
+            '仟': 1000,
+        }
+        self.large_unit_map = {'万': 10000, '亿': 100000000}
+
+    def chinese_to_number(self, text: str) -> Optional[float]:
+        """
+        将中文数字字符串（包括大写）转换为阿拉伯数字浮点数。
+        """
+        if not text:
+            return None
+
+        # 移除常见非数字字符
+        text = re.sub(r'[元圆角分整人民币\\s]', '', text)
+
+        # 处理亿和万
+        if '亿' in text:
+            parts = text.split('亿')
+            high = self._convert_segment(parts[0]) * self.large_unit_map['亿']
+            low = self._convert_segment(parts[1]) if parts[1] else 0
+            return high + low
+        if '万' in text:
+            parts = text.split('万')
+            high = self._convert_segment(parts[0]) * self.large_unit_map['万']
+            low = self._convert_segment(parts[1]) if parts[1] else 0
+            return high + low
+
+        return self._convert_segment(text)
+
+    def _convert_segment(self, segment: str) -> float:
+        """转换万或亿内部的数字部分"""
+        if not segment:
+            return 0
+
+        total = 0
+        current_num = 0
+        for char in segment:
+            if char in self.num_map:
+                current_num = self.num_map[char]
+            elif char in self.unit_map:
+                total += (current_num or 1) * self.unit_map[char]
+                current_num = 0
+            else:
+                # 忽略无法识别的字符
+                pass
+        total += current_num
+        return total
+
+
+
+def generate_amount_texts(count: int = 2000, seed: int = 0) -> List[str]:
+    """生成亿以下的大写整数金额（如“壹佰贰拾叁万肆仟伍佰元整”）"""
+    rng = random.Random(seed)
+    return [to_chinese_uppercase(rng.randint(1000, 99_999_999)) for _ in range(count)]
+
+
+def _time_conversions(convert, texts: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            convert(text)
+    return time.perf_counter() - start
+
+
+def run_benchmark(count: int = 2000, repeat: int = 5):
+    texts = generate_amount_texts(count)
+    legacy = LegacyChineseNumberConverter()
+    current = ChineseNumberConverter()
+
+    mismatches = [t for t in texts if legacy.chinese_to_number(t) != current.chinese_to_number(t)]
+    assert not mismatches, f'新旧实现结果不一致: {mismatches[:5]}'
+
+    legacy_seconds = _time_conversions(legacy.chinese_to_number, texts, repeat)
+
+    # 绕过缓存直接调用状态机
+    uncached_seconds = _time_conversions(_parse_chinese_amount.__wrapped__, texts, repeat)
+    _parse_chinese_amount.cache_clear()
+    cached_seconds = _time_conversions(current.chinese_to_number, texts, repeat)
+
+    conversions = count * repeat
+    return {
+        'conversions': conversions,
+        'legacy_us': legacy_seconds / conversions * 1e6,
+        'state_machine_us': uncached_seconds / conversions * 1e6,
+        'cached_us': cached_seconds / conversions * 1e6,
+    }
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    stats = run_benchmark(count, repeat)
+    print(f"转换次数: {stats['conversions']}")
+    print(f"原实现: {stats['legacy_us']:.2f} us/次")
+    print(f"状态机（不命中缓存）: {stats['state_machine_us']:.2f} us/次")
+    print(f"状态机（{repeat} 轮重复，命中缓存）: {stats['cached_us']:.2f} us/次")
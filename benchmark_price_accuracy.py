@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+价格提取速度与准确率基准
+用带已知总价的合成语料（价格一览表、大写金额、保证金干扰、千分位、报价表格、OCR噪声）
+评估 EnhancedPriceExtractor 的吞吐量（页/秒）和候选召回率，以及
+PriceManager.select_best_price 完整流程的吞吐量和选价准确率，按情形分别统计。
+提取器做速度优化后运行本基准，确认准确率没有下降。
+
+用法:
+    python benchmark_price_accuracy.py [每种情形份数] [每份页数]
+    python benchmark_price_accuracy.py 5 30 --pdf      # 先生成PDF，再经文本提取和表格识别
+"""
+
+import sys
+import os
+import argparse
+from typing import Dict, Any
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.price_corpus import SCENARIOS, run_corpus_benchmark
+
+
+def _print_report(stats: Dict[str, Any]):
+    header = f"{'情形':<18}{'份数':>6}{'提取 页/秒':>12}{'选价 页/秒':>12}{'候选召回':>10}{'选价准确':>10}{'误选保证金':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, s in list(stats['scenarios'].items()) + [('合计', stats['overall'])]:
+        print(
+            f"{name:<18}{s['cases']:>6}{s['extract_pages_per_sec']:>12.0f}{s['select_pages_per_sec']:>12.0f}"
+            f"{s['recall']:>10.0%}{s['accuracy']:>10.0%}{s['deposit_selected']:>10}"
+        )
+    if stats['failures']:
+        print('\n选价错误:')
+        for failure in stats['failures']:
+            print(f"  {failure['name']}: 真值 {failure['expected']}, 选出 {failure['selected']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='价格提取速度与准确率基准')
+    parser.add_argument('cases', type=int, nargs='?', default=5, help='每种情形的语料份数')
+    parser.add_argument('pages', type=int, nargs='?', default=30, help='每份语料的页数')
+    parser.add_argument('--pdf', action='store_true', help='生成PDF并经PDF文本提取和表格识别')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    print(f"情形: {', '.join(SCENARIOS)}")
+    _print_report(run_corpus_benchmark(args.cases, args.pages, args.pdf, args.seed))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+价格提取扫描性能基准
+生成400页的模拟投标文件，对比逐匹配窗口关键词检查的原实现与预编译扫描引擎，
+同时校验两者提取结果完全一致；并对比“提取+选择最佳价格”的完整流程在
+价格一览表大小写金额一致时（提前结束）的耗时和选出的价格。
+
+用法: python benchmark_price_extraction.py [页数] [重复次数]
+"""
+
+import sys
+import os
+import time
+from typing import Dict, Any
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.enhanced_price_extractor import EnhancedPriceExtractor
+from modules.price_manager import PriceManager
+from modules.price_reference import (
+    LegacyEnhancedPriceExtractor,
+    generate_bid_pages,
+    legacy_select_best_price,
+)
+
+
+def _timeit(fn, pages, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(pages)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(num_pages: int = 400, repeat: int = 5) -> Dict[str, Any]:
+    pages = generate_bid_pages(num_pages)
+    legacy = LegacyEnhancedPriceExtractor()
+    current = EnhancedPriceExtractor()
+
+    legacy_time, legacy_prices = _timeit(legacy.extract_enhanced_prices, pages, repeat)
+    current_time, current_prices = _timeit(current.extract_enhanced_prices, pages, repeat)
+    assert legacy_prices == current_prices, '优化后的提取结果与原实现不一致'
+
+    return {
+        'pages': num_pages,
+        'candidates': len(current_prices),
+        'legacy_ms': legacy_time * 1000,
+        'current_ms': current_time * 1000,
+        'speedup': legacy_time / current_time if current_time else float('inf'),
+    }
+
+
+def run_planner_benchmark(num_pages: int = 400, repeat: int = 5) -> Dict[str, Any]:
+    pages = generate_bid_pages(num_pages, verified_summary=True)
+    manager = PriceManager()
+
+    def planned_select_best_price(pages):
+        return manager.select_best_price(manager.extract_prices_from_content(pages), pages)
+
+    legacy_time, legacy_price = _timeit(legacy_select_best_price, pages, repeat)
+    current_time, current_price = _timeit(planned_select_best_price, pages, repeat)
+    assert legacy_price == current_price, '提前结束后选出的价格与原流程不一致'
+
+    return {
+        'pages': num_pages,
+        'price': current_price,
+        'early_exit': manager.extraction_planner.last_early_exit,
+        'legacy_ms': legacy_time * 1000,
+        'current_ms': current_time * 1000,
+        'speedup': legacy_time / current_time if current_time else float('inf'),
+    }
+
+
+if __name__ == '__main__':
+    num_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    stats = run_benchmark(num_pages, repeat)
+    print(f"页数: {stats['pages']}, 候选价格: {stats['candidates']}")
+    print(f"原实现: {stats['legacy_ms']:.1f} ms")
+    print(f"扫描引擎: {stats['current_ms']:.1f} ms")
+    print(f"加速比: {stats['speedup']:.2f}x")
+
+    stats = run_planner_benchmark(num_pages, repeat)
+    print(f"\n一览表大小写一致时的完整流程（提前结束: {stats['early_exit']}），选出价格: {stats['price']}")
+    print(f"原流程: {stats['legacy_ms']:.1f} ms")
+    print(f"章节索引+提前结束: {stats['current_ms']:.1f} ms")
+    print(f"加速比: {stats['speedup']:.2f}x")
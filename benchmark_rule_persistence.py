@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分规则保存基准
+比较原来逐条 add + flush 的递归保存与展开后一次批量插入的耗时，
+并确认两种方式写入的规则行完全相同。使用临时SQLite文件数据库，贴近实际部署。
+
+用法:
+    python benchmark_rule_persistence.py [规则条数] [重复次数]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from typing import List, Dict, Any
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import Base, ScoringRule, TenderProject
+from modules.scoring_rule_store import replace_project_rules
+
+
+def generate_rule_tree(num_rules: int = 200, children_per_parent: int = 9) -> List[Dict[str, Any]]:
+    """生成共 num_rules 个节点的规则树：一条价格规则，其余为父项及其子项"""
+    rules = [
+        {
+            'criteria_name': '价格分',
+            'max_score': 30,
+            'description': '满足招标文件要求且投标价格最低的为评标基准价',
+            'is_price_criteria': True,
+            'price_formula': '投标报价得分=(评标基准价/投标报价)*30',
+            'children': [],
+        }
+    ]
+    remaining = num_rules - 1
+    parent_index = 0
+    while remaining > 0:
+        parent_index += 1
+        count = min(children_per_parent, remaining - 1)
+        children = [
+            {
+                'criteria_name': f'评分项{parent_index}-{i}',
+                'max_score': 2,
+                'description': f'满足第{i}项要求得2分，不满足不得分',
+                'is_price_criteria': False,
+                'children': [],
+            }
+            for i in range(1, count + 1)
+        ]
+        rules.append(
+            {
+                'criteria_name': f'评分大项{parent_index}',
+                'max_score': 2 * count,
+                'description': '',
+                'is_price_criteria': False,
+                'children': children,
+            }
+        )
+        remaining -= count + 1
+    return rules
+
+
+def legacy_save_rules(db, project_id: int, scoring_rules: List[Dict[str, Any]]):
+    """原实现：递归保存，每个节点 add + flush 一次"""
+    db.query(ScoringRule).filter(ScoringRule.project_id == project_id).delete()
+
+    def save_rule_recursive(rule_data, parent_name=None):
+        is_price = bool(rule_data.get('is_price_criteria', False))
+        children = rule_data.get('children') or []
+
+        if children or is_price:
+            db_rule = ScoringRule(
+                project_id=project_id,
+                Parent_Item_Name=rule_data.get('criteria_name'),
+                Parent_max_score=rule_data.get('max_score'),
+                description=rule_data.get('description', ''),
+                is_veto=False,
+                is_price_criteria=is_price,
+            )
+            if is_price:
+                db_rule.price_formula = rule_data.get('price_formula')
+            db.add(db_rule)
+            db.flush()
+            for child_rule in children:
+                save_rule_recursive(child_rule, parent_name=rule_data.get('criteria_name'))
+        else:
+            db_rule = ScoringRule(
+                project_id=project_id,
+                Parent_Item_Name=parent_name,
+                Child_Item_Name=rule_data.get('criteria_name'),
+                Child_max_score=rule_data.get('max_score'),
+                description=rule_data.get('description', ''),
+                is_veto=False,
+                is_price_criteria=False,
+            )
+            db.add(db_rule)
+            db.flush()
+
+    for rule_data in scoring_rules:
+        save_rule_recursive(rule_data)
+    db.commit()
+
+
+def stored_rules(db, project_id: int) -> List[tuple]:
+    """按插入顺序读出项目的规则行（不含ID）"""
+    rows = (
+        db.query(ScoringRule)
+        .filter(ScoringRule.project_id == project_id)
+        .order_by(ScoringRule.id)
+        .all()
+    )
+    return [
+        (
+            r.Parent_Item_Name,
+            r.Parent_max_score,
+            r.Child_Item_Name,
+            r.Child_max_score,
+            r.description,
+            bool(r.is_veto),
+            bool(r.is_price_criteria),
+            r.price_formula,
+        )
+        for r in rows
+    ]
+
+
+def run_benchmark(num_rules: int = 200, repeats: int = 5) -> Dict[str, Any]:
+    directory = tempfile.mkdtemp(prefix='rule_bench_')
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        legacy_project = TenderProject(project_code='BENCH-LEGACY', name='基准-逐条保存')
+        bulk_project = TenderProject(project_code='BENCH-BULK', name='基准-批量保存')
+        db.add_all([legacy_project, bulk_project])
+        db.commit()
+        rules = generate_rule_tree(num_rules)
+
+        timings = {'legacy': [], 'bulk': []}
+        for _ in range(repeats):
+            start = time.perf_counter()
+            legacy_save_rules(db, legacy_project.id, rules)
+            timings['legacy'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            replace_project_rules(db, bulk_project.id, rules)
+            timings['bulk'].append(time.perf_counter() - start)
+
+        legacy_rows = stored_rules(db, legacy_project.id)
+        bulk_rows = stored_rules(db, bulk_project.id)
+        db.close()
+        legacy_best, bulk_best = min(timings['legacy']), min(timings['bulk'])
+        return {
+            'rules': len(bulk_rows),
+            'legacy_ms': legacy_best * 1000,
+            'bulk_ms': bulk_best * 1000,
+            'speedup': legacy_best / bulk_best if bulk_best else float('inf'),
+            'identical': legacy_rows == bulk_rows,
+        }
+    finally:
+        engine.dispose()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='评分规则保存基准')
+    parser.add_argument('rules', type=int, nargs='?', default=200, help='规则树节点数')
+    parser.add_argument('repeats', type=int, nargs='?', default=5, help='重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    stats = run_benchmark(args.rules, args.repeats)
+    print(f"规则行数: {stats['rules']}")
+    print(f"逐条 add+flush: {stats['legacy_ms']:.1f} ms")
+    print(f"批量插入:       {stats['bulk_ms']:.1f} ms")
+    print(f"加速比:         {stats['speedup']:.1f}x")
+    print(f"写入结果一致:   {'是' if stats['identical'] else '否'}")
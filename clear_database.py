@@ -45,8 +45,8 @@ def clear_database():
         # 清空每个表的数据
         for table in tables:
             table_name = table[0]
-            # 跳过sqlite内部表
-            if not table_name.startswith('sqlite_'):
+            # 跳过sqlite内部表和全文索引的影子表（清空全文索引表本身即可）
+            if not table_name.startswith(('sqlite_', 'project_search_')):
                 cursor.execute(f'DELETE FROM {table_name}')
                 print(f'已清空表: {table_name}')
 
@@ -16,6 +16,8 @@ from modules.database import (
     BidDocument,
     ScoringRule,
     AnalysisResult,
+    RuleScore,
+    ProjectSummary,
 )
 
 # 配置日志
@@ -96,6 +98,15 @@ def clear_project_data(project_id: int):
         # 4. 删除数据库记录 (按依赖顺序)
         logging.info('正在删除数据库记录...')
 
+        # 删除汇总表
+        db.query(ProjectSummary).filter(ProjectSummary.project_id == project_id).delete()
+
+        # 删除规则得分（依赖分析结果）
+        deleted_count = (
+            db.query(RuleScore).filter(RuleScore.project_id == project_id).delete()
+        )
+        logging.info(f'  - 已删除 {deleted_count} 条规则得分。')
+
         # 删除分析结果
         deleted_count = (
             db.query(AnalysisResult)
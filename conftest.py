@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试共用的数据库夹具：按当前模型新建的内存SQLite库
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import Base, ensure_search_index
+
+
+def memory_session(search_index: bool = False, **session_options):
+    """
+    新建内存SQLite库并返回会话
+
+    search_index 为 True 时同时建立项目全文索引；session_options 传给 sessionmaker。
+    测试文件以脚本方式运行时直接调用本函数代替夹具。
+    """
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(bind=engine)
+    if search_index:
+        assert ensure_search_index(engine)
+    return sessionmaker(bind=engine, **session_options)()
+
+
+@pytest.fixture
+def db():
+    """每个测试独立的内存库会话，测试结束后关闭"""
+    session = memory_session()
+    yield session
+    session.close()
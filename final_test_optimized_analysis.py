@@ -7,12 +7,12 @@
 
 import sys
 import os
-import json
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from modules.database import SessionLocal, TenderProject, BidDocument, ScoringRule
+from modules.database import SessionLocal, TenderProject, BidDocument, ScoringRule, AnalysisResult
+from modules.rule_scores import replace_result_scores
 from modules.scoring_extractor.core import IntelligentScoringExtractor
 from modules.scoring_extractor.db_handler import DBHandlerMixin
 from modules.intelligent_bid_analyzer import IntelligentBidAnalyzer
@@ -137,17 +137,22 @@ def final_test_optimized_analysis():
             # 显示详细评分
             print("\n   详细评分:")
             for score_item in analysis_result['detailed_scores'][:5]:  # 只显示前5个
-                print(f"     - {score_item['criteria_name']}: {score_item['score']}/{score_item['max_score']}")
+                print(f"     - {score_item['Child_Item_Name']}: {score_item['score']}/{score_item['max_score']}")
                 
             if len(analysis_result['detailed_scores']) > 5:
                 print(f"     ... 还有 {len(analysis_result['detailed_scores']) - 5} 个评分项")
                 
             # 保存分析结果到数据库
             print("\n4. 保存分析结果到数据库...")
-            bid_doc = session.query(BidDocument).filter(BidDocument.id == bid_document_id).first()
-            bid_doc.total_score = analysis_result['total_score']
-            bid_doc.detailed_scores = analysis_result['detailed_scores']
-            bid_doc.extracted_price = analysis_result['extracted_price']
+            result = session.query(AnalysisResult).filter(AnalysisResult.bid_document_id == bid_document_id).first()
+            if result is None:
+                result = AnalysisResult(project_id=project_id, bid_document_id=bid_document_id)
+                session.add(result)
+            result.total_score = analysis_result['total_score']
+            result.extracted_price = analysis_result['extracted_price']
+            result.ai_model = analysis_result['ai_model']
+            # 明细得分保存在 rule_score 表中
+            replace_result_scores(session, result, analysis_result['detailed_scores'], model=result.ai_model)
             session.commit()
             
             print("   ✓ 分析结果已保存到数据库")
@@ -10,7 +10,7 @@ import logging
 import sys
 import traceback
 import time
-import threading
+import multiprocessing
 from typing import List, Optional, Dict, Any, cast
 from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
@@ -23,7 +23,7 @@ from fastapi import (
     Depends,
     BackgroundTasks,
 )
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -38,16 +38,44 @@ from modules.database import (
     BidDocument,
     AnalysisResult,
     ScoringRule,
+    AnalysisProgress,
+    RuleScore,
+    upgrade_database,
 )
+from modules.progress_channel import get_progress_channel, set_event_sink, publish_event
+from modules.progress_events import event_bus
 from modules.intelligent_bid_analyzer import IntelligentBidAnalyzer
 from modules.price_score_calculator import PriceScoreCalculator
+from modules.batch_price_recalc import SETTLED_BID_STATUSES, BatchPriceRecalculator
+from modules.price_candidates import PriceCandidateStore, candidate_to_dict, reextract_project_prices
+from modules.rule_checkpoints import document_hash
+from modules.scoring_model import ScoreEditError, scoring_models
+from modules.background_jobs import BackgroundJobRegistry
+from modules.scoring_rule_cache import extract_scoring_rules_cached
+from modules.scoring_rule_store import replace_project_rules
+from modules.rule_scores import (
+    load_detailed_scores,
+    migrate_detailed_scores,
+    parse_detailed_scores,
+    replace_result_scores,
+)
 from modules.bidder_name_extractor import extract_bidder_name_from_file
-from modules.summary_generator import generate_summary_data
-from modules.runtime_config import load_config, save_config
-
-
-# 评分规则提取器
-from modules.scoring_extractor import IntelligentScoringExtractor
+from modules.project_summary import get_project_summary, refresh_project_summary
+from modules.project_listing import DEFAULT_PAGE_SIZE, list_projects
+from modules.runtime_config import load_config, save_config, get_int
+from modules.cancellation import (
+    AnalysisCancelled,
+    CancellationToken,
+    request_cancel_bid,
+    request_cancel_project,
+    is_project_cancelled,
+    clear_cancellation,
+)
+from modules.local_ai_analyzer import LocalAIAnalyzer
+from modules.incremental_analysis import (
+    plan_reanalysis,
+    rebuild_scores_from_checkpoints,
+)
 
 
 # 跨平台路径处理
@@ -145,12 +173,29 @@ def get_db():
         db.close()
 
 
-# 创建一个进程池
-executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+# 分析工作进程通过该队列把进度增量推送回Web进程；队列、进程池和后台任务登记表在服务启动时创建
+progress_event_queue = None
+executor: Optional[ProcessPoolExecutor] = None
+# 后台任务（评分规则提取等），接口立即返回任务ID
+background_jobs: Optional[BackgroundJobRegistry] = None
+
+
+def _init_analysis_worker(event_queue):
+    """分析工作进程初始化：进度事件写入跨进程队列"""
+    set_event_sink(event_queue.put_nowait)
 
-# 创建上传目录
+
+# Web进程内产生的进度事件直接发布到事件总线
+set_event_sink(event_bus.publish)
+
+# SSE心跳间隔（秒），防止代理断开空闲连接
+SSE_HEARTBEAT_INTERVAL = 15
+
+# 项目分析结束的状态
+TERMINAL_PROJECT_STATUSES = ('completed', 'completed_with_errors', 'cancelled')
+
+# 上传目录
 UPLOADS_DIR = get_platform_safe_path('uploads')
-safe_makedirs(UPLOADS_DIR)
 
 # 配置静态文件和模板
 app.mount(
@@ -158,10 +203,40 @@ app.mount(
 )
 templates = Jinja2Templates(directory=get_platform_safe_path('templates'))
 
-# 创建数据库表
-TenderProject.metadata.create_all(bind=engine)
-BidDocument.metadata.create_all(bind=engine)
-AnalysisResult.metadata.create_all(bind=engine)
+
+@app.on_event('startup')
+async def start_services():
+    """
+    服务启动：升级数据库，创建分析进程池和后台任务登记表，启动进度事件转发
+
+    这些工作不放在模块顶层执行：表格识别的工作进程以 spawn 方式启动，会把启动脚本
+    重新导入为 __mp_main__，以 python main.py 启动时模块顶层代码会在每个工作进程中再执行一遍。
+    """
+    global progress_event_queue, executor, background_jobs
+
+    safe_makedirs(UPLOADS_DIR)
+
+    # 创建数据库表并升级旧数据库
+    TenderProject.metadata.create_all(bind=engine)
+    BidDocument.metadata.create_all(bind=engine)
+    AnalysisResult.metadata.create_all(bind=engine)
+    upgrade_database()
+
+    # 旧数据库中JSON格式的明细得分迁移到 rule_score 表（已迁移时只是一次查询）
+    migration_db = SessionLocal()
+    try:
+        migrate_detailed_scores(migration_db)
+    finally:
+        migration_db.close()
+
+    progress_event_queue = multiprocessing.Queue()
+    executor = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_analysis_worker,
+        initargs=(progress_event_queue,),
+    )
+    background_jobs = BackgroundJobRegistry()
+    event_bus.start_pump(progress_event_queue)
 
 
 class UpdateBidderNameRequest(BaseModel):
@@ -179,6 +254,12 @@ class UpdateRuntimeConfigRequest(BaseModel):
     pdf_page_max_workers: Optional[int] = None
     pdf_page_timeout_sec: Optional[int] = None
     pdf_overall_min_timeout_sec: Optional[int] = None
+    progress_flush_interval_sec: Optional[int] = None
+    analysis_timeout_sec: Optional[int] = None
+    price_recalc_max_workers: Optional[int] = None
+    table_full_scan: Optional[bool] = None
+    table_extract_max_workers: Optional[int] = None
+    checkpoint_commit_every: Optional[int] = None
 
 
 # 运行参数（内存缓存）
@@ -205,6 +286,23 @@ async def update_runtime_config(payload: UpdateRuntimeConfigRequest):
     if payload.pdf_overall_min_timeout_sec is not None:
         v = max(30, min(3600, int(payload.pdf_overall_min_timeout_sec)))
         cfg['pdf_overall_min_timeout_sec'] = v
+    if payload.progress_flush_interval_sec is not None:
+        v = max(1, min(30, int(payload.progress_flush_interval_sec)))
+        cfg['progress_flush_interval_sec'] = v
+    if payload.analysis_timeout_sec is not None:
+        v = max(60, min(7200, int(payload.analysis_timeout_sec)))
+        cfg['analysis_timeout_sec'] = v
+    if payload.price_recalc_max_workers is not None:
+        v = max(1, min(16, int(payload.price_recalc_max_workers)))
+        cfg['price_recalc_max_workers'] = v
+    if payload.table_full_scan is not None:
+        cfg['table_full_scan'] = bool(payload.table_full_scan)
+    if payload.table_extract_max_workers is not None:
+        v = max(1, min(16, int(payload.table_extract_max_workers)))
+        cfg['table_extract_max_workers'] = v
+    if payload.checkpoint_commit_every is not None:
+        v = max(1, min(100, int(payload.checkpoint_commit_every)))
+        cfg['checkpoint_commit_every'] = v
     save_config(cfg)
     RUNTIME_CONFIG = load_config()
     return JSONResponse(content=RUNTIME_CONFIG)
@@ -247,6 +345,7 @@ async def update_bidder_name(
         if ar:
             ar.bidder_name = new_name  # type: ignore[assignment]
             db.commit()
+            refresh_project_summary(db, bid.project_id)
 
         logging.info(
             f'已将投标方名称由 "{old_name}" 更新为 "{new_name}" (bid_id={bid_id})'
@@ -332,6 +431,67 @@ def extract_pdf_text_background(file_path: str, bidder_name: str):
         return (bidder_name, [], False)
 
 
+def _set_bid_state(db, bid_document, status, current_rule, error_message=None):
+    """提交投标文件的状态切换，并立即同步到进度快照"""
+    bid_document.processing_status = status
+    bid_document.progress_current_rule = current_rule
+    if error_message is not None:
+        bid_document.error_message = error_message
+    db.commit()
+    get_progress_channel().report(
+        bid_document.id,
+        bid_document.project_id,
+        status=status,
+        current_rule=current_rule,
+        error_message=error_message,
+        bidder_name=bid_document.bidder_name,
+    )
+
+
+def _seed_progress_snapshots(bid_documents):
+    """启动分析时为每个投标文件写入初始进度快照"""
+    channel = get_progress_channel()
+    for doc in bid_documents:
+        channel.report(
+            doc.id,
+            doc.project_id,
+            status=doc.processing_status,
+            completed=0,
+            total=0,
+            current_rule=doc.progress_current_rule,
+            bidder_name=doc.bidder_name,
+        )
+    channel.flush()
+
+
+def _provisional_price_scores(db, project_id: int):
+    """某个投标方价格提取完成后调用：所有投标方价格齐全时提前计算价格分并通知前端"""
+    if PriceScoreCalculator(db_session=db).calculate_provisional_price_scores(project_id):
+        publish_event(
+            {'type': 'price_scores', 'project_id': project_id, 'provisional': True}
+        )
+
+
+def _reset_price_extracted(project_id: int, bid_document_ids):
+    """重新分析前清除价格提取标记和暂定价格分认领，避免用旧价格提前计算价格分"""
+    if not bid_document_ids:
+        return
+    db = SessionLocal()
+    try:
+        db.query(BidDocument).filter(BidDocument.id.in_(bid_document_ids)).update(
+            {'price_extracted': False}, synchronize_session=False
+        )
+        db.query(TenderProject).filter(TenderProject.id == project_id).update(
+            {'provisional_priced_at': None}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        logging.error(f'重置价格提取标记时出错: {e}')
+        db.rollback()
+    finally:
+        db.close()
+
+
 def analysis_task(project_id: int, bid_document_id: int):
     """
     This function runs in a separate process.
@@ -361,17 +521,23 @@ def analysis_task(project_id: int, bid_document_id: int):
         tender_file_path = project.tender_file_path
         if not tender_file_path or not Path(tender_file_path).exists():
             logging.error('招标文件不存在: %s', tender_file_path)
-            bid_document.processing_status = 'error'
-            bid_document.error_message = '招标文件不存在'
-            bid_document.progress_current_rule = '分析失败'
-            db.commit()
+            _set_bid_state(
+                db, bid_document, 'error', '分析失败', error_message='招标文件不存在'
+            )
             return
 
-        bid_document.processing_status = 'processing'
+        # 超时与取消统一由令牌在分析各阶段协作检查，不再用守护线程 join 超时
+        cancel_token = CancellationToken(
+            bid_document_id,
+            project_id,
+            timeout_sec=get_int(load_config(), 'analysis_timeout_sec', 1800),
+        )
+        # 排队期间已被取消的任务直接结束，立即释放工作进程
+        cancel_token.check()
+
         bid_document.progress_completed_rules = 0
         bid_document.progress_total_rules = 0
-        bid_document.progress_current_rule = '初始化分析...'
-        db.commit()
+        _set_bid_state(db, bid_document, 'processing', '初始化分析...')
 
         # 优化：在分析前预加载PDF文本（这将从缓存中快速读取）
         try:
@@ -379,16 +545,23 @@ def analysis_task(project_id: int, bid_document_id: int):
             logging.info(f'为分析任务预加载PDF文本: {bid_document.file_path}')
             pdf_processor = PDFProcessor(bid_document.file_path)
             # 调用extract_text_per_page会优先从缓存加载，速度很快
-            extracted_pages = pdf_processor.extract_text_per_page(use_cache=True)
+            extracted_pages = pdf_processor.extract_text_per_page(
+                use_cache=True, cancel_token=cancel_token
+            )
             if not extracted_pages or not any(extracted_pages):
                 raise ValueError('未能从缓存或文件中加载有效的PDF文本内容。')
             logging.info(f'成功预加载 {len(extracted_pages)} 页文本')
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             logging.error(f'在分析前加载PDF文本失败: {e}')
-            bid_document.processing_status = 'error'
-            bid_document.error_message = f'加载PDF文本失败: {e}'
-            bid_document.progress_current_rule = '分析失败'
-            db.commit()
+            _set_bid_state(
+                db,
+                bid_document,
+                'error',
+                '分析失败',
+                error_message=f'加载PDF文本失败: {e}',
+            )
             return
 
         analyzer = IntelligentBidAnalyzer(
@@ -398,74 +571,27 @@ def analysis_task(project_id: int, bid_document_id: int):
             bid_document_id=bid_document.id,
             project_id=project_id,
             extracted_text=extracted_pages,  # 传入已提取的文本
+            cancel_token=cancel_token,
+            on_price_extracted=lambda price: _provisional_price_scores(db, project_id),
         )
 
-        result_data = None
-        analysis_error = None
-
-        def run_analysis():
-            nonlocal result_data, analysis_error
-            try:
-                result_data = analyzer.analyze()
-            except Exception as e:
-                analysis_error = e
-
-        analysis_thread = threading.Thread(target=run_analysis)
-        analysis_thread.daemon = True
-
-        try:
-            logging.info('开始分析投标文件 %s', bid_document_id)
-            start_time = time.time()
-            analysis_thread.start()
-            analysis_thread.join(timeout=1800)
-            end_time = time.time()
-            analysis_duration = end_time - start_time
-
-            if analysis_thread.is_alive():
-                logging.error('分析超时 for bid_id %s', bid_document.id)
-                bid_document.processing_status = 'error'
-                bid_document.error_message = '分析超时，请重试'
-                bid_document.progress_current_rule = '分析超时'
-                db.commit()
-                return
-            elif analysis_error:
-                logging.error(
-                    '分析过程中发生异常 for bid_id %s: %s',
-                    bid_document.id,
-                    str(analysis_error),
-                )
-                bid_document.processing_status = 'error'
-                bid_document.error_message = f'分析异常: {str(analysis_error)}'
-                bid_document.progress_current_rule = '分析异常'
-                db.commit()
-                return
-            else:
-                logging.info('分析完成，耗时 %.2f 秒', analysis_duration)
-
-        except Exception as e:
-            logging.error(
-                '分析过程中发生异常 for bid_id %s: %s', bid_document_id, str(e)
-            )
-            bid_document.processing_status = 'error'
-            bid_document.error_message = f'分析异常: {str(e)}'
-            bid_document.progress_current_rule = '分析异常'
-            db.commit()
-            return
+        logging.info('开始分析投标文件 %s', bid_document_id)
+        start_time = time.time()
+        result_data = analyzer.analyze()
+        logging.info('分析完成，耗时 %.2f 秒', time.time() - start_time)
 
         if result_data is None:
             logging.error('分析结果为空 for bid_id %s', bid_document_id)
-            bid_document.processing_status = 'error'
-            bid_document.error_message = '分析结果为空'
-            bid_document.progress_current_rule = '分析失败'
-            db.commit()
+            _set_bid_state(
+                db, bid_document, 'error', '分析失败', error_message='分析结果为空'
+            )
             return
 
         if not isinstance(result_data, dict):
             logging.error('分析结果格式错误 for bid_id %s', bid_document_id)
-            bid_document.processing_status = 'error'
-            bid_document.error_message = '分析结果格式错误'
-            bid_document.progress_current_rule = '分析失败'
-            db.commit()
+            _set_bid_state(
+                db, bid_document, 'error', '分析失败', error_message='分析结果格式错误'
+            )
             return
 
         assert isinstance(result_data, dict)
@@ -476,10 +602,9 @@ def analysis_task(project_id: int, bid_document_id: int):
                 bid_document_id,
                 result_data['error'],
             )
-            bid_document.processing_status = 'error'
-            bid_document.error_message = result_data['error']
-            bid_document.progress_current_rule = '分析出错'
-            db.commit()
+            _set_bid_state(
+                db, bid_document, 'error', '分析出错', error_message=result_data['error']
+            )
             return
 
         total_score = result_data.get('total_score', 0)
@@ -490,34 +615,65 @@ def analysis_task(project_id: int, bid_document_id: int):
         if price_score == 0 and detailed_scores:
             price_score = _extract_price_score_from_detailed_scores(detailed_scores)
 
-        # 确保同一项目下同一投标文件（或同一投标人）不会产生重复结果
-        try:
-            db.query(AnalysisResult).filter(
+        # 取消后不再写入分析结果
+        cancel_token.check()
+
+        # 价格提取后已建立暂定结果（可能已提前算出价格分），在其上更新而不是删除重建，
+        # 同一项目下同一投标文件只保留一条结果
+        existing_results = (
+            db.query(AnalysisResult)
+            .filter(
                 AnalysisResult.project_id == project_id,
                 AnalysisResult.bid_document_id == bid_document_id,
-            ).delete()
-        except Exception:
-            pass
-
-        analysis_result = AnalysisResult(
-            project_id=project_id,
-            bid_document_id=bid_document_id,
-            bidder_name=bid_document.bidder_name,
-            total_score=total_score,
-            price_score=price_score,
-            extracted_price=extracted_price,
-            detailed_scores=json.dumps(detailed_scores, ensure_ascii=False),
-            analysis_summary=result_data.get('analysis_summary', 'Analysis complete.'),
-            ai_model=result_data.get('ai_model', 'Unknown'),
-            scoring_method=result_data.get('scoring_method', 'AI'),
-            is_modified=False,
-            modification_count=0,
+            )
+            .order_by(AnalysisResult.id)
+            .all()
         )
+        for duplicate in existing_results[1:]:
+            db.delete(duplicate)
+        analysis_result = existing_results[0] if existing_results else None
+        if analysis_result is None:
+            analysis_result = AnalysisResult(
+                project_id=project_id, bid_document_id=bid_document_id
+            )
+            db.add(analysis_result)
+        elif price_score == 0 and analysis_result.price_score:
+            # 保留提前计算的价格分，总分 = 规则得分 + 价格分
+            price_score = analysis_result.price_score
+            total_score = (total_score or 0) + price_score
+
+        analysis_result.bidder_name = bid_document.bidder_name
+        analysis_result.total_score = total_score
+        analysis_result.price_score = price_score
+        analysis_result.extracted_price = extracted_price
+        analysis_result.analysis_summary = result_data.get(
+            'analysis_summary', 'Analysis complete.'
+        )
+        analysis_result.ai_model = result_data.get('ai_model', 'Unknown')
+        replace_result_scores(
+            db,
+            analysis_result,
+            parse_detailed_scores(detailed_scores) or [],
+            model=analysis_result.ai_model,
+        )
+        analysis_result.scoring_method = result_data.get('scoring_method', 'AI')
+        analysis_result.is_modified = False
+        analysis_result.modification_count = 0
+        analysis_result.analyzed_at = datetime.datetime.utcnow()
 
-        db.add(analysis_result)
-        bid_document.processing_status = 'completed'
-        db.commit()
+        _set_bid_state(db, bid_document, 'completed', '分析完成')
+        refresh_project_summary(db, project_id)
         logging.info('Successfully completed analysis for bid_id: %s', bid_document_id)
+    except AnalysisCancelled as e:
+        logging.warning('分析任务结束 for bid_id %s: %s', bid_document_id, e)
+        if db and bid_document:
+            db.rollback()
+            if e.reason == 'timeout':
+                _set_bid_state(
+                    db, bid_document, 'error', '分析超时', error_message='分析超时，请重试'
+                )
+            else:
+                _set_bid_state(db, bid_document, 'cancelled', '已取消')
     except Exception as e:
         logging.error(
             'A critical error occurred in analysis_task for bid_id %s:',
@@ -525,10 +681,16 @@ def analysis_task(project_id: int, bid_document_id: int):
         )
         logging.error(traceback.format_exc())
         if db and bid_document:
-            bid_document.processing_status = 'error'
-            bid_document.error_message = f'Critical error: {str(e)}'
-            db.commit()
+            db.rollback()
+            _set_bid_state(
+                db,
+                bid_document,
+                'error',
+                '分析失败',
+                error_message=f'Critical error: {str(e)}',
+            )
     finally:
+        get_progress_channel().forget(bid_document_id)
         if db:
             db.close()
 
@@ -590,63 +752,14 @@ def run_analysis_and_calculate_prices(project_id: int, bid_files_info: list):
             )
             if existing_rules == 0:
                 logging.info(f'项目 {project_id} 没有评分规则，开始提取...')
-                # 使用统一的评分规则提取方法
-                extractor = IntelligentScoringExtractor()
-                scoring_rules = extractor.extract(project.tender_file_path)
+                # 相同招标文件提取过时直接复用缓存的规则树
+                scoring_rules, _ = extract_scoring_rules_cached(
+                    db, project.tender_file_path
+                )
 
                 if scoring_rules:
-                    # Manually save rules to the database
-                    db.query(ScoringRule).filter(
-                        ScoringRule.project_id == project_id
-                    ).delete()
-
-                    def save_rule_recursive(rule_data, project_id, parent_name=None):
-                        """递归保存评分规则（父项填 Parent_Item_Name，子项填 Child_Item_Name）"""
-                        is_price = bool(rule_data.get('is_price_criteria', False))
-                        children = rule_data.get('children') or []
-
-                        if children or is_price:
-                            # 保存父项（或价格父项）
-                            db_rule = ScoringRule(
-                                project_id=project_id,
-                                Parent_Item_Name=rule_data.get('criteria_name'),
-                                Parent_max_score=rule_data.get('max_score'),
-                                description=rule_data.get('description', ''),
-                                is_price_criteria=is_price,
-                            )
-                            if is_price:
-                                db_rule.price_formula = rule_data.get('price_formula')
-                            db_rule.Child_Item_Name = None
-                            db_rule.Child_max_score = None
-
-                            db.add(db_rule)
-                            db.flush()
-
-                            # 递归保存子项，传递父项名称
-                            for child_rule in children:
-                                save_rule_recursive(
-                                    child_rule,
-                                    project_id,
-                                    parent_name=rule_data.get('criteria_name'),
-                                )
-                        else:
-                            # 保存子项（叶子）
-                            db_rule = ScoringRule(
-                                project_id=project_id,
-                                Parent_Item_Name=parent_name,
-                                Parent_max_score=None,
-                                Child_Item_Name=rule_data.get('criteria_name'),
-                                Child_max_score=rule_data.get('max_score'),
-                                description=rule_data.get('description', ''),
-                                is_price_criteria=False,
-                            )
-                            db.add(db_rule)
-                            db.flush()
-
-                    for rule_data in scoring_rules:
-                        save_rule_recursive(rule_data, project_id)
-
-                    db.commit()
+                    replace_project_rules(db, project_id, scoring_rules)
+                    scoring_models.invalidate(project_id)
                     logging.info(
                         '成功提取并保存 %s 条评分规则到数据库', len(scoring_rules)
                     )
@@ -659,19 +772,55 @@ def run_analysis_and_calculate_prices(project_id: int, bid_files_info: list):
     finally:
         db.close()
 
+    _reset_price_extracted(project_id, [bid_info['id'] for bid_info in bid_files_info])
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
-    futures = [
-        loop.run_in_executor(executor, analysis_task, project_id, bid_info['id'])
-        for bid_info in bid_files_info
-    ]
-
-    loop.run_until_complete(asyncio.gather(*futures))
+    try:
+        futures = [
+            loop.run_in_executor(executor, analysis_task, project_id, bid_info['id'])
+            for bid_info in bid_files_info
+        ]
+        loop.run_until_complete(asyncio.gather(*futures))
+    except Exception as e:
+        _publish_analysis_failed(project_id, f'分析任务异常终止: {e}')
+        raise
+    finally:
+        loop.close()
     logging.info(f'项目 {project_id} 的所有分析任务已完成。')
 
+    _finalize_project_scores(project_id)
+
+
+def _publish_analysis_failed(project_id: int, message: str):
+    """分析或汇总出错时推送终止事件，让进度 SSE 连接结束而不是一直等待"""
+    logging.error('项目 %s 分析未正常结束: %s', project_id, message)
+    event_bus.publish({'type': 'failed', 'project_id': project_id, 'error': message})
+
+
+def _finalize_project_scores(project_id: int):
+    """统一计算价格分和总分，并根据投标文件状态更新项目状态"""
     db = SessionLocal()
+    finished = False
     try:
+        # 分析失败或取消的投标方只留下了暂定结果（没有规则得分），不参与价格分计算
+        unfinished_ids = [
+            row.id
+            for row in db.query(BidDocument.id).filter(
+                BidDocument.project_id == project_id,
+                BidDocument.processing_status.in_(('error', 'cancelled')),
+            )
+        ]
+        if unfinished_ids:
+            db.query(AnalysisResult).filter(
+                AnalysisResult.bid_document_id.in_(unfinished_ids),
+                ~db.query(RuleScore.id)
+                .filter(RuleScore.analysis_result_id == AnalysisResult.id)
+                .exists(),
+            ).delete(synchronize_session=False)
+            db.commit()
+
         logging.info(f'开始为项目 {project_id} 计算价格分。')
         calculator = PriceScoreCalculator(db_session=db)
         price_scores_result = calculator.calculate_project_price_scores(project_id)
@@ -690,6 +839,8 @@ def run_analysis_and_calculate_prices(project_id: int, bid_files_info: list):
             )
         else:
             logging.warning('项目 %s 未能计算出任何价格分。', project_id)
+            # 价格分计算成功时已刷新汇总表
+            refresh_project_summary(db, project_id)
 
         project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
         if project is not None:
@@ -703,16 +854,76 @@ def run_analysis_and_calculate_prices(project_id: int, bid_files_info: list):
                 > 0
             )
 
-            project.status = 'completed_with_errors' if has_errors else 'completed'
+            if is_project_cancelled(project_id):
+                project.status = 'cancelled'
+            else:
+                project.status = 'completed_with_errors' if has_errors else 'completed'
             db.commit()
             logging.info('项目 %s 的状态已更新为 %s。', project_id, project.status)
+            event_bus.publish(
+                {
+                    'type': 'project',
+                    'project_id': project_id,
+                    'project_status': project.status,
+                }
+            )
+            finished = True
 
     except Exception as e:
         logging.error(f'为项目 {project_id} 计算价格分时出错: {e}')
         logging.error(traceback.format_exc())
     finally:
         db.close()
-        loop.close()
+        if not finished:
+            _publish_analysis_failed(project_id, '计算价格分或更新项目状态时出错')
+
+
+def run_incremental_reanalysis(project_id: int, plan: Dict[str, Any]):
+    """按增量计划执行：过期的投标方重新分析（检查点跳过未变规则），其余直接重建明细"""
+    logging.info(
+        '项目 %s 增量重新分析：%s 个投标方需重新评估（%s 个规则组合），%s 个投标方直接重建',
+        project_id,
+        len(plan['reanalyze']),
+        plan['stale_pairs'],
+        len(plan['rebuild']),
+    )
+    model = LocalAIAnalyzer().model
+    reanalyze_ids = list(plan['reanalyze'].keys())
+
+    db = SessionLocal()
+    try:
+        from modules.pdf_processor import PDFProcessor
+        for bid_id in plan['rebuild']:
+            doc = db.query(BidDocument).filter(BidDocument.id == bid_id).first()
+            if doc is None:
+                continue
+            # 页面文本从缓存读取，用于计算各规则的上下文哈希
+            pages = PDFProcessor(doc.file_path).extract_text_per_page(use_cache=True)
+            if not rebuild_scores_from_checkpoints(db, doc, model, pages):
+                reanalyze_ids.append(bid_id)
+    except Exception as e:
+        logging.error(f'重建项目 {project_id} 的明细得分时出错: {e}')
+        db.rollback()
+    finally:
+        db.close()
+
+    if reanalyze_ids:
+        _reset_price_extracted(project_id, reanalyze_ids)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            futures = [
+                loop.run_in_executor(executor, analysis_task, project_id, bid_id)
+                for bid_id in reanalyze_ids
+            ]
+            loop.run_until_complete(asyncio.gather(*futures))
+        except Exception as e:
+            _publish_analysis_failed(project_id, f'重新分析任务异常终止: {e}')
+            raise
+        finally:
+            loop.close()
+
+    _finalize_project_scores(project_id)
 
 
 @app.post('/api/upload')
@@ -828,6 +1039,12 @@ async def confirm_names_and_start_analysis(
         
         project.status = 'processing'
         db.commit()
+        clear_cancellation(project.id, [info['id'] for info in bid_files_info])
+        _seed_progress_snapshots(
+            db.query(BidDocument)
+            .filter(BidDocument.id.in_([info['id'] for info in bid_files_info]))
+            .all()
+        )
         
         logging.info(f'项目 {project_id} 名称已确认，即将开始后台分析...')
         
@@ -846,19 +1063,26 @@ async def confirm_names_and_start_analysis(
 
 
 
-@app.get('/api/projects/{project_id}/analysis-status')
-async def get_analysis_status(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
-    if not project:
-        return JSONResponse(status_code=404, content={'error': 'Project not found'})
+def _build_analysis_status(db: Session, project: TenderProject) -> Dict[str, Any]:
+    """组装项目分析状态（轮询接口与SSE初始快照共用）"""
+    project_id = project.id
+    # 优先读取进度通道写入的快照，不触碰分析过程中频繁写入的 bid_document 表
+    snapshots = (
+        db.query(AnalysisProgress)
+        .filter(AnalysisProgress.project_id == project_id)
+        .order_by(AnalysisProgress.bid_document_id)
+        .all()
+    )
+    if snapshots:
+        status_data = [dict(s.snapshot or {}) for s in snapshots]
+        return {'project_status': project.status, 'bids': status_data}
 
+    # 尚未开始分析的项目（没有快照）回退到 bid_document 表
     bid_documents = (
         db.query(BidDocument).filter(BidDocument.project_id == project_id).all()
     )
 
     status_data = []
-    all_completed = True
-    has_errors = False
     for doc in bid_documents:
         partial_results = None
         if bool(doc.partial_analysis_results):
@@ -885,14 +1109,90 @@ async def get_analysis_status(project_id: int, db: Session = Depends(get_db)):
                 'id': doc.id,
             }
         )
-        if doc.processing_status not in ['completed', 'error']:
-            all_completed = False
-        if doc.processing_status == 'error':
-            has_errors = True
 
     # 状态更新由后台统一流程在价格分计算完成后设置，避免前端过早认为已完成
 
-    return JSONResponse(content={'project_status': project.status, 'bids': status_data})
+    return {'project_status': project.status, 'bids': status_data}
+
+
+def _load_analysis_status(project_id: int) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+        if not project:
+            return None
+        return _build_analysis_status(db, project)
+    finally:
+        db.close()
+
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+@app.get('/api/projects/{project_id}/analysis-status')
+async def get_analysis_status(project_id: int, db: Session = Depends(get_db)):
+    project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+    if not project:
+        return JSONResponse(status_code=404, content={'error': 'Project not found'})
+
+    return JSONResponse(content=_build_analysis_status(db, project))
+
+
+@app.get('/api/projects/{project_id}/analysis-events')
+async def stream_analysis_events(project_id: int, request: Request):
+    """
+    以 Server-Sent Events 推送分析进度
+
+    连接建立后先发送一次完整快照（snapshot），之后只推送增量（progress）和
+    项目状态变化（project）；订阅队列溢出时重新发送完整快照。
+    项目进入终止状态或分析异常终止（failed）后结束推送。
+    """
+    # 先订阅再读取快照，避免两者之间产生的事件丢失
+    subscriber = event_bus.subscribe(project_id)
+    initial = await asyncio.to_thread(_load_analysis_status, project_id)
+    if initial is None:
+        event_bus.unsubscribe(subscriber)
+        return JSONResponse(status_code=404, content={'error': 'Project not found'})
+
+    async def event_stream():
+        try:
+            yield _format_sse('snapshot', initial)
+            if initial['project_status'] in TERMINAL_PROJECT_STATUSES:
+                return
+            while True:
+                if await request.is_disconnected():
+                    break
+                if subscriber.needs_resync:
+                    subscriber.needs_resync = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    snapshot = await asyncio.to_thread(_load_analysis_status, project_id)
+                    if snapshot is None:
+                        break
+                    yield _format_sse('snapshot', snapshot)
+                    continue
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=SSE_HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield ': heartbeat\n\n'
+                    continue
+                yield _format_sse(event.get('type', 'progress'), event)
+                if event.get('type') == 'failed' or (
+                    event.get('type') == 'project'
+                    and event.get('project_status') in TERMINAL_PROJECT_STATUSES
+                ):
+                    break
+        finally:
+            event_bus.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 @app.get('/api/projects/{project_id}/results')
@@ -908,37 +1208,26 @@ async def get_analysis_results(project_id: int, db: Session = Depends(get_db)):
             status_code=404, content={'error': 'Results not found for this project'}
         )
 
+    # 规则评分尚未完成的结果只含提前计算的暂定价格分
+    bid_statuses = dict(
+        db.query(BidDocument.id, BidDocument.processing_status)
+        .filter(BidDocument.project_id == project_id)
+        .all()
+    )
+
+    # 明细得分一次查询读出，不再逐条解析JSON
+    details = load_detailed_scores(db, [res.id for res in results])
+
     response_data = []
     for res in results:
+        detailed_scores = details[res.id]
         price_score = getattr(res, 'price_score', None)
-        # 确保价格分正确处理，如果为None则尝试从detailed_scores中提取
+        # 价格分为空时取明细中的价格评分项
         if price_score is None:
-            try:
-                detailed_scores = (
-                    json.loads(res.detailed_scores)
-                    if isinstance(res.detailed_scores, str)
-                    else res.detailed_scores
-                )
-                # 如果detailed_scores是字典格式，尝试从中查找价格分
-                if isinstance(detailed_scores, dict):
-                    for key, value in detailed_scores.items():
-                        if '价格' in key or 'price' in key.lower():
-                            if isinstance(value, (int, float)):
-                                price_score = value
-                                break
-                            elif isinstance(value, dict) and 'score' in value:
-                                price_score = value['score']
-                                break
-                # 如果detailed_scores是列表格式，尝试从中查找价格分
-                elif isinstance(detailed_scores, list):
-                    for item in detailed_scores:
-                        if isinstance(item, dict) and item.get(
-                            'is_price_criteria', False
-                        ):
-                            price_score = item.get('score', 0)
-                            break
-            except Exception as e:
-                logging.error(f'解析价格分时出错: {e}')
+            price_score = next(
+                (item['score'] for item in detailed_scores if item['is_price_criteria']),
+                None,
+            )
 
         response_data.append(
             {
@@ -947,13 +1236,12 @@ async def get_analysis_results(project_id: int, db: Session = Depends(get_db)):
                 'total_score': res.total_score,
                 'price_score': price_score,
                 'extracted_price': res.extracted_price,
-                'detailed_scores': json.loads(res.detailed_scores)
-                if isinstance(res.detailed_scores, str)
-                else res.detailed_scores,
+                'detailed_scores': detailed_scores,
                 'dynamic_scores': json.loads(res.dynamic_scores)
                 if isinstance(res.dynamic_scores, str)
                 else (res.dynamic_scores or {}),
                 'ai_model': res.ai_model,
+                'is_provisional': bid_statuses.get(res.bid_document_id) != 'completed',
             }
         )
 
@@ -1010,36 +1298,36 @@ async def get_scoring_rules(project_id: int, db: Session = Depends(get_db)):
 
 
 @app.get('/api/projects')
-async def get_all_projects(db: Session = Depends(get_db)):
-    projects = db.query(TenderProject).all()
-
-    response_data = []
-    for project in projects:
-        bid_count = (
-            db.query(BidDocument).filter(BidDocument.project_id == project.id).count()
-        )
-        result_count = (
-            db.query(AnalysisResult)
-            .filter(AnalysisResult.project_id == project.id)
-            .count()
-        )
-
-        response_data.append(
-            {
-                'id': project.id,
-                'project_code': project.project_code,
-                'name': project.name,
-                'description': project.description,
-                'created_at': project.created_at.isoformat()
-                if project.created_at
-                else None,
-                'status': project.status,
-                'bid_count': bid_count,
-                'result_count': result_count,
-            }
-        )
+async def get_all_projects(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime.date] = None,
+    created_to: Optional[datetime.date] = None,
+    bidder: Optional[str] = None,
+    q: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    分页列出项目（从新到旧）
 
-    return JSONResponse(content=response_data)
+    - cursor：上一页返回的 next_cursor
+    - status：逗号分隔的项目状态
+    - created_from / created_to：创建日期范围（YYYY-MM-DD，含两端）
+    - bidder：投标方名称包含的文字；q：项目名称、编号或投标方名称包含的文字
+    """
+    statuses = [item.strip() for item in (status or '').split(',') if item.strip()]
+    page = list_projects(
+        db,
+        limit=limit,
+        cursor=cursor,
+        statuses=statuses,
+        created_from=created_from,
+        created_to=created_to,
+        bidder=bidder,
+        q=q,
+    )
+    return JSONResponse(content=page)
 
 
 @app.get('/api/projects/{project_id}/bid-documents/{bid_document_id}/failed-pages')
@@ -1078,7 +1366,7 @@ async def get_failed_pages_info(
 @app.get('/api/projects/{project_id}/dynamic-summary')
 async def get_dynamic_summary(project_id: int, db: Session = Depends(get_db)):
     try:
-        summary_data = generate_summary_data(project_id, db)
+        summary_data = get_project_summary(db, project_id)
         if isinstance(summary_data, dict) and 'error' in summary_data:
             return JSONResponse(status_code=404, content=summary_data)
         return JSONResponse(content=summary_data)
@@ -1091,8 +1379,55 @@ async def get_dynamic_summary(project_id: int, db: Session = Depends(get_db)):
         )
 
 
+class BatchRecalculatePriceScoresRequest(BaseModel):
+    """请求体：批量重算价格分，按项目ID列表和/或筛选条件选择项目"""
+
+    project_ids: Optional[List[int]] = None
+    status: Optional[List[str]] = None
+    name_contains: Optional[str] = None
+    dry_run: bool = False
+    force_reextract: bool = False  # 全部投标文件重新提取价格（默认只重新提取旧版本提取器的结果）
+
+
+@app.post('/api/projects/recalculate-price-scores')
+async def batch_recalculate_price_scores(payload: BatchRecalculatePriceScoresRequest):
+    """批量重算多个项目的价格分和总分，返回每个项目各投标方的前后差异"""
+    if not payload.project_ids and not payload.status and not payload.name_contains:
+        return JSONResponse(
+            status_code=400,
+            content={'error': '请提供项目ID列表或筛选条件（status、name_contains）'},
+        )
+    try:
+        recalculator = BatchPriceRecalculator(
+            max_workers=get_int(RUNTIME_CONFIG, 'price_recalc_max_workers', 4)
+        )
+        loop = asyncio.get_running_loop()
+        project_ids = await loop.run_in_executor(
+            None,
+            recalculator.resolve_project_ids,
+            payload.project_ids,
+            payload.status,
+            payload.name_contains,
+        )
+        if not project_ids:
+            return JSONResponse(status_code=404, content={'error': '没有符合条件的项目'})
+        summary = await loop.run_in_executor(
+            None, recalculator.recalculate, project_ids, payload.dry_run, payload.force_reextract
+        )
+        return JSONResponse(content=summary)
+    except Exception as e:
+        logging.error(f'批量重算价格分时出错: {e}')
+        return JSONResponse(
+            status_code=500,
+            content={'error': f'批量重算价格分时出错: {str(e)}'},
+        )
+
+
 @app.post('/api/projects/{project_id}/recalculate-price-scores')
-async def recalculate_price_scores(project_id: int, db: Session = Depends(get_db)):
+def recalculate_price_scores(
+    project_id: int, force_reextract: bool = False, db: Session = Depends(get_db)
+):
+    """重算项目价格分：旧版本提取器提取的价格先重新提取，force_reextract 时全部重新提取"""
     try:
         project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
         if not project:
@@ -1109,7 +1444,7 @@ async def recalculate_price_scores(project_id: int, db: Session = Depends(get_db
         incomplete_bids = [
             doc
             for doc in bid_documents
-            if doc.processing_status not in ['completed', 'error']
+            if doc.processing_status not in SETTLED_BID_STATUSES
         ]
         if incomplete_bids:
             return JSONResponse(
@@ -1119,6 +1454,8 @@ async def recalculate_price_scores(project_id: int, db: Session = Depends(get_db
                 },
             )
 
+        if reextract_project_prices(db, project_id, force=force_reextract):
+            db.commit()
         calculator = PriceScoreCalculator(db_session=db)
         price_scores = calculator.calculate_project_price_scores(project_id)
 
@@ -1312,6 +1649,8 @@ async def start_analysis(
             
         project.status = 'processing'
         db.commit()
+        clear_cancellation(project_id, [d.id for d in bid_documents])
+        _seed_progress_snapshots(bid_documents)
         logging.info(f'项目 {project_id} 已更新 {updated_count} 个投标方名称，开始分析')
 
         # 启动后台分析
@@ -1329,19 +1668,371 @@ async def start_analysis(
         return JSONResponse(status_code=500, content={'error': f'服务器内部错误: {str(e)}'})
 
 
+@app.post('/api/projects/{project_id}/resume-analysis')
+async def resume_analysis(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """只重新启动项目中未完成的投标方（已完成的规则通过检查点直接复用）"""
+    try:
+        project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+        if not project:
+            return JSONResponse(status_code=404, content={'error': '项目不存在'})
+
+        unfinished = (
+            db.query(BidDocument)
+            .filter(
+                BidDocument.project_id == project_id,
+                BidDocument.processing_status != 'completed',
+            )
+            .all()
+        )
+        if not unfinished:
+            return JSONResponse(
+                content={'message': '没有需要恢复的投标方', 'project_id': project_id, 'resumed': 0}
+            )
+
+        for doc in unfinished:
+            doc.processing_status = 'pending'
+            doc.progress_current_rule = '等待恢复分析...'
+            doc.error_message = None
+        project.status = 'processing'
+        db.commit()
+        clear_cancellation(project_id, [d.id for d in unfinished])
+        _seed_progress_snapshots(unfinished)
+        logging.info(f'项目 {project_id} 恢复分析 {len(unfinished)} 个未完成的投标方')
+
+        bid_files_info = [
+            {'id': d.id, 'path': d.file_path, 'bidder_name': d.bidder_name}
+            for d in unfinished
+        ]
+        background_tasks.add_task(
+            run_analysis_and_calculate_prices, project_id, bid_files_info
+        )
+
+        return JSONResponse(
+            content={
+                'message': '已恢复分析',
+                'project_id': project_id,
+                'resumed': len(unfinished),
+            }
+        )
+    except Exception as e:
+        logging.error(f'恢复分析时出错: {e}')
+        return JSONResponse(status_code=500, content={'error': f'服务器内部错误: {str(e)}'})
+
+
+def _start_incremental_reanalysis(
+    db: Session, project: TenderProject, background_tasks: BackgroundTasks
+) -> Dict[str, Any]:
+    """计算增量计划、标记需要重新分析的投标方，并在后台执行"""
+    plan = plan_reanalysis(db, project.id, LocalAIAnalyzer().model)
+    pending_docs = []
+    if plan['reanalyze']:
+        pending_docs = (
+            db.query(BidDocument)
+            .filter(BidDocument.id.in_(list(plan['reanalyze'].keys())))
+            .all()
+        )
+        for doc in pending_docs:
+            doc.processing_status = 'pending'
+            doc.progress_current_rule = '等待增量分析...'
+            doc.error_message = None
+    project.status = 'processing'
+    db.commit()
+    clear_cancellation(project.id, [d.id for d in pending_docs])
+    _seed_progress_snapshots(pending_docs)
+
+    background_tasks.add_task(run_incremental_reanalysis, project.id, plan)
+    return {
+        'project_id': project.id,
+        'reanalyze_bidders': len(plan['reanalyze']),
+        'stale_pairs': plan['stale_pairs'],
+        'rebuilt_bidders': len(plan['rebuild']),
+    }
+
+
+@app.post('/api/projects/{project_id}/incremental-reanalysis')
+async def incremental_reanalysis(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """只重新评估规则或投标文件发生变化的（投标方, 规则）组合，并重算总分和价格分"""
+    try:
+        project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+        if not project:
+            return JSONResponse(status_code=404, content={'error': '项目不存在'})
+        summary = _start_incremental_reanalysis(db, project, background_tasks)
+        return JSONResponse(content={'message': '增量分析已启动', **summary})
+    except Exception as e:
+        logging.error(f'启动增量分析时出错: {e}')
+        return JSONResponse(status_code=500, content={'error': f'服务器内部错误: {str(e)}'})
+
+
+class UpdateScoringRuleRequest(BaseModel):
+    """请求体：修改单条评分规则（只更新提供的字段）"""
+
+    Parent_Item_Name: Optional[str] = None
+    Parent_max_score: Optional[int] = None
+    Child_Item_Name: Optional[str] = None
+    Child_max_score: Optional[int] = None
+    description: Optional[str] = None
+    is_veto: Optional[bool] = None
+    price_formula: Optional[str] = None
+    reanalyze: bool = True  # 修改后是否立即增量重新分析
+
+
+@app.patch('/api/projects/{project_id}/scoring-rules/{rule_id}')
+async def update_scoring_rule(
+    project_id: int,
+    rule_id: int,
+    payload: UpdateScoringRuleRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """修改评分规则，并只对受影响的（投标方, 规则）组合重新评估"""
+    try:
+        rule = (
+            db.query(ScoringRule)
+            .filter(ScoringRule.id == rule_id, ScoringRule.project_id == project_id)
+            .first()
+        )
+        if not rule:
+            return JSONResponse(status_code=404, content={'error': '评分规则不存在'})
+
+        for field in (
+            'Parent_Item_Name',
+            'Parent_max_score',
+            'Child_Item_Name',
+            'Child_max_score',
+            'description',
+            'is_veto',
+            'price_formula',
+        ):
+            value = getattr(payload, field)
+            if value is not None:
+                setattr(rule, field, value)
+        db.commit()
+        scoring_models.invalidate(project_id)
+        refresh_project_summary(db, project_id)
+
+        content: Dict[str, Any] = {'message': '评分规则已更新', 'rule_id': rule_id}
+        has_results = (
+            db.query(AnalysisResult.id)
+            .filter(AnalysisResult.project_id == project_id)
+            .first()
+            is not None
+        )
+        if payload.reanalyze and has_results:
+            project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+            content.update(_start_incremental_reanalysis(db, project, background_tasks))
+        return JSONResponse(content=content)
+    except Exception as e:
+        logging.error(f'修改评分规则时出错: {e}')
+        db.rollback()
+        return JSONResponse(status_code=500, content={'error': f'服务器内部错误: {str(e)}'})
+
+
+@app.post('/api/projects/{project_id}/bid-documents/{bid_document_id}/replace')
+async def replace_bid_document(
+    project_id: int,
+    bid_document_id: int,
+    background_tasks: BackgroundTasks,
+    bid_file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    """替换单个投标文件，只重新分析该投标方，其余投标方直接复用已有评估"""
+    try:
+        project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+        doc = (
+            db.query(BidDocument)
+            .filter(
+                BidDocument.id == bid_document_id,
+                BidDocument.project_id == project_id,
+            )
+            .first()
+        )
+        if not project or not doc:
+            return JSONResponse(status_code=404, content={'error': '投标文件不存在'})
+
+        file_path = save_upload_file(
+            bid_file,
+            get_platform_safe_path(
+                UPLOADS_DIR, f'{project_id}_bid_{bid_document_id}_{bid_file.filename}'
+            ),
+        )
+        doc.file_path = file_path
+        doc.file_size = Path(file_path).stat().st_size
+        doc.failed_pages_info = None
+        doc.price_extracted = False
+        doc.price_extraction_error = None
+        db.commit()
+        logging.info(f'投标文件 {bid_document_id} 已替换为 {file_path}')
+
+        summary = _start_incremental_reanalysis(db, project, background_tasks)
+        return JSONResponse(content={'message': '投标文件已替换，增量分析已启动', **summary})
+    except Exception as e:
+        logging.error(f'替换投标文件时出错: {e}')
+        return JSONResponse(status_code=500, content={'error': f'服务器内部错误: {str(e)}'})
+
+
+@app.post('/api/projects/{project_id}/bid-documents/{bid_document_id}/cancel')
+async def cancel_bid_analysis(
+    project_id: int, bid_document_id: int, db: Session = Depends(get_db)
+):
+    """取消单个投标方的分析（排队中的任务不再启动，进行中的任务在下一个检查点结束）"""
+    doc = (
+        db.query(BidDocument)
+        .filter(BidDocument.id == bid_document_id, BidDocument.project_id == project_id)
+        .first()
+    )
+    if not doc:
+        return JSONResponse(status_code=404, content={'error': '投标文件不存在'})
+    if doc.processing_status not in ('pending', 'processing'):
+        return JSONResponse(
+            status_code=400,
+            content={'error': f'投标文件当前状态为 {doc.processing_status}，无需取消'},
+        )
+    request_cancel_bid(bid_document_id)
+    logging.info(f'已请求取消投标文件 {bid_document_id} 的分析')
+    return JSONResponse(
+        content={'message': '已请求取消', 'bid_document_id': bid_document_id}
+    )
+
+
+def _get_project_bid_document(db: Session, project_id: int, bid_document_id: int):
+    return (
+        db.query(BidDocument)
+        .filter(BidDocument.id == bid_document_id, BidDocument.project_id == project_id)
+        .first()
+    )
+
+
+def _price_candidate_store(db: Session, doc: BidDocument) -> PriceCandidateStore:
+    return PriceCandidateStore(
+        db, doc.id, document_hash(doc.file_path) if doc.file_path else None
+    )
+
+
+@app.get('/api/projects/{project_id}/bid-documents/{bid_document_id}/price-candidates')
+async def get_price_candidates(
+    project_id: int, bid_document_id: int, db: Session = Depends(get_db)
+):
+    """查看投标文件当前版本的全部价格候选（来源、置信度、排除原因、是否选中）"""
+    doc = _get_project_bid_document(db, project_id, bid_document_id)
+    if not doc:
+        return JSONResponse(status_code=404, content={'error': '投标文件不存在'})
+    store = _price_candidate_store(db, doc)
+    _, selected_price = store.lookup()
+    return JSONResponse(
+        content={
+            'bid_document_id': bid_document_id,
+            'bidder_name': doc.bidder_name,
+            'selected_price': selected_price,
+            'candidates': [candidate_to_dict(row) for row in store.load()],
+        }
+    )
+
+
+class OverridePriceRequest(BaseModel):
+    """请求体：人工指定投标价格，price 为空时撤销人工指定"""
+
+    price: Optional[float] = None
+    modified_by: Optional[str] = None
+
+
+@app.put('/api/projects/{project_id}/bid-documents/{bid_document_id}/price')
+def override_bid_price(
+    project_id: int,
+    bid_document_id: int,
+    payload: OverridePriceRequest,
+    db: Session = Depends(get_db),
+):
+    """人工指定投标价格并立即重算项目价格分，无需重新分析"""
+    if payload.price is not None and payload.price <= 0:
+        return JSONResponse(status_code=400, content={'error': '价格必须大于0'})
+    doc = _get_project_bid_document(db, project_id, bid_document_id)
+    if not doc:
+        return JSONResponse(status_code=404, content={'error': '投标文件不存在'})
+    try:
+        store = _price_candidate_store(db, doc)
+        price = store.override(payload.price, payload.modified_by)
+        db.query(AnalysisResult).filter(
+            AnalysisResult.project_id == project_id,
+            AnalysisResult.bid_document_id == bid_document_id,
+        ).update({'extracted_price': price}, synchronize_session=False)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        return JSONResponse(status_code=400, content={'error': str(e)})
+    except Exception as e:
+        db.rollback()
+        logging.error(f'指定投标文件 {bid_document_id} 的价格时出错: {e}')
+        return JSONResponse(status_code=500, content={'error': f'指定价格时出错: {str(e)}'})
+
+    recalculated = False
+    has_results = (
+        db.query(AnalysisResult).filter(AnalysisResult.project_id == project_id).count() > 0
+    )
+    if has_results:
+        recalculated = PriceScoreCalculator(db_session=db).calculate_project_price_scores(
+            project_id
+        )
+    logging.info(
+        f'投标文件 {bid_document_id} 的价格已{"指定为 " + str(price) if payload.price is not None else "恢复自动选择"}'
+    )
+    return JSONResponse(
+        content={
+            'message': '价格已更新' if payload.price is not None else '已撤销人工指定的价格',
+            'bid_document_id': bid_document_id,
+            'selected_price': price,
+            'price_scores_recalculated': recalculated,
+        }
+    )
+
+
+@app.post('/api/projects/{project_id}/cancel')
+async def cancel_project_analysis(project_id: int, db: Session = Depends(get_db)):
+    """取消整个项目的分析"""
+    project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+    if not project:
+        return JSONResponse(status_code=404, content={'error': '项目不存在'})
+    running = (
+        db.query(BidDocument)
+        .filter(
+            BidDocument.project_id == project_id,
+            BidDocument.processing_status.in_(['pending', 'processing']),
+        )
+        .count()
+    )
+    request_cancel_project(project_id)
+    logging.info(f'已请求取消项目 {project_id} 的分析，涉及 {running} 个投标方')
+    return JSONResponse(
+        content={'message': '已请求取消', 'project_id': project_id, 'running': running}
+    )
+
+
 @app.post('/api/analysis-results/bulk-update-scores')
 async def bulk_update_scores(
     score_updates: List[ScoreUpdateItem], db: Session = Depends(get_db)
 ):
-    updated_count = 0
-    for update in score_updates:
-        result = db.query(AnalysisResult).filter(AnalysisResult.id == update.id).first()
-        if result:
-            result.total_score = update.total_score
-            updated_count += 1
+    # 一次查询取出全部待更新的分析结果
+    totals = {update.id: update.total_score for update in score_updates}
+    results = (
+        db.query(AnalysisResult).filter(AnalysisResult.id.in_(totals.keys())).all()
+        if totals
+        else []
+    )
+    for result in results:
+        result.total_score = totals[result.id]
+    updated_count = len(results)
 
     if updated_count > 0:
         db.commit()
+        for project_id in sorted({result.project_id for result in results}):
+            refresh_project_summary(db, project_id)
         logging.info(f'成功更新了 {updated_count} 条分析结果的总分。')
         return JSONResponse(
             content={'message': f'成功更新了 {updated_count} 条分析结果的总分。'}
@@ -1353,99 +2044,139 @@ async def bulk_update_scores(
         )
 
 
+class ScoreEditItem(BaseModel):
+    result_id: int
+    criteria_name: str  # 评分子项名称，修改价格分时为“价格分”
+    parent_name: Optional[str] = None  # 子项名称在多个父项下出现时指定父项
+    score: float
+    reason: Optional[str] = None
+
+
+class ScoreEditRequest(BaseModel):
+    """请求体：一批分数修改；dry_run 为 True 时只试算排名，不保存"""
+
+    edits: List[ScoreEditItem]
+    modified_by: Optional[str] = None
+    reason: Optional[str] = None
+    dry_run: bool = False
+
+
+@app.post('/api/projects/{project_id}/score-edits')
+async def edit_scores(
+    project_id: int, payload: ScoreEditRequest, db: Session = Depends(get_db)
+):
+    """在内存得分矩阵上应用分数修改，立即返回新的排名；非试算时批量写回并记录修改历史"""
+    start_time = time.perf_counter()
+    edits = [
+        {
+            'result_id': edit.result_id,
+            'criteria_name': edit.criteria_name,
+            'parent_name': edit.parent_name,
+            'score': edit.score,
+            'reason': edit.reason,
+        }
+        for edit in payload.edits
+    ]
+    try:
+        with scoring_models.lock(project_id):
+            model = scoring_models.get(db, project_id)
+            if payload.dry_run:
+                rankings = model.what_if(edits)
+                changed, saved = [], 0
+            else:
+                changed = model.apply(edits, payload.modified_by, payload.reason)
+                saved = model.flush(db)
+                rankings = model.rankings()
+    except ScoreEditError as e:
+        return JSONResponse(status_code=400, content={'error': str(e)})
+    except Exception as e:
+        scoring_models.invalidate(project_id)
+        logging.error(f'修改项目 {project_id} 的分数时出错: {e}')
+        return JSONResponse(status_code=500, content={'error': f'修改分数时出错: {str(e)}'})
+
+    return JSONResponse(
+        content={
+            'dry_run': payload.dry_run,
+            'saved': saved,
+            'changed_result_ids': changed,
+            'rankings': rankings,
+            'elapsed_ms': round((time.perf_counter() - start_time) * 1000, 2),
+        }
+    )
+
+
+@app.get('/api/projects/{project_id}/rankings')
+async def get_rankings(project_id: int, db: Session = Depends(get_db)):
+    """从内存得分矩阵读取当前排名"""
+    with scoring_models.lock(project_id):
+        rankings = scoring_models.get(db, project_id).rankings()
+    if not rankings:
+        return JSONResponse(status_code=404, content={'error': '该项目没有找到分析结果。'})
+    return JSONResponse(content=rankings)
+
+
+def _extract_scoring_rules_job(project_id: int, refresh: bool = False) -> Dict[str, Any]:
+    """后台任务：从招标文件提取评分规则并保存，返回规则数、规则树及是否来自缓存"""
+    db = SessionLocal()
+    try:
+        project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+        if not project:
+            raise ValueError('项目不存在')
+        scoring_rules, from_cache = extract_scoring_rules_cached(
+            db, project.tender_file_path, refresh=refresh
+        )
+        if not scoring_rules:
+            raise ValueError('提取评分规则失败')
+        replace_project_rules(db, project_id, scoring_rules)
+        # 规则签名只含数量、最大ID和满分之和，SQLite 复用已删除的ID时签名可能不变，必须显式失效
+        scoring_models.invalidate(project_id)
+        logging.info('项目 %s 成功提取并保存 %s 条评分规则', project_id, len(scoring_rules))
+        return {'count': len(scoring_rules), 'rules': scoring_rules, 'from_cache': from_cache}
+    finally:
+        db.close()
+
+
 @app.post('/api/projects/{project_id}/extract-scoring-rules')
 async def extract_scoring_rules_api(
-    project_id: int, request: Request, db: Session = Depends(get_db)
+    project_id: int, request: Request, refresh: bool = False, db: Session = Depends(get_db)
 ) -> JSONResponse:
     """
-    从项目关联的招标文件中提取评分规则
+    从项目关联的招标文件中提取评分规则（后台任务）
+
+    立即返回任务ID，通过 /api/jobs/{job_id} 查询进度和结果；
+    同一项目的提取任务未结束时返回已有任务。
+    相同内容的招标文件提取过时复用缓存的规则树，refresh=true 时重新提取并刷新缓存。
 
     Args:
         project_id: 项目ID
         request: 请求对象
+        refresh: 是否绕过评分规则缓存重新提取
         db: 数据库会话
 
     Returns:
         JSON响应
     """
-    # 添加返回类型提示以提高类型安全性
-    try:
-        # 获取项目信息
-        project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
-        if not project:
-            return JSONResponse(status_code=404, content={'error': '项目不存在'})
+    project = db.query(TenderProject).filter(TenderProject.id == project_id).first()
+    if not project:
+        return JSONResponse(status_code=404, content={'error': '项目不存在'})
 
-        # 检查项目是否有招标文件
-        if not project.tender_file_path or not Path(project.tender_file_path).exists():
-            return JSONResponse(
-                status_code=400, content={'error': '项目没有关联的招标文件'}
-            )
+    # 检查项目是否有招标文件
+    if not project.tender_file_path or not Path(project.tender_file_path).exists():
+        return JSONResponse(status_code=400, content={'error': '项目没有关联的招标文件'})
 
-        # 使用评分提取器提取评分规则
-        extractor = IntelligentScoringExtractor()
-        scoring_rules = extractor.extract(project.tender_file_path)
-
-        # 保存到数据库
-        if scoring_rules:
-            # Manually save rules to the database
-            db.query(ScoringRule).filter(ScoringRule.project_id == project_id).delete()
-
-            def save_rule_recursive(rule_data, project_id, parent_id=None):
-                """递归保存评分规则"""
-                # 创建评分规则对象
-                db_rule = ScoringRule(
-                    project_id=project_id,
-                    Parent_Item_Name=rule_data.get('criteria_name'),
-                    Parent_max_score=rule_data.get('max_score'),
-                    description=rule_data.get('description', ''),
-                    is_price_criteria=bool(rule_data.get('is_price_criteria', False)),
-                )
+    job = background_jobs.submit(
+        'extract_scoring_rules', project_id, _extract_scoring_rules_job, project_id, refresh
+    )
+    return JSONResponse(status_code=202, content=job)
 
-                # 如果是价格规则，设置价格公式字段（保留解析器生成的公式）
-                if db_rule.is_price_criteria:
-                    db_rule.price_formula = rule_data.get('price_formula')
-                    db_rule.Child_Item_Name = None
-                    db_rule.Child_max_score = None
-                else:
-                    # 对于非价格规则，如果有子项，需要特殊处理
-                    if 'children' in rule_data and rule_data['children']:
-                        # 父项规则，子项信息将在子项规则中保存
-                        db_rule.Child_Item_Name = None
-                        db_rule.Child_max_score = None
-                    else:
-                        # 叶子节点规则（没有子项）
-                        db_rule.Child_Item_Name = rule_data.get('criteria_name')
-                        db_rule.Child_max_score = rule_data.get('max_score')
-
-                        db.add(db_rule)
-                        db.flush()  # 获取生成的ID
-
-                        # 递归保存子项
-                        if 'children' in rule_data and rule_data['children']:
-                            for child_rule in rule_data['children']:
-                                save_rule_recursive(
-                                    child_rule, project_id, parent_id=db_rule.id
-                                )
-
-                    for rule_data in scoring_rules:
-                        save_rule_recursive(rule_data, project_id)
-
-                    db.commit()
-                    return JSONResponse(
-                        content={
-                            'message': '评分规则提取并保存成功',
-                            'count': len(scoring_rules),
-                            'rules': scoring_rules,
-                        }
-                    )
-        else:
-            return JSONResponse(status_code=500, content={'error': '提取评分规则失败'})
 
-    except Exception as e:
-        logging.error(f'提取评分规则API出错: {e}')
-        return JSONResponse(
-            status_code=500, content={'error': f'提取评分规则时发生错误: {str(e)}'}
-        )
+@app.get('/api/jobs/{job_id}')
+async def get_background_job(job_id: str) -> JSONResponse:
+    """查询后台任务的状态；完成后 result 为任务结果，失败时 error 为原因"""
+    job = background_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={'error': '任务不存在'})
+    return JSONResponse(content=job)
 
 
 if __name__ == '__main__':
@@ -40,6 +40,18 @@ def migrate_database():
                 conn.commit()
                 print(f"成功添加{column_name}字段到bid_document表")
         
+        # 规则检查点表增加增量分析所需的指纹字段（表不存在时由程序启动时自动创建）
+        cursor.execute("PRAGMA table_info(rule_evaluation_checkpoint)")
+        column_names = [column[1] for column in cursor.fetchall()]
+        if column_names:
+            for column_name in ('rule_fingerprint', 'document_hash'):
+                if column_name in column_names:
+                    print(f"{column_name}字段已存在，无需添加")
+                else:
+                    cursor.execute(f"ALTER TABLE rule_evaluation_checkpoint ADD COLUMN {column_name} VARCHAR(64)")
+                    conn.commit()
+                    print(f"成功添加{column_name}字段到rule_evaluation_checkpoint表")
+
         return True
         
     except sqlite3.Error as e:
@@ -0,0 +1,110 @@
+"""
+后台任务模块
+耗时的接口（如从招标文件提取评分规则）提交为后台任务后立即返回任务ID，
+调用方凭任务ID查询状态和结果；任务状态变化同时推送到项目事件流。
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from modules.progress_channel import publish_event
+
+logger = logging.getLogger(__name__)
+
+# 任务结束状态
+FINISHED_JOB_STATUSES = ('completed', 'failed')
+
+
+class BackgroundJobRegistry:
+    """
+    后台任务登记表（仅在当前进程内存中）
+
+    任务在线程池中运行；同一项目同一类任务未结束时重复提交返回已有任务。
+    结束的任务只保留最近 keep_finished 个。
+    """
+
+    def __init__(self, max_workers: int = 2, keep_finished: int = 200):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.keep_finished = keep_finished
+
+    def submit(self, kind: str, project_id: int, fn: Callable[..., Any], *args) -> Dict[str, Any]:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型，如 extract_scoring_rules
+            project_id: 项目ID
+            fn: 任务函数，返回值作为任务结果（需可JSON序列化）
+
+        Returns:
+            Dict: 任务快照
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if (
+                    job['kind'] == kind
+                    and job['project_id'] == project_id
+                    and job['status'] not in FINISHED_JOB_STATUSES
+                ):
+                    return dict(job)
+            job = {
+                'job_id': uuid.uuid4().hex,
+                'kind': kind,
+                'project_id': project_id,
+                'status': 'pending',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+            }
+            self._jobs[job['job_id']] = job
+            self._prune()
+            snapshot = dict(job)
+        self._pool.submit(self._run, job['job_id'], fn, args)
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """返回任务快照，不存在时返回 None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields)
+            event = {
+                'type': 'job',
+                'project_id': job['project_id'],
+                'job_id': job_id,
+                'kind': job['kind'],
+                'status': job['status'],
+            }
+        publish_event(event)
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args):
+        self._update(job_id, status='running', started_at=time.time())
+        try:
+            result = fn(*args)
+        except Exception as e:
+            logger.error(f'后台任务 {job_id} 失败: {e}', exc_info=True)
+            self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+            return
+        self._update(job_id, status='completed', result=result, finished_at=time.time())
+
+    def _prune(self):
+        finished = [
+            job for job in self._jobs.values() if job['status'] in FINISHED_JOB_STATUSES
+        ]
+        if len(finished) <= self.keep_finished:
+            return
+        finished.sort(key=lambda job: job['finished_at'] or 0)
+        for job in finished[: len(finished) - self.keep_finished]:
+            del self._jobs[job['job_id']]
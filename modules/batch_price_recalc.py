@@ -0,0 +1,226 @@
+"""
+批量价格分重算模块
+修复价格提取问题后，需要对大量项目重新计算价格分和总分。
+按项目ID列表或筛选条件一次性查出项目，未完成分析的项目用一次分组查询排除；
+价格候选由旧版本提取器提取的投标文件先重新提取价格（force_reextract 时全部重新提取）；
+每个项目在独立的工作线程和数据库会话中：一次查询价格规则、一次查询分析结果所需的列、一次分组求和规则得分，
+计算后批量更新并只提交一次，返回每个投标方更新前后的价格分与总分。
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import func
+
+from modules.database import SessionLocal, TenderProject, BidDocument, AnalysisResult, ScoringRule
+from modules.price_score_calculator import PriceScoreCalculator
+from modules.price_candidates import load_selected_prices, reextract_project_prices
+from modules.rule_scores import other_scores_totals
+from modules.project_summary import refresh_project_summary
+
+
+logger = logging.getLogger(__name__)
+
+# 投标文件处于这些状态之外时，说明项目仍在分析中，不参与重算
+SETTLED_BID_STATUSES = ('completed', 'error', 'cancelled')
+
+
+def incomplete_bid_counts_query(db_session, project_ids: List[int]):
+    """各项目中仍在分析（状态不在 SETTLED_BID_STATUSES 中）的投标文件数"""
+    return (
+        db_session.query(BidDocument.project_id, func.count(BidDocument.id))
+        .filter(
+            BidDocument.project_id.in_(project_ids),
+            ~BidDocument.processing_status.in_(SETTLED_BID_STATUSES),
+        )
+        .group_by(BidDocument.project_id)
+    )
+
+
+class BatchPriceRecalculator:
+    """多项目价格分批量重算"""
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = 4):
+        self.session_factory = session_factory
+        self.max_workers = max(1, max_workers)
+
+    def resolve_project_ids(
+        self,
+        project_ids: Optional[List[int]] = None,
+        status: Optional[List[str]] = None,
+        name_contains: Optional[str] = None,
+    ) -> List[int]:
+        """按ID列表和/或筛选条件（项目状态、名称关键字）查出待重算的项目ID"""
+        db = self.session_factory()
+        try:
+            query = db.query(TenderProject.id)
+            if project_ids:
+                query = query.filter(TenderProject.id.in_(project_ids))
+            if status:
+                query = query.filter(TenderProject.status.in_(status))
+            if name_contains:
+                query = query.filter(TenderProject.name.contains(name_contains))
+            return [row.id for row in query.order_by(TenderProject.id).all()]
+        finally:
+            db.close()
+
+    def _incomplete_bid_counts(self, project_ids: List[int]) -> Dict[int, int]:
+        """一次分组查询各项目中仍在分析的投标文件数"""
+        db = self.session_factory()
+        try:
+            rows = incomplete_bid_counts_query(db, project_ids).all()
+            return {project_id: count for project_id, count in rows}
+        finally:
+            db.close()
+
+    def recalculate(
+        self, project_ids: List[int], dry_run: bool = False, force_reextract: bool = False
+    ) -> Dict[str, Any]:
+        """
+        并行重算多个项目的价格分
+
+        Args:
+            project_ids: 项目ID列表
+            dry_run: 为 True 时只计算前后差异，不写入数据库
+            force_reextract: 为 True 时全部投标文件重新提取价格（否则只重新提取旧版本提取器的结果）
+
+        Returns:
+            Dict: 汇总信息和每个项目的结果（含每个投标方的前后差异）
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        if not project_ids:
+            return {'total': 0, 'updated': 0, 'skipped': 0, 'failed': 0, 'dry_run': dry_run, 'projects': []}
+
+        incomplete = self._incomplete_bid_counts(project_ids)
+        reports: Dict[int, Dict[str, Any]] = {}
+        runnable = []
+        for project_id in project_ids:
+            if incomplete.get(project_id):
+                reports[project_id] = {
+                    'project_id': project_id,
+                    'status': 'skipped',
+                    'message': f'还有 {incomplete[project_id]} 个投标文件未完成分析',
+                    'bidders': [],
+                }
+            else:
+                runnable.append(project_id)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(runnable)))) as pool:
+            for report in pool.map(
+                lambda pid: self._recalculate_project(pid, dry_run, force_reextract), runnable
+            ):
+                reports[report['project_id']] = report
+
+        projects = [reports[project_id] for project_id in project_ids]
+        summary = {
+            'total': len(projects),
+            'updated': sum(1 for r in projects if r['status'] == 'updated'),
+            'skipped': sum(1 for r in projects if r['status'] == 'skipped'),
+            'failed': sum(1 for r in projects if r['status'] == 'failed'),
+            'dry_run': dry_run,
+            'projects': projects,
+        }
+        logger.info(
+            f"批量重算价格分完成: 共 {summary['total']} 个项目，更新 {summary['updated']}，"
+            f"跳过 {summary['skipped']}，失败 {summary['failed']}"
+        )
+        return summary
+
+    def _recalculate_project(
+        self, project_id: int, dry_run: bool, force_reextract: bool = False
+    ) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            price_rule = (
+                db.query(ScoringRule)
+                .filter(ScoringRule.project_id == project_id, ScoringRule.is_price_criteria == True)
+                .first()
+            )
+            if not price_rule:
+                return self._report(project_id, 'skipped', '没有找到价格评分规则')
+
+            reextracted = reextract_project_prices(
+                db, project_id, force=force_reextract, save=not dry_run
+            )
+            if reextracted and not dry_run:
+                db.commit()
+
+            rows = (
+                db.query(
+                    AnalysisResult.id,
+                    AnalysisResult.bid_document_id,
+                    AnalysisResult.bidder_name,
+                    AnalysisResult.extracted_price,
+                    AnalysisResult.price_score,
+                    AnalysisResult.total_score,
+                )
+                .filter(AnalysisResult.project_id == project_id)
+                .order_by(AnalysisResult.id)
+                .all()
+            )
+            if not rows:
+                return self._report(project_id, 'skipped', '没有找到分析结果')
+
+            calculator = PriceScoreCalculator(db_session=db)
+            selected_prices = load_selected_prices(db, project_id)
+            if dry_run:
+                # 试算时重新提取的价格不保存，覆盖已保存的选中价格
+                selected_prices.update(
+                    {bid_id: price for bid_id, price in reextracted.items() if price is not None}
+                )
+            bidder_prices = calculator._extract_bidder_prices(rows, selected_prices)
+            price_scores = calculator.compute_price_scores(price_rule, bidder_prices)
+            other_totals = other_scores_totals(db, project_id)
+
+            mappings = []
+            bidders = []
+            seen = set()
+            for row in rows:
+                # 与单项目重算一致：同名投标方只更新第一条记录
+                if row.bidder_name in seen:
+                    continue
+                seen.add(row.bidder_name)
+
+                new_price_score = price_scores.get(row.bidder_name, 0)
+                other_scores_total = other_totals.get(row.id, 0)
+                new_total_score = round(other_scores_total + new_price_score, 2)
+
+                mappings.append(
+                    {'id': row.id, 'price_score': new_price_score, 'total_score': new_total_score}
+                )
+                bidders.append(
+                    {
+                        'bidder_name': row.bidder_name,
+                        'extracted_price': bidder_prices.get(row.bidder_name),
+                        'price_score_before': row.price_score,
+                        'price_score_after': new_price_score,
+                        'total_score_before': row.total_score,
+                        'total_score_after': new_total_score,
+                        'total_score_delta': round(new_total_score - (row.total_score or 0), 2),
+                    }
+                )
+
+            if not dry_run:
+                db.bulk_update_mappings(AnalysisResult, mappings)
+                db.commit()
+                refresh_project_summary(db, project_id)
+            message = f'更新了 {len(mappings)} 个投标方'
+            if reextracted:
+                message += f'，重新提取了 {len(reextracted)} 个投标文件的价格'
+            return self._report(project_id, 'updated', message, bidders)
+        except Exception as e:
+            db.rollback()
+            logger.error(f'批量重算项目 {project_id} 的价格分失败: {e}')
+            return self._report(project_id, 'failed', str(e))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _report(project_id: int, status: str, message: str, bidders=None) -> Dict[str, Any]:
+        return {
+            'project_id': project_id,
+            'status': status,
+            'message': message,
+            'bidders': bidders or [],
+        }
@@ -8,6 +8,9 @@ import json
 import re
 from typing import List, Dict, Any, Optional
 from modules.database import BidDocument, AnalysisResult
+from modules.progress_channel import get_progress_channel
+from modules.price_candidates import PriceCandidateStore
+from modules.rule_checkpoints import document_hash
 
 
 class BidAnalyzerHelpers:
@@ -26,52 +29,33 @@ class BidAnalyzerHelpers:
     def _update_progress(self, completed, total, current_rule, partial_results=None):
         """更新分析进度
 
+        进度只写入进程内的进度通道，由通道按限定频率合并落库，
+        不再每条规则查询并提交一次 BidDocument。
+
         Args:
             completed (int): 已完成的规则数量
             total (int): 总规则数量
             current_rule (str): 当前正在分析的规则名称
             partial_results (list): 部分分析结果，用于动态展示
         """
-        if hasattr(self, 'db') and hasattr(self, 'bid_document_id') and self.db and self.bid_document_id:
-            try:
-                bid_doc = (
-                    self.db.query(BidDocument)
-                    .filter(BidDocument.id == self.bid_document_id)
-                    .first()
-                )
-                if bid_doc:
-                    # 确保总规则数正确设置
-                    if total > 0:
-                        bid_doc.progress_total_rules = total
-                    # 更新已完成规则数
-                    bid_doc.progress_completed_rules = completed
-                    
-                    # 使用更新后的投标人名称（如果已提取）
-                    bidder_name_to_use = self.bidder_name if hasattr(self, 'bidder_name') and self.bidder_name != '未知投标方' else bid_doc.bidder_name
-                    progress_info = f"{bidder_name_to_use} - {current_rule}" if current_rule else bidder_name_to_use
-                    
-                    # 限制规则名称长度，避免前端显示问题
-                    bid_doc.progress_current_rule = (
-                        progress_info[:100] if progress_info else None
-                    )
-                    # 同时更新详细进度信息
-                    bid_doc.detailed_progress_info = progress_info
-
-                    # 如果有部分结果，也保存到数据库中供前端展示
-                    if partial_results is not None:
-                        # 只保存前5个结果以避免数据过大
-                        bid_doc.partial_analysis_results = json.dumps(
-                            partial_results[:5], ensure_ascii=False
-                        )
-
-                    # 每次都提交进度更新，确保前端能及时获取到进度变化
-                    self.db.commit()
-                    logging.info(f'进度更新: {completed}/{total} - {progress_info}')
-
-            except Exception as e:
-                logging.error(f'更新进度时出错: {e}')
-                if hasattr(self, 'db'):
-                    self.db.rollback()
+        if not (getattr(self, 'bid_document_id', None) and getattr(self, 'project_id', None)):
+            return
+        try:
+            bidder_name = getattr(self, 'bidder_name', None) or '未知投标方'
+            progress_info = f"{bidder_name} - {current_rule}" if current_rule else bidder_name
+            get_progress_channel().report(
+                self.bid_document_id,
+                self.project_id,
+                completed=completed,
+                total=total if total > 0 else None,
+                current_rule=progress_info,
+                detailed_progress_info=progress_info,
+                partial_results=partial_results,
+                bidder_name=bidder_name,
+            )
+            logging.info(f'进度更新: {completed}/{total} - {progress_info}')
+        except Exception as e:
+            logging.error(f'更新进度时出错: {e}')
 
     def _flatten_rules(self, rules):
         """将树状规则列表扁平化，用于进度计算"""
@@ -190,11 +174,30 @@ class BidAnalyzerHelpers:
             for keyword in ['价格', 'price', '报价', '投标报价']
         )
 
+    def _resolve_best_price(self, bid_pages):
+        """
+        获取投标文件的最佳价格，同一次分析中只解析一次；
+        有数据库会话时读写价格候选存储，内容未变的投标文件不再重新提取
+        """
+        if getattr(self, '_best_price_resolved', False):
+            return self._best_price
+
+        bid_file_path = getattr(self, 'bid_file_path', None)
+        store = PriceCandidateStore(
+            getattr(self, 'db', None),
+            getattr(self, 'bid_document_id', None),
+            document_hash(bid_file_path) if bid_file_path else None,
+        )
+        self._best_price = self.price_manager.resolve_best_price(
+            bid_pages, pdf_path=bid_file_path, store=store
+        )
+        self._best_price_resolved = True
+        return self._best_price
+
     def _handle_price_criteria(self, rule, bid_pages):
         """处理价格分项，只提取价格信息，不进行评分"""
-        # 从投标文件中提取价格信息
-        prices = self.price_manager.extract_prices_from_content(bid_pages)
-        best_price = self.price_manager.select_best_price(prices, bid_pages)
+        # 从投标文件中提取价格信息（同一投标文件只提取一次）
+        best_price = self._resolve_best_price(bid_pages)
 
         # 创建价格分项结果，分数为0，等待后续综合计算
         analyzed_rule = {
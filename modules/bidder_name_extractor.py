@@ -343,7 +343,8 @@ def extract_bidder_name_from_file(file_path: str) -> str | None:
         try:
             from .table_analyzer import TableAnalyzer  # 延迟导入，避免循环依赖
 
-            analyzer = TableAnalyzer(file_path)
+            # 已在分析工作进程中运行，表格识别不再另开进程
+            analyzer = TableAnalyzer(file_path, max_workers=1)
             merged = analyzer.extract_and_merge_tables()
             tables = analyzer.convert_to_structured_format(merged)
 
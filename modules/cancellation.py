@@ -0,0 +1,107 @@
+"""
+分析任务取消模块
+分析运行在独立的工作进程中，取消请求通过标记文件跨进程传递；
+分析流程的各个阶段（PDF提取、上下文检索、AI调用、写库）在检查点主动检查令牌，
+一旦取消或超过截止时间立即抛出 AnalysisCancelled，释放工作进程和进行中的AI请求。
+"""
+
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Iterable
+
+
+logger = logging.getLogger(__name__)
+
+# 标记目录固定在项目根目录下，Web进程与工作进程的当前目录不同时也指向同一位置
+CANCEL_FLAGS_DIR = Path(__file__).resolve().parent.parent / 'temp_cancel_flags'
+
+# 检查标记文件的最小间隔（秒），避免逐页、逐块检查时频繁访问文件系统
+FLAG_POLL_INTERVAL = 0.5
+
+
+class AnalysisCancelled(Exception):
+    """分析被取消或超时"""
+
+    def __init__(self, reason: str = 'cancelled'):
+        self.reason = reason
+        super().__init__('分析超时' if reason == 'timeout' else '分析已取消')
+
+
+def _bid_flag(bid_document_id: int) -> Path:
+    return Path(CANCEL_FLAGS_DIR) / f'bid_{bid_document_id}'
+
+
+def _project_flag(project_id: int) -> Path:
+    return Path(CANCEL_FLAGS_DIR) / f'project_{project_id}'
+
+
+def _touch(flag: Path):
+    flag.parent.mkdir(parents=True, exist_ok=True)
+    flag.touch()
+
+
+def request_cancel_bid(bid_document_id: int):
+    """请求取消单个投标方的分析"""
+    _touch(_bid_flag(bid_document_id))
+
+
+def request_cancel_project(project_id: int):
+    """请求取消整个项目的分析"""
+    _touch(_project_flag(project_id))
+
+
+def is_project_cancelled(project_id: int) -> bool:
+    return _project_flag(project_id).exists()
+
+
+def clear_cancellation(project_id: int, bid_document_ids: Iterable[int] = ()):
+    """重新启动分析前清除遗留的取消标记"""
+    for flag in [_project_flag(project_id)] + [_bid_flag(i) for i in bid_document_ids]:
+        try:
+            flag.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f'清除取消标记失败: {flag}, {e}')
+
+
+class CancellationToken:
+    """单个投标方分析任务的取消令牌（可在工作进程中安全使用）"""
+
+    def __init__(
+        self,
+        bid_document_id: int,
+        project_id: int,
+        timeout_sec: Optional[float] = None,
+    ):
+        self.bid_document_id = bid_document_id
+        self.project_id = project_id
+        self.deadline = time.monotonic() + timeout_sec if timeout_sec else None
+        self._reason: Optional[str] = None
+        self._last_poll = 0.0
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason
+
+    def is_cancelled(self) -> bool:
+        if self._reason is not None:
+            return True
+        now = time.monotonic()
+        if self.deadline is not None and now >= self.deadline:
+            self._reason = 'timeout'
+            return True
+        if now - self._last_poll >= FLAG_POLL_INTERVAL:
+            self._last_poll = now
+            if _bid_flag(self.bid_document_id).exists() or _project_flag(
+                self.project_id
+            ).exists():
+                self._reason = 'cancelled'
+                return True
+        return False
+
+    def check(self):
+        """已取消或超时时抛出 AnalysisCancelled"""
+        if self.is_cancelled():
+            raise AnalysisCancelled(self._reason or 'cancelled')
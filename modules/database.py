@@ -1,5 +1,4 @@
 from sqlalchemy import (
-    create_engine,
     Column,
     Integer,
     String,
@@ -8,20 +7,34 @@ from sqlalchemy import (
     JSON,
     Boolean,
     ForeignKey,
+    Index,
+    UniqueConstraint,
+    inspect,
+    text,
 )
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 import datetime
 
-DATABASE_URL = 'sqlite:///./tender_evaluation.db'
+from modules.db_config import create_db_engine, get_database_url, register_fork_handler
 
-engine = create_engine(DATABASE_URL, connect_args={'check_same_thread': False})
+# 可通过环境变量 DATABASE_URL 改用其他数据库（见 modules/db_config.py）
+DATABASE_URL = get_database_url()
+
+engine = create_db_engine(DATABASE_URL)
+register_fork_handler(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
 class TenderProject(Base):
     __tablename__ = 'tender_project'
+    __table_args__ = (
+        # 项目列表按状态筛选并按ID倒序分页
+        Index('ix_tender_project_status_id', 'status', 'id'),
+        Index('ix_tender_project_created_at', 'created_at'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     project_code = Column(String, unique=True, index=True)
     name = Column(String, index=True)
@@ -30,6 +43,8 @@ class TenderProject(Base):
     scoring_rules_summary = Column(JSON)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     status = Column(String, default='new')
+    # 暂定价格分已被某个分析工作进程认领计算的时间，重新分析前清空
+    provisional_priced_at = Column(DateTime)
     bid_documents = relationship('BidDocument', back_populates='project')
     analysis_results = relationship('AnalysisResult', back_populates='project')
     scoring_rules = relationship('ScoringRule', back_populates='project')
@@ -38,6 +53,10 @@ class TenderProject(Base):
 
 class BidDocument(Base):
     __tablename__ = 'bid_document'
+    __table_args__ = (
+        # 按项目列出投标文件、按项目统计各处理状态
+        Index('ix_bid_document_project_status', 'project_id', 'processing_status'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey('tender_project.id'))
     bidder_name = Column(String)
@@ -70,6 +89,11 @@ class BidDocument(Base):
 
 class AnalysisResult(Base):
     __tablename__ = 'analysis_result'
+    __table_args__ = (
+        # 按项目取结果并按总分排名
+        Index('ix_analysis_result_project_total', 'project_id', 'total_score'),
+        Index('ix_analysis_result_bid_document', 'bid_document_id'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey('tender_project.id'))
     bid_document_id = Column(Integer, ForeignKey('bid_document.id'))
@@ -77,6 +101,8 @@ class AnalysisResult(Base):
     total_score = Column(Float)
     price_score = Column(Float)  # Adding price score field
     extracted_price = Column(Float) # Extracted bid price
+    # 旧版的JSON明细得分（曾以JSON字符串双重编码保存），现由 rule_score 表保存，
+    # 启动时迁移到 rule_score 后清空，见 modules/rule_scores.py
     detailed_scores = Column(JSON)
     # 添加动态评分项字段，用于存储各评分项的得分
     dynamic_scores = Column(JSON, default=dict)  # 存储动态评分项得分，key为评分项简称，value为得分
@@ -94,10 +120,123 @@ class AnalysisResult(Base):
     modification_history = relationship(
         'ScoreModificationHistory', back_populates='analysis_result'
     )
+    rule_scores = relationship(
+        'RuleScore',
+        back_populates='analysis_result',
+        order_by='RuleScore.position',
+        cascade='all, delete-orphan',
+    )
+
+
+class RuleScore(Base):
+    """分析结果中单条评分规则的得分（每个分析结果、每条规则一行）"""
+
+    __tablename__ = 'rule_score'
+    __table_args__ = (
+        # 同一子项名称可能出现在不同父项下，以明细中的顺序区分各行
+        # （重新提取评分规则后规则ID会变化，以父项和子项名称识别同一规则）
+        UniqueConstraint('analysis_result_id', 'position', name='uq_rule_score'),
+        # 按项目汇总各投标方得分
+        Index('ix_rule_score_project_result', 'project_id', 'analysis_result_id'),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    analysis_result_id = Column(Integer, ForeignKey('analysis_result.id'), nullable=False)
+    project_id = Column(Integer, ForeignKey('tender_project.id'))
+    scoring_rule_id = Column(Integer, ForeignKey('scoring_rule.id'), nullable=True)
+    parent_name = Column(String)
+    criteria_name = Column(String, nullable=False)
+    max_score = Column(Float)
+    score = Column(Float)
+    reason = Column(String)
+    model = Column(String)
+    is_price_criteria = Column(Boolean, default=False)
+    position = Column(Integer, default=0)  # 在明细中的顺序
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+    analysis_result = relationship('AnalysisResult', back_populates='rule_scores')
+
+
+class ProjectSummary(Base):
+    """项目汇总表（表头与排名行）的物化结果，分析完成、价格分重算或分数修改后刷新"""
+
+    __tablename__ = 'project_summary'
+    project_id = Column(Integer, ForeignKey('tender_project.id'), primary_key=True)
+    summary = Column(JSON)
+    bidder_count = Column(Integer, default=0)
+    refreshed_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class AnalysisProgress(Base):
+    """分析进度快照（由进度通道合并后写入，状态接口只读此表）"""
+
+    __tablename__ = 'analysis_progress'
+    bid_document_id = Column(Integer, ForeignKey('bid_document.id'), primary_key=True)
+    project_id = Column(Integer, ForeignKey('tender_project.id'), index=True)
+    snapshot = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class RuleEvaluationCheckpoint(Base):
+    """单条评分规则的AI评估检查点，重试或恢复分析时跳过已完成的规则"""
+
+    __tablename__ = 'rule_evaluation_checkpoint'
+    __table_args__ = (
+        UniqueConstraint(
+            'bid_document_id', 'scoring_rule_id', 'context_hash', 'model',
+            name='uq_rule_checkpoint',
+        ),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    bid_document_id = Column(Integer, ForeignKey('bid_document.id'), index=True)
+    scoring_rule_id = Column(Integer, ForeignKey('scoring_rule.id'))
+    context_hash = Column(String(64))
+    model = Column(String)
+    # 规则内容指纹与投标文件内容哈希，用于增量重新分析时判断哪些评估已过期
+    rule_fingerprint = Column(String(64), index=True)
+    document_hash = Column(String(64))
+    score = Column(Float)
+    reason = Column(String)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class PriceCandidate(Base):
+    """投标文件（某一内容版本）提取到的全部价格候选及其来源，选中的价格供后续各环节直接读取"""
+
+    __tablename__ = 'price_candidate'
+    id = Column(Integer, primary_key=True, index=True)
+    bid_document_id = Column(Integer, ForeignKey('bid_document.id'), index=True)
+    document_hash = Column(String(64), index=True)
+    extractor_version = Column(String, nullable=True)  # 提取时的 PriceManager.VERSION，人工指定的价格不受版本影响
+    value = Column(Float)
+    page = Column(Integer, nullable=True)  # 从0开始的页码，人工指定的价格为空
+    reason = Column(String)  # 匹配来源（模式、关键字、表格等）
+    confidence = Column(Float)
+    source = Column(String, default='text')  # text / table / manual
+    exclusion_reason = Column(String, nullable=True)  # 被排除的原因，未排除为空
+    is_selected = Column(Boolean, default=False)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class ScoringRuleCacheEntry(Base):
+    """按招标文件内容哈希和提取器版本缓存的评分规则树，相同招标文件的新项目直接复用"""
+
+    __tablename__ = 'scoring_rule_cache'
+    __table_args__ = (
+        UniqueConstraint('content_hash', 'extractor_version', name='uq_scoring_rule_cache'),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64))
+    extractor_version = Column(String)
+    rules = Column(JSON)
+    rule_count = Column(Integer)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.datetime.utcnow)
 
 
 class ScoringRule(Base):
     __tablename__ = 'scoring_rule'
+    __table_args__ = (Index('ix_scoring_rule_project', 'project_id'),)
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey('tender_project.id'))
     Parent_Item_Name = Column(String(20))
@@ -114,6 +253,9 @@ class ScoringRule(Base):
 
 class ScoreModificationHistory(Base):
     __tablename__ = 'score_modification_history'
+    __table_args__ = (
+        Index('ix_score_history_result_time', 'analysis_result_id', 'modified_at'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     analysis_result_id = Column(Integer, ForeignKey('analysis_result.id'))
     criteria_name = Column(String)
@@ -135,6 +277,9 @@ class ScoreModificationHistory(Base):
 
 class ProjectAuditLog(Base):
     __tablename__ = 'project_audit_log'
+    __table_args__ = (
+        Index('ix_project_audit_log_project_time', 'project_id', 'operation_time'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey('tender_project.id'))
     operation_type = Column(String)
@@ -146,4 +291,164 @@ class ProjectAuditLog(Base):
     project = relationship('TenderProject', back_populates='audit_logs')
 
 
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+
+
+def ensure_indexes(bind=None):
+    """
+    为已存在的表补建模型中声明的索引
+
+    create_all 只在建表时创建索引，旧数据库升级后由这里补齐（已存在的索引跳过）。
+    """
+    bind = bind or engine
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def ensure_columns(bind=None):
+    """
+    为已存在的表补建模型中新增的可空列
+
+    create_all 不会修改已存在的表，旧数据库升级后由这里补齐（已存在的列跳过）。
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable or column.primary_key:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+def ensure_rule_score_key(bind=None) -> bool:
+    """
+    把旧数据库 rule_score 表的唯一约束 (analysis_result_id, criteria_name) 改为 (analysis_result_id, position)
+
+    旧约束使不同父项下的同名子项只能保存一行；SQLite 不能修改约束，只能重建表并复制数据。
+
+    Returns:
+        bool: 是否重建了表
+    """
+    bind = bind or engine
+    if bind.dialect.name != 'sqlite':
+        return False
+    table = RuleScore.__table__
+    with bind.begin() as connection:
+        ddl = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': table.name},
+        ).scalar()
+        if not ddl or 'UNIQUE (analysis_result_id, criteria_name)' not in ddl:
+            return False
+        legacy = f'{table.name}_legacy'
+        for (index_name,) in connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+            {'name': table.name},
+        ).all():
+            connection.execute(text(f'DROP INDEX "{index_name}"'))
+        connection.execute(text(f'ALTER TABLE {table.name} RENAME TO {legacy}'))
+        table.create(bind=connection)
+        columns = ', '.join(column.name for column in table.columns)
+        connection.execute(text(f'INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {legacy}'))
+        connection.execute(text(f'DROP TABLE {legacy}'))
+    return True
+
+
+# 项目名称、编号和投标方名称的全文索引（SQLite FTS5，trigram 分词支持中文任意子串），
+# 由触发器随 tender_project / bid_document 的写入同步，rowid 即项目ID
+PROJECT_SEARCH_TABLE = 'project_search'
+
+_PROJECT_SEARCH_BIDDERS = (
+    "(SELECT group_concat(bidder_name, ' ') FROM bid_document WHERE project_id = {project_id})"
+)
+
+_PROJECT_SEARCH_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS {PROJECT_SEARCH_TABLE}_project_insert AFTER INSERT ON tender_project BEGIN
+        INSERT INTO {PROJECT_SEARCH_TABLE}(rowid, name, project_code, bidders)
+        VALUES (new.id, new.name, new.project_code, {_PROJECT_SEARCH_BIDDERS.format(project_id='new.id')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PROJECT_SEARCH_TABLE}_project_update
+    AFTER UPDATE OF name, project_code ON tender_project BEGIN
+        UPDATE {PROJECT_SEARCH_TABLE} SET name = new.name, project_code = new.project_code WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PROJECT_SEARCH_TABLE}_project_delete AFTER DELETE ON tender_project BEGIN
+        DELETE FROM {PROJECT_SEARCH_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PROJECT_SEARCH_TABLE}_bid_insert AFTER INSERT ON bid_document BEGIN
+        UPDATE {PROJECT_SEARCH_TABLE} SET bidders = {_PROJECT_SEARCH_BIDDERS.format(project_id='new.project_id')}
+        WHERE rowid = new.project_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PROJECT_SEARCH_TABLE}_bid_update
+    AFTER UPDATE OF bidder_name, project_id ON bid_document BEGIN
+        UPDATE {PROJECT_SEARCH_TABLE} SET bidders = {_PROJECT_SEARCH_BIDDERS.format(project_id='old.project_id')}
+        WHERE rowid = old.project_id;
+        UPDATE {PROJECT_SEARCH_TABLE} SET bidders = {_PROJECT_SEARCH_BIDDERS.format(project_id='new.project_id')}
+        WHERE rowid = new.project_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {PROJECT_SEARCH_TABLE}_bid_delete AFTER DELETE ON bid_document BEGIN
+        UPDATE {PROJECT_SEARCH_TABLE} SET bidders = {_PROJECT_SEARCH_BIDDERS.format(project_id='old.project_id')}
+        WHERE rowid = old.project_id;
+    END""",
+]
+
+
+def ensure_search_index(bind=None) -> bool:
+    """
+    创建项目全文索引及同步触发器；新建索引时从现有数据填充
+
+    非SQLite数据库或SQLite不支持 FTS5 trigram 时不创建，项目搜索改用 LIKE 查询。
+
+    Returns:
+        bool: 全文索引是否可用
+    """
+    bind = bind or engine
+    if bind.dialect.name != 'sqlite':
+        return False
+    try:
+        with bind.begin() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': PROJECT_SEARCH_TABLE},
+            ).first()
+            if not exists:
+                connection.execute(
+                    text(
+                        f"CREATE VIRTUAL TABLE {PROJECT_SEARCH_TABLE} "
+                        "USING fts5(name, project_code, bidders, tokenize='trigram')"
+                    )
+                )
+                connection.execute(
+                    text(
+                        f"INSERT INTO {PROJECT_SEARCH_TABLE}(rowid, name, project_code, bidders) "
+                        "SELECT id, name, project_code, "
+                        f"{_PROJECT_SEARCH_BIDDERS.format(project_id='tender_project.id')} FROM tender_project"
+                    )
+                )
+            for statement in _PROJECT_SEARCH_DDL:
+                connection.execute(text(statement))
+        return True
+    except OperationalError:
+        # SQLite 未编译 FTS5 或版本过低（trigram 需要 3.34+）
+        return False
+
+
+
+def upgrade_database(bind=None):
+    """
+    升级旧数据库：补建新增列、改正 rule_score 唯一约束、补建索引和项目全文索引
+
+    由服务启动时调用一次，不在导入本模块时执行：工作进程也会导入本模块，
+    不应在服务运行期间对同一个数据库文件重复执行迁移。
+    """
+    bind = bind or engine
+    ensure_columns(bind)
+    ensure_rule_score_key(bind)
+    ensure_indexes(bind)
+    ensure_search_index(bind)
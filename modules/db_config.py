@@ -0,0 +1,98 @@
+"""
+数据库配置模块
+统一创建数据库引擎：
+- 默认使用本地 SQLite 文件，连接时设置 WAL、synchronous=NORMAL、忙等待超时和 mmap，
+  多个分析进程同时写进度时读写互不阻塞，短暂的写锁冲突由忙等待吸收而不是直接报错；
+- 环境变量 DATABASE_URL 可改用服务器数据库（如 PostgreSQL），连接池大小等由
+  DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE 设置；
+- 进程池 fork 出的子进程不能复用父进程的连接，子进程中丢弃继承的连接池，按需重新连接。
+"""
+
+import os
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = 'sqlite:///./tender_evaluation.db'
+
+# SQLite 连接参数（每个新连接执行一次）
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,  # 毫秒
+    'mmap_size': 268435456,  # 256MB
+    'temp_store': 'MEMORY',
+}
+
+
+def get_database_url() -> str:
+    """数据库连接串：优先取环境变量 DATABASE_URL"""
+    return os.environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: Optional[str] = None) -> Engine:
+    """
+    按连接串创建引擎（SQLite 设置连接参数，其他数据库使用按环境变量设定大小的连接池）
+
+    Args:
+        url: 数据库连接串，为空时使用 get_database_url()
+
+    Returns:
+        Engine: SQLAlchemy 引擎
+    """
+    url = url or get_database_url()
+    if url.startswith('sqlite'):
+        engine = create_engine(
+            url,
+            connect_args={
+                'check_same_thread': False,
+                'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+            },
+        )
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
+        return engine
+
+    return create_engine(
+        url,
+        pool_size=_env_int('DB_POOL_SIZE', 10),
+        max_overflow=_env_int('DB_MAX_OVERFLOW', 20),
+        pool_timeout=_env_int('DB_POOL_TIMEOUT', 30),
+        pool_recycle=_env_int('DB_POOL_RECYCLE', 1800),
+        pool_pre_ping=True,
+    )
+
+
+def reset_engine_after_fork(engine: Engine):
+    """
+    在 fork 出的子进程中丢弃从父进程继承的连接池
+
+    close=False：不关闭继承的连接（它们仍属于父进程），子进程之后按需建立自己的连接。
+    """
+    engine.dispose(close=False)
+
+
+def register_fork_handler(engine: Engine):
+    """fork 后的子进程自动重建连接池（进程池工作进程、多进程表格识别等）"""
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=lambda: reset_engine_after_fork(engine))
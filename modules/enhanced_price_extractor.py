@@ -1,91 +1,145 @@
 import re
-from typing import List, Dict, Any, Optional
+import itertools
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Collection
 import logging
 
+from modules.keyword_scanner import KeywordScanner, KeywordHits
+from modules.price_extraction_planner import VERIFIED_SUMMARY_REASON, PriceSectionIndex
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 价格一览表中的小写价格模式（前6个为明确关键字，后2个为通用模式）
+_XIAOXIE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r'(小写).*?￥?\s*([\d,]+\.?\d*)',
+        r'(小写金额)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+        r'(投标报价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+        r'(总报价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+        r'(总价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+        r'(人民币)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+        r'￥\s*([\d,]+\.?\d*)',
+        r'([\d,]+\.?\d*)\s*(?:元|人民币)',
+    ]
+]
+
+# 价格一览表中的大写价格模式
+_DAXIE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in [
+        r'(大写)[:：\s]*([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)',
+        r'(大写金额)[:：\s]*([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)',
+        r'([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)[:：\s]*(?:元|人民币)',
+    ]
+]
+
+_NON_CHINESE_RE = re.compile(r'[^\u4e00-\u9fa5]')
+
+# 大写金额之后的角、分（如“…元捌角伍分”），大写模式本身不包含这些字符
+DAXIE_FRACTION_RE = re.compile(
+    r'[元圆]?\s*((?:零?\s*[壹贰叁肆伍陆柒捌玖一二三四五六七八九两]\s*[角分]\s*)+)'
+)
+
+
+def _is_amount_char(ch: str) -> bool:
+    r"""与正则中 [\d,]、\.、\s 可匹配的字符一致"""
+    return ch == ',' or ch == '.' or ch.isdecimal() or ch.isspace()
+
+
+# 状态机的字符表：中文数字映射为 0-9，单位映射为倍数，每个字符只查一次表
+_CN_AMOUNT_VALUES = {
+    **{ch: value for value, chars in enumerate(
+        ['零〇', '一壹', '二两贰貳', '三叁參', '四肆', '五伍', '六陆陸', '七柒', '八捌', '九玖']
+    ) for ch in chars},
+    '十': 10, '拾': 10, '百': 100, '佰': 100, '千': 1000, '仟': 1000,
+    '万': 10000, '萬': 10000, '亿': 100000000, '億': 100000000,
+}
+# 较少出现的字符：阿拉伯数字（含全角）、小数点、千分位逗号、元和角分
+_ARABIC_CHARS = {
+    **{ch: ch for ch in '0123456789.'},
+    **{fw: ch for fw, ch in zip('０１２３４５６７８９．', '0123456789.')},
+}
+_SEPARATOR_CHARS = {',', '，'}
+_YUAN_CHARS = {'元', '圆'}
+_FRACTION_UNITS = {'角': 0.1, '毛': 0.1, '分': 0.01, '厘': 0.001}
+
+
+@lru_cache(maxsize=4096)
+def _parse_chinese_amount(text: str) -> Optional[float]:
+    """
+    单遍状态机解析中文金额：累积当前数字、万以下的小节、万级小节和已结束的整数部分，
+    遇到元/圆收拢整数部分，角/分/厘按小数计入。
+    支持大写、小写、全角数字以及“12万3千”“1.5万”这类阿拉伯数字与中文单位混写；
+    千分位逗号只在阿拉伯数字内部跳过，其余无法识别的字符（人民币、整、空格等）直接忽略。
+    """
+    total = 0  # 已结束的亿级部分（或元之前的整数部分）
+    section = 0  # 当前亿以内已结束的万级部分
+    small = 0  # 当前万以内已结束的千、百、十位
+    digit = None  # 尚未乘单位的数字
+    fraction = 0  # 角、分、厘
+    arabic = ''  # 正在读取的阿拉伯数字
+    seen = False
+    get = _CN_AMOUNT_VALUES.get
+
+    for ch in text:
+        value = get(ch)
+        if value is None:
+            arabic_ch = _ARABIC_CHARS.get(ch)
+            if arabic_ch is not None:
+                if arabic_ch != '.' or (arabic and '.' not in arabic):
+                    arabic += arabic_ch
+                continue
+            if arabic and ch in _SEPARATOR_CHARS:
+                continue
+        if arabic:
+            digit = float(arabic)
+            seen = True
+            arabic = ''
+        if value is None:
+            if ch in _FRACTION_UNITS:
+                fraction += (digit or 0) * _FRACTION_UNITS[ch]
+                digit = None
+            elif ch in _YUAN_CHARS:
+                # 元之后只剩角分，先把整数部分收拢
+                total += section + small + (digit or 0)
+                section, small, digit = 0, 0, None
+        elif value < 10:
+            digit = value
+            seen = True
+        elif value < 10000:
+            small += (1 if digit is None else digit) * value
+            digit = None
+            seen = True
+        elif value == 10000:
+            section += (small + (digit or 0)) * value
+            small, digit = 0, None
+        else:
+            total += (section + small + (digit or 0)) * value
+            section, small, digit = 0, 0, None
+
+    if arabic:
+        digit = float(arabic)
+        seen = True
+    if not seen:
+        return None
+    return round(float(total + section + small + (digit or 0) + fraction), 4)
+
 
 class ChineseNumberConverter:
     """
-    一个更强大的中文数字转换器，支持大写、小写、单位（万、亿）和基本的小数处理。
+    一个更强大的中文数字转换器，支持大写、小写、单位（万、亿）、角分小数、
+    全角数字以及阿拉伯数字与中文单位混写，同一文本的转换结果会被缓存。
     """
 
-    def __init__(self):
-        self.num_map = {
-            '零': 0,
-            '一': 1,
-            '二': 2,
-            '三': 3,
-            '四': 4,
-            '五': 5,
-            '六': 6,
-            '七': 7,
-            '八': 8,
-            '九': 9,
-            '壹': 1,
-            '贰': 2,
-            '叁': 3,
-            '肆': 4,
-            '伍': 5,
-            '陆': 6,
-            '柒': 7,
-            '捌': 8,
-            '玖': 9,
-            '两': 2,
-        }
-        self.unit_map = {
-            '十': 10,
-            '百': 100,
-            '千': 1000,
-            '拾': 10,
-            '佰': 100,
-            '仟': 1000,
-        }
-        self.large_unit_map = {'万': 10000, '亿': 100000000}
-
     def chinese_to_number(self, text: str) -> Optional[float]:
         """
         将中文数字字符串（包括大写）转换为阿拉伯数字浮点数。
         """
         if not text:
             return None
-
-        # 移除常见非数字字符
-        text = re.sub(r'[元圆角分整人民币\\s]', '', text)
-
-        # 处理亿和万
-        if '亿' in text:
-            parts = text.split('亿')
-            high = self._convert_segment(parts[0]) * self.large_unit_map['亿']
-            low = self._convert_segment(parts[1]) if parts[1] else 0
-            return high + low
-        if '万' in text:
-            parts = text.split('万')
-            high = self._convert_segment(parts[0]) * self.large_unit_map['万']
-            low = self._convert_segment(parts[1]) if parts[1] else 0
-            return high + low
-
-        return self._convert_segment(text)
-
-    def _convert_segment(self, segment: str) -> float:
-        """转换万或亿内部的数字部分"""
-        if not segment:
-            return 0
-
-        total = 0
-        current_num = 0
-        for char in segment:
-            if char in self.num_map:
-                current_num = self.num_map[char]
-            elif char in self.unit_map:
-                total += (current_num or 1) * self.unit_map[char]
-                current_num = 0
-            else:
-                # 忽略无法识别的字符
-                pass
-        total += current_num
-        return total
+        return _parse_chinese_amount(text)
 
 
 class EnhancedPriceExtractor:
@@ -131,30 +185,67 @@ class EnhancedPriceExtractor:
             r'(总报价|总价).*?(\\d[\\d,]*\\.?\\d*)',
         ]
 
-    def extract_enhanced_prices(self, pages: List[str]) -> List[Dict[str, Any]]:
+        # 预编译的扫描引擎：排除关键词一次扫描建立命中索引，金额模式预编译
+        # 关键字模式与通用模式分别执行，保证相互重叠的匹配与原实现一致
+        self._exclude_scanner = KeywordScanner(self.exclude_keywords)
+        self._keyword_first_regex = re.compile(self.price_patterns[0])
+        self._amount_first_regex = re.compile(self.price_patterns[1])
+        # 总价关键字的所有出现位置（候选顺序与 price_patterns 中的一致）
+        self._total_keyword_regex = re.compile(
+            '(?=(' + '|'.join(re.escape(k) for k in self.total_price_keywords) + '))'
+        )
+        # 通用模式中的 \\s、\\d 为转义后的字面反斜杠，匹配文本必然包含反斜杠和
+        # “￥”/“元”，页面不含这些字符时跳过；DOTALL 使其中的“.”在原始文本上
+        # 与在换行替换为空格后的文本上行为一致
+        self._general_price_regexes = [
+            (re.compile(p, re.DOTALL), ('\\', literal))
+            for p, literal in zip(self.general_price_patterns, ('￥', '元'))
+        ]
+
+    def extract_enhanced_prices(
+        self,
+        pages: List[str],
+        sections: Optional[PriceSectionIndex] = None,
+        summary_results: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+        rejected: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         从PDF页面中提取价格，并为每个价格计算置信度。
+
+        每页只建立一次排除关键词命中索引；模式中的 \\s 同时匹配换行和空格，
+        因此直接扫描原始页面文本，无需先复制一份替换换行的文本（位置一一对应）。
+        sections/summary_results 为 PriceExtractionPlanner 已建立的章节索引和
+        已提取的一览表页面结果，传入时不再重复计算。
+        传入 rejected 列表时，因附近出现保证金等关键词而被排除的金额会追加到其中。
         """
         all_prices = []
 
-        # 1. 识别关键章节
-        price_summary_pages = self._identify_sections(
-            pages, ['投标一览表', '开标一览表', '价格一览表']
-        )
-        price_doc_pages = self._identify_sections(pages, ['价格文件', '报价部分'])
+        # 1. 识别关键章节（一次遍历）
+        if sections is None:
+            sections = PriceSectionIndex.build(pages)
+        price_summary_pages = sections.summary_page_set
+        price_doc_pages = sections.price_doc_page_set
+        summary_results = summary_results or {}
 
         for i, page_text in enumerate(pages):
-            context = page_text.replace('\n', ' ')
+            exclude_hits = self._exclude_scanner.scan(page_text)
 
             # 2. 特别处理价格一览表页面
             if i in price_summary_pages:
-                summary_prices = self._extract_prices_from_summary_page(page_text, i)
+                summary_prices = summary_results.get(i)
+                if summary_prices is None:
+                    summary_prices = self._extract_prices_from_summary_page(
+                        page_text, i, exclude_hits=exclude_hits
+                    )
                 all_prices.extend(summary_prices)
 
             # 3. 在页面中查找所有可能的价格
-            # 查找与关键字强相关的价格
-            for pattern in self.price_patterns:
-                for match in re.finditer(pattern, context):
+            # 查找与关键字强相关的价格（两个模式都要求出现总价关键字）
+            if any(k in page_text for k in self.total_price_keywords):
+                for match in itertools.chain(
+                    self._keyword_first_regex.finditer(page_text),
+                    self._iter_amount_first_matches(page_text),
+                ):
                     groups = match.groups()
                     price_str = (
                         groups[1]
@@ -163,10 +254,8 @@ class EnhancedPriceExtractor:
                     )
                     chinese_price_str = groups[2] if len(groups) > 2 else None
                     # 窗口文本用于排除保证金等干扰
-                    window_start = max(0, match.start() - 40)
-                    window_end = min(len(context), match.end() + 40)
-                    window_text = context[window_start:window_end]
-                    if any(k in window_text for k in self.exclude_keywords):
+                    if exclude_hits.any_within(match.start() - 40, match.end() + 40):
+                        self._record_rejected(rejected, price_str, i, '关键字匹配')
                         continue
 
                     price_value = self._str_to_float(price_str)
@@ -191,13 +280,13 @@ class EnhancedPriceExtractor:
                     )
 
             # 查找通用价格格式
-            for pattern in self.general_price_patterns:
-                for match in re.finditer(pattern, context):
+            for regex, literals in self._general_price_regexes:
+                if any(literal not in page_text for literal in literals):
+                    continue
+                for match in regex.finditer(page_text):
                     price_str = match.group(1)
-                    window_start = max(0, match.start() - 25)
-                    window_end = min(len(context), match.end() + 25)
-                    window_text = context[window_start:window_end]
-                    if any(k in window_text for k in self.exclude_keywords):
+                    if exclude_hits.any_within(match.start() - 25, match.end() + 25):
+                        self._record_rejected(rejected, price_str, i, '通用格式匹配')
                         continue
                     price_value = self._str_to_float(price_str)
                     if price_value is None:
@@ -221,41 +310,80 @@ class EnhancedPriceExtractor:
 
         return all_prices
 
+    def _record_rejected(
+        self,
+        rejected: Optional[List[Dict[str, Any]]],
+        price_str: str,
+        page_index: int,
+        reason: str,
+    ):
+        if rejected is None:
+            return
+        price_value = self._str_to_float(price_str)
+        if price_value is not None:
+            rejected.append(
+                {
+                    'value': price_value,
+                    'page': page_index,
+                    'confidence': 0,
+                    'reason': reason,
+                    'exclusion_reason': '附近出现保证金等排除关键词',
+                }
+            )
+
+    def _iter_amount_first_matches(self, page_text: str):
+        """
+        等价于 self._amount_first_regex.finditer(page_text)，但只在总价关键字前方执行
+
+        “金额+关键字”模式以数字开头，直接全文 finditer 会在每个数字位置尝试并回溯；
+        其匹配必然由若干数字、逗号、小数点、空白紧接一个关键字构成，
+        因此从每个关键字向前回溯到这段字符的起点，只在该区间内匹配，结果与全文匹配相同。
+        """
+        for kw_match in self._total_keyword_regex.finditer(page_text):
+            kw_start = kw_match.start()
+            start = kw_start
+            while start > 0 and _is_amount_char(page_text[start - 1]):
+                start -= 1
+            if start == kw_start:
+                continue
+            yield from self._amount_first_regex.finditer(
+                page_text, start, kw_start + len(kw_match.group(1))
+            )
+
+    @staticmethod
+    def _line_bounds(page_text: str, start: int, end: int):
+        """匹配所在行（从匹配起点所在行首到匹配终点所在行尾）"""
+        line_start = page_text.rfind('\n', 0, start) + 1
+        line_end = page_text.find('\n', end)
+        if line_end == -1:
+            line_end = len(page_text)
+        return line_start, line_end
+
     def _extract_prices_from_summary_page(
-        self, page_text: str, page_index: int
+        self,
+        page_text: str,
+        page_index: int,
+        exclude_hits: Optional[KeywordHits] = None,
     ) -> List[Dict[str, Any]]:
         """
         从价格一览表页面提取价格，特别处理小写和大写价格对照的情况
         """
+        if exclude_hits is None:
+            exclude_hits = self._exclude_scanner.scan(page_text)
         prices = []
         xiaoxie_price = None
         daxie_price_text = None
         daxie_price_value = None
 
-        # 查找小写价格 - 增强模式以匹配更多格式
-        xiaoxie_patterns = [
-            r'(小写).*?￥?\s*([\d,]+\.?\d*)',
-            r'(小写金额)[:：\s]*￥?\s*([\d,]+\.?\d*)',
-            r'(投标报价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
-            r'(总报价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
-            r'(总价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
-            r'(人民币)[:：\s]*￥?\s*([\d,]+\.?\d*)',
-            r'￥\s*([\d,]+\.?\d*)',
-            r'([\d,]+\.?\d*)\s*(?:元|人民币)',
-        ]
-
         # 首先查找更明确的投标报价、总报价等关键字
-        for pattern in xiaoxie_patterns[:6]:  # 前6个模式是更明确的关键字
-            xiaoxie_match = re.search(pattern, page_text, re.IGNORECASE)
+        for regex in _XIAOXIE_PATTERNS[:6]:  # 前6个模式是更明确的关键字
+            xiaoxie_match = regex.search(page_text)
             if xiaoxie_match:
                 xiaoxie_price_str = xiaoxie_match.group(2)  # 获取价格组
                 # 行级过滤以排除保证金等干扰项
-                line_start = page_text.rfind('\n', 0, xiaoxie_match.start()) + 1
-                line_end = page_text.find('\n', xiaoxie_match.end())
-                if line_end == -1:
-                    line_end = len(page_text)
-                line_text = page_text[line_start:line_end]
-                if any(k in line_text for k in self.exclude_keywords):
+                if exclude_hits.any_within(
+                    *self._line_bounds(page_text, xiaoxie_match.start(), xiaoxie_match.end())
+                ):
                     continue
                 xiaoxie_price = self._str_to_float(xiaoxie_price_str)
                 if (
@@ -266,24 +394,21 @@ class EnhancedPriceExtractor:
                             'value': xiaoxie_price,
                             'page': page_index,
                             'confidence': 100,  # 最高置信度
-                            'reason': f'价格一览表明确关键字价格 (pattern: {pattern})',
+                            'reason': f'价格一览表明确关键字价格 (pattern: {regex.pattern})',
                         }
                     )
                     break  # 找到第一个有效价格就停止
 
         # 如果没找到明确关键字，再使用通用模式
         if not prices:
-            for pattern in xiaoxie_patterns[6:]:  # 后面的通用模式
-                xiaoxie_match = re.search(pattern, page_text, re.IGNORECASE)
+            for regex in _XIAOXIE_PATTERNS[6:]:  # 后面的通用模式
+                xiaoxie_match = regex.search(page_text)
                 if xiaoxie_match:
                     xiaoxie_price_str = xiaoxie_match.group(1)  # 获取价格组
                     # 行级过滤以排除保证金等干扰项
-                    line_start = page_text.rfind('\n', 0, xiaoxie_match.start()) + 1
-                    line_end = page_text.find('\n', xiaoxie_match.end())
-                    if line_end == -1:
-                        line_end = len(page_text)
-                    line_text = page_text[line_start:line_end]
-                    if any(k in line_text for k in self.exclude_keywords):
+                    if exclude_hits.any_within(
+                        *self._line_bounds(page_text, xiaoxie_match.start(), xiaoxie_match.end())
+                    ):
                         continue
                     xiaoxie_price = self._str_to_float(xiaoxie_price_str)
                     if (
@@ -294,20 +419,14 @@ class EnhancedPriceExtractor:
                                 'value': xiaoxie_price,
                                 'page': page_index,
                                 'confidence': 90,  # 高置信度
-                                'reason': f'价格一览表通用模式价格 (pattern: {pattern})',
+                                'reason': f'价格一览表通用模式价格 (pattern: {regex.pattern})',
                             }
                         )
                         break  # 找到第一个有效价格就停止
 
-        # 查找大写价格，增加更多模式
-        daxie_patterns = [
-            r'(大写)[:：\s]*([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)',
-            r'(大写金额)[:：\s]*([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)',
-            r'([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)[:：\s]*(?:元|人民币)',
-        ]
-
-        for pattern in daxie_patterns:
-            daxie_match = re.search(pattern, page_text, re.IGNORECASE)
+        # 查找大写价格
+        for regex in _DAXIE_PATTERNS:
+            daxie_match = regex.search(page_text)
             if daxie_match:
                 daxie_price_text = (
                     daxie_match.group(2)
@@ -315,14 +434,14 @@ class EnhancedPriceExtractor:
                     else daxie_match.group(1)
                 )
                 # 清理大写价格文本，移除多余的空格和干扰字符
-                daxie_price_text = re.sub(r'[^\u4e00-\u9fa5]', '', daxie_price_text)
+                daxie_price_text = _NON_CHINESE_RE.sub('', daxie_price_text)
+                fraction_match = DAXIE_FRACTION_RE.match(page_text, daxie_match.end())
+                if fraction_match:
+                    daxie_price_text += '元' + _NON_CHINESE_RE.sub('', fraction_match.group(1))
                 # 行级过滤以排除保证金等干扰项
-                line_start = page_text.rfind('\n', 0, daxie_match.start()) + 1
-                line_end = page_text.find('\n', daxie_match.end())
-                if line_end == -1:
-                    line_end = len(page_text)
-                line_text = page_text[line_start:line_end]
-                if any(k in line_text for k in self.exclude_keywords):
+                if exclude_hits.any_within(
+                    *self._line_bounds(page_text, daxie_match.start(), daxie_match.end())
+                ):
                     continue
                 daxie_price_value = self.converter.chinese_to_number(daxie_price_text)
                 if (
@@ -333,7 +452,7 @@ class EnhancedPriceExtractor:
                             'value': daxie_price_value,
                             'page': page_index,
                             'confidence': 95,  # 高置信度
-                            'reason': f'价格一览表大写价格 (pattern: {pattern})',
+                            'reason': f'价格一览表大写价格 (pattern: {regex.pattern})',
                         }
                     )
                     break  # 找到第一个有效价格就停止
@@ -350,7 +469,7 @@ class EnhancedPriceExtractor:
                 for price_info in prices:
                     if price_info['value'] == xiaoxie_price:
                         price_info['confidence'] = 100  # 最高置信度
-                        price_info['reason'] = '价格一览表小写价格(与大写价格匹配)'
+                        price_info['reason'] = VERIFIED_SUMMARY_REASON
                         break
 
         return prices
@@ -379,8 +498,8 @@ class EnhancedPriceExtractor:
         page_index: int,
         price_value: float,
         keyword_found: bool,
-        price_summary_pages: List[int],
-        price_doc_pages: List[int],
+        price_summary_pages: Collection[int],
+        price_doc_pages: Collection[int],
         chinese_price_str: Optional[str] = None,
     ) -> float:
         """
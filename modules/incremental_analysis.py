@@ -0,0 +1,142 @@
+"""
+增量重新分析模块
+根据规则内容指纹和投标文件内容哈希判断哪些（投标方, 规则）评估已经过期，
+只重新评估这些组合；其余投标方直接用检查点重建明细得分，再统一重算价格分和总分。
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Any, List, Set
+
+from modules.database import (
+    BidDocument,
+    ScoringRule,
+    AnalysisResult,
+)
+from modules.intelligent_bid_analyzer import IntelligentBidAnalyzer
+from modules.rule_checkpoints import (
+    rule_fingerprint,
+    document_hash,
+    checkpoint_query,
+    checkpointed_rules_query,
+    compute_context_hash,
+)
+from modules.rule_scores import replace_result_scores
+
+
+logger = logging.getLogger(__name__)
+
+
+def _child_rules(rules: List[ScoringRule]) -> List[ScoringRule]:
+    """需要AI评估的子项规则（与 IntelligentBidAnalyzer 的筛选条件一致）"""
+    return [
+        rule
+        for rule in rules
+        if not rule.is_price_criteria and rule.Child_Item_Name is not None
+    ]
+
+
+def plan_reanalysis(db, project_id: int, model: str) -> Dict[str, Any]:
+    """
+    计算项目需要重新评估的最小（投标方, 规则）集合
+
+    Returns:
+        Dict[str, Any]:
+            reanalyze: {投标文件ID: [过期的规则ID]}，需要重新运行分析（含价格提取）
+            rebuild: [投标文件ID]，所有规则均有有效检查点，只需重建明细与总分
+            stale_pairs: 需要重新评估的组合总数
+    """
+    rules = _child_rules(
+        db.query(ScoringRule).filter(ScoringRule.project_id == project_id).all()
+    )
+    fingerprints = {rule.id: rule_fingerprint(rule) for rule in rules}
+    bid_documents = (
+        db.query(BidDocument).filter(BidDocument.project_id == project_id).all()
+    )
+
+    # 整个项目的检查点和分析结果各用一次分组查询取出
+    done: Dict[tuple, Set[str]] = defaultdict(set)
+    if bid_documents:
+        for bid_id, doc_hash, fingerprint in checkpointed_rules_query(
+            db, [doc.id for doc in bid_documents], model
+        ):
+            done[(bid_id, doc_hash)].add(fingerprint)
+    with_result = {
+        row.bid_document_id
+        for row in db.query(AnalysisResult.bid_document_id)
+        .filter(AnalysisResult.project_id == project_id)
+        .group_by(AnalysisResult.bid_document_id)
+    }
+
+    reanalyze: Dict[int, List[int]] = {}
+    rebuild: List[int] = []
+    for doc in bid_documents:
+        doc_hash = document_hash(doc.file_path) if doc.file_path else None
+        checkpointed = done.get((doc.id, doc_hash), set()) if doc_hash else set()
+        stale = [rule.id for rule in rules if fingerprints[rule.id] not in checkpointed]
+        # 投标文件替换后（哈希变化）即使没有规则也要重新提取价格
+        has_result = doc.id in with_result
+        if stale or not has_result or doc.processing_status != 'completed':
+            reanalyze[doc.id] = stale
+        else:
+            rebuild.append(doc.id)
+
+    return {
+        'reanalyze': reanalyze,
+        'rebuild': rebuild,
+        'stale_pairs': sum(len(v) for v in reanalyze.values()),
+    }
+
+
+def rebuild_scores_from_checkpoints(
+    db, bid_document: BidDocument, model: str, pages: List[str]
+) -> bool:
+    """
+    用检查点重建某个投标方的明细得分（规则增删改名后无需调用AI）
+
+    与 RuleCheckpointStore 一样按（规则指纹, 上下文哈希）匹配检查点，上下文哈希由
+    投标文件页面文本重新生成提示词计算；总分中的价格分部分由随后统一执行的价格分计算补齐。
+
+    Returns:
+        bool: 是否成功重建（有规则缺少当前上下文的检查点时返回 False，需要重新分析）
+    """
+    rules = _child_rules(
+        db.query(ScoringRule)
+        .filter(ScoringRule.project_id == bid_document.project_id)
+        .all()
+    )
+    doc_hash = document_hash(bid_document.file_path)
+    checkpoints = {
+        (row.rule_fingerprint, row.context_hash): row
+        for row in checkpoint_query(db, bid_document.id, model, doc_hash)
+    }
+    prompts = IntelligentBidAnalyzer(None, bid_document.file_path, extracted_text=pages)
+
+    detailed_scores = []
+    for rule in rules:
+        context_hash = compute_context_hash(prompts.build_rule_prompt(rule, pages))
+        checkpoint = checkpoints.get((rule_fingerprint(rule), context_hash))
+        if checkpoint is None:
+            logger.warning(f'投标文件 {bid_document.id} 的规则 {rule.Child_Item_Name} 缺少检查点，无法重建')
+            return False
+        detailed_scores.append(
+            {
+                'Child_Item_Name': rule.Child_Item_Name,
+                'max_score': rule.Child_max_score,
+                'score': checkpoint.score,
+                'reason': checkpoint.reason,
+                'Parent_Item_Name': rule.Parent_Item_Name,
+            }
+        )
+
+    result = (
+        db.query(AnalysisResult)
+        .filter(AnalysisResult.bid_document_id == bid_document.id)
+        .first()
+    )
+    if result is None:
+        return False
+    replace_result_scores(db, result, detailed_scores, model=model)
+    result.total_score = sum(item['score'] for item in detailed_scores)
+    db.commit()
+    return True
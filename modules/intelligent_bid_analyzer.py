@@ -7,6 +7,14 @@ from modules.pdf_processor import PDFProcessor
 from modules.price_manager import PriceManager
 from modules.database import BidDocument, ScoringRule, AnalysisResult
 from modules.bid_analyzer_helpers import BidAnalyzerHelpers
+from modules.cancellation import AnalysisCancelled
+from modules.section_index import SectionIndex
+from modules.runtime_config import load_config, get_int
+from modules.rule_checkpoints import (
+    RuleCheckpointStore,
+    compute_context_hash,
+    document_hash,
+)
 
 class IntelligentBidAnalyzer(BidAnalyzerHelpers):
     def __init__(
@@ -17,6 +25,8 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
         bid_document_id=None,
         project_id=None,
         extracted_text: list = None,
+        cancel_token=None,
+        on_price_extracted=None,
     ):
         super().__init__()
         self.tender_file_path = tender_file_path
@@ -24,9 +34,14 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
         self.db = db_session
         self.bid_document_id = bid_document_id
         self.project_id = project_id
+        self.cancel_token = cancel_token
+        # 价格保存后的回调（例如所有投标方价格齐全时提前计算价格分）
+        self.on_price_extracted = on_price_extracted
         self.ai_analyzer = LocalAIAnalyzer()
         self.price_manager = PriceManager()
         self.logger = logging.getLogger(__name__)
+        # 投标文件章节索引（首次需要时建立，所有规则共用）
+        self._section_index = None
 
         if self.db and self.bid_document_id:
             bid_doc = self.db.query(BidDocument).filter(BidDocument.id == self.bid_document_id).first()
@@ -45,25 +60,6 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
             self.bid_processor = PDFProcessor(self.bid_file_path)
             self.bid_pages = None
 
-    def _update_progress(self, completed, total, current_rule, partial_results=None):
-        if not (self.db and self.bid_document_id):
-            return
-        try:
-            bid_doc = self.db.query(BidDocument).filter(BidDocument.id == self.bid_document_id).first()
-            if bid_doc:
-                bid_doc.progress_total_rules = total
-                bid_doc.progress_completed_rules = completed
-                progress_info = f"{self.bidder_name} - {current_rule}"
-                bid_doc.progress_current_rule = progress_info[:100]
-                bid_doc.detailed_progress_info = progress_info
-                if partial_results is not None:
-                    bid_doc.partial_analysis_results = json.dumps(partial_results[:5], ensure_ascii=False)
-                self.db.commit()
-                self.logger.info(f'进度更新: {completed}/{total} - {progress_info}')
-        except Exception as e:
-            self.logger.error(f'更新进度时出错: {e}')
-            self.db.rollback()
-
     def _build_rules_tree_from_db(self, rules_from_db: list) -> list:
         """将从数据库获取的扁平化评分规则列表转换为树形结构。"""
         rule_map = {rule.id: {
@@ -82,6 +78,11 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
             tree.append(rule_node)
         return tree
 
+    def _check_cancelled(self):
+        """在各阶段之间检查取消令牌"""
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
     def _get_bid_pages(self):
         """获取投标文件页面内容，优先使用已加载的文本。"""
         # 如果文本已在初始化时提供，直接返回
@@ -106,6 +107,7 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
             if not self.db or not self.project_id:
                 return {'error': '数据库会话或项目ID未提供，无法加载评分规则。'}
             
+            self._check_cancelled()
             rules_from_db = self.db.query(ScoringRule).filter(ScoringRule.project_id == self.project_id).all()
             if not rules_from_db:
                 return {'error': f'项目 {self.project_id} 在数据库中没有找到评分规则。'}
@@ -119,10 +121,12 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
                 return {'error': '从投标文件中提取有效文本失败。'}
 
             # 3. 提取价格
-            prices = self.price_manager.extract_prices_from_content(bid_pages)
-            self.logger.info(f"投标人 {self.bidder_name} 提取到的所有价格: {prices}")
-            best_price = self.price_manager.select_best_price(prices, bid_pages)
+            self._check_cancelled()
+            best_price = self._resolve_best_price(bid_pages)
             self.logger.info(f"投标人 {self.bidder_name} 选择的最佳价格: {best_price}")
+            # 价格只依赖文本，先保存，不必等待AI规则评分完成
+            self._save_extracted_price(best_price)
+            self._notify_price_extracted(best_price)
 
             # 4. 执行AI分析 - 首先分析子项规则
             # 获取所有子项规则（非价格规则且有Child_Item_Name的规则）
@@ -133,26 +137,42 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
             self.total_rules_to_analyze = len(child_rules)
             self._update_progress(0, self.total_rules_to_analyze, f'[{self.bidder_name}] 初始化分析...', [])
             
+            # 已完成的规则检查点（重试或恢复分析时跳过）
+            checkpoints = RuleCheckpointStore(
+                self.db, self.bid_document_id, self.ai_analyzer.model, document_hash(self.bid_file_path)
+            )
+
+            # 检查点每 checkpoint_commit_every 条规则提交一次，异常退出时最多重新评估一批
+            commit_every = max(1, get_int(load_config(), 'checkpoint_commit_every', 5))
+
             # 分析每个子项规则
             analyzed_scores = []  # 改为列表格式以匹配数据库期望的格式
             analyzed_scores_for_progress = []
             for rule in child_rules:
+                self._check_cancelled()
                 self.progress_counter += 1
                 current_rule_name = f'分析规则 {self.progress_counter}/{self.total_rules_to_analyze}: {rule.Child_Item_Name}'
                 self.logger.info(f'正在为投标人 {self.bidder_name} 分析子项规则: {rule.Child_Item_Name}')
                 
-                # 查找相关上下文（复用已提取的文本）
-                relevant_context = self._find_relevant_context_for_child_rule(rule, bid_pages)
+                # 查找相关上下文（复用已提取的文本）并创建prompt
+                prompt = self.build_rule_prompt(rule, bid_pages)
                 
-                # 创建prompt
-                prompt = self._create_prompt_for_child_rule(rule, relevant_context)
-                
-                # 提交AI分析
-                ai_response = self.ai_analyzer.analyze_text(prompt)
-                if 'Error:' in ai_response:
-                    score, reason = 0, f'AI分析失败: {ai_response}'
+                context_hash = compute_context_hash(prompt)
+                checkpoint = checkpoints.get(rule, context_hash)
+                if checkpoint is not None:
+                    self.logger.info(f'规则 {rule.Child_Item_Name} 已有检查点，跳过AI分析')
+                    score, reason = checkpoint['score'], checkpoint['reason']
                 else:
-                    score, reason = self._parse_ai_score_response(ai_response, rule.Child_max_score)
+                    # 提交AI分析
+                    ai_response = self.ai_analyzer.analyze_text(prompt, cancel_token=self.cancel_token)
+                    if 'Error:' in ai_response:
+                        # AI调用失败不写检查点，下次重试时重新分析
+                        score, reason = 0, f'AI分析失败: {ai_response}'
+                    else:
+                        score, reason = self._parse_ai_score_response(ai_response, rule.Child_max_score)
+                        checkpoints.save(rule, context_hash, score, reason)
+                        if checkpoints.pending >= commit_every:
+                            checkpoints.commit()
                 
                 # 保存分析结果到列表
                 analyzed_rule = {
@@ -177,17 +197,10 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
                 # 更新进度
                 self._update_progress(self.progress_counter, self.total_rules_to_analyze, current_rule_name, analyzed_scores_for_progress)
             
-            # 5. 计算价格分（注意：价格分应该在所有投标人都分析完成后统一计算，这里仅保存提取的价格）
-            price_score = 0
-            price_rule = next((rule for rule in rules_from_db if rule.is_price_criteria), None)
-            if price_rule:
-                self.logger.info(f'投标人 {self.bidder_name} 提取到价格: {best_price}')
-                # 价格分将在所有投标人分析完成后统一计算，这里仅保存提取的价格
-                self._save_extracted_price(best_price)
-            else:
-                # 没有价格规则也保存提取的价格
-                self._save_extracted_price(best_price)
-            
+            checkpoints.commit()
+
+            # 5. 价格分在所有投标人的价格提取后统一计算，提取的价格已在第3步保存
+
             # 6. 计算总分
             total_score = sum(item['score'] for item in analyzed_scores)
             self._update_progress(self.total_rules_to_analyze, self.total_rules_to_analyze, '分析完成', analyzed_scores_for_progress)
@@ -200,25 +213,37 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
                 'analysis_summary': '分析完成。',
                 'ai_model': self.ai_analyzer.model,
             }
-            self._save_extracted_price(best_price)
             return analysis_result
 
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             self.logger.error(f'分析过程中发生意外错误: {e}')
             self.logger.error(traceback.format_exc())
             return {'error': f'分析过程中发生意外错误: {str(e)}'}
 
+    def build_rule_prompt(self, rule, pages):
+        """子项规则提交给AI的完整提示词（检查点按其哈希匹配上下文）"""
+        relevant_context = self._find_relevant_context_for_child_rule(rule, pages)
+        return self._create_prompt_for_child_rule(rule, relevant_context)
+
     def _find_relevant_context_for_child_rule(self, rule, pages, context_window=2):
         """为子项规则查找相关上下文"""
         keywords = set(re.split(r'\s|，|。', rule.Child_Item_Name + ' ' + (rule.description or '')))
         keywords = {k for k in keywords if k and len(k) > 1}
         relevant_pages_indices = set()
         for i, page_text in enumerate(pages):
+            if i % 50 == 0:
+                self._check_cancelled()
             if any(keyword.lower() in page_text.lower() for keyword in keywords):
                 for j in range(i, min(i + context_window + 1, len(pages))):
                     relevant_pages_indices.add(j)
         if not relevant_pages_indices:
-            return '\n'.join(pages[:3])
+            # 正文未出现关键词时，取投标文件中以父项命名的章节开头几页，否则取前3页
+            section_pages = self._find_parent_section_pages(rule, pages, context_window)
+            if section_pages is None:
+                return '\n'.join(pages[:3])
+            relevant_pages_indices = set(section_pages)
         sorted_indices = sorted(list(relevant_pages_indices))
         grouped_pages = []
         if not sorted_indices: return ''
@@ -233,6 +258,20 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
         context_parts = [f'--- Pages {s+1}-{e+1} ---\n' + '\n'.join(pages[s:e+1]) for s, e in grouped_pages]
         return '\n\n'.join(context_parts)
 
+    def _find_parent_section_pages(self, rule, pages, context_window=2):
+        """在投标文件大纲中查找标题包含父项名称的章节，返回其开头几页的页码"""
+        parent_name = (rule.Parent_Item_Name or '').strip()
+        if not parent_name:
+            return None
+        if self._section_index is None or len(self._section_index.page_starts) != len(pages):
+            self._section_index = SectionIndex.from_pages(pages)
+        heading = self._section_index.find(parent_name)
+        if heading is None:
+            return None
+        first = self._section_index.page_of(heading.start)
+        last = self._section_index.page_of(max(heading.start, heading.end - 1))
+        return range(first, min(last, first + context_window) + 1)
+
     def _create_prompt_for_child_rule(self, rule, context_text):
         """为子项规则创建prompt"""
         max_context_len = 8000
@@ -349,8 +388,19 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
             self.logger.error(f'保存失败页面信息时出错: {e}')
             self.db.rollback()
 
+    def _notify_price_extracted(self, price):
+        """通知价格已保存；回调出错不影响规则分析"""
+        if self.on_price_extracted is None:
+            return
+        try:
+            self.on_price_extracted(price)
+        except Exception as e:
+            self.logger.error(f'价格提取回调出错: {e}')
+            if self.db:
+                self.db.rollback()
+
     def _save_extracted_price(self, price):
-        """保存提取到的价格"""
+        """保存提取到的价格（规则评分完成前先建立暂定的分析结果）"""
         if not (self.db and self.bid_document_id):
             return
         try:
@@ -362,7 +412,11 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
                         project_id=self.project_id,
                         bid_document_id=self.bid_document_id,
                         bidder_name=self.bidder_name,
-                        extracted_price=float(price) if price is not None else None
+                        extracted_price=float(price) if price is not None else None,
+                        total_score=0,
+                        price_score=0,
+                        analysis_summary='价格已提取，规则评分进行中。',
+                        ai_model=self.ai_analyzer.model,
                     )
                     self.db.add(analysis_result)
                 else:
@@ -370,7 +424,7 @@ class IntelligentBidAnalyzer(BidAnalyzerHelpers):
                 
                 # 同时更新投标文档中的价格状态
                 bid_doc.price_extracted = price is not None
-                bid_doc.price_extraction_attempts += 1
+                bid_doc.price_extraction_attempts = (bid_doc.price_extraction_attempts or 0) + 1
                 
                 self.db.commit()
         except Exception as e:
@@ -0,0 +1,65 @@
+"""
+多关键词扫描模块
+一次扫描找出文本中所有关键词的出现位置（包括相互重叠的出现，如“投标保证金”中的“保证金”），
+之后任意窗口内“是否包含某个关键词”的判断只需一次二分查找，
+替代对每个候选匹配反复执行 any(k in window_text for k in keywords)。
+"""
+
+import re
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+
+
+class KeywordScanner:
+    """
+    预编译的多关键词扫描器（Aho-Corasick 式的一次性多模式匹配）
+
+    关键词编译成一个零宽前瞻的候选式正则，每个起始位置只尝试一次，
+    扫描在正则引擎内完成；同一位置按长度从短到长尝试，得到该位置结束最早的关键词，
+    足以判断窗口内是否完整包含任一关键词。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        unique = sorted({k for k in keywords if k}, key=len)
+        self.keywords = unique
+        self._pattern = (
+            re.compile('(?=(' + '|'.join(re.escape(k) for k in unique) + '))')
+            if unique
+            else None
+        )
+
+    def scan(self, text: str) -> 'KeywordHits':
+        """返回文本的关键词命中索引（首次查询时才真正扫描）"""
+        return KeywordHits(text, self._pattern)
+
+
+class KeywordHits:
+    """单段文本的关键词命中索引"""
+
+    def __init__(self, text: str, pattern: Optional['re.Pattern']):
+        self._text = text
+        self._pattern = pattern
+        self._starts: Optional[List[int]] = None
+        self._min_end_after: List[int] = []
+
+    def _build(self):
+        starts: List[int] = []
+        ends: List[int] = []
+        if self._pattern is not None:
+            for m in self._pattern.finditer(self._text):
+                starts.append(m.start())
+                ends.append(m.start() + len(m.group(1)))
+        # min_end_after[i]：第 i 个及之后的命中中最早的结束位置
+        min_end_after = ends[:]
+        for i in range(len(min_end_after) - 2, -1, -1):
+            if min_end_after[i + 1] < min_end_after[i]:
+                min_end_after[i] = min_end_after[i + 1]
+        self._starts = starts
+        self._min_end_after = min_end_after
+
+    def any_within(self, start: int, end: int) -> bool:
+        """text[start:end] 中是否完整包含任一关键词"""
+        if self._starts is None:
+            self._build()
+        idx = bisect_left(self._starts, max(0, start))
+        return idx < len(self._starts) and self._min_end_after[idx] <= end
@@ -14,6 +14,8 @@ import json
 import logging
 import time
 
+from modules.cancellation import AnalysisCancelled
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -25,7 +27,7 @@ class LocalAIAnalyzer:
         self.model = model
         self.api_url = f'{host}/api/generate'
 
-    def analyze_text(self, prompt):
+    def analyze_text(self, prompt, cancel_token=None):
         # 优化AI分析速度的参数设置
         options = {
             'temperature': 0.7,  # 降低随机性以提高一致性
@@ -40,6 +42,10 @@ class LocalAIAnalyzer:
             'stream': False,
             'options': options,
         }
+
+        # 可取消的调用使用流式响应，在数据块之间检查取消令牌，取消时立即断开连接
+        if cancel_token is not None:
+            payload['stream'] = True
         
         # 增加重试逻辑和更长的超时时间
         max_retries = 3
@@ -48,6 +54,10 @@ class LocalAIAnalyzer:
 
         for attempt in range(max_retries):
             try:
+                if cancel_token is not None:
+                    cancel_token.check()
+                    return self._stream_generate(payload, request_timeout, cancel_token)
+
                 # 添加超时设置，避免长时间等待
                 response = requests.post(
                     self.api_url, json=payload, timeout=request_timeout
@@ -69,6 +79,9 @@ class LocalAIAnalyzer:
             except requests.exceptions.RequestException as e:
                 logger.error(f'AI模型请求失败: {e}')
                 return f'Error: AI model request failed: {str(e)}'
+            except ValueError as e:
+                logger.error(f'解析AI模型流式响应失败: {e}')
+                return f'Error: Invalid streaming response: {str(e)}'
             
             # 如果不是最后一次尝试，则等待后重试
             if attempt + 1 < max_retries:
@@ -78,6 +91,25 @@ class LocalAIAnalyzer:
         return 'Error: AI model request failed after multiple retries.'
 
 
+    def _stream_generate(self, payload, request_timeout, cancel_token):
+        """流式调用生成接口，逐块拼接响应；取消时关闭连接并抛出 AnalysisCancelled"""
+        chunks = []
+        with requests.post(
+            self.api_url, json=payload, timeout=request_timeout, stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel_token.is_cancelled():
+                    logger.info('AI请求已取消，断开连接')
+                    raise AnalysisCancelled(cancel_token.reason or 'cancelled')
+                if not line:
+                    continue
+                data = json.loads(line)
+                chunks.append(data.get('response', ''))
+                if data.get('done'):
+                    break
+        return ''.join(chunks).strip()
+
     def check_model_availability(self):
         try:
             response = requests.get(
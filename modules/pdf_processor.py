@@ -19,6 +19,7 @@ import pdfplumber
 from .pdf_processor_helpers import PDFProcessorHelpers
 from .runtime_config import load_config
 from .ocrmypdf_processor import OCRmyPDFProcessor
+from .cancellation import AnalysisCancelled
 
 
 class PDFProcessor(PDFProcessorHelpers):
@@ -116,12 +117,13 @@ class PDFProcessor(PDFProcessorHelpers):
             except Exception as e:
                 self.logger.warning(f'保存缓存失败: {e}')
 
-    def extract_text_per_page(self, use_cache=True) -> List[str]:
+    def extract_text_per_page(self, use_cache=True, cancel_token=None) -> List[str]:
         """
         逐页提取PDF文本，优先使用缓存
 
         Args:
             use_cache: 是否使用缓存
+            cancel_token: 取消令牌，取消时放弃未开始的页面并抛出 AnalysisCancelled
 
         Returns:
             List[str]: 每页文本字符串列表（与后续处理保持一致）
@@ -171,6 +173,9 @@ class PDFProcessor(PDFProcessorHelpers):
                         for future in as_completed(
                             future_to_page, timeout=overall_timeout
                         ):
+                            if cancel_token is not None and cancel_token.is_cancelled():
+                                executor.shutdown(wait=False, cancel_futures=True)
+                                raise AnalysisCancelled(cancel_token.reason or 'cancelled')
                             page_info = future_to_page[future]
                             try:
                                 result = future.result(timeout=timeout_sec)
@@ -208,6 +213,8 @@ class PDFProcessor(PDFProcessorHelpers):
                 results_sorted = sorted(results, key=lambda x: x['page'])
                 all_pages_text = [r.get('text', '') for r in results_sorted]
 
+            except AnalysisCancelled:
+                raise
             except Exception as e:
                 self.logger.error(f'使用PyMuPDF处理PDF时出错: {e}')
                 # 如果PyMuPDF失败，回退到PyPDF2
@@ -217,6 +224,8 @@ class PDFProcessor(PDFProcessorHelpers):
             self._save_to_cache(all_pages_text)
             return all_pages_text
 
+        except AnalysisCancelled:
+            raise
         except Exception as e:
             self.logger.error(f'提取PDF文本时发生未知错误: {e}')
             return []
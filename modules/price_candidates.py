@@ -0,0 +1,290 @@
+"""
+价格候选存储模块
+每个投标文件（按内容哈希区分版本）只提取一次价格：全部候选（金额、页码、匹配来源、置信度、
+被排除的原因）和选中的价格写入 price_candidate 表。
+重新分析、价格分计算、批量重算都直接读取选中的价格，不再重新提取或解析 detailed_scores；
+用户可以人工指定价格，无需重新分析，投标文件被替换后候选随内容哈希一起失效。
+候选同时记录提取器版本（PriceManager.VERSION）：修复提取逻辑并递增版本后，旧版本的候选不再复用，
+重算价格分时由 reextract_project_prices 重新提取（也可强制全部重新提取）。
+"""
+
+import os
+import logging
+from typing import List, Dict, Any, Optional, Iterable
+
+from sqlalchemy import and_, or_
+
+from modules.database import PriceCandidate, BidDocument, AnalysisResult
+from modules.price_manager import PriceManager
+from modules.rule_checkpoints import document_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_query(db_session, bid_document_id: int, doc_hash: str, extractor_version: str):
+    """某个投标文件（某一内容版本）由该版本提取器提取的候选和人工指定的价格"""
+    return (
+        db_session.query(PriceCandidate)
+        .filter(
+            PriceCandidate.bid_document_id == bid_document_id,
+            PriceCandidate.document_hash == doc_hash,
+            or_(
+                PriceCandidate.extractor_version == extractor_version,
+                PriceCandidate.source == 'manual',
+            ),
+        )
+        .order_by(PriceCandidate.id)
+    )
+
+
+def selected_prices_query(db_session, project_id: int):
+    """项目中各投标文件选中的价格（含内容哈希，由调用方过滤旧版本）"""
+    return (
+        db_session.query(
+            PriceCandidate.bid_document_id,
+            PriceCandidate.document_hash,
+            PriceCandidate.value,
+            PriceCandidate.source,
+            BidDocument.file_path,
+        )
+        .join(BidDocument, BidDocument.id == PriceCandidate.bid_document_id)
+        .filter(BidDocument.project_id == project_id, PriceCandidate.is_selected == True)
+        .order_by(PriceCandidate.id)
+    )
+
+
+class PriceCandidateStore:
+    """某个投标文件（某一内容版本）的价格候选"""
+
+    def __init__(
+        self,
+        db_session,
+        bid_document_id: int,
+        doc_hash: Optional[str],
+        extractor_version: str = PriceManager.VERSION,
+    ):
+        self.db = db_session
+        self.bid_document_id = bid_document_id
+        self.doc_hash = doc_hash
+        self.extractor_version = extractor_version
+
+    @property
+    def enabled(self) -> bool:
+        return self.db is not None and self.bid_document_id is not None and bool(self.doc_hash)
+
+    def load(self) -> List[PriceCandidate]:
+        """当前内容版本的候选：当前提取器版本提取的候选和人工指定的价格"""
+        if not self.enabled:
+            return []
+        return candidate_query(
+            self.db, self.bid_document_id, self.doc_hash, self.extractor_version
+        ).all()
+
+    def lookup(self):
+        """
+        返回 (是否已有候选, 选中的价格)
+
+        同一内容版本、同一提取器版本提取过时直接复用；人工指定的价格优先于自动选择。
+        """
+        rows = self.load()
+        extracted = [row for row in rows if row.source != 'manual']
+        selected = [row for row in rows if row.is_selected]
+        manual = [row for row in selected if row.source == 'manual']
+        chosen = (manual or selected or [None])[-1]
+        return bool(extracted), chosen.value if chosen else None
+
+    def manual_price(self) -> Optional[float]:
+        """当前内容版本人工指定的价格"""
+        manual = [row for row in self.load() if row.source == 'manual' and row.is_selected]
+        return manual[-1].value if manual else None
+
+    def save(
+        self,
+        prices: List[Dict[str, Any]],
+        rejected: Iterable[Dict[str, Any]],
+        selected_value: Optional[float],
+    ):
+        """替换该投标文件的全部候选（旧内容版本、旧提取器版本的候选一并删除，保留当前内容版本的人工指定）"""
+        if not self.enabled:
+            return
+        try:
+            self.db.query(PriceCandidate).filter(
+                PriceCandidate.bid_document_id == self.bid_document_id,
+                ~and_(
+                    PriceCandidate.source == 'manual',
+                    PriceCandidate.document_hash == self.doc_hash,
+                ),
+            ).delete(synchronize_session=False)
+
+            rows = []
+            selected_marked = False
+            for price in prices:
+                is_selected = (
+                    not selected_marked
+                    and selected_value is not None
+                    and price['value'] == selected_value
+                )
+                selected_marked = selected_marked or is_selected
+                rows.append(self._row(price, is_selected=is_selected))
+            rows.extend(self._row(price) for price in rejected)
+            if selected_value is not None and not selected_marked:
+                # 选中的价格来自兜底选择、不在候选列表中时单独记录
+                rows.append(
+                    self._row(
+                        {'value': selected_value, 'reason': '最佳价格选择', 'confidence': None},
+                        is_selected=True,
+                    )
+                )
+            self.db.bulk_save_objects(rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f'保存价格候选失败: bid_document_id={self.bid_document_id}, {e}')
+
+    def _row(self, price: Dict[str, Any], is_selected: bool = False) -> PriceCandidate:
+        return PriceCandidate(
+            bid_document_id=self.bid_document_id,
+            document_hash=self.doc_hash,
+            extractor_version=self.extractor_version,
+            value=price['value'],
+            page=price.get('page'),
+            reason=price.get('reason'),
+            confidence=price.get('confidence'),
+            source=price.get('source', 'text'),
+            exclusion_reason=price.get('exclusion_reason'),
+            is_selected=is_selected,
+        )
+
+    def override(self, value: Optional[float], user: Optional[str] = None):
+        """
+        人工指定价格（value 为 None 时撤销人工指定，恢复自动选择的价格）
+
+        Returns:
+            Optional[float]: 撤销或指定后生效的价格
+        """
+        if not self.enabled:
+            raise ValueError('投标文件不存在或无法读取，无法指定价格')
+        self.db.query(PriceCandidate).filter(
+            PriceCandidate.bid_document_id == self.bid_document_id,
+            PriceCandidate.source == 'manual',
+        ).delete(synchronize_session=False)
+        if value is not None:
+            self.db.add(
+                PriceCandidate(
+                    bid_document_id=self.bid_document_id,
+                    document_hash=self.doc_hash,
+                    extractor_version=self.extractor_version,
+                    value=value,
+                    reason='人工指定',
+                    confidence=100,
+                    source='manual',
+                    is_selected=True,
+                    created_by=user,
+                )
+            )
+        self.db.flush()
+        return self.lookup()[1]
+
+
+def load_selected_prices(db_session, project_id: int) -> Dict[int, float]:
+    """
+    一次查询项目中每个投标文件当前内容版本的选中价格（人工指定优先）
+
+    Returns:
+        Dict[int, float]: 投标文件ID到价格的映射
+    """
+    rows = selected_prices_query(db_session, project_id).all()
+    selected: Dict[int, float] = {}
+    current_hashes: Dict[int, Optional[str]] = {}
+    for bid_document_id, doc_hash, value, source, file_path in rows:
+        if bid_document_id not in current_hashes:
+            current_hashes[bid_document_id] = document_hash(file_path) if file_path else None
+        # 投标文件被替换后，旧版本的候选不再有效
+        if doc_hash != current_hashes[bid_document_id]:
+            continue
+        if source == 'manual' or bid_document_id not in selected:
+            selected[bid_document_id] = value
+    return selected
+
+
+def reextract_project_prices(
+    db_session,
+    project_id: int,
+    force: bool = False,
+    save: bool = True,
+    manager: Optional[PriceManager] = None,
+) -> Dict[int, Optional[float]]:
+    """
+    重新提取项目中候选由旧版本提取器提取的投标文件的价格；force 为 True 时全部投标文件重新提取
+
+    save 为 True 时保存新的候选并更新分析结果的 extracted_price（由调用方提交）；
+    为 False 时（试算）只返回重新提取的价格，不写入数据库。人工指定的价格仍然优先。
+
+    Returns:
+        Dict[int, Optional[float]]: 重新提取的投标文件ID -> 选中的价格
+    """
+    from modules.pdf_processor import PDFProcessor
+
+    manager = manager or PriceManager()
+    query = db_session.query(BidDocument.id, BidDocument.file_path).filter(
+        BidDocument.project_id == project_id, BidDocument.file_path.isnot(None)
+    )
+    if not force:
+        stale = (
+            db_session.query(PriceCandidate.id)
+            .filter(
+                PriceCandidate.bid_document_id == BidDocument.id,
+                PriceCandidate.source != 'manual',
+                or_(
+                    PriceCandidate.extractor_version.is_(None),
+                    PriceCandidate.extractor_version != manager.VERSION,
+                ),
+            )
+            .exists()
+        )
+        query = query.filter(stale)
+    prices: Dict[int, Optional[float]] = {}
+    for bid_document_id, file_path in query.order_by(BidDocument.id).all():
+        if not os.path.exists(file_path):
+            continue
+        store = PriceCandidateStore(
+            db_session, bid_document_id, document_hash(file_path), extractor_version=manager.VERSION
+        )
+        pages = PDFProcessor(file_path).extract_text_per_page()
+        if not pages:
+            logger.warning(f'投标文件 {bid_document_id} 没有可读取的文本，跳过重新提取价格')
+            continue
+        if save:
+            price = manager.resolve_best_price(pages, pdf_path=file_path, store=store, force=True)
+            db_session.query(AnalysisResult).filter(
+                AnalysisResult.project_id == project_id,
+                AnalysisResult.bid_document_id == bid_document_id,
+            ).update({'extracted_price': price}, synchronize_session=False)
+        else:
+            manual_price = store.manual_price()
+            price = (
+                manual_price
+                if manual_price is not None
+                else manager.resolve_best_price(pages, pdf_path=file_path)
+            )
+        prices[bid_document_id] = price
+    if prices:
+        logger.info(f'项目 {project_id} 重新提取了 {len(prices)} 个投标文件的价格')
+    return prices
+
+
+def candidate_to_dict(row: PriceCandidate) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'value': row.value,
+        'page': row.page + 1 if row.page is not None else None,
+        'reason': row.reason,
+        'confidence': row.confidence,
+        'source': row.source,
+        'exclusion_reason': row.exclusion_reason,
+        'is_selected': row.is_selected,
+        'extractor_version': row.extractor_version,
+        'created_by': row.created_by,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+    }
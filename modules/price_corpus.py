@@ -0,0 +1,326 @@
+"""
+价格提取回归语料生成模块
+生成带已知总价（真值）的模拟投标文件页面文本和PDF，覆盖价格一览表、大写金额、
+保证金干扰项、千分位分隔符和OCR噪声等情形，用于验证价格提取的速度优化不降低准确率。
+语料完全由随机种子决定，同一种子每次生成的内容相同。
+evaluate_corpus / run_corpus_benchmark 统计提取器吞吐量、候选召回率和选价准确率，
+供测试和 benchmark_price_accuracy.py 共用。
+"""
+
+import os
+import time
+import random
+import shutil
+import tempfile
+from typing import List, Dict, Any, Optional
+
+import fitz  # PyMuPDF
+
+from modules.enhanced_price_extractor import EnhancedPriceExtractor
+from modules.price_manager import PriceManager
+
+
+# 模拟的叙述性内容（含业绩金额、分项报价等非总价金额）
+NARRATIVE_LINES = [
+    '本项目技术方案严格按照招标文件要求编制，确保设备安全可靠运行。',
+    '售后服务承诺：接到通知后2小时内响应，24小时内到达现场。',
+    '我公司具备完善的质量管理体系，已通过ISO9001认证。',
+    '项目实施进度计划详见附表，关键节点均设置检查点。',
+    '设备主要技术参数：额定功率 45kW，防护等级 IP55。',
+    '人员配置：项目经理1名，技术负责人1名，安装工程师6名。',
+    '近三年类似项目业绩：合同金额 3,200,000.00 元，已完成验收。',
+    '培训计划：设备安装完成后对操作人员进行为期3天的现场培训。',
+    '质保期为验收合格之日起36个月，质保期内免费维修更换。',
+]
+
+SCENARIOS = (
+    'summary_verified',
+    'uppercase_amount',
+    'deposit_decoy',
+    'separators',
+    'summary_table',
+    'ocr_noise',
+)
+
+_DIGITS = '零壹贰叁肆伍陆柒捌玖'
+_UNITS = ['', '拾', '佰', '仟']
+
+# OCR常见误识别：全角标点、数字与字母混淆、字符间多余空格
+_OCR_CONFUSIONS = {'：': ':', '，': ',', '（': '(', '）': ')', '0': 'O', '1': 'l'}
+
+
+def to_chinese_uppercase(amount: int) -> str:
+    """整数金额转为中文大写（如 1234500 -> 壹佰贰拾叁万肆仟伍佰元整）"""
+    if amount <= 0:
+        return '零元整'
+
+    def section(num: int) -> str:
+        text = ''
+        zero = False
+        for position in range(3, -1, -1):
+            digit = num // (10 ** position) % 10
+            if digit == 0:
+                zero = bool(text)
+                continue
+            if zero:
+                text += '零'
+                zero = False
+            text += _DIGITS[digit] + _UNITS[position]
+        return text
+
+    parts = []
+    for value, unit in ((amount // 10 ** 8, '亿'), (amount // 10 ** 4 % 10 ** 4, '万'), (amount % 10 ** 4, '')):
+        if value:
+            if parts and value < 1000:
+                parts.append('零')
+            parts.append(section(value) + unit)
+        elif parts and parts[-1] != '零':
+            parts.append('零')
+    text = ''.join(parts).rstrip('零')
+    return text + '元整'
+
+
+def _format_amount(amount: int, style: str) -> str:
+    if style == 'comma':
+        return f'{amount:,}.00'
+    if style == 'plain':
+        return f'{amount}.00'
+    return str(amount)
+
+
+def _narrative(rng: random.Random, count: int) -> List[str]:
+    return [rng.choice(NARRATIVE_LINES) for _ in range(count)]
+
+
+def _add_ocr_noise(rng: random.Random, text: str, rate: float = 0.05) -> str:
+    """按比例替换易混淆字符、插入多余空格，模拟扫描件OCR结果"""
+    chars = []
+    for ch in text:
+        if ch in _OCR_CONFUSIONS and not ch.isdigit() and rng.random() < rate * 4:
+            chars.append(_OCR_CONFUSIONS[ch])
+        else:
+            chars.append(ch)
+        if rng.random() < rate:
+            chars.append(' ')
+    return ''.join(chars)
+
+
+def generate_case(scenario: str, seed: int = 0, num_pages: int = 30) -> Dict[str, Any]:
+    """
+    生成一份模拟投标文件
+
+    Returns:
+        Dict: name、scenario、total（真值总价）、deposit（保证金干扰金额）、
+              pages（页面文本）、summary_page（总价所在页，从0开始）、
+              table（summary_table 情形下的报价表行，用于生成带边框表格的PDF）
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f'未知的语料情形: {scenario}')
+    rng = random.Random(f'{scenario}-{seed}')
+    total = rng.randint(200, 9000) * 1000 + rng.choice([0, 500])
+    deposit = rng.choice([20000, 50000, 80000, 100000])
+    summary_page = rng.randint(2, max(2, num_pages // 4))
+    pages = ['\n'.join(_narrative(rng, rng.randint(15, 30))) for _ in range(num_pages)]
+    table = None
+
+    # 分项报价页（金额小于总价）和保证金页，所有情形都包含
+    item_page = min(num_pages - 1, summary_page + 1)
+    pages[item_page] = '\n'.join(
+        ['分项报价明细'] + [f'分项{k}：￥{rng.randint(1000, total // 10):,}.00' for k in range(1, 6)]
+    )
+    pages[0] = '\n'.join(['投标函', f'投标保证金：￥{deposit:,}.00'] + _narrative(rng, 10))
+
+    if scenario == 'summary_verified':
+        lines = [
+            '开标一览表',
+            f'投标报价（小写）：￥{total:,}.00',
+            f'大写：{to_chinese_uppercase(total)}',
+            f'投标保证金：￥{deposit:,}.00',
+        ]
+    elif scenario == 'uppercase_amount':
+        lines = [
+            '投标函',
+            f'我方投标总价为人民币（大写）{to_chinese_uppercase(total)}',
+            f'（小写：{total:,}.00元），工期90日历天。',
+        ]
+    elif scenario == 'deposit_decoy':
+        # 保证金、履约保函金额与总价同页（大于分项报价），总价前后各隔一段说明
+        decoy = rng.choice([deposit * 3, total // 10])
+        lines = [
+            '价格文件',
+            f'履约保证金：{decoy:,}.00 元',
+            f'投标保证金 {deposit:,}.00 元已缴纳',
+            *_narrative(rng, 2),
+            f'投标总价：{total:,}.00 元',
+            *_narrative(rng, 2),
+            f'银行保函金额 {decoy:,}.00 元',
+        ]
+    elif scenario == 'separators':
+        style = rng.choice(['comma', 'plain', 'integer'])
+        lines = ['报价部分', f'投标报价：{_format_amount(total, style)}元']
+    elif scenario == 'summary_table':
+        table = [
+            ['序号', '项目名称', '投标总价（元）'],
+            ['1', '设备采购及安装', f'{total:,}.00'],
+            ['大写', to_chinese_uppercase(total), ''],
+        ]
+        lines = ['开标一览表'] + ['  '.join(cell for cell in row if cell) for row in table]
+    else:  # ocr_noise
+        lines = [
+            '开标一览表',
+            _add_ocr_noise(rng, f'投标报价（小写）：￥{total:,}.00'),
+            '大写：' + ' '.join(to_chinese_uppercase(total)),
+            _add_ocr_noise(rng, f'投标保证金：￥{deposit:,}.00'),
+        ]
+        pages = [_add_ocr_noise(rng, page) for page in pages]
+
+    pages[summary_page] = '\n'.join(lines + _narrative(rng, 5))
+    return {
+        'name': f'{scenario}-{seed}',
+        'scenario': scenario,
+        'total': float(total),
+        'deposit': float(deposit),
+        'pages': pages,
+        'summary_page': summary_page,
+        'table': table,
+    }
+
+
+def generate_corpus(
+    cases_per_scenario: int = 5,
+    num_pages: int = 30,
+    scenarios: Optional[List[str]] = None,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """按情形各生成若干份模拟投标文件"""
+    return [
+        generate_case(scenario, seed + k, num_pages)
+        for scenario in (scenarios or SCENARIOS)
+        for k in range(cases_per_scenario)
+    ]
+
+
+def write_case_pdf(case: Dict[str, Any], path: str) -> str:
+    """
+    把语料写成PDF（每页一段文本，报价表情形在总价页绘制带边框的表格），
+    用于校验包含PDF文本提取和表格识别的完整流程
+    """
+    doc = fitz.open()
+    try:
+        for index, text in enumerate(case['pages']):
+            page = doc.new_page()
+            if index == case['summary_page'] and case['table']:
+                page.insert_text((50, 60), '开标一览表', fontname='china-s', fontsize=14)
+                widths = [60, 200, 240]
+                for r, row in enumerate(case['table']):
+                    x = 50
+                    for c, cell in enumerate(row):
+                        rect = fitz.Rect(x, 80 + r * 30, x + widths[c], 80 + (r + 1) * 30)
+                        page.draw_rect(rect, color=(0, 0, 0), width=1)
+                        page.insert_textbox(rect + (3, 5, -3, 0), cell, fontname='china-s', fontsize=9)
+                        x += widths[c]
+                continue
+            page.insert_textbox(
+                fitz.Rect(40, 40, page.rect.width - 40, page.rect.height - 40),
+                text,
+                fontname='china-s',
+                fontsize=9,
+            )
+        doc.save(path)
+    finally:
+        doc.close()
+    return path
+
+
+# 选出的价格与真值的相对误差在此范围内视为正确
+PRICE_TOLERANCE = 0.005
+
+
+def _matches(value: Optional[float], expected: float) -> bool:
+    return value is not None and abs(value - expected) <= expected * PRICE_TOLERANCE
+
+
+def _attach_pdfs(corpus: List[Dict[str, Any]], directory: str):
+    """把每份语料写成PDF，并用PDF中提取的文本替换页面文本"""
+    for case in corpus:
+        path = write_case_pdf(case, os.path.join(directory, f"{case['name']}.pdf"))
+        with fitz.open(path) as doc:
+            case['pages'] = [page.get_text() for page in doc]
+        case['pdf_path'] = path
+
+
+def evaluate_corpus(corpus: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    对语料逐份运行提取器和完整选价流程
+
+    Returns:
+        Dict: overall 为整体统计，scenarios 为按情形的统计，failures 为选价错误的语料
+    """
+    extractor = EnhancedPriceExtractor()
+    manager = PriceManager()
+    rows = []
+    for case in corpus:
+        pages = case['pages']
+        start = time.perf_counter()
+        candidates = extractor.extract_enhanced_prices(pages)
+        extract_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prices = manager.extract_prices_from_content(pages, pdf_path=case.get('pdf_path'))
+        selected = manager.select_best_price(prices, pages)
+        select_seconds = time.perf_counter() - start
+
+        rows.append(
+            {
+                'name': case['name'],
+                'scenario': case['scenario'],
+                'pages': len(pages),
+                'extract_seconds': extract_seconds,
+                'select_seconds': select_seconds,
+                'recalled': any(_matches(p['value'], case['total']) for p in candidates),
+                'correct': _matches(selected, case['total']),
+                'deposit_selected': _matches(selected, case['deposit']),
+                'expected': case['total'],
+                'selected': selected,
+            }
+        )
+
+    def summarize(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        pages = sum(r['pages'] for r in group)
+        extract_seconds = sum(r['extract_seconds'] for r in group)
+        select_seconds = sum(r['select_seconds'] for r in group)
+        return {
+            'cases': len(group),
+            'pages': pages,
+            'extract_pages_per_sec': pages / extract_seconds if extract_seconds else float('inf'),
+            'select_pages_per_sec': pages / select_seconds if select_seconds else float('inf'),
+            'recall': sum(r['recalled'] for r in group) / len(group),
+            'accuracy': sum(r['correct'] for r in group) / len(group),
+            'deposit_selected': sum(r['deposit_selected'] for r in group),
+        }
+
+    scenarios = {}
+    for scenario in dict.fromkeys(r['scenario'] for r in rows):
+        scenarios[scenario] = summarize([r for r in rows if r['scenario'] == scenario])
+    return {
+        'overall': summarize(rows) if rows else {},
+        'scenarios': scenarios,
+        'failures': [
+            {k: r[k] for k in ('name', 'expected', 'selected')} for r in rows if not r['correct']
+        ],
+    }
+
+
+def run_corpus_benchmark(
+    cases_per_scenario: int = 5, num_pages: int = 30, use_pdf: bool = False, seed: int = 0
+) -> Dict[str, Any]:
+    """生成语料并评估；use_pdf 为 True 时先写成PDF，再用PDF中提取的文本和表格评估"""
+    corpus = generate_corpus(cases_per_scenario, num_pages, seed=seed)
+    if not use_pdf:
+        return evaluate_corpus(corpus)
+    directory = tempfile.mkdtemp(prefix='price_corpus_')
+    try:
+        _attach_pdfs(corpus, directory)
+        return evaluate_corpus(corpus)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,175 @@
+"""
+价格提取规划模块
+一次遍历建立投标文件的章节索引（价格一览表页、价格文件页及价格表所在的页码区间），
+按优先级扫描：提供PDF路径时先识别价格页中的表格（PriceTableExtractor），
+再处理价格一览表页面的文本，一旦得到大小写金额相互印证的价格即停止，
+否则再对全文执行完整提取（复用已建立的索引和一览表结果）。
+候选价格的总价判断按页预先计算关键字标记，一次批量完成，
+不再为每个候选拼接前后两页的上下文。
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SECTION_KEYWORDS = ['投标一览表', '开标一览表', '价格一览表']
+PRICE_DOC_SECTION_KEYWORDS = ['价格文件', '报价部分']
+
+# 大小写金额相互印证的一览表价格（见 EnhancedPriceExtractor._extract_prices_from_summary_page）
+VERIFIED_SUMMARY_REASON = '价格一览表小写价格(与大写价格匹配)'
+# 与大写金额一致的价格表合计（见 PriceTableExtractor.parse_table）
+VERIFIED_TABLE_REASON = '价格表合计(与大写金额一致)'
+
+# 与 EnhancedPriceExtractor._is_total_price_intelligent 中的总价关键字一致
+INTELLIGENT_TOTAL_KEYWORDS = ['总价', '总报价', '投标报价', '合计', '总计', '报价总额', '小写', '大写']
+
+
+class PriceSectionIndex:
+    """投标文件的价格相关章节索引"""
+
+    def __init__(self, summary_pages: List[int], price_doc_pages: List[int]):
+        self.summary_pages = summary_pages
+        self.price_doc_pages = price_doc_pages
+        self.summary_page_set = set(summary_pages)
+        self.price_doc_page_set = set(price_doc_pages)
+        self.price_table_ranges = self._merge_ranges(
+            sorted(self.summary_page_set | self.price_doc_page_set)
+        )
+
+    @classmethod
+    def build(cls, pages: List[str]) -> 'PriceSectionIndex':
+        """
+        一次遍历所有页面，同时识别价格一览表页和价格文件页
+
+        关键字均为纯文本，逐个子串查找比多分支正则搜索快一个数量级。
+        """
+        summary_pages: List[int] = []
+        price_doc_pages: List[int] = []
+        for i, page_text in enumerate(pages):
+            if any(k in page_text for k in SUMMARY_SECTION_KEYWORDS):
+                summary_pages.append(i)
+            if any(k in page_text for k in PRICE_DOC_SECTION_KEYWORDS):
+                price_doc_pages.append(i)
+        return cls(summary_pages, price_doc_pages)
+
+    @staticmethod
+    def _merge_ranges(page_indexes: List[int]) -> List[Tuple[int, int]]:
+        """将连续页码合并为闭区间 (起始页, 结束页)"""
+        ranges: List[Tuple[int, int]] = []
+        for i in page_indexes:
+            if ranges and ranges[-1][1] == i - 1:
+                ranges[-1] = (ranges[-1][0], i)
+            else:
+                ranges.append((i, i))
+        return ranges
+
+    def price_table_pages(self) -> List[int]:
+        """价格表可能所在的页面（各区间内的全部页码）"""
+        return [i for start, end in self.price_table_ranges for i in range(start, end + 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'summary_pages': self.summary_pages,
+            'price_doc_pages': self.price_doc_pages,
+            'price_table_ranges': self.price_table_ranges,
+        }
+
+
+class PriceExtractionPlanner:
+    """按章节优先级组织价格提取，找到已验证的一览表价格后提前结束"""
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.last_index: Optional[PriceSectionIndex] = None
+        self.last_early_exit = False
+
+    def extract(
+        self,
+        pages: List[str],
+        pdf_path: Optional[str] = None,
+        rejected: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        index = PriceSectionIndex.build(pages)
+        self.last_index = index
+        self.last_early_exit = False
+
+        # 第一优先级：价格页中的表格（只对章节索引标记的页面做表格识别）
+        table_prices: List[Dict[str, Any]] = []
+        if pdf_path and index.price_table_ranges:
+            # 延迟导入：price_table_extractor 依赖 enhanced_price_extractor，后者又依赖本模块
+            from modules.price_table_extractor import PriceTableExtractor
+
+            table_prices = PriceTableExtractor(pdf_path, self.extractor.converter).extract(
+                index.price_table_pages()
+            )
+            if any(p['reason'] == VERIFIED_TABLE_REASON for p in table_prices):
+                self.last_early_exit = True
+                logger.info(f'价格表合计与大写金额一致，跳过全部 {len(pages)} 页的文本价格扫描')
+                return table_prices
+
+        # 第二优先级：价格一览表页面的文本
+        summary_results: Dict[int, List[Dict[str, Any]]] = {}
+        for i in index.summary_pages:
+            summary_results[i] = self.extractor._extract_prices_from_summary_page(pages[i], i)
+
+        verified = [
+            p
+            for i in index.summary_pages
+            for p in summary_results[i]
+            if p['reason'] == VERIFIED_SUMMARY_REASON
+        ]
+        if verified:
+            self.last_early_exit = True
+            logger.info(
+                f'价格一览表第 {verified[0]["page"] + 1} 页大小写金额一致，跳过其余 {len(pages) - len(index.summary_pages)} 页的价格扫描'
+            )
+            return table_prices + [p for i in index.summary_pages for p in summary_results[i]]
+
+        # 未找到已验证价格：全文提取，复用章节索引和一览表结果
+        return table_prices + self.extractor.extract_enhanced_prices(
+            pages, sections=index, summary_results=summary_results, rejected=rejected
+        )
+
+    @staticmethod
+    def total_price_flags(prices: List[Dict[str, Any]], pages: List[str]) -> List[bool]:
+        """
+        批量判断候选价格是否为总价，结果与逐个调用
+        EnhancedPriceExtractor._is_total_price_intelligent(当前页 + 下一页, 价格) 相同。
+
+        关键字和价格字符串都不含换行，不会跨越两页拼接处，
+        因此“上下文包含”等价于“当前页或下一页包含”：关键字标记按页只计算一次，
+        金额大于10000的候选直接判定，其余候选才检查价格字符串。
+        """
+        keyword_pages: Dict[int, bool] = {}
+
+        def page_has_keyword(page_index: int) -> bool:
+            if page_index not in keyword_pages:
+                keyword_pages[page_index] = any(
+                    k in pages[page_index] for k in INTELLIGENT_TOTAL_KEYWORDS
+                )
+            return keyword_pages[page_index]
+
+        flags = []
+        for price_info in prices:
+            value = price_info['value']
+            if value > 10000:
+                flags.append(True)
+                continue
+            page_index = price_info['page']
+            context_pages = [page_index]
+            if page_index + 1 < len(pages):
+                context_pages.append(page_index + 1)
+            if not any(page_has_keyword(i) for i in context_pages):
+                flags.append(False)
+                continue
+            price_str = str(value)
+            formatted_price_str = f'{value:,.2f}'
+            flags.append(
+                any(
+                    price_str in pages[i] or formatted_price_str in pages[i]
+                    for i in context_pages
+                )
+            )
+        return flags
@@ -0,0 +1,402 @@
+"""
+价格分公式引擎
+将招标文件中常见的价格分计算规则编译为安全的表达式树，并对所有投标人一次性向量化求值：
+- 评标基准价：最低报价、算术平均值、去掉最高最低后的平均值，可带系数（如“平均值的95%”、“下浮5%”）
+- 比值公式：如“投标报价得分＝（评标基准价/投标报价）×40%×100”、“(评标基准价/投标报价)×价格分值”
+- 偏离扣分：如“每高于评标基准价1%扣1分，每低于1%扣0.5分，扣完为止”
+- 得分区间：“最低得X分”、“最高不超过X分”，默认限制在 [0, 满分]
+
+表达式只允许数字、四则运算、括号和三个变量（投标报价P、评标基准价B、满分M），
+不使用 eval，结果确定可复现。无法解析的规则返回 None，由调用方回退到AI计算。
+"""
+
+import re
+import logging
+import unicodedata
+from typing import List, Dict, Optional, Union
+
+
+logger = logging.getLogger(__name__)
+
+Vector = Union[float, List[float]]
+
+# 文本中的变量名（按长度从长到短匹配）
+_VARIABLE_NAMES = {
+    'B': ['评标基准价', '评审基准价', '基准价格', '基准价'],
+    'P': ['有效投标报价', '投标人报价', '投标报价', '投标价格', '评标价格', '评标价', '报价'],
+    'M': ['价格分满分', '价格分值', '价格分', '满分', '分值'],
+}
+_VOCABULARY = sorted(
+    ((name, var) for var, names in _VARIABLE_NAMES.items() for name in names),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+_OPERATORS = {'+': '+', '-': '-', '*': '*', '×': '*', 'x': '*', 'X': '*', '/': '/', '÷': '/'}
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?%?')
+_CLAUSE_END_RE = re.compile(r'[，,。；;\n]')
+
+_PERCENT = r'(\d+(?:\.\d+)?)(?:%|个百分点)'
+_DEDUCT = r'[的,，]?(?:扣减|扣除|扣|减)(\d+(?:\.\d+)?)分'
+_DEVIATION_HIGH_RE = re.compile(r'每(?:高于|超过|超出|大于)(?:评标)?(?:基准价|基准)?(?:的)?' + _PERCENT + _DEDUCT)
+_DEVIATION_LOW_RE = re.compile(r'每(?:低于|小于)(?:评标)?(?:基准价|基准)?(?:的)?' + _PERCENT + _DEDUCT)
+_DEVIATION_BOTH_RE = re.compile(r'每偏离(?:评标)?(?:基准价|基准)?(?:的)?' + _PERCENT + _DEDUCT)
+_FLOOR_RE = re.compile(r'最低(?:得|为|不低于)?(\d+(?:\.\d+)?)分')
+_CAP_RE = re.compile(r'最高(?:得|为|不超过|不高于)?(\d+(?:\.\d+)?)分')
+_MEAN_FACTOR_RE = re.compile(r'平均(?:值|价|数)?(?:的|×|\*|乘以)?(\d+(?:\.\d+)?)%')
+# 基准价下浮只认基准价定义的写法：评标基准价为平均值下浮5%、平均值下浮5%作为评标基准价、
+# 评标基准价=平均值×(1-5%)；“低于评标基准价下浮20%视为异常低价”等预警条款不改变基准价
+_DISCOUNT_RE = re.compile(
+    r'基准价[^。；，,\n下]*?(?:为|=)[^。；，,\n]*?下浮(\d+(?:\.\d+)?)%'
+    r'|下浮(\d+(?:\.\d+)?)%[^。；，,\n]*?(?:作为|(?<!视)为)[^。；，,\n]*?基准价'
+    r'|基准价=[^。；\n]*?[×*]\s*\(\s*1\s*-\s*(\d+(?:\.\d+)?)%\s*\)'
+)
+_TRIMMED_RE = re.compile(r'去掉[^。；]*?最高[^。；]*?最低|去掉[^。；]*?最低[^。；]*?最高')
+_MEAN_RE = re.compile(r'平均[^。；]*?基准价|基准价[^。；]*?平均')
+_LOWEST_RE = re.compile(r'最低[^。；]*?基准价|基准价[^。；]*?最低(?:报价|价|的)')
+
+
+def _elementwise(fn, a: Vector, b: Vector) -> Vector:
+    if isinstance(a, list) and isinstance(b, list):
+        return [fn(x, y) for x, y in zip(a, b)]
+    if isinstance(a, list):
+        return [fn(x, b) for x in a]
+    if isinstance(b, list):
+        return [fn(a, y) for y in b]
+    return fn(a, b)
+
+
+def _divide(x: float, y: float) -> float:
+    # 报价为0属于无效数据，该投标人按0分处理而不是中断整个项目的计算
+    return x / y if y else 0.0
+
+
+_BINARY = {
+    '+': lambda x, y: x + y,
+    '-': lambda x, y: x - y,
+    '*': lambda x, y: x * y,
+    '/': _divide,
+}
+
+
+class Const:
+    def __init__(self, value: float):
+        self.value = value
+
+    def evaluate(self, env: Dict[str, Vector]) -> Vector:
+        return self.value
+
+    def variables(self) -> set:
+        return set()
+
+    def __repr__(self):
+        return f'{self.value:g}'
+
+
+class Var:
+    def __init__(self, name: str):
+        self.name = name
+
+    def evaluate(self, env: Dict[str, Vector]) -> Vector:
+        return env[self.name]
+
+    def variables(self) -> set:
+        return {self.name}
+
+    def __repr__(self):
+        return self.name
+
+
+class BinOp:
+    def __init__(self, op: str, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def evaluate(self, env: Dict[str, Vector]) -> Vector:
+        return _elementwise(_BINARY[self.op], self.left.evaluate(env), self.right.evaluate(env))
+
+    def variables(self) -> set:
+        return self.left.variables() | self.right.variables()
+
+    def __repr__(self):
+        return f'({self.left!r} {self.op} {self.right!r})'
+
+
+class Positive:
+    """max(0, x)，用于偏离扣分中只计算单侧偏离"""
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def evaluate(self, env: Dict[str, Vector]) -> Vector:
+        return _elementwise(lambda x, _: max(0.0, x), self.operand.evaluate(env), 0.0)
+
+    def variables(self) -> set:
+        return self.operand.variables()
+
+    def __repr__(self):
+        return f'pos{self.operand!r}'
+
+
+class _Parser:
+    """四则运算的递归下降解析器（只接受 _tokenize 产生的记号）"""
+
+    def __init__(self, tokens: List[tuple]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def parse(self):
+        node = self._expr()
+        if self.pos != len(self.tokens):
+            raise ValueError('表达式末尾有多余内容')
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _expr(self):
+        node = self._term()
+        while self._peek() in (('op', '+'), ('op', '-')):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = BinOp(op, node, self._term())
+        return node
+
+    def _term(self):
+        node = self._factor()
+        while self._peek() in (('op', '*'), ('op', '/')):
+            op = self.tokens[self.pos][1]
+            self.pos += 1
+            node = BinOp(op, node, self._factor())
+        return node
+
+    def _factor(self):
+        kind, value = self._peek()
+        if kind is None:
+            raise ValueError('表达式不完整')
+        self.pos += 1
+        if (kind, value) == ('op', '-'):
+            return BinOp('-', Const(0.0), self._factor())
+        if kind == 'num':
+            return Const(value)
+        if kind == 'var':
+            return Var(value)
+        if kind == 'lparen':
+            node = self._expr()
+            if self._peek()[0] != 'rparen':
+                raise ValueError('括号不匹配')
+            self.pos += 1
+            return node
+        raise ValueError(f'无法识别的记号: {value}')
+
+
+def _tokenize(text: str) -> List[tuple]:
+    """将公式右侧切分为记号，遇到无法识别的文字（如“（保留两位小数）”）即停止"""
+    tokens = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch.isspace():
+            i += 1
+            continue
+        number = _NUMBER_RE.match(text, i)
+        if number:
+            literal = number.group(0)
+            value = float(literal.rstrip('%'))
+            tokens.append(('num', value / 100 if literal.endswith('%') else value))
+            i = number.end()
+            continue
+        if ch in _OPERATORS:
+            tokens.append(('op', _OPERATORS[ch]))
+            i += 1
+            continue
+        if ch in '()':
+            tokens.append(('lparen' if ch == '(' else 'rparen', ch))
+            i += 1
+            continue
+        for name, var in _VOCABULARY:
+            if text.startswith(name, i):
+                tokens.append(('var', var))
+                i += len(name)
+                break
+        else:
+            break
+    # 去掉被截断的说明文字留下的左括号
+    while tokens and tokens[-1][0] == 'lparen':
+        tokens.pop()
+    return tokens
+
+
+def _normalize(text: str) -> str:
+    # NFKC 将全角括号、等号、百分号、星号、斜杠等统一为半角
+    return unicodedata.normalize('NFKC', text).replace('[', '(').replace(']', ')')
+
+
+def _parse_score_expression(text: str):
+    """在规则文本中查找“得分=…”形式的公式，返回其右侧的表达式树"""
+    for match in re.finditer('=', text):
+        lhs_start = max(
+            (m.end() for m in _CLAUSE_END_RE.finditer(text, 0, match.start())), default=0
+        )
+        lhs = text[lhs_start:match.start()]
+        # “评标基准价=…”是基准价定义而不是得分公式
+        if '基准价' in lhs:
+            continue
+        rhs = text[match.end():]
+        end = _CLAUSE_END_RE.search(rhs)
+        if end:
+            rhs = rhs[:end.start()]
+        tokens = _tokenize(rhs)
+        if not tokens:
+            continue
+        try:
+            node = _Parser(tokens).parse()
+        except (ValueError, IndexError):
+            continue
+        if 'P' in node.variables():
+            return node
+    return None
+
+
+class CompiledPriceFormula:
+    """编译后的价格分公式"""
+
+    def __init__(
+        self,
+        expression,
+        benchmark: Optional[str],
+        benchmark_factor: float = 1.0,
+        floor: float = 0.0,
+        cap: Optional[float] = None,
+        kind: str = 'ratio',
+    ):
+        self.expression = expression
+        self.benchmark = benchmark
+        self.benchmark_factor = benchmark_factor
+        self.floor = floor
+        self.cap = cap
+        self.kind = kind
+
+    def describe(self) -> str:
+        benchmark = {
+            'min': '最低报价',
+            'mean': '算术平均值',
+            'trimmed_mean': '去掉最高最低后的平均值',
+            None: '无',
+        }[self.benchmark]
+        factor = f'×{self.benchmark_factor:g}' if self.benchmark_factor != 1.0 else ''
+        return f'{self.kind}: 得分={self.expression!r}, 基准价={benchmark}{factor}'
+
+    def _benchmark_value(self, prices: List[float]) -> float:
+        if self.benchmark == 'min':
+            value = min(prices)
+        elif self.benchmark == 'trimmed_mean' and len(prices) > 2:
+            ordered = sorted(prices)[1:-1]
+            value = sum(ordered) / len(ordered)
+        else:
+            value = sum(prices) / len(prices)
+        return value * self.benchmark_factor
+
+    def evaluate(self, bidder_prices: Dict[str, float], max_score: float) -> Dict[str, float]:
+        """对所有投标人一次求值，得分限制在 [最低分, 最高分(默认满分)] 并保留两位小数"""
+        valid = {b: float(p) for b, p in bidder_prices.items() if p is not None and p > 0}
+        if not valid:
+            return {}
+        bidders = list(valid)
+        prices = [valid[b] for b in bidders]
+        env = {'P': prices, 'M': float(max_score)}
+        if self.benchmark:
+            env['B'] = self._benchmark_value(prices)
+
+        values = self.expression.evaluate(env)
+        if not isinstance(values, list):
+            values = [values] * len(bidders)
+
+        cap = self.cap if self.cap is not None else float(max_score)
+        return {
+            bidder: round(min(max(value, self.floor), cap), 2)
+            for bidder, value in zip(bidders, values)
+        }
+
+
+def _detect_benchmark(text: str):
+    if _TRIMMED_RE.search(text) and '平均' in text:
+        benchmark = 'trimmed_mean'
+    elif _MEAN_RE.search(text):
+        benchmark = 'mean'
+    elif _LOWEST_RE.search(text):
+        benchmark = 'min'
+    else:
+        return None, 1.0
+
+    factor = 1.0
+    if benchmark != 'min':
+        factor_match = _MEAN_FACTOR_RE.search(text)
+        if factor_match:
+            factor = float(factor_match.group(1)) / 100
+    discount = _DISCOUNT_RE.search(text)
+    if discount:
+        factor *= 1 - float(next(g for g in discount.groups() if g is not None)) / 100
+    return benchmark, factor
+
+
+def _deviation_expression(text: str):
+    """偏离扣分：M - 高于每step%扣a分 - 低于每step%扣b分（不足一个step的按比例计算）"""
+    high = _DEVIATION_HIGH_RE.search(text)
+    low = _DEVIATION_LOW_RE.search(text)
+    both = _DEVIATION_BOTH_RE.search(text)
+    if not (high or low or both):
+        return None
+    high = high or both
+    low = low or both
+
+    # 偏离百分比 = (P - B) / B * 100
+    deviation = BinOp('*', BinOp('/', BinOp('-', Var('P'), Var('B')), Var('B')), Const(100.0))
+    node = Var('M')
+    for match, signed in ((high, deviation), (low, BinOp('-', Const(0.0), deviation))):
+        if not match:
+            continue
+        step, points = float(match.group(1)), float(match.group(2))
+        if step <= 0:
+            return None
+        penalty = BinOp('*', BinOp('/', Positive(signed), Const(step)), Const(points))
+        node = BinOp('-', node, penalty)
+    return node
+
+
+def compile_price_formula(
+    formula: Optional[str], description: Optional[str] = None
+) -> Optional[CompiledPriceFormula]:
+    """
+    编译价格分规则（价格公式与评分描述合并解析）
+
+    Returns:
+        Optional[CompiledPriceFormula]: 无法确定基准价或得分公式时返回 None
+    """
+    text = _normalize('\n'.join(t for t in (formula, description) if isinstance(t, str) and t))
+    if not text.strip():
+        return None
+
+    benchmark, factor = _detect_benchmark(text)
+
+    kind = 'deviation'
+    expression = _deviation_expression(text)
+    if expression is None:
+        kind = 'ratio'
+        expression = _parse_score_expression(text)
+    if expression is None:
+        return None
+    if 'B' in expression.variables() and benchmark is None:
+        logger.info('价格公式引用了评标基准价，但规则中没有基准价的定义，无法编译')
+        return None
+
+    floor_match = _FLOOR_RE.search(text)
+    cap_match = _CAP_RE.search(text)
+    return CompiledPriceFormula(
+        expression,
+        benchmark if 'B' in expression.variables() else None,
+        benchmark_factor=factor,
+        floor=float(floor_match.group(1)) if floor_match else 0.0,
+        cap=float(cap_match.group(1)) if cap_match else None,
+        kind=kind,
+    )
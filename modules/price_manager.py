@@ -1,40 +1,80 @@
 from modules.enhanced_price_extractor import EnhancedPriceExtractor
+from modules.price_extraction_planner import VERIFIED_TABLE_REASON, PriceExtractionPlanner
+from modules.price_formula_engine import compile_price_formula
 from typing import List, Dict, Any, Optional
 import logging
 
 
 class PriceManager:
+    # 价格提取或选择逻辑变化时递增：已保存的价格候选随之失效，重算价格分时重新提取
+    VERSION = '1'
+
     def __init__(self):
         self.price_extractor = EnhancedPriceExtractor()
+        self.extraction_planner = PriceExtractionPlanner(self.price_extractor)
         self.logger = logging.getLogger(__name__)
 
-    def extract_prices_from_content(self, pages: List[str]) -> List[Dict[str, Any]]:
-        prices = self.price_extractor.extract_enhanced_prices(pages)
-        return self._deduplicate_prices(prices)
+    def extract_prices_from_content(
+        self,
+        pages: List[str],
+        pdf_path: Optional[str] = None,
+        rejected: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        # 先识别价格页中的表格（提供PDF路径时），再扫描价格一览表，
+        # 找到大小写一致的价格即不再扫描其余页面
+        prices = self.extraction_planner.extract(pages, pdf_path=pdf_path, rejected=rejected)
+        return self._deduplicate_prices(prices, rejected=rejected)
+
+    def resolve_best_price(
+        self, pages: List[str], pdf_path: Optional[str] = None, store=None, force: bool = False
+    ) -> Optional[float]:
+        """
+        获取投标文件的最佳价格：同一内容版本、同一提取器版本已提取过时直接读取价格候选存储（含人工指定），
+        否则（或 force 为 True 时）提取、选择并把全部候选连同排除原因写入存储
+        """
+        if store is not None and not force:
+            found, value = store.lookup()
+            if found:
+                self.logger.info(f"复用已保存的价格候选，选中价格: {value}")
+                return value
+
+        rejected: List[Dict[str, Any]] = []
+        prices = self.extract_prices_from_content(pages, pdf_path=pdf_path, rejected=rejected)
+        self.logger.info(f"提取到的所有价格: {prices}")
+        best_price = self.select_best_price(prices, pages)
+        if store is not None:
+            store.save(prices, rejected, best_price)
+            # 人工指定的价格不随重新提取失效
+            manual_price = store.manual_price()
+            if manual_price is not None:
+                return manual_price
+        return best_price
 
     def select_best_price(
         self, prices: List[Dict[str, Any]], pages: List[str]
     ) -> float:
-        # 首先检查是否有来自"投标一览表"页面的高置信度价格
-        summary_page_prices = [p for p in prices if '价格一览表' in p.get('reason', '') and p.get('confidence', 0) >= 90]
-        if summary_page_prices:
-            # 从"投标一览表"中选择置信度最高的价格
-            summary_page_prices.sort(key=lambda x: x['confidence'], reverse=True)
-            return summary_page_prices[0]['value']
-
-        # 然后检查智能判断的价格
-        intelligent_prices = []
-        for price_info in prices:
-            page_index = price_info['page']
-            # Create a context of the current page and the next one if it exists
-            context = pages[page_index]
-            if page_index + 1 < len(pages):
-                context += '\n' + pages[page_index + 1]
+        # 与大写金额一致的价格表合计结构明确且经过校验，作为最高优先级来源
+        verified_table_prices = [p for p in prices if p.get('reason') == VERIFIED_TABLE_REASON]
+        if verified_table_prices:
+            return max(verified_table_prices, key=lambda x: x['confidence'])['value']
+
+        # 其次在未经校验的价格表合计和"投标一览表"页面的高置信度价格中选择置信度最高的
+        # （大小写一致的一览表价格优先于未校验的表格合计）
+        ranked_prices = [
+            p
+            for p in prices
+            if p.get('source') == 'table'
+            or ('价格一览表' in p.get('reason', '') and p.get('confidence', 0) >= 90)
+        ]
+        if ranked_prices:
+            ranked_prices.sort(key=lambda x: x['confidence'], reverse=True)
+            return ranked_prices[0]['value']
 
-            if self.price_extractor._is_total_price_intelligent(
-                context, price_info['value']
-            ):
-                intelligent_prices.append(price_info['value'])
+        # 然后检查智能判断的价格（按页预计算关键字，批量判断所有候选）
+        flags = self.extraction_planner.total_price_flags(prices, pages)
+        intelligent_prices = [
+            price_info['value'] for price_info, is_total in zip(prices, flags) if is_total
+        ]
 
         if intelligent_prices:
             return max(intelligent_prices)
@@ -42,14 +82,25 @@ class PriceManager:
         # Fallback to the simple method if no intelligent price is found
         return self.price_extractor.select_best_total_price(prices)
 
-    def _deduplicate_prices(self, prices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _deduplicate_prices(
+        self,
+        prices: List[Dict[str, Any]],
+        rejected: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
         # Deduplicate based on price value, keeping the first occurrence (lowest page number)
-        seen = set()
+        first_pages = {}
         deduplicated = []
         for price_info in prices:
-            if price_info['value'] not in seen:
-                seen.add(price_info['value'])
+            if price_info['value'] not in first_pages:
+                first_pages[price_info['value']] = price_info['page']
                 deduplicated.append(price_info)
+            elif rejected is not None:
+                rejected.append(
+                    dict(
+                        price_info,
+                        exclusion_reason=f"与第 {first_pages[price_info['value']] + 1} 页的相同金额重复",
+                    )
+                )
         # Sort by value, descending
         return sorted(deduplicated, key=lambda p: p['value'], reverse=True)
 
@@ -231,6 +282,13 @@ class PriceManager:
         if not formula:
             self.logger.error("没有提供有效的价格计算公式，无法计算价格分")
             return scores
+
+        # 常见公式（最低价/平均价基准、比值、偏离扣分）由公式引擎直接计算
+        compiled = compile_price_formula(formula, description)
+        if compiled:
+            scores = compiled.evaluate(bidder_prices, price_max_score)
+            self.logger.info(f"公式引擎计算价格分 ({compiled.describe()}): {scores}")
+            return scores
             
         # 这里应该调用AI大模型来计算价格分，而不是硬编码计算逻辑
         # 目前记录详细信息，后续需要实现AI大模型调用
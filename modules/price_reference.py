@@ -0,0 +1,325 @@
+"""
+价格提取参照实现与模拟页面模块
+保留优化前的价格提取实现和选价流程，以及生成模拟投标文件页面的工具，
+供测试和基准脚本校验优化后的实现结果不变。
+"""
+
+import re
+import random
+from typing import List, Dict, Any
+
+from modules.enhanced_price_extractor import EnhancedPriceExtractor
+from modules.price_manager import PriceManager
+
+
+NARRATIVE_LINES = [
+    '本项目技术方案严格按照招标文件要求编制，确保设备安全可靠运行。',
+    '售后服务承诺：接到通知后2小时内响应，24小时内到达现场。',
+    '我公司具备完善的质量管理体系，已通过ISO9001认证。',
+    '项目实施进度计划详见附表，关键节点均设置检查点。',
+    '设备主要技术参数：额定功率 45kW，防护等级 IP55。',
+    '人员配置：项目经理1名，技术负责人1名，安装工程师6名。',
+    '近三年类似项目业绩：合同金额 3,200,000.00 元，已完成验收。',
+    '投标保证金已按要求缴纳，金额为人民币 50,000.00 元。',
+    '履约保证金为合同总价的10%，中标后按要求提交银行保函。',
+    '分项报价：控制柜 ￥120,000.00，电缆 ￥35,600.00。',
+]
+
+
+def generate_bid_pages(
+    num_pages: int = 400, seed: int = 0, verified_summary: bool = False
+) -> List[str]:
+    """
+    生成模拟投标文件页面（含价格一览表、保证金干扰项和分项报价）
+
+    verified_summary 为 True 时一览表的小写金额与大写金额一致。
+    """
+    rng = random.Random(seed)
+    total = rng.randint(1_000_000, 9_000_000)
+    if verified_summary:
+        total = 1_234_500
+    pages = []
+    for i in range(num_pages):
+        lines = [rng.choice(NARRATIVE_LINES) for _ in range(rng.randint(20, 40))]
+        if i == 3:
+            lines.insert(0, '开标一览表')
+            lines.insert(1, f'投标报价：￥{total:,}.00')
+            lines.insert(2, '大写：壹佰贰拾叁万肆仟伍佰元整')
+            lines.insert(3, '投标保证金：￥50,000.00')
+        elif i % 37 == 0:
+            lines.insert(0, '价格文件')
+            lines.append(f'合计 {rng.randint(10_000, 900_000):,}.00 元')
+        elif i % 53 == 0:
+            lines.append(f'总价：{rng.randint(10_000, 900_000)} 投标保证金另计')
+        pages.append('\n'.join(lines))
+    return pages
+
+
+class LegacyEnhancedPriceExtractor(EnhancedPriceExtractor):
+    """优化前的实现（逐页复制文本、逐匹配扫描窗口内的排除关键词），仅用于对比"""
+
+    def extract_enhanced_prices(self, pages: List[str]) -> List[Dict[str, Any]]:
+        """
+        从PDF页面中提取价格，并为每个价格计算置信度。
+        """
+        all_prices = []
+
+        # 1. 识别关键章节
+        price_summary_pages = self._identify_sections(
+            pages, ['投标一览表', '开标一览表', '价格一览表']
+        )
+        price_doc_pages = self._identify_sections(pages, ['价格文件', '报价部分'])
+
+        for i, page_text in enumerate(pages):
+            context = page_text.replace('\n', ' ')
+
+            # 2. 特别处理价格一览表页面
+            if i in price_summary_pages:
+                summary_prices = self._extract_prices_from_summary_page(page_text, i)
+                all_prices.extend(summary_prices)
+
+            # 3. 在页面中查找所有可能的价格
+            # 查找与关键字强相关的价格
+            for pattern in self.price_patterns:
+                for match in re.finditer(pattern, context):
+                    groups = match.groups()
+                    price_str = (
+                        groups[1]
+                        if groups[0] in self.total_price_keywords
+                        else groups[0]
+                    )
+                    chinese_price_str = groups[2] if len(groups) > 2 else None
+                    # 窗口文本用于排除保证金等干扰
+                    window_start = max(0, match.start() - 40)
+                    window_end = min(len(context), match.end() + 40)
+                    window_text = context[window_start:window_end]
+                    if any(k in window_text for k in self.exclude_keywords):
+                        continue
+
+                    price_value = self._str_to_float(price_str)
+                    if price_value is None:
+                        continue
+
+                    confidence = self._calculate_price_confidence(
+                        page_index=i,
+                        price_value=price_value,
+                        keyword_found=True,
+                        chinese_price_str=chinese_price_str,
+                        price_summary_pages=price_summary_pages,
+                        price_doc_pages=price_doc_pages,
+                    )
+                    all_prices.append(
+                        {
+                            'value': price_value,
+                            'page': i,
+                            'confidence': confidence,
+                            'reason': '关键字匹配',
+                        }
+                    )
+
+            # 查找通用价格格式
+            for pattern in self.general_price_patterns:
+                for match in re.finditer(pattern, context):
+                    price_str = match.group(1)
+                    window_start = max(0, match.start() - 25)
+                    window_end = min(len(context), match.end() + 25)
+                    window_text = context[window_start:window_end]
+                    if any(k in window_text for k in self.exclude_keywords):
+                        continue
+                    price_value = self._str_to_float(price_str)
+                    if price_value is None:
+                        continue
+
+                    confidence = self._calculate_price_confidence(
+                        page_index=i,
+                        price_value=price_value,
+                        keyword_found=False,
+                        price_summary_pages=price_summary_pages,
+                        price_doc_pages=price_doc_pages,
+                    )
+                    all_prices.append(
+                        {
+                            'value': price_value,
+                            'page': i,
+                            'confidence': confidence,
+                            'reason': '通用格式匹配',
+                        }
+                    )
+
+        return all_prices
+
+    def _extract_prices_from_summary_page(
+        self, page_text: str, page_index: int
+    ) -> List[Dict[str, Any]]:
+        """
+        从价格一览表页面提取价格，特别处理小写和大写价格对照的情况
+        """
+        prices = []
+        xiaoxie_price = None
+        daxie_price_text = None
+        daxie_price_value = None
+
+        # 查找小写价格 - 增强模式以匹配更多格式
+        xiaoxie_patterns = [
+            r'(小写).*?￥?\s*([\d,]+\.?\d*)',
+            r'(小写金额)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+            r'(投标报价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+            r'(总报价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+            r'(总价)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+            r'(人民币)[:：\s]*￥?\s*([\d,]+\.?\d*)',
+            r'￥\s*([\d,]+\.?\d*)',
+            r'([\d,]+\.?\d*)\s*(?:元|人民币)',
+        ]
+
+        # 首先查找更明确的投标报价、总报价等关键字
+        for pattern in xiaoxie_patterns[:6]:  # 前6个模式是更明确的关键字
+            xiaoxie_match = re.search(pattern, page_text, re.IGNORECASE)
+            if xiaoxie_match:
+                xiaoxie_price_str = xiaoxie_match.group(2)  # 获取价格组
+                # 行级过滤以排除保证金等干扰项
+                line_start = page_text.rfind('\n', 0, xiaoxie_match.start()) + 1
+                line_end = page_text.find('\n', xiaoxie_match.end())
+                if line_end == -1:
+                    line_end = len(page_text)
+                line_text = page_text[line_start:line_end]
+                if any(k in line_text for k in self.exclude_keywords):
+                    continue
+                xiaoxie_price = self._str_to_float(xiaoxie_price_str)
+                if (
+                    xiaoxie_price is not None and xiaoxie_price > 1000
+                ):  # 过滤掉过小的价格（如1.00）
+                    prices.append(
+                        {
+                            'value': xiaoxie_price,
+                            'page': page_index,
+                            'confidence': 100,  # 最高置信度
+                            'reason': f'价格一览表明确关键字价格 (pattern: {pattern})',
+                        }
+                    )
+                    break  # 找到第一个有效价格就停止
+
+        # 如果没找到明确关键字，再使用通用模式
+        if not prices:
+            for pattern in xiaoxie_patterns[6:]:  # 后面的通用模式
+                xiaoxie_match = re.search(pattern, page_text, re.IGNORECASE)
+                if xiaoxie_match:
+                    xiaoxie_price_str = xiaoxie_match.group(1)  # 获取价格组
+                    # 行级过滤以排除保证金等干扰项
+                    line_start = page_text.rfind('\n', 0, xiaoxie_match.start()) + 1
+                    line_end = page_text.find('\n', xiaoxie_match.end())
+                    if line_end == -1:
+                        line_end = len(page_text)
+                    line_text = page_text[line_start:line_end]
+                    if any(k in line_text for k in self.exclude_keywords):
+                        continue
+                    xiaoxie_price = self._str_to_float(xiaoxie_price_str)
+                    if (
+                        xiaoxie_price is not None and xiaoxie_price > 1000
+                    ):  # 过滤掉过小的价格
+                        prices.append(
+                            {
+                                'value': xiaoxie_price,
+                                'page': page_index,
+                                'confidence': 90,  # 高置信度
+                                'reason': f'价格一览表通用模式价格 (pattern: {pattern})',
+                            }
+                        )
+                        break  # 找到第一个有效价格就停止
+
+        # 查找大写价格，增加更多模式
+        daxie_patterns = [
+            r'(大写)[:：\s]*([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)',
+            r'(大写金额)[:：\s]*([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)',
+            r'([壹贰叁肆伍陆柒捌玖拾佰仟万亿零一二三四五六七八九十百千万亿\s]+)[:：\s]*(?:元|人民币)',
+        ]
+
+        for pattern in daxie_patterns:
+            daxie_match = re.search(pattern, page_text, re.IGNORECASE)
+            if daxie_match:
+                daxie_price_text = (
+                    daxie_match.group(2)
+                    if len(daxie_match.groups()) >= 2
+                    else daxie_match.group(1)
+                )
+                # 清理大写价格文本，移除多余的空格和干扰字符
+                daxie_price_text = re.sub(r'[^\u4e00-\u9fa5]', '', daxie_price_text)
+                # 行级过滤以排除保证金等干扰项
+                line_start = page_text.rfind('\n', 0, daxie_match.start()) + 1
+                line_end = page_text.find('\n', daxie_match.end())
+                if line_end == -1:
+                    line_end = len(page_text)
+                line_text = page_text[line_start:line_end]
+                if any(k in line_text for k in self.exclude_keywords):
+                    continue
+                daxie_price_value = self.converter.chinese_to_number(daxie_price_text)
+                if (
+                    daxie_price_value is not None and daxie_price_value > 1000
+                ):  # 过滤掉过小的价格
+                    prices.append(
+                        {
+                            'value': daxie_price_value,
+                            'page': page_index,
+                            'confidence': 95,  # 高置信度
+                            'reason': f'价格一览表大写价格 (pattern: {pattern})',
+                        }
+                    )
+                    break  # 找到第一个有效价格就停止
+
+        # 如果同时找到小写和大写价格，进行验证
+        if xiaoxie_price is not None and daxie_price_value is not None:
+            # 如果两个价格相差不大(允许一定误差)，则提高小写价格的置信度
+            if (
+                abs(xiaoxie_price - daxie_price_value)
+                / max(xiaoxie_price, daxie_price_value)
+                < 0.01
+            ):  # 1%误差范围内
+                # 找到小写价格条目并提高置信度
+                for price_info in prices:
+                    if price_info['value'] == xiaoxie_price:
+                        price_info['confidence'] = 100  # 最高置信度
+                        price_info['reason'] = '价格一览表小写价格(与大写价格匹配)'
+                        break
+
+        return prices
+
+
+def legacy_select_best_price(pages: List[str]) -> float:
+    """优化前的完整流程：全文提取，再为每个候选拼接两页上下文判断是否为总价"""
+    manager = PriceManager()
+    extractor = LegacyEnhancedPriceExtractor()
+    prices = manager._deduplicate_prices(extractor.extract_enhanced_prices(pages))
+    summary_page_prices = [
+        p for p in prices if '价格一览表' in p.get('reason', '') and p.get('confidence', 0) >= 90
+    ]
+    if summary_page_prices:
+        summary_page_prices.sort(key=lambda x: x['confidence'], reverse=True)
+        return summary_page_prices[0]['value']
+    intelligent_prices = []
+    for price_info in prices:
+        page_index = price_info['page']
+        context = pages[page_index]
+        if page_index + 1 < len(pages):
+            context += '\n' + pages[page_index + 1]
+        if extractor._is_total_price_intelligent(context, price_info['value']):
+            intelligent_prices.append(price_info['value'])
+    if intelligent_prices:
+        return max(intelligent_prices)
+    return extractor.select_best_total_price(prices)
+
+
+# 容易触发边界情况的片段：重叠的排除关键词、贴近窗口边界的保证金、换行与全角空格等
+TOKENS = [
+    '投标保证金', '保证金', '履约保函', '押金', '总价', '总报价', '投标报价', '合计', '总计',
+    '小写', '大写', '人民币', '￥', '元', '整', '壹佰贰拾万', '叁仟', '伍拾',
+    '1,234,567.89', '2500000', '12.5', '3,000', '.', ',', ' ', '　', '\n', '：', ':',
+    '(', ')', '\\', '\\s', '开标一览表', '价格文件', '本公司承诺', '技术方案说明',
+]
+
+
+def random_token_pages(seed: int, num_pages: int = 30) -> List[str]:
+    """由边界片段随机拼接的页面，用于校验新旧实现的结果逐项相同"""
+    rng = random.Random(seed)
+    return [
+        ''.join(rng.choice(TOKENS) for _ in range(rng.randint(20, 200)))
+        for _ in range(num_pages)
+    ]
@@ -3,15 +3,35 @@
 负责在所有投标方分析完成后，根据评标规则进行综合价格分计算
 """
 
+import datetime
 import logging
 import json
 import re
 from typing import List, Dict, Any, Optional, Tuple, Union
 from contextlib import contextmanager
 
-from modules.database import SessionLocal, AnalysisResult, ScoringRule, TenderProject
+from modules.database import (
+    SessionLocal,
+    AnalysisResult,
+    ScoringRule,
+    TenderProject,
+    BidDocument,
+)
 from modules.price_calculator_helpers import PriceScoreCalculatorHelpers
 from modules.local_ai_analyzer import LocalAIAnalyzer
+from modules.price_formula_engine import compile_price_formula
+from modules.price_candidates import load_selected_prices
+from modules.rule_scores import other_scores_totals
+from modules.project_summary import refresh_project_summary
+
+
+def unextracted_price_query(db_session, project_id: int):
+    """项目中尚未提取到价格的投标文件（出错、已取消的不计）"""
+    return db_session.query(BidDocument.id).filter(
+        BidDocument.project_id == project_id,
+        ~BidDocument.processing_status.in_(('error', 'cancelled')),
+        BidDocument.price_extracted.isnot(True),
+    )
 
 
 class PriceScoreCalculator(PriceScoreCalculatorHelpers):
@@ -81,12 +101,6 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
                     self.logger.warning(f'项目 {project_id} 没有找到价格评分规则')
                     return False
 
-                # 构造包含公式和描述的字典
-                formula_info = {
-                    'formula': price_rule.price_formula,
-                    'description': price_rule.description,
-                }
-
                 self.logger.info(
                     f'找到价格评分规则: 满分 {price_rule.Parent_max_score}, 公式: {price_rule.price_formula}, 描述: {price_rule.description}'
                 )
@@ -103,7 +117,9 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
                     return False
 
                 # 4. 仅提取当前项目的投标人报价
-                bidder_prices = self._extract_bidder_prices(analysis_results)
+                bidder_prices = self._extract_bidder_prices(
+                    analysis_results, load_selected_prices(db, project_id)
+                )
                 # 可选：记录保证金候选（不参与总价计算，便于调试与后续使用）
                 try:
                     from modules.enhanced_price_extractor import EnhancedPriceExtractor
@@ -120,34 +136,9 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
                 )
 
                 # 5. 计算所有投标人的价格分（统一计算）
-                price_scores = self._calculate_price_scores(
-                    bidder_prices, price_rule.Parent_max_score, formula_info
-                )
-                self.logger.info(f'计算出价格分: {price_scores}')
-
-                # 若无法计算价格分（例如缺少有效公式或AI失败），使用默认计算方法
-                if not price_scores:
-                    self.logger.warning('价格分未通过AI计算，使用默认计算方法。')
-                    # 使用默认计算方法：满足招标文件要求且投标报价最低的投标报价为评标基准价，其价格分为满分
-                    if bidder_prices:
-                        min_price = min(bidder_prices.values())
-                        price_scores = {}
-                        for bidder, price in bidder_prices.items():
-                            if price == min_price:
-                                # 最低报价得满分
-                                price_scores[bidder] = price_rule.Parent_max_score
-                                self.logger.info(
-                                    f'投标人 {bidder} 报价为最低价 {price}，得满分 {price_rule.Parent_max_score}'
-                                )
-                            else:
-                                # 按照评标规则公式计算：投标报价得分＝（评标基准价/投标报价）*满分
-                                score = (
-                                    min_price / price
-                                ) * price_rule.Parent_max_score
-                                price_scores[bidder] = round(score, 2)
-                                self.logger.info(
-                                    f'投标人 {bidder} 报价 {price}，得分 {price_scores[bidder]}'
-                                )
+                price_scores = self.compute_price_scores(price_rule, bidder_prices)
+                # 各投标人除价格分外的规则得分之和（一次分组求和查询）
+                other_totals = other_scores_totals(db, project_id)
 
                 # 6. 更新每个投标人的价格分和总分
                 updated_count = 0
@@ -192,22 +183,8 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
                         # 更新总分
                         old_total_score = result.total_score or 0
 
-                        # 从详细评分中获取除价格分外的其他分数总和
-                        other_scores_total = 0
-                        if result.detailed_scores:
-                            try:
-                                detailed_scores = (
-                                    json.loads(result.detailed_scores)
-                                    if isinstance(result.detailed_scores, str)
-                                    else result.detailed_scores
-                                )
-                                other_scores_total = self._calculate_other_scores_total(
-                                    detailed_scores
-                                )
-                            except Exception as e:
-                                self.logger.error(
-                                    f'解析投标人 {bidder_name} 的详细评分时出错: {e}'
-                                )
+                        # 除价格分外的其他分数总和
+                        other_scores_total = other_totals.get(result.id, 0)
 
                         # 新总分 = 其他分数总和 + 新价格分
                         new_total_score = other_scores_total + new_price_score
@@ -227,12 +204,97 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
                 db.commit()
                 self.logger.info(f'成功更新了 {updated_count} 个投标方的价格分和总分')
                 self.logger.info('=' * 50)
+                refresh_project_summary(db, project_id)
                 return True
 
         except Exception as e:
             self.logger.error(f'更新数据库中的价格分时出错: {e}')
             return False
 
+    def calculate_provisional_price_scores(self, project_id: int) -> bool:
+        """
+        所有投标方的价格都已提取时提前计算价格分（规则评分仍在进行中）
+
+        价格提取只依赖文本，远早于AI规则评分完成；此时按当前报价计算的价格分和排名即可供评审查看，
+        规则评分全部完成后再由 calculate_project_price_scores 统一更新总分。
+        出错、已取消的投标文件不参与判断；仍有投标方未提取到价格时不计算。
+        多个工作进程可能同时看到价格齐全，由条件更新 provisional_priced_at 认领，只有一个进程计算。
+
+        Returns:
+            bool: 是否计算了暂定价格分
+        """
+        with self._get_db_session() as db:
+            pending = unextracted_price_query(db, project_id).count()
+            if pending:
+                self.logger.info(f'项目 {project_id} 还有 {pending} 个投标方未提取到价格，暂不计算价格分')
+                return False
+            claimed = (
+                db.query(TenderProject)
+                .filter(
+                    TenderProject.id == project_id,
+                    TenderProject.provisional_priced_at.is_(None),
+                )
+                .update(
+                    {'provisional_priced_at': datetime.datetime.utcnow()},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+        if not claimed:
+            self.logger.info(f'项目 {project_id} 的暂定价格分已由其他工作进程计算')
+            return False
+        self.logger.info(f'项目 {project_id} 所有投标方的价格已提取，提前计算暂定价格分')
+        return self.calculate_project_price_scores(project_id)
+
+    def compute_price_scores(
+        self, price_rule: ScoringRule, bidder_prices: Dict[str, float]
+    ) -> Dict[str, float]:
+        """
+        按价格评分规则计算所有投标人的价格分，无法按公式计算时使用默认方法
+
+        Args:
+            price_rule: 价格评分规则
+            bidder_prices: 投标方名称到报价的映射
+
+        Returns:
+            Dict[str, float]: 投标方名称到价格分的映射
+        """
+        # 构造包含公式和描述的字典
+        formula_info = {
+            'formula': price_rule.price_formula,
+            'description': price_rule.description,
+        }
+        price_scores = self._calculate_price_scores(
+            bidder_prices, price_rule.Parent_max_score, formula_info
+        )
+        self.logger.info(f'计算出价格分: {price_scores}')
+
+        # 若无法计算价格分（例如缺少有效公式或AI失败），使用默认计算方法
+        if not price_scores and bidder_prices:
+            self.logger.warning('价格分未通过公式或AI计算，使用默认计算方法。')
+            price_scores = self._default_price_scores(
+                bidder_prices, price_rule.Parent_max_score
+            )
+        return price_scores
+
+    def _default_price_scores(
+        self, bidder_prices: Dict[str, float], max_score: float
+    ) -> Dict[str, float]:
+        """默认计算方法：满足招标文件要求且投标报价最低的投标报价为评标基准价，其价格分为满分"""
+        min_price = min(bidder_prices.values())
+        price_scores = {}
+        for bidder, price in bidder_prices.items():
+            if price == min_price:
+                # 最低报价得满分
+                price_scores[bidder] = max_score
+                self.logger.info(f'投标人 {bidder} 报价为最低价 {price}，得满分 {max_score}')
+            else:
+                # 按照评标规则公式计算：投标报价得分＝（评标基准价/投标报价）*满分
+                score = (min_price / price) * max_score
+                price_scores[bidder] = round(score, 2)
+                self.logger.info(f'投标人 {bidder} 报价 {price}，得分 {price_scores[bidder]}')
+        return price_scores
+
     def _find_existing_price_score(self, scores: List[Dict[str, Any]]) -> float:
         """
         递归查找并返回现有价格项的分数。
@@ -454,6 +516,14 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
             self.logger.error('没有提供有效的价格计算公式或描述')
             return {}
 
+        # 常见公式由公式引擎确定性计算，只有无法解析的规则才交给AI大模型
+        compiled = compile_price_formula(formula, description)
+        if compiled:
+            price_scores = compiled.evaluate(bidder_prices, max_score)
+            self.logger.info(f'公式引擎计算价格分 ({compiled.describe()}): {price_scores}')
+            return price_scores
+        self.logger.info('公式引擎无法解析该价格规则，改由AI大模型计算')
+
         # 构造发送给AI大模型的prompt
         prompt = f"""
 你是一个专业的评标专家，请根据以下价格评分规则和各投标人的投标报价，计算每个投标人的价格得分。
@@ -589,46 +659,6 @@ class PriceScoreCalculator(PriceScoreCalculatorHelpers):
         self.logger.warning(f'无法解析AI响应为有效的价格分计算结果: {ai_response}')
         return {}
 
-    def _calculate_other_scores_total(self, detailed_scores) -> float:
-        """
-        计算除价格分外的其他分数总和
-
-        Args:
-            detailed_scores: 详细评分数据
-
-        Returns:
-            float: 其他分数总和
-        """
-        total = 0
-        if not detailed_scores:
-            return total
-
-        try:
-            # 处理列表格式的详细评分
-            if isinstance(detailed_scores, list):
-                for item in detailed_scores:
-                    # 跳过价格评分项
-                    if item.get('is_price_criteria') or (
-                        item.get('Child_Item_Name', '').startswith('价格')
-                    ):
-                        continue
-                    # 累加其他评分项
-                    score = item.get('score', 0)
-                    if isinstance(score, (int, float)):
-                        total += score
-            # 处理字典格式的详细评分（旧格式兼容）
-            elif isinstance(detailed_scores, dict):
-                for key, score in detailed_scores.items():
-                    # 跳过价格评分项
-                    if key.startswith('价格'):
-                        continue
-                    if isinstance(score, (int, float)):
-                        total += score
-        except Exception as e:
-            self.logger.error(f'计算其他分数总和时出错: {e}')
-
-        return total
-
 
 # 测试代码
 if __name__ == '__main__':
@@ -0,0 +1,197 @@
+"""
+价格表格提取模块
+只在章节索引标记的价格页（价格一览表、价格文件）上执行 PyMuPDF 表格识别，
+按表头定位总价/金额列，从合计行或单行报价表中读取总价，
+并与表格中的大写金额（ChineseNumberConverter）交叉验证。
+多列报价表在展平后的文本中行列错位，正则难以对应，表格结构可以直接给出金额所在单元格。
+"""
+
+import os
+import re
+import logging
+from typing import List, Dict, Any, Optional, Iterable
+
+import fitz  # PyMuPDF
+
+from modules.enhanced_price_extractor import ChineseNumberConverter, DAXIE_FRACTION_RE
+from modules.price_extraction_planner import VERIFIED_TABLE_REASON
+
+
+logger = logging.getLogger(__name__)
+
+# 表头中的总价列与金额列关键字（按优先级排列）
+TOTAL_COLUMN_KEYWORDS = ['投标总价', '总报价', '报价总额', '总价', '投标报价', '合计金额', '合计']
+AMOUNT_COLUMN_KEYWORDS = ['金额', '报价', '价格', '小计']
+# 合计行/键值行的标签关键字
+TOTAL_ROW_KEYWORDS = ['合计', '总计', '投标总价', '总报价', '报价总额', '总价', '投标报价']
+# 排除保证金等干扰项
+EXCLUDE_KEYWORDS = ['保证金', '保函', '押金', '担保', '单价']
+
+TABLE_REASON = '价格表合计'
+
+_AMOUNT_CELL_RE = re.compile(r'(?:[￥¥]|人民币)?(\d[\d,]*(?:\.\d+)?)(?:元)?(?:整)?')
+_DAXIE_RE = re.compile(r'([壹贰叁肆伍陆柒捌玖拾佰仟万亿零]+)[元圆]')
+_WHITESPACE_RE = re.compile(r'[\s　]+')
+
+
+def _clean_cell(cell: Any) -> str:
+    return _WHITESPACE_RE.sub('', str(cell)) if cell is not None else ''
+
+
+def _contains(text: str, keywords: List[str]) -> bool:
+    return any(k in text for k in keywords)
+
+
+class PriceTableExtractor:
+    """从价格页的表格中提取投标总价"""
+
+    def __init__(self, pdf_path: str, converter: Optional[ChineseNumberConverter] = None):
+        self.pdf_path = pdf_path
+        self.converter = converter or ChineseNumberConverter()
+
+    def extract(self, page_indexes: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        识别指定页面（从0开始的页码，与逐页文本一致）中的表格并提取总价
+
+        Returns:
+            List[Dict]: 价格候选，字段与文本提取结果一致，另有 source='table'
+        """
+        page_indexes = sorted(set(page_indexes))
+        if not page_indexes or not self.pdf_path or not os.path.exists(self.pdf_path):
+            return []
+
+        prices = []
+        try:
+            with fitz.open(self.pdf_path) as doc:
+                for page_index in page_indexes:
+                    if page_index >= len(doc):
+                        break
+                    try:
+                        tables = doc[page_index].find_tables()
+                    except Exception as e:
+                        logger.warning(f'第{page_index + 1}页表格识别失败: {e}')
+                        continue
+                    for table in tables:
+                        price = self.parse_table(table.extract(), page_index)
+                        if price:
+                            prices.append(price)
+        except Exception as e:
+            logger.error(f'打开PDF识别价格表失败: {self.pdf_path}, {e}')
+            return []
+
+        if prices:
+            logger.info(f'价格表识别到 {len(prices)} 个总价候选: {[p["value"] for p in prices]}')
+        return prices
+
+    def parse_table(self, rows: List[List[Any]], page_index: int) -> Optional[Dict[str, Any]]:
+        """
+        从一张表格（table.extract() 的行列表）中提取总价
+
+        依次尝试：合计行/“投标报价(小写)”键值行、只有一行数据的报价表中的总价列。
+        """
+        rows = [[_clean_cell(c) for c in row] for row in rows or []]
+        rows = [row for row in rows if any(row)]
+        if not rows:
+            return None
+
+        header_index, value_col, unit = self._find_header(rows)
+        data_rows = rows[header_index + 1:] if header_index is not None else rows
+
+        value = None
+        for row in data_rows:
+            if _contains(''.join(row), EXCLUDE_KEYWORDS):
+                continue
+            label_col = self._label_column(row)
+            if label_col is None:
+                continue
+            value = self._row_value(row, value_col, label_col)
+            if value is not None:
+                break
+
+        if value is None and value_col is not None:
+            # 单行报价表：表头含总价列，唯一一行数据直接给出总价（大写金额行等不计）
+            amounts = [
+                self._parse_amount(row[value_col])
+                for row in data_rows
+                if value_col < len(row) and not _contains(''.join(row), EXCLUDE_KEYWORDS)
+            ]
+            amounts = [a for a in amounts if a is not None]
+            if len(amounts) == 1:
+                value = amounts[0]
+
+        if value is None:
+            return None
+        value *= unit
+        if value <= 1000:  # 与一览表文本提取一致，过滤过小的金额
+            return None
+
+        daxie_value = self._find_daxie_value(rows)
+        verified = (
+            daxie_value is not None
+            and abs(value - daxie_value) / max(value, daxie_value) < 0.01
+        )
+        return {
+            'value': value,
+            'page': page_index,
+            'confidence': 100 if verified else 90,
+            'reason': VERIFIED_TABLE_REASON if verified else TABLE_REASON,
+            'source': 'table',
+        }
+
+    def _find_header(self, rows: List[List[str]]):
+        """返回 (表头行号, 金额列号, 金额单位倍数)，没有表头时行号和列号为 None"""
+        for row_index, row in enumerate(rows):
+            # 表头行不含金额；含金额的是“投标报价(小写) | ￥…”这样的键值行
+            if any(self._parse_amount(cell) is not None for cell in row):
+                continue
+            for keywords in (TOTAL_COLUMN_KEYWORDS, AMOUNT_COLUMN_KEYWORDS):
+                for col, cell in enumerate(row):
+                    if (
+                        _contains(cell, keywords)
+                        and '大写' not in cell
+                        and not _contains(cell, EXCLUDE_KEYWORDS)
+                    ):
+                        return row_index, col, 10000 if '万元' in cell else 1
+        return None, None, 1
+
+    @staticmethod
+    def _label_column(row: List[str]) -> Optional[int]:
+        """合计行或“投标报价(小写)”键值行的标签所在列（大写金额行不参与）"""
+        for col, cell in enumerate(row[:2]):
+            if _contains(cell, TOTAL_ROW_KEYWORDS) and '大写' not in cell:
+                return col
+        return None
+
+    def _row_value(self, row: List[str], value_col: Optional[int], label_col: int) -> Optional[float]:
+        if value_col is not None and value_col < len(row) and value_col != label_col:
+            value = self._parse_amount(row[value_col])
+            if value is not None:
+                return value
+        for cell in row[label_col + 1:]:
+            value = self._parse_amount(cell)
+            if value is not None:
+                return value
+        return None
+
+    @staticmethod
+    def _parse_amount(cell: str) -> Optional[float]:
+        match = _AMOUNT_CELL_RE.fullmatch(cell)
+        if not match:
+            return None
+        try:
+            return float(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+
+    def _find_daxie_value(self, rows: List[List[str]]) -> Optional[float]:
+        for row in rows:
+            row_text = ''.join(row)
+            if _contains(row_text, EXCLUDE_KEYWORDS):
+                continue
+            match = _DAXIE_RE.search(row_text)
+            if match:
+                fraction = DAXIE_FRACTION_RE.match(row_text, match.end() - 1)
+                return self.converter.chinese_to_number(
+                    match.group(1) + ('元' + fraction.group(1) if fraction else '')
+                )
+        return None
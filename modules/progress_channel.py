@@ -0,0 +1,282 @@
+"""
+分析进度通道模块
+在内存中合并各投标文件的进度更新，按限定频率（或在状态切换时立即）由单一写入者落库，
+避免每分析一条规则就查询并提交一次 BidDocument 造成的 SQLite 锁竞争。
+"""
+
+import os
+import time
+import logging
+import datetime
+import threading
+from typing import Dict, Any, Optional, List, Callable
+
+from modules.database import SessionLocal, AnalysisProgress
+from modules.runtime_config import load_config, get_int
+
+
+logger = logging.getLogger(__name__)
+
+# 部分结果只保留前5条，避免快照过大
+PARTIAL_RESULTS_LIMIT = 5
+
+
+class ProgressChannel:
+    """进度通道：缓冲最新进度快照，由后台线程按间隔合并写入 analysis_progress 表"""
+
+    def __init__(self, session_factory=SessionLocal, flush_interval: Optional[float] = None):
+        self.session_factory = session_factory
+        if flush_interval is None:
+            flush_interval = get_int(load_config(), 'progress_flush_interval_sec', 2)
+        self.flush_interval = max(0.1, float(flush_interval))
+
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._projects: Dict[int, int] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        # 写入锁保证同一进程内只有一个写入者
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_flush = 0.0
+
+    def report(
+        self,
+        bid_document_id: int,
+        project_id: int,
+        status: Optional[str] = None,
+        completed: Optional[int] = None,
+        total: Optional[int] = None,
+        current_rule: Optional[str] = None,
+        detailed_progress_info: Optional[str] = None,
+        partial_results: Optional[List[Dict[str, Any]]] = None,
+        error_message: Optional[str] = None,
+        bidder_name: Optional[str] = None,
+        flush: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        记录一次进度更新（仅更新内存快照）
+
+        状态发生切换（如 processing -> completed）或 flush=True 时立即同步落库，
+        其余更新由后台线程按 flush_interval 合并写入。本次变化的字段会作为增量事件
+        立即推送给事件接收端（SSE进度流）。
+
+        Returns:
+            Dict[str, Any]: 合并后的最新快照
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(bid_document_id)
+            if snapshot is None:
+                snapshot = {
+                    'id': bid_document_id,
+                    'bidder_name': bidder_name,
+                    'status': 'pending',
+                    'error_message': None,
+                    'progress_completed': 0,
+                    'progress_total': 0,
+                    'current_rule': None,
+                    'detailed_progress_info': None,
+                    'partial_analysis_results': None,
+                }
+                self._snapshots[bid_document_id] = snapshot
+            previous_status = snapshot.get('status')
+
+            if bidder_name is not None:
+                snapshot['bidder_name'] = bidder_name
+            if status is not None:
+                snapshot['status'] = status
+            if completed is not None:
+                snapshot['progress_completed'] = completed
+            if total is not None:
+                snapshot['progress_total'] = total
+            if current_rule is not None:
+                snapshot['current_rule'] = current_rule[:100]
+            if detailed_progress_info is not None:
+                snapshot['detailed_progress_info'] = detailed_progress_info
+            if partial_results is not None:
+                snapshot['partial_analysis_results'] = list(
+                    partial_results[:PARTIAL_RESULTS_LIMIT]
+                )
+            if error_message is not None or status is not None:
+                snapshot['error_message'] = error_message
+
+            self._projects[bid_document_id] = project_id
+            self._dirty.add(bid_document_id)
+            state_changed = status is not None and status != previous_status
+            result = dict(snapshot)
+
+        self._publish_delta(
+            project_id,
+            result,
+            status=status,
+            completed=completed,
+            total=total,
+            current_rule=current_rule,
+            detailed_progress_info=detailed_progress_info,
+            partial_results=partial_results,
+            error_message=error_message,
+            bidder_name=bidder_name,
+        )
+        if state_changed or flush:
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return result
+
+    def _publish_delta(self, project_id: int, snapshot: Dict[str, Any], **changes):
+        """把本次更新涉及的字段作为增量事件推送出去"""
+        sink = _event_sink
+        if sink is None:
+            return
+        field_map = {
+            'status': 'status',
+            'completed': 'progress_completed',
+            'total': 'progress_total',
+            'current_rule': 'current_rule',
+            'detailed_progress_info': 'detailed_progress_info',
+            'partial_results': 'partial_analysis_results',
+            'bidder_name': 'bidder_name',
+        }
+        delta = {
+            snapshot_key: snapshot[snapshot_key]
+            for arg, snapshot_key in field_map.items()
+            if changes.get(arg) is not None
+        }
+        if changes.get('status') is not None or changes.get('error_message') is not None:
+            delta['error_message'] = snapshot['error_message']
+        try:
+            sink(
+                {
+                    'type': 'progress',
+                    'project_id': project_id,
+                    'bid_document_id': snapshot['id'],
+                    'delta': delta,
+                }
+            )
+        except Exception as e:
+            logger.debug(f'推送进度事件失败: {e}')
+
+    def get_snapshot(self, bid_document_id: int) -> Optional[Dict[str, Any]]:
+        """获取内存中的最新快照（未落库的更新也可见）"""
+        with self._lock:
+            snapshot = self._snapshots.get(bid_document_id)
+            return dict(snapshot) if snapshot else None
+
+    def forget(self, bid_document_id: int):
+        """清除内存中的快照（投标文件处理结束后释放内存）"""
+        with self._lock:
+            if bid_document_id in self._dirty:
+                return
+            self._snapshots.pop(bid_document_id, None)
+            self._projects.pop(bid_document_id, None)
+
+    def flush(self) -> int:
+        """
+        将所有待写入的快照合并写入数据库
+
+        Returns:
+            int: 本次写入的快照数量
+        """
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                pending = [
+                    (bid_id, self._projects.get(bid_id), dict(self._snapshots[bid_id]))
+                    for bid_id in sorted(self._dirty)
+                ]
+                self._dirty.clear()
+
+            db = self.session_factory()
+            try:
+                now = datetime.datetime.utcnow()
+                for bid_id, project_id, snapshot in pending:
+                    db.merge(
+                        AnalysisProgress(
+                            bid_document_id=bid_id,
+                            project_id=project_id,
+                            snapshot=snapshot,
+                            updated_at=now,
+                        )
+                    )
+                db.commit()
+                self._last_flush = time.monotonic()
+                return len(pending)
+            except Exception as e:
+                logger.error(f'写入进度快照时出错: {e}')
+                db.rollback()
+                # 写入失败时重新标记为待写入，下次继续尝试
+                with self._lock:
+                    self._dirty.update(bid_id for bid_id, _, _ in pending)
+                return 0
+            finally:
+                db.close()
+
+    def _ensure_flusher(self):
+        """按需启动后台合并写入线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='progress-flusher', daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f'进度合并写入线程出错: {e}')
+
+    def close(self):
+        """停止后台线程并写入剩余快照"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+        self.flush()
+
+
+_channel: Optional[ProgressChannel] = None
+_channel_lock = threading.Lock()
+# 进度增量事件的接收端：Web进程内为事件总线，工作进程内为跨进程队列
+_event_sink: Optional[Callable[[Dict[str, Any]], None]] = None
+
+
+def set_event_sink(sink: Optional[Callable[[Dict[str, Any]], None]]):
+    """设置当前进程的进度事件接收端"""
+    global _event_sink
+    _event_sink = sink
+
+
+def publish_event(event: Dict[str, Any]):
+    """推送进度之外的项目事件（如暂定价格分已计算），未设置接收端时忽略"""
+    sink = _event_sink
+    if sink is None:
+        return
+    try:
+        sink(event)
+    except Exception as e:
+        logger.warning(f'推送事件失败: {e}')
+
+
+def get_progress_channel() -> ProgressChannel:
+    """获取当前进程的进度通道（每个进程一个实例）"""
+    global _channel
+    if _channel is None:
+        with _channel_lock:
+            if _channel is None:
+                _channel = ProgressChannel()
+    return _channel
+
+
+def _reset_after_fork():
+    """子进程中丢弃从父进程继承的通道（其后台线程在子进程中不存在）"""
+    global _channel, _channel_lock
+    _channel = None
+    _channel_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
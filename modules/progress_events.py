@@ -0,0 +1,99 @@
+"""
+分析进度事件总线模块
+分析工作进程通过跨进程队列推送进度增量，Web进程内的总线把事件分发给各个SSE订阅者，
+替代前端每2秒轮询 analysis-status 的方式。
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# 单个订阅者最多缓存的事件数，超出后要求其重新同步完整快照
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class _Subscriber:
+    """单个SSE连接的订阅信息"""
+
+    def __init__(self, project_id: int, loop: asyncio.AbstractEventLoop):
+        self.project_id = project_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.needs_resync = False
+
+    def _put(self, event: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.needs_resync = True
+
+
+class ProgressEventBus:
+    """进程内的进度事件总线（线程安全）"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, List[_Subscriber]] = {}
+        self._lock = threading.Lock()
+        self._pump_thread: Optional[threading.Thread] = None
+
+    def subscribe(self, project_id: int) -> _Subscriber:
+        """在当前事件循环中订阅某个项目的进度事件"""
+        subscriber = _Subscriber(project_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(project_id, []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.project_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(subscriber.project_id, None)
+
+    def publish(self, event: Dict[str, Any]):
+        """发布事件（可在任意线程调用）"""
+        project_id = event.get('project_id')
+        with self._lock:
+            subscribers = list(self._subscribers.get(project_id, []))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber._put, event)
+            except RuntimeError:
+                # 订阅者的事件循环已关闭
+                self.unsubscribe(subscriber)
+
+    def subscriber_count(self, project_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(project_id, []))
+
+    def start_pump(self, source_queue):
+        """启动后台线程，把工作进程写入跨进程队列的事件转发到总线"""
+        if self._pump_thread is not None and self._pump_thread.is_alive():
+            return
+
+        def _pump():
+            while True:
+                try:
+                    event = source_queue.get()
+                except (EOFError, OSError):
+                    logger.warning('进度事件队列已关闭，停止转发')
+                    return
+                except Exception as e:
+                    logger.error(f'读取进度事件时出错: {e}')
+                    continue
+                if event is None:
+                    return
+                self.publish(event)
+
+        self._pump_thread = threading.Thread(
+            target=_pump, name='progress-event-pump', daemon=True
+        )
+        self._pump_thread.start()
+
+
+event_bus = ProgressEventBus()
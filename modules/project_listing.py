@@ -0,0 +1,180 @@
+"""
+项目列表模块
+历史页的项目列表按项目ID倒序做键集分页（下一页从上一页最后一个项目ID之后开始，
+不使用 OFFSET，翻到多深都是一次索引范围查询），在服务端按状态、创建日期、
+投标方名称和关键词筛选；当前页各项目的投标文件数和分析结果数用一次分组查询统计。
+
+关键词和投标方名称搜索使用 project_search 全文索引（SQLite FTS5 trigram，见 modules/database.py）；
+查询少于3个字符或全文索引不可用时改用 LIKE 查询。
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import column, exists, func, literal, or_, select, table, union_all
+
+from modules.database import PROJECT_SEARCH_TABLE, AnalysisResult, BidDocument, TenderProject
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# trigram 分词只能匹配不少于3个字符的查询
+_MIN_FTS_QUERY_LENGTH = 3
+
+_search = table(PROJECT_SEARCH_TABLE, column('rowid'), column(PROJECT_SEARCH_TABLE))
+
+
+def search_index_available(db_session) -> bool:
+    """当前数据库是否建有项目全文索引"""
+    bind = db_session.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return False
+    return (
+        db_session.execute(
+            select(literal(1))
+            .select_from(table('sqlite_master', column('name'), column('type')))
+            .where(column('type') == 'table', column('name') == PROJECT_SEARCH_TABLE)
+        ).first()
+        is not None
+    )
+
+
+def _fts_query(value: str, columns: Optional[List[str]]) -> str:
+    phrase = '"' + value.replace('"', '""') + '"'
+    return f"{{{' '.join(columns)}}} : {phrase}" if columns else phrase
+
+
+def _text_filter(value: str, use_index: bool, bidders_only: bool = False):
+    """项目名称/编号/投标方名称（bidders_only 时只匹配投标方名称）包含 value 的条件"""
+    if use_index and len(value) >= _MIN_FTS_QUERY_LENGTH:
+        match = _fts_query(value, ['bidders'] if bidders_only else None)
+        return TenderProject.id.in_(
+            select(_search.c.rowid).where(_search.c[PROJECT_SEARCH_TABLE].op('MATCH')(match))
+        )
+    bidder_match = exists().where(
+        BidDocument.project_id == TenderProject.id,
+        BidDocument.bidder_name.contains(value, autoescape=True),
+    )
+    if bidders_only:
+        return bidder_match
+    return or_(
+        TenderProject.name.contains(value, autoescape=True),
+        TenderProject.project_code.contains(value, autoescape=True),
+        bidder_match,
+    )
+
+
+def project_counts_query(project_ids: List[int]):
+    """各项目投标文件数和分析结果数的分组查询（投标文件和分析结果合并后按项目分组）"""
+    rows = union_all(
+        select(BidDocument.project_id.label('project_id'), literal(1).label('bid'), literal(0).label('result'))
+        .where(BidDocument.project_id.in_(project_ids)),
+        select(AnalysisResult.project_id, literal(0), literal(1))
+        .where(AnalysisResult.project_id.in_(project_ids)),
+    ).subquery()
+    return select(rows.c.project_id, func.sum(rows.c.bid), func.sum(rows.c.result)).group_by(rows.c.project_id)
+
+
+def project_counts(db_session, project_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    一次分组查询统计各项目的投标文件数和分析结果数
+
+    Returns:
+        Dict[int, Dict[str, int]]: 项目ID -> {'bid_count', 'result_count'}
+    """
+    project_ids = list(project_ids)
+    counts = {project_id: {'bid_count': 0, 'result_count': 0} for project_id in project_ids}
+    if not project_ids:
+        return counts
+    for project_id, bid_count, result_count in db_session.execute(project_counts_query(project_ids)):
+        counts[project_id] = {'bid_count': int(bid_count or 0), 'result_count': int(result_count or 0)}
+    return counts
+
+
+def project_list_query(
+    db_session,
+    cursor: Optional[int] = None,
+    statuses: Optional[List[str]] = None,
+    created_from: Optional[datetime.date] = None,
+    created_to: Optional[datetime.date] = None,
+    bidder: Optional[str] = None,
+    q: Optional[str] = None,
+):
+    """按筛选条件和游标构造项目查询（按项目ID倒序，未限制条数）"""
+    query = db_session.query(TenderProject)
+    if statuses:
+        query = query.filter(TenderProject.status.in_(statuses))
+    if created_from:
+        query = query.filter(
+            TenderProject.created_at >= datetime.datetime.combine(created_from, datetime.time.min)
+        )
+    if created_to:
+        query = query.filter(
+            TenderProject.created_at
+            < datetime.datetime.combine(created_to + datetime.timedelta(days=1), datetime.time.min)
+        )
+    q = (q or '').strip()
+    bidder = (bidder or '').strip()
+    if q or bidder:
+        use_index = search_index_available(db_session)
+        if q:
+            query = query.filter(_text_filter(q, use_index))
+        if bidder:
+            query = query.filter(_text_filter(bidder, use_index, bidders_only=True))
+    if cursor is not None:
+        query = query.filter(TenderProject.id < cursor)
+    return query.order_by(TenderProject.id.desc())
+
+
+def list_projects(
+    db_session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[int] = None,
+    statuses: Optional[List[str]] = None,
+    created_from: Optional[datetime.date] = None,
+    created_to: Optional[datetime.date] = None,
+    bidder: Optional[str] = None,
+    q: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    分页列出项目（按项目ID倒序，即从新到旧）
+
+    Args:
+        db_session: 数据库会话
+        limit: 每页项目数（1-MAX_PAGE_SIZE）
+        cursor: 上一页返回的 next_cursor，为空时从第一页开始
+        statuses: 只列出这些状态的项目
+        created_from / created_to: 创建日期范围（含两端，UTC）
+        bidder: 投标方名称包含的文字
+        q: 项目名称、编号或投标方名称包含的文字
+
+    Returns:
+        Dict: items 为当前页项目，next_cursor 为下一页的游标（没有下一页时为 None）
+    """
+    limit = max(1, min(MAX_PAGE_SIZE, int(limit)))
+    projects = (
+        project_list_query(db_session, cursor, statuses, created_from, created_to, bidder, q)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(projects) > limit
+    projects = projects[:limit]
+    counts = project_counts(db_session, [project.id for project in projects])
+    items = [
+        {
+            'id': project.id,
+            'project_code': project.project_code,
+            'name': project.name,
+            'description': project.description,
+            'created_at': project.created_at.isoformat() if project.created_at else None,
+            'status': project.status,
+            **counts[project.id],
+        }
+        for project in projects
+    ]
+    return {
+        'items': items,
+        'next_cursor': projects[-1].id if has_more else None,
+        'has_more': has_more,
+    }
@@ -0,0 +1,86 @@
+"""
+项目汇总表物化模块
+汇总表（两行表头、按总分排名的各投标方得分行）按项目保存在 project_summary 表中，
+在写入时刷新：投标文件分析完成、价格分重算、分数修改、投标方改名后重新生成该项目的汇总；
+评分规则被替换时在同一事务内删除汇总，下次读取时重新生成。
+历史页读取汇总只需按主键取一行，不再每次请求都查询全部规则和得分再组装。
+"""
+
+import logging
+import datetime
+from typing import Any, Dict, Optional
+
+from modules.database import ProjectSummary
+from modules.summary_generator import generate_summary_data
+
+
+logger = logging.getLogger(__name__)
+
+
+def _store(db_session, project_id: int, summary: Dict[str, Any]):
+    row = db_session.get(ProjectSummary, project_id)
+    if row is None:
+        row = ProjectSummary(project_id=project_id)
+        db_session.add(row)
+    row.summary = summary
+    row.bidder_count = len(summary.get('rows', []))
+    row.refreshed_at = datetime.datetime.utcnow()
+    db_session.commit()
+
+
+def refresh_project_summary(db_session, project_id: int) -> Optional[Dict[str, Any]]:
+    """
+    重新生成并保存项目汇总（在写入分数的事务提交之后调用）
+
+    刷新失败不影响调用方：删除该项目的汇总，下次读取时重新生成。
+
+    Returns:
+        Optional[Dict]: 新的汇总数据，失败时返回 None
+    """
+    try:
+        summary = generate_summary_data(project_id, db_session)
+        if 'error' in summary:
+            # 还没有规则或结果时不保存，读取时实时生成
+            invalidate_project_summary(db_session, project_id)
+            db_session.commit()
+        else:
+            _store(db_session, project_id, summary)
+        return summary
+    except Exception as e:
+        db_session.rollback()
+        logger.error(f'刷新项目 {project_id} 的汇总表失败: {e}')
+        try:
+            invalidate_project_summary(db_session, project_id)
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+        return None
+
+
+def invalidate_project_summary(db_session, project_id: int):
+    """删除项目汇总（不提交，随调用方的事务生效），下次读取时重新生成"""
+    db_session.query(ProjectSummary).filter(ProjectSummary.project_id == project_id).delete(
+        synchronize_session=False
+    )
+
+
+def get_project_summary(db_session, project_id: int) -> Dict[str, Any]:
+    """
+    读取项目汇总：已保存时直接返回，否则生成并保存
+
+    Returns:
+        Dict: generate_summary_data 的结果（没有规则或结果时含 error）
+    """
+    row = db_session.get(ProjectSummary, project_id)
+    if row is not None and row.summary is not None:
+        return row.summary
+    summary = generate_summary_data(project_id, db_session)
+    if 'error' in summary:
+        return summary
+    try:
+        _store(db_session, project_id, summary)
+    except Exception as e:
+        # 并发读取时另一请求可能已保存，返回本次生成的结果即可
+        db_session.rollback()
+        logger.warning(f'保存项目 {project_id} 的汇总表失败: {e}')
+    return summary
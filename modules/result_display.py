@@ -6,9 +6,9 @@
 实现多层表头的表格展示功能
 """
 
-import json
 from typing import List, Dict, Any
 from modules.database import SessionLocal, TenderProject, BidDocument, ScoringRule, AnalysisResult
+from modules.rule_scores import lookup_by_rule, project_score_matrix
 import logging
 
 logger = logging.getLogger(__name__)
@@ -131,35 +131,13 @@ class ResultDisplay:
     
     def _build_bidder_scores(self, analysis_results: List[AnalysisResult]) -> Dict[str, Dict[str, float]]:
         """
-        构建投标方得分数据
+        构建投标方得分数据（规则得分一次查询读出）
         """
+        score_matrix = project_score_matrix(self.session, self.project_id)
         bidder_scores = {}
-        
         for result in analysis_results:
-            if not result.detailed_scores:
-                continue
-                
-            bidder_name = result.bidder_name
-            bidder_scores[bidder_name] = {}
-            
-            # 解析详细得分
-            try:
-                if isinstance(result.detailed_scores, str):
-                    detailed_scores = json.loads(result.detailed_scores)
-                else:
-                    detailed_scores = result.detailed_scores
-                    
-                # 根据新的数据结构处理detailed_scores
-                # 每个元素是一个字典，包含：Child_Item_Name、score、reason、Parent_Item_Name
-                if isinstance(detailed_scores, list):
-                    for score_item in detailed_scores:
-                        child_item_name = score_item.get('Child_Item_Name') or score_item.get('criteria_name')
-                        score = score_item.get('score', 0)
-                        if child_item_name:
-                            bidder_scores[bidder_name][child_item_name] = score
-            except Exception as e:
-                logger.error(f"解析投标方 {bidder_name} 的得分数据时出错: {e}")
-                
+            if result.id in score_matrix:
+                bidder_scores[result.bidder_name] = score_matrix[result.id]
         return bidder_scores
     
     def _generate_headers(self, rules_tree: List[Dict[str, Any]]) -> List[List[str]]:
@@ -232,7 +210,7 @@ class ResultDisplay:
                     for child_item in children:
                         # 特殊处理价格评分项，不从scores中获取
                         if child_item.get('name') != '价格分':
-                            score = scores.get(child_item['name'], 0)
+                            score = lookup_by_rule(scores, parent_item['name'], child_item['name']) or 0
                             row.append(round(score, 2))
             
             # 添加价格分
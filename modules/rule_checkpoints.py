@@ -0,0 +1,159 @@
+"""
+评分规则检查点模块
+每完成一条规则的AI评估就写入一条检查点（投标文件、规则、上下文哈希、模型），
+分析超时、工作进程退出或服务重启后重新分析时直接复用，避免从头调用AI。
+
+检查点按规则内容指纹、投标文件内容哈希和提示词上下文哈希匹配，因此重新提取评分规则
+（规则ID变化）后内容未变的规则仍可复用，规则、投标文件或提交给AI的上下文变化后
+对应检查点自然失效。
+"""
+
+import os
+import json
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from modules.database import RuleEvaluationCheckpoint
+
+
+logger = logging.getLogger(__name__)
+
+
+def compute_context_hash(prompt: str) -> str:
+    """计算提交给AI的完整提示词的哈希"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+def rule_fingerprint(rule) -> str:
+    """
+    规则内容指纹：影响AI评估的字段（名称、描述、满分）加上父项名称
+
+    不同父项下名称、描述、满分相同的子项（如技术部分和服务部分各有“实施方案”）是两条规则，
+    指纹必须不同，否则会互相复用检查点。
+    """
+    payload = json.dumps(
+        [rule.Parent_Item_Name or '', rule.Child_Item_Name, rule.description or '', rule.Child_max_score],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _hash_file(file_path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def document_hash(file_path: str) -> Optional[str]:
+    """投标文件内容哈希（按路径、大小、修改时间缓存，文件未变时不重复读取）"""
+    try:
+        st = os.stat(file_path)
+        return _hash_file(file_path, st.st_size, st.st_mtime_ns)
+    except OSError as e:
+        logger.warning(f'计算文件哈希失败: {file_path}, {e}')
+        return None
+
+
+def checkpoint_query(db_session, bid_document_id: int, model: str, doc_hash: str, *columns):
+    """某个投标文件（某一内容版本）在某个模型下的检查点；columns 为空时查询整行"""
+    return db_session.query(*(columns or (RuleEvaluationCheckpoint,))).filter(
+        RuleEvaluationCheckpoint.bid_document_id == bid_document_id,
+        RuleEvaluationCheckpoint.model == model,
+        RuleEvaluationCheckpoint.document_hash == doc_hash,
+    )
+
+
+def checkpointed_rules_query(db_session, bid_document_ids, model: str):
+    """一批投标文件在某个模型下已有检查点的（投标文件, 文件哈希, 规则指纹），每个组合一行"""
+    return (
+        db_session.query(
+            RuleEvaluationCheckpoint.bid_document_id,
+            RuleEvaluationCheckpoint.document_hash,
+            RuleEvaluationCheckpoint.rule_fingerprint,
+        )
+        .filter(
+            RuleEvaluationCheckpoint.bid_document_id.in_(bid_document_ids),
+            RuleEvaluationCheckpoint.model == model,
+        )
+        .group_by(
+            RuleEvaluationCheckpoint.bid_document_id,
+            RuleEvaluationCheckpoint.document_hash,
+            RuleEvaluationCheckpoint.rule_fingerprint,
+        )
+    )
+
+
+class RuleCheckpointStore:
+    """某个投标文件（某一内容版本）在某个模型下的规则评估检查点"""
+
+    def __init__(self, db_session, bid_document_id: int, model: str, doc_hash: Optional[str]):
+        self.db = db_session
+        self.bid_document_id = bid_document_id
+        self.model = model
+        self.doc_hash = doc_hash
+        # (规则指纹, 上下文哈希) -> 评估结果
+        self._cache: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+        # 已加入会话、尚未提交的检查点
+        self._pending: List[Tuple[str, str]] = []
+
+    def _load(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        if self._cache is None:
+            self._cache = {}
+            if self.db is not None and self.bid_document_id is not None and self.doc_hash:
+                rows = checkpoint_query(self.db, self.bid_document_id, self.model, self.doc_hash)
+                for row in rows:
+                    self._cache[(row.rule_fingerprint, row.context_hash)] = {
+                        'score': row.score,
+                        'reason': row.reason,
+                    }
+        return self._cache
+
+    @property
+    def pending(self) -> int:
+        """尚未提交的检查点数量"""
+        return len(self._pending)
+
+    def get(self, rule, context_hash: str) -> Optional[Dict[str, Any]]:
+        """获取规则在同一上下文下已完成的评估结果，没有检查点时返回 None"""
+        return self._load().get((rule_fingerprint(rule), context_hash))
+
+    def save(self, rule, context_hash: str, score: float, reason: str):
+        """把一条检查点加入会话，由调用方调用 commit() 分批提交"""
+        cache = self._load()
+        key = (rule_fingerprint(rule), context_hash)
+        if key in cache:
+            return
+        if self.db is None or self.bid_document_id is None or not self.doc_hash:
+            return
+        self.db.add(
+            RuleEvaluationCheckpoint(
+                bid_document_id=self.bid_document_id,
+                scoring_rule_id=rule.id,
+                context_hash=context_hash,
+                model=self.model,
+                rule_fingerprint=key[0],
+                document_hash=self.doc_hash,
+                score=score,
+                reason=reason,
+            )
+        )
+        cache[key] = {'score': score, 'reason': reason}
+        self._pending.append(key)
+
+    def commit(self):
+        """提交会话中尚未提交的检查点；失败时丢弃这一批，下次分析重新评估"""
+        if not self._pending:
+            return
+        try:
+            self.db.commit()
+        except Exception as e:
+            logger.error(f'保存规则检查点时出错: {e}')
+            self.db.rollback()
+            for key in self._pending:
+                self._cache.pop(key, None)
+        self._pending = []
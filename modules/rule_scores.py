@@ -0,0 +1,330 @@
+"""
+规则得分存储模块
+分析结果的明细得分保存在 rule_score 表中（每个分析结果、每条评分规则一行，含得分、理由和模型），
+取代 AnalysisResult.detailed_scores 中以JSON字符串双重编码保存的明细：
+汇总表、价格分重算等直接按行查询或在SQL中 GROUP BY 求和，不再逐条解析JSON再递归查找分数。
+旧数据库中的JSON明细由 migrate_detailed_scores 迁移到本表。
+"""
+
+import json
+import logging
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, null
+
+from modules.database import AnalysisResult, RuleScore, ScoringRule
+
+
+logger = logging.getLogger(__name__)
+
+
+def _item_name(item: Dict[str, Any]) -> Optional[str]:
+    # 支持两种格式：旧格式使用criteria_name，新格式使用Child_Item_Name
+    return item.get('Child_Item_Name') or item.get('criteria_name')
+
+
+def _parent_name(item: Dict[str, Any]) -> Optional[str]:
+    return item.get('Parent_Item_Name') or None
+
+
+def rule_key(parent_name: Optional[str], name: str) -> Tuple[Optional[str], str]:
+    """评分项的键：(父项名称, 子项名称)。同一子项名称可能出现在不同父项下（如商务、技术下都有“业绩”）"""
+    return (parent_name or None, name)
+
+
+def lookup_by_rule(
+    values: Dict[Tuple[Optional[str], str], Any],
+    parent_name: Optional[str],
+    name: str,
+    default: Any = None,
+) -> Any:
+    """
+    按 (父项, 子项) 取值；没有完全匹配时（如旧数据未记录父项），该子项名称唯一才按名称取
+    """
+    key = rule_key(parent_name, name)
+    if key in values:
+        return values[key]
+    matches = [value for (_, item_name), value in values.items() if item_name == name]
+    return matches[0] if len(matches) == 1 else default
+
+
+def _is_price_item(item: Dict[str, Any]) -> bool:
+    """价格评分项（与原来计算其他分数总和时跳过的条件一致）"""
+    return bool(item.get('is_price_criteria')) or (_item_name(item) or '').startswith('价格')
+
+
+def _to_float(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def parse_detailed_scores(value) -> Optional[List[Dict[str, Any]]]:
+    """
+    解析旧版 detailed_scores（JSON字符串、双重编码的JSON字符串、列表或旧的 {名称: 分数} 字典）
+
+    Returns:
+        Optional[List[Dict]]: 展开后的明细列表（含 children 的项展开为其子项），无法解析时返回 None
+    """
+    for _ in range(2):
+        if not isinstance(value, str):
+            break
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        value = [
+            {'criteria_name': key, 'score': score.get('score') if isinstance(score, dict) else score}
+            for key, score in value.items()
+        ]
+    if not isinstance(value, list):
+        return None
+
+    items: List[Dict[str, Any]] = []
+
+    def visit(entries, parent_name):
+        for item in entries:
+            if not isinstance(item, dict):
+                continue
+            if item.get('children'):
+                visit(item['children'], _item_name(item))
+            elif _item_name(item):
+                if parent_name and not item.get('Parent_Item_Name'):
+                    item = dict(item, Parent_Item_Name=parent_name)
+                items.append(item)
+
+    visit(value, None)
+    return items
+
+
+def rule_score_rows(
+    result: AnalysisResult,
+    detailed_scores: Iterable[Dict[str, Any]],
+    model: Optional[str] = None,
+    rule_ids: Optional[Dict[Tuple[Optional[str], str], int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    把明细得分转换为 rule_score 行（父项和子项名称都相同的评分项只保留第一条）
+
+    Args:
+        result: 分析结果（需已有ID）
+        detailed_scores: 明细得分列表
+        model: 评分使用的AI模型
+        rule_ids: (父项名称, 子项名称) -> 评分规则ID
+
+    Returns:
+        List[Dict]: 列名 -> 值 的行列表，便于批量插入
+    """
+    rule_ids = rule_ids or {}
+    now = datetime.datetime.utcnow()
+    rows, seen = [], set()
+    for item in detailed_scores:
+        name = _item_name(item)
+        if not name:
+            continue
+        key = rule_key(_parent_name(item), name)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append(
+            {
+                'analysis_result_id': result.id,
+                'project_id': result.project_id,
+                'scoring_rule_id': lookup_by_rule(rule_ids, *key),
+                'parent_name': key[0],
+                'criteria_name': name,
+                'max_score': _to_float(item.get('max_score')),
+                'score': _to_float(item.get('score')),
+                'reason': item.get('reason'),
+                'model': item.get('model') or model,
+                'is_price_criteria': _is_price_item(item),
+                'position': len(rows),
+                'updated_at': now,
+            }
+        )
+    return rows
+
+
+def _project_rule_ids(db_session, project_id: int) -> Dict[Tuple[Optional[str], str], int]:
+    rule_ids = {}
+    for rule_id, parent_name, name in db_session.query(
+        ScoringRule.id, ScoringRule.Parent_Item_Name, ScoringRule.Child_Item_Name
+    ).filter(ScoringRule.project_id == project_id):
+        if name:
+            rule_ids.setdefault(rule_key(parent_name, name), rule_id)
+    return rule_ids
+
+
+def replace_result_scores(
+    db_session,
+    result: AnalysisResult,
+    detailed_scores: Iterable[Dict[str, Any]],
+    model: Optional[str] = None,
+    rule_ids: Optional[Dict[Tuple[Optional[str], str], int]] = None,
+) -> int:
+    """
+    用新的明细得分替换分析结果的全部规则得分（不提交，由调用方在同一事务内提交）
+
+    Returns:
+        int: 写入的行数
+    """
+    if result.id is None:
+        db_session.flush()
+    if rule_ids is None:
+        rule_ids = _project_rule_ids(db_session, result.project_id)
+    rows = rule_score_rows(result, detailed_scores, model, rule_ids)
+    db_session.query(RuleScore).filter(RuleScore.analysis_result_id == result.id).delete(
+        synchronize_session=False
+    )
+    if rows:
+        db_session.bulk_insert_mappings(RuleScore, rows)
+    # 明细只保存在 rule_score 表中
+    if result.detailed_scores is not None:
+        result.detailed_scores = null()
+    db_session.expire(result, ['rule_scores'])
+    return len(rows)
+
+
+def rule_score_item(row: RuleScore) -> Dict[str, Any]:
+    """规则得分行转换为明细项（与原 detailed_scores 的元素格式相同）"""
+    return {
+        'Child_Item_Name': row.criteria_name,
+        'max_score': row.max_score,
+        'score': row.score,
+        'reason': row.reason,
+        'Parent_Item_Name': row.parent_name,
+        'model': row.model,
+        'is_price_criteria': bool(row.is_price_criteria),
+    }
+
+
+def detailed_scores_query(db_session, result_ids: List[int]):
+    """多个分析结果的规则得分，按结果和原明细顺序排列"""
+    return (
+        db_session.query(RuleScore)
+        .filter(RuleScore.analysis_result_id.in_(result_ids))
+        .order_by(RuleScore.analysis_result_id, RuleScore.position)
+    )
+
+
+def load_detailed_scores(db_session, result_ids: Iterable[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    一次查询读出多个分析结果的明细得分（接口返回的明细格式不变）
+
+    Returns:
+        Dict[int, List[Dict]]: 分析结果ID -> 明细列表（没有规则得分的结果为空列表）
+    """
+    result_ids = list(result_ids)
+    details: Dict[int, List[Dict[str, Any]]] = {result_id: [] for result_id in result_ids}
+    if not result_ids:
+        return details
+    for row in detailed_scores_query(db_session, result_ids):
+        details[row.analysis_result_id].append(rule_score_item(row))
+    return details
+
+
+def score_matrix_query(db_session, project_id: int):
+    """项目全部规则得分的 (分析结果ID, 父项名称, 子项名称, 得分)"""
+    return db_session.query(
+        RuleScore.analysis_result_id, RuleScore.parent_name, RuleScore.criteria_name, RuleScore.score
+    ).filter(RuleScore.project_id == project_id)
+
+
+def project_score_matrix(
+    db_session, project_id: int
+) -> Dict[int, Dict[Tuple[Optional[str], str], Optional[float]]]:
+    """
+    项目各分析结果的规则得分（按评分项取分用 lookup_by_rule）
+
+    Returns:
+        Dict[int, Dict[Tuple, float]]: 分析结果ID -> {(父项名称, 子项名称): 得分}
+    """
+    matrix: Dict[int, Dict[Tuple[Optional[str], str], Optional[float]]] = {}
+    for result_id, parent_name, name, score in score_matrix_query(db_session, project_id):
+        matrix.setdefault(result_id, {})[rule_key(parent_name, name)] = score
+    return matrix
+
+
+def other_scores_totals_query(db_session, project_id: int):
+    """按分析结果分组求和除价格分外的规则得分"""
+    return (
+        db_session.query(RuleScore.analysis_result_id, func.sum(RuleScore.score))
+        .filter(RuleScore.project_id == project_id, RuleScore.is_price_criteria.isnot(True))
+        .group_by(RuleScore.analysis_result_id)
+    )
+
+
+def other_scores_totals(db_session, project_id: int) -> Dict[int, float]:
+    """
+    各分析结果除价格分外的规则得分之和（SQL GROUP BY 求和）
+
+    Returns:
+        Dict[int, float]: 分析结果ID -> 得分之和（没有规则得分的结果不在其中）
+    """
+    return {
+        result_id: float(total or 0)
+        for result_id, total in other_scores_totals_query(db_session, project_id)
+    }
+
+
+def migrate_detailed_scores(db_session, batch_size: int = 200) -> int:
+    """
+    把旧数据库中 AnalysisResult.detailed_scores 的JSON明细迁移到 rule_score 表并清空原字段
+
+    已有规则得分的结果以 rule_score 为准，只清空原字段；无法解析的明细保留原样并记录日志。
+    每批提交一次，可重复执行。
+
+    Returns:
+        int: 迁移的分析结果数
+    """
+    pending_ids = [
+        result_id
+        for (result_id,) in db_session.query(AnalysisResult.id)
+        .filter(AnalysisResult.detailed_scores.isnot(None))
+        .order_by(AnalysisResult.id)
+    ]
+    if not pending_ids:
+        return 0
+
+    migrated = 0
+    rule_ids_by_project: Dict[int, Dict[Tuple[Optional[str], str], int]] = {}
+    for start in range(0, len(pending_ids), batch_size):
+        batch = pending_ids[start : start + batch_size]
+        try:
+            has_rows = {
+                result_id
+                for (result_id,) in db_session.query(RuleScore.analysis_result_id)
+                .filter(RuleScore.analysis_result_id.in_(batch))
+                .distinct()
+            }
+            results = db_session.query(AnalysisResult).filter(AnalysisResult.id.in_(batch)).all()
+            mappings = []
+            for result in results:
+                items = parse_detailed_scores(result.detailed_scores)
+                if items is None:
+                    logger.warning(f'分析结果 {result.id} 的明细得分无法解析，保留原数据')
+                    continue
+                if result.id not in has_rows:
+                    if result.project_id not in rule_ids_by_project:
+                        rule_ids_by_project[result.project_id] = _project_rule_ids(
+                            db_session, result.project_id
+                        )
+                    mappings.extend(
+                        rule_score_rows(
+                            result, items, result.ai_model, rule_ids_by_project[result.project_id]
+                        )
+                    )
+                result.detailed_scores = null()
+                migrated += 1
+            if mappings:
+                db_session.bulk_insert_mappings(RuleScore, mappings)
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            raise
+    logger.info(f'已把 {migrated} 个分析结果的明细得分迁移到 rule_score 表')
+    return migrated
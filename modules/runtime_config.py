@@ -13,6 +13,12 @@ def _default_config() -> Dict[str, Any]:
         'pdf_page_max_workers': 4,  # 单PDF并行页数上限
         'pdf_page_timeout_sec': 20,  # 单页超时
         'pdf_overall_min_timeout_sec': 60,  # 单文件最小总超时
+        'progress_flush_interval_sec': 2,  # 进度快照最小落库间隔
+        'analysis_timeout_sec': 1800,  # 单个投标方分析的截止时间
+        'price_recalc_max_workers': 4,  # 批量重算价格分的并行项目数
+        'table_full_scan': False,  # 评分表识别是否逐页执行（关闭时只识别关键词候选页及续表页）
+        'table_extract_max_workers': 4,  # 评分表识别的并行进程数
+        'checkpoint_commit_every': 5,  # 每完成多少条规则提交一次检查点
     }
 
 
@@ -27,11 +27,18 @@ class IntelligentScoringExtractor(DefaultRulesMixin, StructureHandlerMixin):
     3. 如果上述步骤失败，则回退到默认规则。
     """
 
+    # 提取逻辑的版本号，表格识别、规则解析或树构建的结果会变化时递增，
+    # 使按招标文件内容缓存的评分规则失效
+    # 2：评分章节改为按编译的章节索引定位，并按规则放宽章节范围
+    VERSION = '2'
+
     def __init__(self):
         """初始化提取器，设置日志和解析器。"""
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         self.rule_parser = ScoringRuleParser()
+        # 最近一次 extract 是否返回了默认规则（回退规则不应被缓存）
+        self.used_fallback = False
 
     def extract(self, pdf_path: str) -> List[Dict[str, Any]]:
         """
@@ -44,6 +51,7 @@ class IntelligentScoringExtractor(DefaultRulesMixin, StructureHandlerMixin):
             List[Dict[str, Any]]: 一个结构化的评分规则列表（树形结构）。
                                   如果提取失败，则返回一个默认的规则集。
         """
+        self.used_fallback = False
         if not pdf_path:
             self.logger.warning("PDF路径为空，无法提取评分规则。将返回默认规则。")
             return self._get_fallback_rules()
@@ -83,6 +91,7 @@ class IntelligentScoringExtractor(DefaultRulesMixin, StructureHandlerMixin):
         在提取失败时，提供一个回退机制，返回默认的评分规则。
         """
         self.logger.info("回退到默认评分规则。")
+        self.used_fallback = True
         try:
             default_rules = self._get_default_scoring_rules()
             if default_rules:
@@ -29,21 +29,15 @@ class DBHandlerMixin:
         :return: 是否保存成功
         """
         try:
-            from modules.database import ScoringRule
-            
-            with self._get_db_session() as db:
-                # 先删除该项目已有的评分规则
-                db.query(ScoringRule).filter(ScoringRule.project_id == project_id).delete()
-                
-                # 第一步：按正常规则提取并存储全部规则
-                self._save_scoring_rules_recursive(db, project_id, rules, None)
-                db.commit()
-                
+            from modules.scoring_rule_store import replace_project_rules
+
             with self._get_db_session() as db:
+                # 第一步：删除该项目已有的评分规则，展开规则树后一次批量插入
+                replace_project_rules(db, project_id, rules, commit=False)
+
                 # 第二步：更新规则，处理父项信息继承
                 self._update_parent_info_inheritance(db, project_id)
-                db.commit()
-                
+
                 # 第三步：清理不完整的规则
                 self._clean_incomplete_rules(db, project_id)
                 db.commit()
@@ -126,90 +120,6 @@ class DBHandlerMixin:
         """
         return rules
 
-    def _save_scoring_rules_recursive(self, db, project_id: int, rules: List[Dict[str, Any]], parent_id: int = None):
-        """
-        递归保存评分规则到数据库
-        :param db: 数据库会话
-        :param project_id: 项目ID
-        :param rules: 评分规则列表
-        :param parent_id: 父级规则ID
-        """
-        from modules.database import ScoringRule
-        
-        for rule in rules:
-            try:
-                # 确定父项和子项名称
-                criteria_name = rule['criteria_name']
-                max_score = rule['max_score']
-                description = rule.get('description', '')
-                is_price_criteria = rule.get('is_price_criteria', False)
-                price_formula = rule.get('price_formula', None)
-                
-                # 特殊处理价格规则
-                if is_price_criteria and not rule.get('children', []):
-                    # 价格规则没有子项，将描述和公式保存在相应字段中
-                    scoring_rule = ScoringRule(
-                        project_id=project_id,
-                        Parent_Item_Name=criteria_name[:20],
-                        Parent_max_score=int(max_score) if max_score else None,
-                        Child_Item_Name=None,
-                        Child_max_score=None,
-                        description=description[:100] if description else None,
-                        is_veto=False,
-                        is_price_criteria=True,
-                        price_formula=price_formula[:100] if price_formula else None
-                    )
-                elif is_price_criteria and rule.get('children', []):
-                    # 价格规则有子项的情况
-                    scoring_rule = ScoringRule(
-                        project_id=project_id,
-                        Parent_Item_Name=criteria_name[:20],
-                        Parent_max_score=int(max_score) if max_score else None,
-                        Child_Item_Name=None,
-                        Child_max_score=None,
-                        description=description[:100] if description else None,
-                        is_veto=False,
-                        is_price_criteria=True,
-                        price_formula=price_formula[:100] if price_formula else None
-                    )
-                elif parent_id is None:  # 父项（非价格规则）
-                    scoring_rule = ScoringRule(
-                        project_id=project_id,
-                        Parent_Item_Name=criteria_name[:20],
-                        Parent_max_score=int(max_score) if max_score else None,
-                        Child_Item_Name=None,
-                        Child_max_score=None,
-                        description=description[:100] if description else None,
-                        is_veto=False,
-                        is_price_criteria=False,
-                        price_formula=None
-                    )
-                else:  # 子项
-                    scoring_rule = ScoringRule(
-                        project_id=project_id,
-                        Parent_Item_Name=None,
-                        Parent_max_score=None,
-                        Child_Item_Name=criteria_name[:20],
-                        Child_max_score=int(max_score) if max_score else None,
-                        description=description[:100] if description else None,
-                        is_veto=False,
-                        is_price_criteria=is_price_criteria,  # 子项也可能是价格项
-                        price_formula=price_formula[:100] if price_formula and is_price_criteria else None
-                    )
-                
-                db.add(scoring_rule)
-                db.flush()  # 获取插入记录的ID
-                
-                # 递归处理子项（如果有的话）
-                children = rule.get('children', [])
-                if children:
-                    self._save_scoring_rules_recursive(db, project_id, children, scoring_rule.id)
-                    
-            except Exception as e:
-                self.logger.error(f"保存评分规则 '{criteria_name}' 时出错: {e}")
-                db.rollback()
-                raise
-
     def save_scoring_rules_from_table_data(self, project_id: int, structured_tables: List[Dict]) -> bool:
         """
         从结构化表格数据中提取评分规则并保存到数据库
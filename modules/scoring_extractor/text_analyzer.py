@@ -20,7 +20,7 @@ class TextAnalyzerMixin(TextAnalyzerHelpers):
 
             self.logger.info(f'开始分析招标文件，总长度: {len(full_text)} 字符')
 
-            # 1. 提取评标相关的章节内容
+            # 1. 提取评标相关的章节内容（由章节索引定位，见 TextAnalyzerHelpers）
             evaluation_section_text = self._extract_scoring_section(full_text)
 
             # 记录提取的章节信息
@@ -73,207 +73,6 @@ class TextAnalyzerMixin(TextAnalyzerHelpers):
             self.logger.error(f'从文本提取评分规则时出错: {e}', exc_info=True)
             return []
             
-    def _extract_scoring_section(self, full_text: str) -> str:
-        """提取评标相关的章节内容"""
-        # 寻找评标相关的章节标题 - 扩展更多可能的关键字
-        scoring_keywords = [
-            '评标办法',
-            '评分标准',
-            '评审标准',
-            '评价标准',
-            '评分细则',
-            '评标细则',
-            '评价项目',
-            '评价内容',
-            '评审内容',
-            '打分标准',
-            '评分要求',
-            '评审要求',
-            '技术评分',
-            '商务评分',
-            '价格评分',
-            '综合评分',
-            '评分方法',
-            '评审方法',
-        ]
-
-        # 章节结束标记 - 扩展更多结束标记
-        end_keywords = [
-            '合同',
-            '附件',
-            '附录',
-            '格式',
-            '投标文件格式',
-            '附表',
-            '投标文件',
-            '第四章',
-            '第四部分',
-            '四、',
-            '五、',
-            '第五章',
-            '第五部分',
-            '投标须知',
-            '投标人须知',
-            '投标保证金',
-            '投标有效期',
-        ]
-
-        lines = full_text.split('\n')
-        start_idx = -1
-        end_idx = len(lines)
-
-        # 查找评标章节开始位置 - 改进匹配逻辑
-        for i, line in enumerate(lines):
-            line_clean = re.sub(r'\s+', '', line)  # 去除所有空白字符便于匹配
-            # 检查行中是否包含评分关键字
-            if (
-                any(keyword in line for keyword in scoring_keywords)
-                and len(line_clean) < 100
-            ):
-                # 进一步检查是否为章节标题（通常在行首）
-                line_stripped = line.strip()
-                if (
-                    line_stripped.startswith(
-                        (
-                            '第',
-                            '一',
-                            '二',
-                            '三',
-                            '四',
-                            '五',
-                            '六',
-                            '七',
-                            '八',
-                            '九',
-                            '十',
-                        )
-                    )
-                    or line_stripped.endswith(('、', '.'))
-                    or any(keyword in line_stripped for keyword in scoring_keywords)
-                    or re.match(r'^\d+\.', line_stripped)
-                    or re.match(r'^[A-Z]\.', line_stripped)
-                ):
-                    start_idx = i
-                    self.logger.info(f'找到评标章节开始位置: {line.strip()}')
-                    break
-
-        # 如果没找到明确的章节标题，尝试查找包含评分关键字的内容
-        if start_idx == -1:
-            for i, line in enumerate(lines):
-                if (
-                    any(keyword in line for keyword in scoring_keywords)
-                    and '分' in line
-                ):
-                    start_idx = max(0, i - 10)  # 向前回溯更多行
-                    self.logger.info(
-                        f'通过评分关键字定位到评标内容开始位置: {lines[start_idx].strip()}'
-                    )
-                    break
-
-        # 如果仍然没找到，不使用全文，而是返回空
-        if start_idx == -1:
-            self.logger.warning('未找到明确的评标章节标题，不提取评分规则')
-            return ''
-
-        # 查找章节结束位置 - 增加更多结束标记和更智能的判断
-        chapter_end_keywords = [
-            '合同',
-            '附件',
-            '附录',
-            '格式',
-            '投标文件格式',
-            '附表',
-            '第四章',
-            '第四部分',
-            '四、',
-            '投标须知',
-            '投标人须知',
-            '投标保证金',
-            '投标有效期',
-            '投标函',
-            '法定代表人',
-            '第五章',
-            '第五部分',
-            '五、',
-            '六、',
-            '第六章',
-            '第六部分',
-            '投标报价',
-            '投标文件递交',
-            '开标',
-            '中标',
-        ]
-
-        # 从开始位置往后查找结束标记
-        for i in range(start_idx + 1, len(lines)):
-            line = lines[i].strip()
-            if line:
-                # 检查是否是新的章节标题
-                is_new_chapter = (
-                    (line.startswith('第') and '章' in line)
-                    or re.match(r'^[一二三四五六七八九十]+、', line)  # 中文章节标题
-                    or re.match(r'^\d+\.', line)  # 数字章节标题
-                    or re.match(r'^[A-Z]\.', line)  # 字母章节标题
-                    or any(keyword in line for keyword in chapter_end_keywords)
-                )
-
-                # 如果是新的章节标题且不是评分相关的内容
-                if is_new_chapter and not any(
-                    keyword in line
-                    for keyword in scoring_keywords + ['价格', '报价', '评分', '评审']
-                ):
-                    end_idx = i
-                    self.logger.info(f'找到评标章节结束位置: {line}')
-                    break
-
-        scoring_section = '\n'.join(lines[start_idx:end_idx])
-        self.logger.info(f'提取评标章节，长度: {len(scoring_section)} 字符')
-
-        # 如果提取的章节太短，使用更大的范围
-        if len(scoring_section) < 500:  # 减少阈值到500字符
-            self.logger.warning('提取的评标章节较短，扩大搜索范围')
-            # 扩大搜索范围，包含更多内容
-            expanded_end = min(start_idx + 200, len(lines))  # 减少到200行
-            scoring_section = '\n'.join(lines[start_idx:expanded_end])
-            self.logger.info(f'扩大后的评标章节，长度: {len(scoring_section)} 字符')
-
-        # 如果章节内容仍然很短，尝试从开始位置往后取更多内容直到找到明显的结束标记
-        if len(scoring_section) < 500:
-            self.logger.warning('评标章节内容仍然较短，尝试获取更多相关内容')
-            # 查找包含评分关键字的段落
-            extended_end = start_idx
-            found_end_marker = False
-            for i in range(start_idx, min(start_idx + 500, len(lines))):
-                line = lines[i]
-                # 如果找到明显的结束标记
-                if (
-                    any(keyword in line for keyword in ['合同', '附件', '附录'])
-                    and len(line.strip()) < 30
-                ):
-                    extended_end = i
-                    found_end_marker = True
-                    break
-                # 继续扩展直到有足够的内容
-                extended_end = i
-
-            if not found_end_marker:
-                extended_end = min(start_idx + 500, len(lines))
-
-            scoring_section = '\n'.join(lines[start_idx:extended_end])
-            self.logger.info(
-                f'进一步扩大后的评标章节，长度: {len(scoring_section)} 字符'
-            )
-
-        # 如果内容仍然不够，返回更大的范围
-        if len(scoring_section) < 800:
-            self.logger.warning('评标章节内容仍然不足，返回更大的文本范围')
-            larger_start = max(0, start_idx - 50)
-            larger_end = min(len(lines), start_idx + 500)
-            scoring_section = '\n'.join(lines[larger_start:larger_end])
-            self.logger.info(f'返回更大的文本范围，长度: {len(scoring_section)} 字符')
-
-        return scoring_section
-        
     def _parse_rules_from_text(self, text: str) -> List[Dict[str, Any]]:
         """从文本中解析出所有结构化的评分规则项"""
         # 优化正则表达式以更好地匹配评分规则，兼容中英文括号
@@ -7,6 +7,32 @@ import re
 import logging
 from typing import List, Dict, Any, Tuple
 
+from modules.section_index import get_section_index
+
+
+# 同一行内既有评分关键词又有“分”字（没有评标章节标题时用于定位评分内容）
+_SCORING_LINE_RE = re.compile(
+    r'^(?=[^\n]*分)[^\n]*(?:评标办法|评分标准|评审标准|评价标准|评分细则|评标细则|评价项目|打分标准|综合评分)',
+    re.MULTILINE,
+)
+
+
+def _move_lines(text: str, pos: int, lines: int) -> int:
+    """从 pos 所在行起向后（lines>0）或向前（lines<0）移动若干行，返回行首偏移"""
+    pos = text.rfind('\n', 0, pos) + 1
+    if lines >= 0:
+        for _ in range(lines):
+            nl = text.find('\n', pos)
+            if nl < 0:
+                return len(text)
+            pos = nl + 1
+        return pos
+    for _ in range(-lines):
+        if pos == 0:
+            break
+        pos = text.rfind('\n', 0, pos - 1) + 1
+    return pos
+
 
 class TextAnalyzerHelpers:
     """文本分析辅助类"""
@@ -17,60 +43,39 @@ class TextAnalyzerHelpers:
     def _extract_scoring_section(self, text: str) -> str:
         """
         提取评标相关的章节内容
-        
+
+        由章节索引直接取出“评标办法”“评分标准”等标题所在的章节；章节过短时
+        （例如标题后紧跟的编号条目被当作下一章节）向后扩展到标题起200行，
+        仍不足800字时取标题前50行至后500行。没有这类标题时，从第一处同时
+        出现评分关键词和“分”字的行的前10行开始取。
+
         Args:
             text: 完整的招标文件文本
-            
+
         Returns:
             str: 评标章节的文本内容
         """
-        # 定义可能的评标章节标题
-        scoring_section_headers = [
-            r'评标办法',
-            r'评分标准',
-            r'评审标准',
-            r'技术评分',
-            r'综合评分',
-            r'评标标准',
-        ]
-
-        # 查找评标章节的开始位置
-        start_pos = -1
-        section_header = ''
-        for header in scoring_section_headers:
-            # 查找章节标题
-            pattern = rf'(^|\n)[\d、.]*\s*{header}[\s\S]*?(?=\n\d、\.|\n第[一二三四五六七八九十]章|\Z)'
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                start_pos = match.start()
-                section_header = header
-                break
-
-        if start_pos == -1:
-            # 如果没有找到标准章节标题，尝试更宽松的匹配
-            pattern = r'评[标审][\s\S]*?标准|评分[\s\S]*?标准'
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                start_pos = match.start()
-                section_header = match.group()
-
-        if start_pos != -1:
-            # 找到章节开始位置，提取相关内容
-            # 从章节标题开始，到下一个主要章节或文档结尾
-            section_text = text[start_pos:]
-            next_chapter_pattern = (
-                r'\n\d+、|\n第[一二三四五六七八九十]章|\n第四章|\Z'  # 匹配下一个章节
-            )
-            next_chapter_match = re.search(next_chapter_pattern, section_text[10:])
-            if next_chapter_match:
-                end_pos = next_chapter_match.start() + 10
-                section_text = section_text[:end_pos]
-
-            self.logger.info(f'成功提取评标章节: {section_header}')
-            return section_text.strip()
+        heading = get_section_index(text).section('scoring')
+        if heading is not None:
+            start, end = heading.start, heading.end
+            self.logger.info(f'成功提取评标章节: {heading.title}')
         else:
-            self.logger.warning('未找到明确的评标章节标题')
-            return ''
+            match = _SCORING_LINE_RE.search(text)
+            if not match:
+                self.logger.warning('未找到明确的评标章节标题')
+                return ''
+            start = _move_lines(text, match.start(), -10)
+            end = _move_lines(text, start, 200)
+            self.logger.info('通过评分关键字定位到评标内容')
+
+        anchor = start
+        if end - start < 500:
+            end = max(end, _move_lines(text, anchor, 200))
+        if end - start < 800:
+            start = _move_lines(text, anchor, -50)
+            end = max(end, _move_lines(text, anchor, 500))
+            self.logger.info(f'评标章节较短，扩大到 {end - start} 字符')
+        return text[start:end].strip()
 
     def _parse_rules_from_text(self, text: str) -> List[Dict[str, Any]]:
         """
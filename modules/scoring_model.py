@@ -0,0 +1,408 @@
+"""
+项目评分模型模块
+评审人员在一次评审中会连续调整几十个分数。模型把项目的得分载入内存，建立
+投标方 × 评分子项（加价格分）的得分矩阵：每次修改只按差值更新该投标方的总分，
+并在有序排名中移动该投标方的位置，无需重新读取全部规则得分；
+修改按批写回数据库（更新 rule_score 中对应的行，只提交一次），同时写入 ScoreModificationHistory。
+也可以只试算（what-if），查看修改后的排名而不保存。
+"""
+
+import bisect
+import datetime
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import func
+
+from modules.database import AnalysisResult, RuleScore, ScoringRule, ScoreModificationHistory
+from modules.rule_scores import lookup_by_rule, other_scores_totals, project_score_matrix, rule_key, rule_score_item
+from modules.project_summary import refresh_project_summary
+
+
+logger = logging.getLogger(__name__)
+
+# 价格分在得分矩阵中的列名
+PRICE_COLUMN = '价格分'
+
+
+class ScoreEditError(ValueError):
+    """修改的投标方、评分项或分数无效"""
+
+
+class _BidderScores:
+    """得分矩阵中的一行（一个分析结果）"""
+
+    __slots__ = ('result_id', 'bidder_name', 'scores', 'price_score', 'total')
+
+    def __init__(self, result_id, bidder_name, scores, price_score, other_total=None):
+        self.result_id = result_id
+        self.bidder_name = bidder_name
+        self.scores = scores
+        self.price_score = price_score
+        # 全部非价格规则得分之和（含不在当前评分规则中的得分行）加价格分，与价格分重算写入的总分一致
+        known_total = sum(s for s in scores if s is not None)
+        self.total = (known_total if other_total is None else other_total) + (price_score or 0)
+
+    def rank_key(self) -> Tuple[float, str, int]:
+        return (-round(self.total, 6), self.bidder_name or '', self.result_id)
+
+
+class ProjectScoringModel:
+    """项目的内存得分矩阵，增量维护总分和排名"""
+
+    def __init__(
+        self,
+        project_id: int,
+        columns: List[Dict[str, Any]],
+        rows: List[_BidderScores],
+        price_max_score: Optional[float] = None,
+        signature=None,
+    ):
+        self.project_id = project_id
+        self.columns = columns
+        self.column_index = {rule_key(column['parent_name'], column['name']): i for i, column in enumerate(columns)}
+        self.price_max_score = price_max_score
+        self.rows = {row.result_id: row for row in rows}
+        self.signature = signature
+        self._ranking = sorted(row.rank_key() for row in rows)
+        # 尚未写回数据库的修改
+        self._pending: List[Dict[str, Any]] = []
+
+    @classmethod
+    def load(cls, db, project_id: int) -> 'ProjectScoringModel':
+        """一次查询评分规则、一次查询分析结果，构建得分矩阵"""
+        rules = db.query(ScoringRule).filter(ScoringRule.project_id == project_id).all()
+        columns = []
+        price_max_score = None
+        for rule in rules:
+            if rule.is_price_criteria:
+                price_max_score = rule.Parent_max_score
+                continue
+            if not rule.Child_Item_Name:
+                continue
+            key = rule_key(rule.Parent_Item_Name, rule.Child_Item_Name)
+            if key not in (rule_key(c['parent_name'], c['name']) for c in columns):
+                columns.append(
+                    {
+                        'name': rule.Child_Item_Name,
+                        'parent_name': key[0],
+                        'max_score': rule.Child_max_score or 0,
+                    }
+                )
+
+        results = (
+            db.query(AnalysisResult.id, AnalysisResult.bidder_name, AnalysisResult.price_score)
+            .filter(AnalysisResult.project_id == project_id)
+            .all()
+        )
+        score_matrix = project_score_matrix(db, project_id)
+        other_totals = other_scores_totals(db, project_id)
+        rows = []
+        for result_id, bidder_name, price_score in results:
+            rule_scores = score_matrix.get(result_id, {})
+            rows.append(
+                _BidderScores(
+                    result_id,
+                    bidder_name,
+                    [lookup_by_rule(rule_scores, c['parent_name'], c['name']) for c in columns],
+                    price_score,
+                    other_totals.get(result_id, 0.0),
+                )
+            )
+        return cls(project_id, columns, rows, price_max_score, project_signature(db, project_id))
+
+    def _resolve(self, edit: Dict[str, Any]) -> Tuple[_BidderScores, Optional[int], float, float]:
+        """校验一条修改，返回 (行, 列序号（价格分为None）, 原分数, 新分数)"""
+        row = self.rows.get(edit.get('result_id'))
+        if row is None:
+            raise ScoreEditError(f"分析结果 {edit.get('result_id')} 不属于项目 {self.project_id}")
+        criteria_name = edit.get('criteria_name')
+        try:
+            new_score = float(edit.get('score'))
+        except (TypeError, ValueError):
+            raise ScoreEditError(f'{criteria_name} 的分数无效: {edit.get("score")}')
+
+        if criteria_name == PRICE_COLUMN:
+            column, old_score, max_score = None, row.price_score, self.price_max_score
+        else:
+            column = self._column(edit.get('parent_name'), criteria_name)
+            old_score, max_score = row.scores[column], self.columns[column]['max_score']
+        if new_score < 0 or (max_score is not None and new_score > max_score):
+            raise ScoreEditError(f'{criteria_name} 的分数 {new_score} 超出范围 0-{max_score}')
+        return row, column, old_score, new_score
+
+    def _column(self, parent_name: Optional[str], criteria_name: str) -> int:
+        """评分项所在的列；子项名称在多个父项下出现时需要指定父项"""
+        column = lookup_by_rule(self.column_index, parent_name, criteria_name)
+        if column is not None:
+            return column
+        if parent_name is None and sum(1 for _, name in self.column_index if name == criteria_name) > 1:
+            raise ScoreEditError(f'评分项 {criteria_name} 出现在多个父项下，请指定父项')
+        raise ScoreEditError(f'评分项不存在: {criteria_name}')
+
+    def what_if(self, edits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """试算：返回应用修改后的排名，不改变模型"""
+        totals = {}
+        cells = {}
+        for edit in edits:
+            row, column, old_score, new_score = self._resolve(edit)
+            # 同一评分项被多次修改时，以前一次修改后的分数为原分数
+            old_score = cells.get((row.result_id, column), old_score)
+            cells[(row.result_id, column)] = new_score
+            totals[row.result_id] = totals.get(row.result_id, row.total) + new_score - (old_score or 0)
+        if not totals:
+            return self.rankings()
+        # 只重新排序受影响的投标方
+        ranking = list(self._ranking)
+        for result_id, total in totals.items():
+            row = self.rows[result_id]
+            ranking.pop(bisect.bisect_left(ranking, row.rank_key()))
+            bisect.insort(ranking, (-round(total, 6), row.bidder_name or '', result_id))
+        return self._ranking_view(ranking, totals)
+
+    def apply(self, edits: List[Dict[str, Any]], modified_by: Optional[str] = None, reason: Optional[str] = None) -> List[int]:
+        """
+        应用修改：按差值更新总分并调整排名位置，修改记入待写回列表
+
+        全部修改先校验，任何一条无效时都不应用。
+
+        Returns:
+            List[int]: 总分发生变化的分析结果ID
+        """
+        resolved = [(edit, self._resolve(edit)) for edit in edits]
+        changed = []
+        for edit, (row, column, old_score, new_score) in resolved:
+            # 前面的修改可能已改过同一单元格，以当前值为原分数
+            old_score = row.price_score if column is None else row.scores[column]
+            if old_score == new_score:
+                continue
+            old_key = row.rank_key()
+            if column is None:
+                row.price_score = new_score
+            else:
+                row.scores[column] = new_score
+            row.total += new_score - (old_score or 0)
+            self._ranking.pop(bisect.bisect_left(self._ranking, old_key))
+            bisect.insort(self._ranking, row.rank_key())
+
+            criteria_name = edit['criteria_name']
+            self._pending.append(
+                {
+                    'result_id': row.result_id,
+                    'criteria_name': criteria_name,
+                    'column': column,
+                    'original_score': old_score,
+                    'new_score': new_score,
+                    'new_reason': edit.get('reason'),
+                    'modified_by': modified_by,
+                    'modification_reason': reason,
+                }
+            )
+            if row.result_id not in changed:
+                changed.append(row.result_id)
+        return changed
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def flush(self, db) -> int:
+        """
+        把待写回的修改批量写入数据库：一次查询涉及的分析结果、一次查询其规则得分，
+        更新规则得分、价格分和总分，批量插入修改历史，只提交一次
+
+        Returns:
+            int: 写回的修改条数
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, []
+        result_ids = {edit['result_id'] for edit in pending}
+        results = {
+            result.id: result
+            for result in db.query(AnalysisResult).filter(AnalysisResult.id.in_(result_ids)).all()
+        }
+        rule_scores: Dict[int, Dict[Tuple[Optional[str], str], RuleScore]] = {
+            result_id: {} for result_id in results
+        }
+        originals: Dict[int, List[Dict[str, Any]]] = {result_id: [] for result_id in results}
+        for rule_score in (
+            db.query(RuleScore)
+            .filter(RuleScore.analysis_result_id.in_(result_ids))
+            .order_by(RuleScore.analysis_result_id, RuleScore.position)
+        ):
+            rule_scores[rule_score.analysis_result_id].setdefault(
+                rule_key(rule_score.parent_name, rule_score.criteria_name), rule_score
+            )
+            originals[rule_score.analysis_result_id].append(rule_score_item(rule_score))
+        now = datetime.datetime.utcnow()
+        history = []
+        try:
+            for edit in pending:
+                result = results.get(edit['result_id'])
+                if result is None:
+                    continue
+                if result.original_scores is None:
+                    result.original_scores = originals[result.id]
+                original_reason = None
+                if edit['column'] is None:
+                    result.price_score = edit['new_score']
+                else:
+                    original_reason = self._set_rule_score(db, rule_scores[result.id], result, edit, now)
+                history.append(
+                    ScoreModificationHistory(
+                        analysis_result_id=result.id,
+                        criteria_name=edit['criteria_name'],
+                        original_score=edit['original_score'],
+                        new_score=edit['new_score'],
+                        original_reason=original_reason,
+                        new_reason=edit['new_reason'],
+                        modification_type='manual',
+                        modified_by=edit['modified_by'],
+                        modified_at=now,
+                        modification_reason=edit['modification_reason'],
+                    )
+                )
+                result.modification_count = (result.modification_count or 0) + 1
+                result.is_modified = True
+                result.last_modified_at = now
+                result.last_modified_by = edit['modified_by']
+            for result_id in {edit['result_id'] for edit in pending} & set(results):
+                self._store_total(results[result_id], rule_scores[result_id])
+            db.bulk_save_objects(history)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # 写回失败时保留修改，下次再写
+            self._pending = pending + self._pending
+            raise
+        refresh_project_summary(db, self.project_id)
+        self.signature = project_signature(db, self.project_id)
+        logger.info(f'项目 {self.project_id} 写回 {len(history)} 条分数修改')
+        return len(history)
+
+    def _store_total(self, result: AnalysisResult, rule_scores: Dict[Tuple[Optional[str], str], RuleScore]):
+        """按该结果的全部规则得分（不只是当前评分规则中的列）重新计算并保存总分，同步模型中的排名"""
+        total = sum(
+            rule_score.score
+            for rule_score in rule_scores.values()
+            if rule_score.score is not None and not rule_score.is_price_criteria
+        ) + (result.price_score or 0)
+        result.total_score = round(total, 2)
+        row = self.rows[result.id]
+        if round(row.total, 6) != round(total, 6):
+            self._ranking.pop(bisect.bisect_left(self._ranking, row.rank_key()))
+            row.total = total
+            bisect.insort(self._ranking, row.rank_key())
+
+    def _set_rule_score(
+        self,
+        db,
+        rule_scores: Dict[Tuple[Optional[str], str], RuleScore],
+        result: AnalysisResult,
+        edit: Dict[str, Any],
+        now: datetime.datetime,
+    ) -> Optional[str]:
+        """修改（或补充）该投标方该评分项的规则得分（rule_scores 为该结果的规则得分），返回原评分理由"""
+        column = self.columns[edit['column']]
+        rule_score = lookup_by_rule(rule_scores, column['parent_name'], column['name'])
+        if rule_score is not None:
+            original_reason = rule_score.reason
+            rule_score.score = edit['new_score']
+            if edit['new_reason']:
+                rule_score.reason = edit['new_reason']
+            rule_score.updated_at = now
+            return original_reason
+        position = max((row.position or 0 for row in rule_scores.values()), default=-1) + 1
+        rule_score = RuleScore(
+            analysis_result_id=result.id,
+            project_id=result.project_id,
+            parent_name=column['parent_name'],
+            criteria_name=column['name'],
+            max_score=column['max_score'],
+            score=edit['new_score'],
+            reason=edit['new_reason'] or '人工评分',
+            model='manual',
+            is_price_criteria=False,
+            position=position,
+            updated_at=now,
+        )
+        db.add(rule_score)
+        rule_scores[rule_key(column['parent_name'], column['name'])] = rule_score
+        return None
+
+    def rankings(self) -> List[Dict[str, Any]]:
+        return self._ranking_view(self._ranking, {})
+
+    def _ranking_view(self, ranking, totals: Dict[int, float]) -> List[Dict[str, Any]]:
+        view = []
+        for rank, (_, _, result_id) in enumerate(ranking, start=1):
+            row = self.rows[result_id]
+            view.append(
+                {
+                    'rank': rank,
+                    'result_id': result_id,
+                    'bidder_name': row.bidder_name,
+                    'price_score': row.price_score,
+                    'total_score': round(totals.get(result_id, row.total), 2),
+                }
+            )
+        return view
+
+
+def project_signature_queries(db, project_id: int):
+    """版本标记使用的两个聚合查询：(分析结果查询, 评分规则查询)"""
+    results = db.query(
+        func.count(AnalysisResult.id),
+        func.max(AnalysisResult.id),
+        func.max(AnalysisResult.analyzed_at),
+        func.max(AnalysisResult.last_modified_at),
+        func.sum(AnalysisResult.total_score),
+    ).filter(AnalysisResult.project_id == project_id)
+    rules = db.query(
+        func.count(ScoringRule.id),
+        func.max(ScoringRule.id),
+        func.sum(ScoringRule.Child_max_score),
+        func.sum(ScoringRule.Parent_max_score),
+    ).filter(ScoringRule.project_id == project_id)
+    return results, rules
+
+
+def project_signature(db, project_id: int):
+    """
+    分析结果和评分规则的版本标记：结果被重新分析或在模型之外修改、评分规则被替换或修改满分后随之变化
+
+    评分规则没有修改时间，只改名称时由修改规则的接口调用 ScoringModelCache.invalidate。
+    """
+    results, rules = project_signature_queries(db, project_id)
+    return tuple(results.one()) + tuple(rules.one())
+
+
+class ScoringModelCache:
+    """Web进程内按项目缓存评分模型；分析结果在模型之外变化时重新加载"""
+
+    def __init__(self):
+        self._models: Dict[int, ProjectScoringModel] = {}
+        self._locks: Dict[int, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def lock(self, project_id: int) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(project_id, threading.Lock())
+
+    def get(self, db, project_id: int) -> ProjectScoringModel:
+        """调用方需持有该项目的锁"""
+        model = self._models.get(project_id)
+        if model is None or (
+            model.pending_count == 0 and model.signature != project_signature(db, project_id)
+        ):
+            model = ProjectScoringModel.load(db, project_id)
+            self._models[project_id] = model
+        return model
+
+    def invalidate(self, project_id: int):
+        self._models.pop(project_id, None)
+
+
+scoring_models = ScoringModelCache()
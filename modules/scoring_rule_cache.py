@@ -0,0 +1,105 @@
+"""
+评分规则缓存模块
+同一份招标文件常被多个项目、多轮招标重复使用或重新上传。提取出的评分规则树
+按招标文件内容哈希和提取器版本缓存，项目缺少评分规则时直接复用缓存，
+不再重复表格识别和规则解析；人工“重新提取”时绕过缓存并刷新缓存。
+"""
+
+import copy
+import datetime
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from modules.database import ScoringRuleCacheEntry
+from modules.rule_checkpoints import document_hash
+from modules.scoring_extractor import IntelligentScoringExtractor
+
+
+logger = logging.getLogger(__name__)
+
+
+def cache_entry_query(db_session, content_hash: str, extractor_version: str):
+    """同一招标文件内容、同一提取器版本的缓存条目"""
+    return db_session.query(ScoringRuleCacheEntry).filter(
+        ScoringRuleCacheEntry.content_hash == content_hash,
+        ScoringRuleCacheEntry.extractor_version == extractor_version,
+    )
+
+
+class ScoringRuleCache:
+    """评分规则树缓存（scoring_rule_cache 表）"""
+
+    def __init__(self, db_session, extractor_version: str = IntelligentScoringExtractor.VERSION):
+        self.db = db_session
+        self.extractor_version = extractor_version
+
+    def _entry(self, content_hash: str) -> Optional[ScoringRuleCacheEntry]:
+        return cache_entry_query(self.db, content_hash, self.extractor_version).first()
+
+    def get(self, content_hash: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """返回缓存的规则树（副本），未命中返回 None"""
+        if not content_hash:
+            return None
+        entry = self._entry(content_hash)
+        if entry is None or not entry.rules:
+            return None
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = datetime.datetime.utcnow()
+        self.db.commit()
+        return copy.deepcopy(entry.rules)
+
+    def put(self, content_hash: Optional[str], rules: List[Dict[str, Any]]):
+        """写入或覆盖规则树"""
+        if not content_hash or not rules:
+            return
+        try:
+            entry = self._entry(content_hash)
+            if entry is None:
+                entry = ScoringRuleCacheEntry(
+                    content_hash=content_hash,
+                    extractor_version=self.extractor_version,
+                    hit_count=0,
+                )
+                self.db.add(entry)
+            entry.rules = rules
+            entry.rule_count = len(rules)
+            entry.last_used_at = datetime.datetime.utcnow()
+            self.db.commit()
+        except IntegrityError:
+            # 并发提取同一份招标文件，另一方已写入
+            self.db.rollback()
+        except Exception as e:
+            logger.error(f'写入评分规则缓存时出错: {e}')
+            self.db.rollback()
+
+
+def extract_scoring_rules_cached(
+    db_session, tender_file_path: str, refresh: bool = False
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    提取招标文件的评分规则树，优先使用缓存
+
+    Args:
+        db_session: 数据库会话
+        tender_file_path: 招标文件路径
+        refresh: 为 True 时绕过缓存重新提取，并用结果刷新缓存
+
+    Returns:
+        Tuple[List[Dict], bool]: 规则树，以及是否来自缓存
+    """
+    cache = ScoringRuleCache(db_session)
+    content_hash = document_hash(tender_file_path)
+    if not refresh:
+        rules = cache.get(content_hash)
+        if rules is not None:
+            logger.info(f'招标文件 {tender_file_path} 命中评分规则缓存（{len(rules)} 条）')
+            return rules, True
+
+    extractor = IntelligentScoringExtractor()
+    rules = extractor.extract(tender_file_path)
+    # 默认规则是提取失败时的回退，不写入缓存
+    if rules and not extractor.used_fallback:
+        cache.put(content_hash, rules)
+    return rules, False
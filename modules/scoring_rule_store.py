@@ -0,0 +1,82 @@
+"""
+评分规则持久化模块
+提取出的评分规则树在内存中展开为数据库行（父项填 Parent_Item_Name，
+叶子子项填 Child_Item_Name 并记录所属父项名称），在一个事务内
+先删除项目原有规则，再一次批量插入全部行，取代逐条 add + flush 的递归写入。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from modules.database import ScoringRule
+from modules.project_summary import invalidate_project_summary
+
+
+def flatten_rule_tree(project_id: int, rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    把规则树按先序展开为 scoring_rule 行
+
+    有子项的规则和价格规则保存为父项行，子项行的 Parent_Item_Name 为所属父项名称；
+    没有子项的非价格规则保存为子项行。
+
+    Returns:
+        List[Dict]: 列名 -> 值 的行列表（所有行列名相同，便于批量插入）
+    """
+    rows: List[Dict[str, Any]] = []
+
+    def visit(rule_data: Dict[str, Any], parent_name: Optional[str]):
+        is_price = bool(rule_data.get('is_price_criteria', False))
+        children = rule_data.get('children') or []
+        name = rule_data.get('criteria_name')
+        is_parent = bool(children) or is_price
+        rows.append(
+            {
+                'project_id': project_id,
+                'Parent_Item_Name': name if is_parent else parent_name,
+                'Parent_max_score': rule_data.get('max_score') if is_parent else None,
+                'Child_Item_Name': None if is_parent else name,
+                'Child_max_score': None if is_parent else rule_data.get('max_score'),
+                'description': rule_data.get('description', ''),
+                'is_veto': bool(rule_data.get('is_veto', False)),
+                'is_price_criteria': is_price,
+                'price_formula': rule_data.get('price_formula') if is_price else None,
+            }
+        )
+        # 子项记录父项名称
+        for child in children if is_parent else ():
+            visit(child, name)
+
+    for rule_data in rules:
+        visit(rule_data, None)
+    return rows
+
+
+def replace_project_rules(
+    db_session, project_id: int, rules: List[Dict[str, Any]], commit: bool = True
+) -> int:
+    """
+    用规则树替换项目的全部评分规则（删除与批量插入在同一事务内）
+
+    Args:
+        db_session: 数据库会话
+        project_id: 项目ID
+        rules: 规则树
+        commit: 是否提交；为 False 时由调用方在同一事务内继续处理后提交
+
+    Returns:
+        int: 写入的行数
+    """
+    rows = flatten_rule_tree(project_id, rules)
+    try:
+        db_session.query(ScoringRule).filter(ScoringRule.project_id == project_id).delete(
+            synchronize_session=False
+        )
+        if rows:
+            db_session.bulk_insert_mappings(ScoringRule, rows)
+        # 汇总表的表头来自评分规则
+        invalidate_project_summary(db_session, project_id)
+        if commit:
+            db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return len(rows)
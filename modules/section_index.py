@@ -0,0 +1,171 @@
+"""
+章节索引模块
+一次扫描把文档中的标题（第X章/第X部分/第X节、一、（一）、1. 1.1 等编号标题）
+解析为带字符偏移的大纲，每个标题的范围延伸到下一个同级或更高级标题之前。
+评标办法、价格、资格审查等常用章节在建立索引时一并归类，
+之后按名称取章节是字典查找，按偏移定位所在章节、所在页是二分查找，
+招标文件的评分规则提取和投标文件分析共用同一索引，不再逐行正则扫描全文。
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+
+_CN_NUM = '一二三四五六七八九十百零〇两'
+
+# 标题行：行首编号 + 不超过60字的标题文字；编号决定层级
+_HEADING_RE = re.compile(
+    r'^[ \t　]*(?:'
+    rf'(?P<chapter>第[{_CN_NUM}\d]+(?:章|篇|部分))'
+    rf'|(?P<section>第[{_CN_NUM}\d]+节)'
+    rf'|(?P<cn_item>[{_CN_NUM}]+[、．.])'
+    rf'|(?P<cn_paren>[（(][{_CN_NUM}]+[)）])'
+    r'|(?P<number>\d{1,2}(?:\.\d{1,2}){0,3})(?:[、．.](?!\d)|(?=[ \t　]))'
+    r')[ \t　]*(?P<title>[^\n]{0,60})$',
+    re.MULTILINE,
+)
+
+_LEVELS = {'chapter': 1, 'section': 2, 'cn_item': 2, 'cn_paren': 3}
+
+# 目录行（标题后跟引导符和页码）不是正文标题
+_TOC_TAIL_RE = re.compile(r'(?:[.．…·]{3,}|[ \t　]{2,})[ \t　]*\d+[ \t　]*$')
+
+# 常用章节：名称 -> 标题关键词（标题去掉空白后包含任一关键词即归入该章节）
+SECTION_KEYWORDS: Dict[str, List[str]] = {
+    'scoring': ['评标办法', '评分标准', '评审标准', '评标标准', '评分细则', '评标细则', '综合评分', '评分办法', '评审办法'],
+    'price': ['投标报价', '价格文件', '报价部分', '开标一览表', '投标一览表', '价格一览表', '报价一览表'],
+    'qualification': ['资格审查', '资格证明', '资格条件', '资质证明', '资格要求', '资格文件'],
+}
+
+
+class Heading:
+    """大纲中的一个标题：层级、标题文字及其章节范围 [start, end)"""
+
+    __slots__ = ('level', 'title', 'start', 'end', 'parent')
+
+    def __init__(self, level: int, title: str, start: int):
+        self.level = level
+        self.title = title
+        self.start = start
+        self.end = start
+        self.parent: Optional[int] = None
+
+    def __repr__(self):
+        return f'Heading({self.level}, {self.title!r}, {self.start}-{self.end})'
+
+
+class SectionIndex:
+    """文档大纲索引"""
+
+    def __init__(self, text: str, page_starts: Optional[List[int]] = None):
+        self.text = text
+        # 各页在全文中的起始偏移（由 from_pages 建立），用于偏移 -> 页码
+        self.page_starts = page_starts or [0]
+        self.headings: List[Heading] = []
+        self._starts: List[int] = []
+        self._named: Dict[str, int] = {}
+        self._build()
+
+    @classmethod
+    def from_pages(cls, pages: List[str]) -> 'SectionIndex':
+        """按页建立索引，页之间以换行连接"""
+        page_starts = []
+        offset = 0
+        for page in pages:
+            page_starts.append(offset)
+            offset += len(page) + 1
+        return cls('\n'.join(pages), page_starts)
+
+    def _build(self):
+        stack: List[int] = []
+        for m in _HEADING_RE.finditer(self.text):
+            if _TOC_TAIL_RE.search(m.group(0)):
+                continue
+            title = m.group('title').strip()
+            kind = next(k for k in ('chapter', 'section', 'cn_item', 'cn_paren', 'number') if m.group(k))
+            if kind == 'number':
+                # 编号后没有文字（或以数字开头）的多为正文中的数值
+                if not title or title[0].isdigit():
+                    continue
+                # 1. -> 4，1.1 -> 5，1.1.1 -> 6
+                level = 4 + m.group('number').count('.')
+            else:
+                level = _LEVELS[kind]
+                if kind in ('chapter', 'section'):
+                    title = f"{m.group(kind)} {title}".strip()
+            heading = Heading(level, title, m.start(kind))
+            index = len(self.headings)
+            # 关闭所有同级及下级标题
+            while stack and self.headings[stack[-1]].level >= level:
+                self.headings[stack.pop()].end = heading.start
+            heading.parent = stack[-1] if stack else None
+            stack.append(index)
+            self.headings.append(heading)
+        for index in stack:
+            self.headings[index].end = len(self.text)
+        self._starts = [h.start for h in self.headings]
+        self._classify()
+
+    def _classify(self):
+        """为常用章节选出标题：层级最高者优先，同级取范围最长者"""
+        best: Dict[str, Tuple[int, int, int]] = {}
+        for index, heading in enumerate(self.headings):
+            title = re.sub(r'\s+', '', heading.title)
+            for name, keywords in SECTION_KEYWORDS.items():
+                if any(k in title for k in keywords):
+                    key = (heading.level, -(heading.end - heading.start), index)
+                    if name not in best or key < best[name]:
+                        best[name] = key
+        self._named = {name: key[2] for name, key in best.items()}
+
+    def heading_at(self, offset: int) -> Optional[Heading]:
+        """偏移所在的最内层章节标题"""
+        index = bisect_right(self._starts, offset) - 1
+        while index is not None and index >= 0:
+            heading = self.headings[index]
+            if offset < heading.end:
+                return heading
+            index = heading.parent
+        return None
+
+    def page_of(self, offset: int) -> int:
+        """偏移所在的页码（从0开始）"""
+        return max(0, bisect_right(self.page_starts, offset) - 1)
+
+    def section(self, name: str) -> Optional[Heading]:
+        """常用章节（scoring / price / qualification）的标题，不存在时返回 None"""
+        index = self._named.get(name)
+        return self.headings[index] if index is not None else None
+
+    def section_text(self, name: str) -> str:
+        heading = self.section(name)
+        return self.text[heading.start : heading.end] if heading else ''
+
+    def section_pages(self, name: str) -> Optional[Tuple[int, int]]:
+        """常用章节所在的页码区间（闭区间，从0开始）"""
+        heading = self.section(name)
+        if heading is None:
+            return None
+        return self.page_of(heading.start), self.page_of(max(heading.start, heading.end - 1))
+
+    def find(self, keyword: str) -> Optional[Heading]:
+        """标题包含关键词的第一个章节（层级最高者优先）"""
+        matches = [h for h in self.headings if keyword in h.title]
+        return min(matches, key=lambda h: h.level) if matches else None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'headings': [
+                {'level': h.level, 'title': h.title, 'start': h.start, 'end': h.end}
+                for h in self.headings
+            ],
+            'sections': {name: self.headings[i].title for name, i in self._named.items()},
+        }
+
+
+@lru_cache(maxsize=8)
+def get_section_index(text: str) -> SectionIndex:
+    """同一文本只建立一次索引（评分规则提取的多个步骤共用）"""
+    return SectionIndex(text)
@@ -9,21 +9,9 @@
 #
 # Copyright (c) 2025 by 中车眉山车辆有限公司/KingFreeDom, All Rights Reserved.
 #
-import json
 from sqlalchemy.orm import Session
 from modules.database import AnalysisResult, ScoringRule
-
-
-def get_score_for_rule(detailed_scores, rule_name):
-    """从详细评分中查找特定规则的分数"""
-    if not detailed_scores:
-        return None
-    for item in detailed_scores:
-        # 支持两种格式：旧格式使用criteria_name，新格式使用Child_Item_Name
-        criteria_name = item.get('Child_Item_Name') or item.get('criteria_name')
-        if criteria_name == rule_name:
-            return item.get('score')
-    return None
+from modules.rule_scores import lookup_by_rule, project_score_matrix
 
 
 def generate_summary_data(project_id: int, db: Session):
@@ -49,6 +37,7 @@ def generate_summary_data(project_id: int, db: Session):
         child_items.append(
             {
                 'parent_name': rule.Parent_Item_Name or '未知',
+                'rule_parent': rule.Parent_Item_Name,
                 'name': rule.Child_Item_Name,
                 'max_score': rule.Child_max_score or 0,
             }
@@ -75,21 +64,14 @@ def generate_summary_data(project_id: int, db: Session):
     if not results:
         return {'error': '该项目没有找到分析结果。'}
 
-    # 4. 构建表格行数据
+    # 4. 构建表格行数据（各投标方的规则得分一次查询读出）
+    score_matrix = project_score_matrix(db, project_id)
     rows_data = []
     rank = 1
     for result in results:
-        detailed_scores = (
-            json.loads(result.detailed_scores)
-            if isinstance(result.detailed_scores, str)
-            else result.detailed_scores
-        )
-
-        scores = []
+        rule_scores = score_matrix.get(result.id, {})
         # 只计算子项得分
-        for item in child_items:
-            score = get_score_for_rule(detailed_scores, item['name'])
-            scores.append(score)
+        scores = [lookup_by_rule(rule_scores, item['rule_parent'], item['name']) for item in child_items]
 
         # 计算总分：只包括子项得分和价格分
         total_score = sum(s for s in scores if s is not None)
@@ -7,9 +7,12 @@
 
 import json
 import logging
+import multiprocessing
+import re
 import sys
 import os
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
 
 # 添加项目根目录到Python路径，解决导入问题
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -27,15 +30,48 @@ except ImportError:
 
 import fitz  # PyMuPDF
 
+from modules.runtime_config import load_config, get_int
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# 每个分片至少包含的页数；页数不足两个分片时在当前进程识别，省去启动工作进程的开销
+_MIN_PAGES_PER_SHARD = 8
+
+
+def _extract_pages_worker(
+    pdf_path: str, target_headers: List[str], pages: List[int], follow: bool
+) -> Dict[int, List[Dict]]:
+    """工作进程入口：自行打开文档，识别一组页面的表格"""
+    analyzer = TableAnalyzer(pdf_path, full_scan=not follow, max_workers=1)
+    analyzer.target_headers = target_headers
+    with fitz.open(pdf_path) as doc:
+        return analyzer._extract_pages(doc, pages, follow)
+
 
 class TableAnalyzer:
     """表格分析器，用于处理PDF中的表格数据"""
 
-    def __init__(self, pdf_path: str):
+    def __init__(
+        self,
+        pdf_path: str,
+        full_scan: Optional[bool] = None,
+        max_workers: Optional[int] = None,
+    ):
         self.pdf_path = pdf_path
         self.logger = logging.getLogger(__name__)
         # 定义需要保留的表头关键词
         self.target_headers = ['评价项目', '评价标准']
+        # 是否对每一页执行表格识别；None 时读取运行参数 table_full_scan
+        # 表格识别的并行进程数；None 时读取运行参数 table_extract_max_workers
+        if full_scan is None or max_workers is None:
+            cfg = load_config()
+            if full_scan is None:
+                full_scan = bool(cfg.get('table_full_scan', False))
+            if max_workers is None:
+                max_workers = get_int(cfg, 'table_extract_max_workers', 4)
+        self.full_scan = full_scan
+        self.max_workers = max(1, max_workers)
+        # 实际执行了表格识别的页码（从1开始），便于统计和排查
+        self.scanned_pages: List[int] = []
 
     def extract_and_merge_tables(self) -> List[Dict[str, Any]]:
         """
@@ -61,48 +97,166 @@ class TableAnalyzer:
 
     def _extract_all_tables(self) -> List[Dict]:
         """
-        提取所有页面的原始表格数据
+        提取页面的原始表格数据
+
+        page.find_tables() 开销很大，默认分两步：先用文本层关键词扫描找出
+        含全部目标表头的候选页，只对候选页识别表格；候选页识别出表格后，
+        若下一页的表格与之连续（跨页续表），继续识别下一页，直到表格不再延续。
+        full_scan 为 True 时对每一页识别表格。
+        待识别页较多时按顺序切成连续分片，由多个工作进程各自打开文档并行识别，
+        结果按页码合并后再交给 _merge_cross_page_tables。
 
         Returns:
-            List[Dict]: 所有表格信息列表
+            List[Dict]: 表格信息列表（按页码顺序）
         """
         tables_info = []
+        self.scanned_pages = []
 
         try:
             with fitz.open(self.pdf_path) as doc:
-                for page_num, page in enumerate(doc, 1):
-                    try:
-                        tables = page.find_tables()
-                        for table_index, table in enumerate(tables):
-                            extracted_table = table.extract()
-                            if extracted_table and len(extracted_table) > 0:
-                                # 基本信息
-                                rows = len(extracted_table)
-                                cols = (
-                                    max(len(row) for row in extracted_table)
-                                    if extracted_table
-                                    else 0
-                                )
-                                headers = extracted_table[0] if extracted_table else []
-
-                                tables_info.append(
-                                    {
-                                        'page': page_num,
-                                        'table_index': table_index,
-                                        'rows': rows,
-                                        'cols': cols,
-                                        'headers': headers,
-                                        'data': extracted_table,
-                                    }
-                                )
-                    except Exception as page_e:
-                        self.logger.warning(f'处理第{page_num}页表格时出错: {page_e}')
-                        continue
+                page_count = doc.page_count
+                if self.full_scan:
+                    pages = list(range(1, page_count + 1))
+                else:
+                    pages = self._find_candidate_pages(doc)
+                shards = self._shard_pages(pages)
+                if len(shards) <= 1:
+                    page_tables = self._extract_pages(doc, pages, not self.full_scan)
+            if len(shards) > 1:
+                page_tables = self._extract_pages_parallel(shards)
+
+            # 各分片按页码顺序合并（续表页可能被相邻分片重复识别，结果相同）
+            self.scanned_pages = sorted(page_tables)
+            for page_num in self.scanned_pages:
+                tables_info.extend(page_tables[page_num])
+            self.logger.info(
+                f'表格识别 {len(self.scanned_pages)}/{page_count} 页'
+                f'（{"逐页" if self.full_scan else f"关键词候选页 {len(pages)}"}，分片 {max(1, len(shards))}）'
+            )
         except Exception as e:
             self.logger.error(f'使用PyMuPDF提取表格时出错: {e}')
 
         return tables_info
 
+    def _shard_pages(self, pages: List[int]) -> List[List[int]]:
+        """把页码按顺序切成至多 max_workers 个连续分片，每片不少于 _MIN_PAGES_PER_SHARD 页"""
+        count = min(self.max_workers, len(pages) // _MIN_PAGES_PER_SHARD)
+        if count <= 1:
+            return [pages] if pages else []
+        size, extra = divmod(len(pages), count)
+        shards, start = [], 0
+        for i in range(count):
+            end = start + size + (1 if i < extra else 0)
+            shards.append(pages[start:end])
+            start = end
+        return shards
+
+    def _extract_pages_parallel(self, shards: List[List[int]]) -> Dict[int, List[Dict]]:
+        """
+        每个分片交给一个工作进程识别，返回合并后的 页码 -> 表格列表
+
+        调用方可能是 Web 进程里的后台线程，fork 会把其他线程持有的锁一并复制进子进程，
+        因此工作进程固定用 spawn 方式启动。
+        """
+        follow = not self.full_scan
+        page_tables: Dict[int, List[Dict]] = {}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            futures = [
+                pool.submit(
+                    _extract_pages_worker, self.pdf_path, self.target_headers, shard, follow
+                )
+                for shard in shards
+            ]
+            for future in futures:
+                for page_num, tables in future.result().items():
+                    page_tables.setdefault(page_num, tables)
+        return page_tables
+
+    def _extract_pages(self, doc, pages: List[int], follow: bool) -> Dict[int, List[Dict]]:
+        """
+        识别指定页面的表格
+
+        follow 为 True 时，页面识别出表格后逐页向后跟踪跨页续表：
+        下一页的第一个表格与本页最后一个表格连续则继续，否则停止。
+
+        Returns:
+            Dict[int, List[Dict]]: 实际识别过的页码 -> 该页的表格信息列表
+        """
+        page_tables: Dict[int, List[Dict]] = {}
+
+        def tables_of(page_num: int) -> List[Dict]:
+            if page_num not in page_tables:
+                page_tables[page_num] = self._extract_page_tables(
+                    doc[page_num - 1], page_num
+                )
+            return page_tables[page_num]
+
+        for page_num in pages:
+            current = tables_of(page_num)
+            while follow and current and page_num < doc.page_count:
+                following = tables_of(page_num + 1)
+                if not following or not self._is_continuous_table(
+                    current[-1], following[0]
+                ):
+                    break
+                page_num += 1
+                current = following
+        return page_tables
+
+    def _find_candidate_pages(self, doc) -> List[int]:
+        """
+        文本层关键词扫描：返回含全部目标表头关键词的页码（从1开始）
+
+        单元格内的表头可能被换行或空格拆开，比较前去掉所有空白。
+        """
+        candidates = []
+        for page_num, page in enumerate(doc, 1):
+            try:
+                text = _WHITESPACE_RE.sub('', page.get_text())
+            except Exception as page_e:
+                self.logger.warning(f'读取第{page_num}页文本时出错: {page_e}')
+                continue
+            if all(header in text for header in self.target_headers):
+                candidates.append(page_num)
+        return candidates
+
+    def _extract_page_tables(self, page, page_num: int) -> List[Dict]:
+        """
+        识别单页中的表格
+
+        Returns:
+            List[Dict]: 该页的表格信息列表
+        """
+        tables_info = []
+        try:
+            tables = page.find_tables()
+            for table_index, table in enumerate(tables):
+                extracted_table = table.extract()
+                if extracted_table and len(extracted_table) > 0:
+                    # 基本信息
+                    rows = len(extracted_table)
+                    cols = (
+                        max(len(row) for row in extracted_table)
+                        if extracted_table
+                        else 0
+                    )
+                    headers = extracted_table[0] if extracted_table else []
+
+                    tables_info.append(
+                        {
+                            'page': page_num,
+                            'table_index': table_index,
+                            'rows': rows,
+                            'cols': cols,
+                            'headers': headers,
+                            'data': extracted_table,
+                        }
+                    )
+        except Exception as page_e:
+            self.logger.warning(f'处理第{page_num}页表格时出错: {page_e}')
+        return tables_info
+
     def _merge_cross_page_tables(self, all_tables: List[Dict]) -> List[Dict]:
         """
         合并跨页表格
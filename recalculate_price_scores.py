@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量重算价格分命令
+修复价格提取或价格公式问题后，一次性重算多个项目的价格分和总分，并打印每个投标方的前后差异。
+
+用法:
+    python recalculate_price_scores.py --ids 1 2 3
+    python recalculate_price_scores.py --status completed completed_with_errors --workers 8
+    python recalculate_price_scores.py --all --dry-run
+"""
+
+import sys
+import os
+import json
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.batch_price_recalc import BatchPriceRecalculator
+from modules.runtime_config import load_config, get_int
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='批量重算项目价格分')
+    parser.add_argument('--ids', type=int, nargs='*', help='项目ID列表')
+    parser.add_argument('--status', nargs='*', help='按项目状态筛选')
+    parser.add_argument('--name', help='按项目名称关键字筛选')
+    parser.add_argument('--all', action='store_true', help='重算全部项目')
+    parser.add_argument('--workers', type=int, help='并行项目数（默认取运行参数配置）')
+    parser.add_argument('--dry-run', action='store_true', help='只计算差异，不写入数据库')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出完整结果')
+    args = parser.parse_args(argv)
+
+    if not (args.ids or args.status or args.name or args.all):
+        parser.error('请指定 --ids、--status、--name 或 --all')
+
+    workers = args.workers or get_int(load_config(), 'price_recalc_max_workers', 4)
+    recalculator = BatchPriceRecalculator(max_workers=workers)
+    project_ids = recalculator.resolve_project_ids(args.ids, args.status, args.name)
+    if not project_ids:
+        print('没有符合条件的项目')
+        return 1
+
+    summary = recalculator.recalculate(project_ids, dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return 0 if summary['failed'] == 0 else 2
+
+    for report in summary['projects']:
+        print(f"项目 {report['project_id']}: {report['status']} - {report['message']}")
+        for bidder in report['bidders']:
+            print(
+                f"  {bidder['bidder_name']}: 报价 {bidder['extracted_price']}, "
+                f"价格分 {bidder['price_score_before']} -> {bidder['price_score_after']}, "
+                f"总分 {bidder['total_score_before']} -> {bidder['total_score_after']} "
+                f"({bidder['total_score_delta']:+})"
+            )
+    mode = '（试算，未写入）' if summary['dry_run'] else ''
+    print(
+        f"共 {summary['total']} 个项目{mode}: 更新 {summary['updated']}，"
+        f"跳过 {summary['skipped']}，失败 {summary['failed']}"
+    )
+    return 0 if summary['failed'] == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,7 @@ document.addEventListener('DOMContentLoaded', function () {
     const progressBar = document.getElementById('progressBar');
     const progressText = document.getElementById('progressText');
     const detailedProgress = document.getElementById('detailedProgress');
+    const provisionalPriceRanking = document.getElementById('provisionalPriceRanking');
     const resultArea = document.getElementById('resultArea');
     const resultDetailsModal = new bootstrap.Modal(document.getElementById('resultDetailsModal'));
     const modalBody = document.getElementById('modalBody');
@@ -25,6 +26,8 @@ document.addEventListener('DOMContentLoaded', function () {
     };
     let currentProjectId = null;
     let pollInterval = null;
+    let progressSource = null;
+    let progressState = null;
 
     // 添加WebSocket错误处理
     window.addEventListener('error', function (event) {
@@ -266,14 +269,97 @@ document.addEventListener('DOMContentLoaded', function () {
     function startPolling (projectId) {
         progressText.innerHTML = '<i class="fas fa-sync-alt fa-spin me-2"></i>正在初始化分析...';
 
+        stopProgressUpdates();
+
+        // 优先使用SSE推送进度，不支持或连接失败时回退到定时轮询
+        if (window.EventSource) {
+            startEventStream(projectId);
+            return;
+        }
+        startIntervalPolling(projectId);
+    }
+
+    function stopProgressUpdates () {
         if (pollInterval) {
             clearInterval(pollInterval);
+            pollInterval = null;
         }
+        if (progressSource) {
+            progressSource.close();
+            progressSource = null;
+        }
+    }
 
+    function startIntervalPolling (projectId) {
         pollInterval = setInterval(() => pollProgress(projectId), 2000);
         pollProgress(projectId); // Initial poll
     }
 
+    function startEventStream (projectId) {
+        const source = new EventSource(`/api/projects/${projectId}/analysis-events`);
+        progressSource = source;
+
+        source.addEventListener('snapshot', (event) => {
+            progressState = JSON.parse(event.data);
+            handleProgressState(projectId);
+        });
+
+        source.addEventListener('progress', (event) => {
+            if (!progressState) {
+                return;
+            }
+            const data = JSON.parse(event.data);
+            let bid = progressState.bids.find(b => b.id === data.bid_document_id);
+            if (!bid) {
+                bid = { id: data.bid_document_id, progress_completed: 0, progress_total: 0 };
+                progressState.bids.push(bid);
+            }
+            Object.assign(bid, data.delta);
+            updateProgressDisplay(progressState);
+        });
+
+        source.addEventListener('project', (event) => {
+            if (!progressState) {
+                return;
+            }
+            progressState.project_status = JSON.parse(event.data).project_status;
+            handleProgressState(projectId);
+        });
+
+        source.addEventListener('failed', (event) => {
+            stopProgressUpdates();
+            progressText.textContent = '分析异常终止: ' + JSON.parse(event.data).error;
+        });
+
+        source.addEventListener('price_scores', () => {
+            fetchProvisionalPriceRanking(projectId);
+        });
+
+        source.onerror = () => {
+            if (source !== progressSource) {
+                return;
+            }
+            console.warn('进度推送连接中断，改为轮询');
+            stopProgressUpdates();
+            startIntervalPolling(projectId);
+        };
+    }
+
+    async function handleProgressState (projectId) {
+        updateProgressDisplay(progressState);
+        const status = progressState.project_status;
+        if (status === 'cancelled') {
+            stopProgressUpdates();
+            progressText.innerHTML = '<i class="fas fa-ban me-2"></i>分析已取消';
+            return;
+        }
+        if (status === 'completed' || status === 'completed_with_errors') {
+            stopProgressUpdates();
+            progressText.innerHTML = '<i class="fas fa-check-circle me-2"></i>分析完成!';
+            await fetchAndDisplayResults(projectId);
+        }
+    }
+
     async function pollProgress (projectId) {
         try {
             const response = await fetch(`/api/projects/${projectId}/analysis-status`);
@@ -289,8 +375,13 @@ document.addEventListener('DOMContentLoaded', function () {
             const data = await response.json();
             updateProgressDisplay(data);
 
+            if (data.project_status === 'cancelled') {
+                stopProgressUpdates();
+                progressText.innerHTML = '<i class="fas fa-ban me-2"></i>分析已取消';
+                return;
+            }
             if (data.project_status === 'completed' || data.project_status === 'completed_with_errors') {
-                clearInterval(pollInterval);
+                stopProgressUpdates();
                 progressText.innerHTML = '<i class="fas fa-check-circle me-2"></i>分析完成!';
                 await fetchAndDisplayResults(projectId);
             }
@@ -310,7 +401,7 @@ document.addEventListener('DOMContentLoaded', function () {
         if (data.bids) {
             data.bids.forEach(bid => {
                 let bidProgress = bid.progress_total > 0 ? (bid.progress_completed / bid.progress_total * 100) : 0;
-                if (bid.status === 'completed' || bid.status === 'error') {
+                if (bid.status === 'completed' || bid.status === 'error' || bid.status === 'cancelled') {
                     completedBids++;
                 }
                 detailedProgress.innerHTML += createBidProgressItem(bid, bidProgress);
@@ -338,6 +429,10 @@ document.addEventListener('DOMContentLoaded', function () {
                 statusIcon = '<i class="fas fa-exclamation-circle text-danger me-2"></i>';
                 statusClass = 'bg-danger';
                 break;
+            case 'cancelled':
+                statusIcon = '<i class="fas fa-ban text-warning me-2"></i>';
+                statusClass = 'bg-warning';
+                break;
             case 'processing':
                 statusIcon = '<i class="fas fa-spinner fa-spin me-2"></i>';
                 statusClass = 'progress-bar-striped progress-bar-animated';
@@ -363,6 +458,38 @@ document.addEventListener('DOMContentLoaded', function () {
         `;
     }
 
+    async function fetchProvisionalPriceRanking (projectId) {
+        try {
+            const response = await fetch(`/api/projects/${projectId}/results`);
+            if (!response.ok) {
+                return;
+            }
+            const results = await response.json();
+            results.sort((a, b) => (b.price_score || 0) - (a.price_score || 0));
+            provisionalPriceRanking.innerHTML = `
+                <h5><i class="fas fa-coins me-2"></i>暂定价格分排名</h5>
+                <table class="table table-sm table-bordered">
+                    <thead><tr><th>排名</th><th>投标人</th><th>报价</th><th>价格分</th><th>状态</th></tr></thead>
+                    <tbody></tbody>
+                </table>`;
+            // 投标人名称来自上传的文件，用 textContent 写入，避免被当作 HTML 解析
+            const tbody = provisionalPriceRanking.querySelector('tbody');
+            results.forEach((res, index) => {
+                const row = tbody.insertRow();
+                [index + 1, res.bidder_name, res.extracted_price ?? 'N/A', res.price_score ?? 'N/A'].forEach(value => {
+                    row.insertCell().textContent = value;
+                });
+                const badge = document.createElement('span');
+                badge.className = res.is_provisional ? 'badge bg-warning text-dark' : 'badge bg-success';
+                badge.textContent = res.is_provisional ? '规则评分中' : '已完成';
+                row.insertCell().appendChild(badge);
+            });
+            provisionalPriceRanking.style.display = 'block';
+        } catch (error) {
+            console.warn('获取暂定价格分失败:', error);
+        }
+    }
+
     async function fetchAndDisplayResults (projectId) {
         try {
             const [resultsResponse, rulesResponse] = await Promise.all([
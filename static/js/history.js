@@ -13,30 +13,77 @@ document.addEventListener('DOMContentLoaded', function () {
     const errorMessage = document.getElementById('errorMessage');
     const errorText = document.getElementById('errorText');
 
-    async function fetchProjects () {
+    const loadMoreContainer = document.getElementById('loadMoreContainer');
+    const loadMoreButton = document.getElementById('loadMoreButton');
+    const filterForm = document.getElementById('projectFilters');
+    const filterInputs = {
+        q: document.getElementById('filterQuery'),
+        bidder: document.getElementById('filterBidder'),
+        status: document.getElementById('filterStatus'),
+        created_from: document.getElementById('filterCreatedFrom'),
+        created_to: document.getElementById('filterCreatedTo')
+    };
+
+    // 下一页的游标（上一页最后一个项目ID），为 null 时没有更多项目
+    let nextCursor = null;
+    // 筛选条件变化后丢弃尚未返回的旧请求
+    let requestSeq = 0;
+    let searchTimer = null;
+
+    function buildQuery (cursor) {
+        const params = new URLSearchParams();
+        Object.entries(filterInputs).forEach(([key, input]) => {
+            const value = input.value.trim();
+            if (value) {
+                params.set(key, value);
+            }
+        });
+        if (cursor !== null) {
+            params.set('cursor', cursor);
+        }
+        return params.toString();
+    }
+
+    async function fetchProjects (append = false) {
+        const seq = ++requestSeq;
         try {
             loadingIndicator.style.display = 'block';
+            loadMoreButton.disabled = true;
             errorMessage.classList.add('d-none');
 
-            const response = await fetch('/api/projects');
+            const query = buildQuery(append ? nextCursor : null);
+            const response = await fetch('/api/projects' + (query ? `?${query}` : ''));
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
-            const projects = await response.json();
+            const page = await response.json();
+            if (seq !== requestSeq) {
+                return;
+            }
 
-            renderProjects(projects);
+            renderProjects(page.items, append);
+            nextCursor = page.next_cursor;
+            loadMoreContainer.classList.toggle('d-none', !page.has_more);
         } catch (error) {
+            if (seq !== requestSeq) {
+                return;
+            }
             console.error('Error fetching projects:', error);
             errorText.textContent = '无法加载项目列表，请稍后重试。';
             errorMessage.classList.remove('d-none');
         } finally {
-            loadingIndicator.style.display = 'none';
+            if (seq === requestSeq) {
+                loadingIndicator.style.display = 'none';
+                loadMoreButton.disabled = false;
+            }
         }
     }
 
-    function renderProjects (projects) {
-        projectsTableBody.innerHTML = '';
-        if (projects.length === 0) {
+    function renderProjects (projects, append = false) {
+        if (!append) {
+            projectsTableBody.innerHTML = '';
+        }
+        if (projects.length === 0 && !append) {
             projectsTableBody.innerHTML = '<tr><td colspan="8" class="text-center">没有找到任何项目。</td></tr>';
             return;
         }
@@ -61,6 +108,28 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 
+    // 文字输入停顿后再查询，下拉框和日期变化立即查询
+    [filterInputs.q, filterInputs.bidder].forEach(input => {
+        input.addEventListener('input', function () {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => fetchProjects(), 300);
+        });
+    });
+    [filterInputs.status, filterInputs.created_from, filterInputs.created_to].forEach(input => {
+        input.addEventListener('change', () => fetchProjects());
+    });
+    filterForm.addEventListener('submit', function (event) {
+        event.preventDefault();
+        clearTimeout(searchTimer);
+        fetchProjects();
+    });
+    filterForm.addEventListener('reset', function () {
+        clearTimeout(searchTimer);
+        // reset 事件在表单清空之前触发
+        setTimeout(() => fetchProjects(), 0);
+    });
+    loadMoreButton.addEventListener('click', () => fetchProjects(true));
+
     function getStatusColor (status) {
         switch (status) {
             case 'completed':
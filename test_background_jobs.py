@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试后台任务登记：提交后立即返回任务ID，完成或失败后可查询结果
+"""
+
+import sys
+import os
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.background_jobs import BackgroundJobRegistry
+
+
+def _wait(registry, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = registry.get(job_id)
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError('任务未在期限内结束')
+
+
+def test_job_lifecycle():
+    """
+    同一项目同类任务未结束时复用已有任务；结果和失败原因可查询
+    """
+    registry = BackgroundJobRegistry(max_workers=2)
+    release = threading.Event()
+
+    def slow_job(value):
+        release.wait(5)
+        return {'count': value}
+
+    def failing_job():
+        raise ValueError('提取评分规则失败')
+
+    job = registry.submit('extract_scoring_rules', 1, slow_job, 3)
+    assert job['status'] == 'pending'
+    again = registry.submit('extract_scoring_rules', 1, slow_job, 4)
+    assert again['job_id'] == job['job_id']
+
+    failed = _wait(registry, registry.submit('extract_scoring_rules', 2, failing_job)['job_id'])
+    assert failed['status'] == 'failed' and failed['error'] == '提取评分规则失败'
+
+    release.set()
+    done = _wait(registry, job['job_id'])
+    assert done['status'] == 'completed' and done['result'] == {'count': 3}
+    assert registry.submit('extract_scoring_rules', 1, slow_job, 5)['job_id'] != job['job_id']
+    assert registry.get('missing') is None
+
+
+if __name__ == '__main__':
+    test_job_lifecycle()
+    print('后台任务测试通过!')
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试多项目价格分批量重算
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import Base, TenderProject, BidDocument, AnalysisResult, ScoringRule
+from modules.batch_price_recalc import BatchPriceRecalculator
+from modules.rule_scores import replace_result_scores
+
+
+def _setup():
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+    engine = create_engine(f'sqlite:///{db_file}', connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = session_factory()
+    project_ids = []
+    # 第二个项目有一个投标方的分析被取消，仍视为已完成的项目
+    for index, (status, bid_statuses) in enumerate(
+        [
+            ('completed', ('completed', 'completed')),
+            ('completed', ('completed', 'cancelled')),
+            ('processing', ('processing', 'processing')),
+        ]
+    ):
+        project = TenderProject(project_code=f'BP-{index}', name=f'批量项目{index}', status=status)
+        db.add(project)
+        db.commit()
+        project_ids.append(project.id)
+        db.add(
+            ScoringRule(
+                project_id=project.id,
+                Parent_Item_Name='价格分',
+                Parent_max_score=40,
+                is_price_criteria=True,
+                price_formula='投标报价得分＝（评标基准价/投标报价）×价格分值',
+                description='满足招标文件要求且投标报价最低的投标报价为评标基准价',
+            )
+        )
+        for (bidder, price), bid_status in zip([('甲公司', 1000000), ('乙公司', 1250000)], bid_statuses):
+            bid = BidDocument(project_id=project.id, bidder_name=bidder, processing_status=bid_status)
+            db.add(bid)
+            db.commit()
+            result = AnalysisResult(
+                project_id=project.id,
+                bid_document_id=bid.id,
+                bidder_name=bidder,
+                extracted_price=price,
+                price_score=0,
+                total_score=50,
+            )
+            db.add(result)
+            replace_result_scores(db, result, [{'Child_Item_Name': '技术方案', 'score': 50}])
+        db.commit()
+    db.close()
+    return db_file, session_factory, project_ids
+
+
+def test_batch_recalculate_reports_deltas():
+    """
+    已完成的项目批量更新并返回前后差异；仍在分析的项目被跳过；试算不写库
+    """
+    db_file, session_factory, project_ids = _setup()
+    recalculator = BatchPriceRecalculator(session_factory=session_factory, max_workers=2)
+    assert recalculator.resolve_project_ids(status=['completed']) == project_ids[:2]
+
+    preview = recalculator.recalculate(project_ids, dry_run=True)
+    assert (preview['updated'], preview['skipped'], preview['failed']) == (2, 1, 0)
+    db = session_factory()
+    assert {r.price_score for r in db.query(AnalysisResult).all()} == {0}
+    db.close()
+
+    summary = recalculator.recalculate(project_ids)
+    first = summary['projects'][0]
+    assert first['status'] == 'updated'
+    assert [
+        (b['bidder_name'], b['price_score_after'], b['total_score_after'], b['total_score_delta'])
+        for b in first['bidders']
+    ] == [('甲公司', 40.0, 90.0, 40.0), ('乙公司', 32.0, 82.0, 32.0)]
+    assert summary['projects'][2]['status'] == 'skipped'
+
+    db = session_factory()
+    totals = {
+        (r.project_id, r.bidder_name): r.total_score for r in db.query(AnalysisResult).all()
+    }
+    assert totals[(project_ids[1], '乙公司')] == 82.0
+    assert totals[(project_ids[2], '乙公司')] == 50
+    db.close()
+    os.unlink(db_file)
+
+
+if __name__ == '__main__':
+    test_batch_recalculate_reports_deltas()
+    print('批量重算价格分测试通过!')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试分析任务的协作式取消
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import Base, ScoringRule
+from modules import cancellation
+from modules.cancellation import (
+    AnalysisCancelled,
+    CancellationToken,
+    request_cancel_bid,
+    request_cancel_project,
+    clear_cancellation,
+)
+from modules.intelligent_bid_analyzer import IntelligentBidAnalyzer
+
+
+@contextmanager
+def _temp_flags_dir():
+    """临时改用独立的标记目录并关闭检查间隔，结束后恢复模块设置"""
+    saved = cancellation.CANCEL_FLAGS_DIR, cancellation.FLAG_POLL_INTERVAL
+    cancellation.CANCEL_FLAGS_DIR = tempfile.mkdtemp()
+    cancellation.FLAG_POLL_INTERVAL = 0
+    try:
+        yield
+    finally:
+        shutil.rmtree(cancellation.CANCEL_FLAGS_DIR, ignore_errors=True)
+        cancellation.CANCEL_FLAGS_DIR, cancellation.FLAG_POLL_INTERVAL = saved
+
+
+def test_token_observes_flags_and_deadline():
+    """
+    取消标记（单个投标方或整个项目）与截止时间都会使令牌失效
+    """
+    with _temp_flags_dir():
+        token = CancellationToken(1, 10)
+        assert not token.is_cancelled()
+        request_cancel_bid(1)
+        assert token.is_cancelled()
+        assert token.reason == 'cancelled'
+
+        clear_cancellation(10, [1])
+        request_cancel_project(10)
+        other = CancellationToken(2, 10)
+        try:
+            other.check()
+            assert False, '项目取消后应抛出 AnalysisCancelled'
+        except AnalysisCancelled as e:
+            assert e.reason == 'cancelled'
+        clear_cancellation(10, [2])
+
+        expired = CancellationToken(3, 11, timeout_sec=0.01)
+        time.sleep(0.02)
+        assert expired.is_cancelled()
+        assert expired.reason == 'timeout'
+
+
+def test_analyzer_stops_between_rules():
+    """
+    分析过程中收到取消请求后，在下一条规则开始前结束，不再调用AI
+    """
+    with _temp_flags_dir():
+        token = CancellationToken(5, 20)
+
+        class CancellingAIAnalyzer:
+            model = 'test-model'
+            calls = 0
+
+            def analyze_text(self, prompt, cancel_token=None):
+                self.calls += 1
+                request_cancel_bid(5)
+                return '{"score": 1, "reason": "ok"}'
+
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False})
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        for name in ['技术方案', '售后服务']:
+            db.add(ScoringRule(project_id=20, Child_Item_Name=name, Child_max_score=5))
+        db.commit()
+
+        analyzer = IntelligentBidAnalyzer(
+            'tender.pdf', 'bid.pdf', project_id=20, extracted_text=['技术方案'], cancel_token=token
+        )
+        analyzer.db = db
+        analyzer.ai_analyzer = CancellingAIAnalyzer()
+        try:
+            analyzer.analyze()
+            assert False, '取消后应抛出 AnalysisCancelled'
+        except AnalysisCancelled:
+            pass
+        assert analyzer.ai_analyzer.calls == 1
+        db.close()
+        clear_cancellation(20, [5])
+
+
+if __name__ == '__main__':
+    test_token_observes_flags_and_deadline()
+    test_analyzer_stops_between_rules()
+    print('取消测试通过!')
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试中文金额转换：角分小数、阿拉伯数字混写、全角数字，以及与原实现的一致性
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.enhanced_price_extractor import ChineseNumberConverter, EnhancedPriceExtractor
+from benchmark_chinese_number import LegacyChineseNumberConverter, generate_amount_texts
+
+
+def test_convert_amount_forms():
+    """
+    角分按小数计入，万/亿混合、阿拉伯数字与中文单位混写、全角数字都能转换
+    """
+    converter = ChineseNumberConverter()
+    cases = {
+        '壹佰贰拾叁万肆仟伍佰陆拾柒元捌角': 1234567.8,
+        '贰拾万零叁佰元伍角陆分': 200300.56,
+        '壹佰元零伍分': 100.05,
+        '壹亿零壹佰万零伍佰元整': 101000500,
+        '玖亿捌仟壹佰柒拾玖万零壹拾玖': 981790019,
+        '人民币拾万元整': 100000,
+        '12万3千': 123000,
+        '123.45万元': 1234500,
+        '１２３，４５６．５元': 123456.5,
+        '1,234,500.00元': 1234500,
+    }
+    for text, expected in cases.items():
+        assert converter.chinese_to_number(text) == expected, text
+    assert converter.chinese_to_number('元整') is None
+    assert converter.chinese_to_number('') is None
+
+    # 原实现支持的亿以下大写整数金额，结果与原实现相同
+    legacy = LegacyChineseNumberConverter()
+    for text in generate_amount_texts(300):
+        assert converter.chinese_to_number(text) == legacy.chinese_to_number(text), text
+
+
+def test_summary_page_verified_with_jiao_fen():
+    """
+    大写金额带角分时，一览表的小写价格仍能与大写金额互相验证
+    """
+    pages = ['开标一览表\n投标报价（小写）：￥1,234,567.85\n大写：壹佰贰拾叁万肆仟伍佰陆拾柒元捌角伍分\n']
+    prices = EnhancedPriceExtractor().extract_enhanced_prices(pages)
+    assert prices[0]['value'] == 1234567.85
+    assert prices[0]['reason'] == '价格一览表小写价格(与大写价格匹配)'
+
+
+if __name__ == '__main__':
+    test_convert_amount_forms()
+    test_summary_page_verified_with_jiao_fen()
+    print('中文金额转换测试通过!')
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试数据库配置：SQLite 连接参数、DATABASE_URL 覆盖，以及 fork 后子进程重建连接池
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from modules.db_config import (
+    DEFAULT_DATABASE_URL,
+    create_db_engine,
+    get_database_url,
+    register_fork_handler,
+)
+
+_engine = None
+
+
+def _child_query():
+    # fork 继承的连接池已被丢弃，子进程使用自己的新连接
+    inherited = _engine.pool.checkedin()
+    with _engine.connect() as conn:
+        count = conn.execute(text('SELECT COUNT(*) FROM t')).scalar()
+        conn.execute(text('INSERT INTO t VALUES (2)'))
+        conn.commit()
+    return inherited, count
+
+
+def test_sqlite_pragmas_and_fork():
+    """
+    新连接启用 WAL、synchronous=NORMAL、忙等待超时；fork 出的子进程不复用父进程连接
+    """
+    global _engine
+    directory = tempfile.mkdtemp()
+    try:
+        _engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'db.sqlite')}")
+        register_fork_handler(_engine)
+        with _engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert conn.execute(text('PRAGMA synchronous')).scalar() == 1
+            assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 30000
+            conn.execute(text('CREATE TABLE t (v INTEGER)'))
+            conn.execute(text('INSERT INTO t VALUES (1)'))
+            conn.commit()
+        assert _engine.pool.checkedin() == 1
+
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            assert pool.submit(_child_query).result() == (0, 1)
+        with _engine.connect() as conn:
+            assert conn.execute(text('SELECT COUNT(*) FROM t')).scalar() == 2
+        _engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_database_url_override():
+    """
+    设置 DATABASE_URL 时使用该连接串，否则使用本地 SQLite 文件
+    """
+    previous = os.environ.pop('DATABASE_URL', None)
+    try:
+        assert get_database_url() == DEFAULT_DATABASE_URL
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        assert get_database_url() == 'sqlite:///:memory:'
+    finally:
+        os.environ.pop('DATABASE_URL', None)
+        if previous is not None:
+            os.environ['DATABASE_URL'] = previous
+
+
+if __name__ == '__main__':
+    test_sqlite_pragmas_and_fork()
+    test_database_url_override()
+    print('数据库配置测试通过!')
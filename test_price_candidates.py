@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试价格候选存储：提取结果复用、人工指定价格与文件替换后失效
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz
+
+from conftest import memory_session
+from modules.database import TenderProject, BidDocument, AnalysisResult, PriceCandidate
+from modules.price_candidates import PriceCandidateStore, load_selected_prices, reextract_project_prices
+from modules.price_manager import PriceManager
+from modules.rule_checkpoints import document_hash
+
+
+PAGES = ['投标函 投标报价：50,000.00元 为投标保证金', '投标报价 投标总价：1,280,000.00元', '技术方案']
+
+
+def test_candidates_reused_and_overridden(db):
+    """
+    首次提取保存全部候选（含被排除的保证金金额），再次分析直接复用；
+    人工指定的价格优先，投标文件被替换后候选失效
+    """
+    project = TenderProject(project_code='PC-1', name='价格候选项目')
+    db.add(project)
+    db.commit()
+
+    bid_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+    bid_file.write(b'version-1')
+    bid_file.close()
+    bid = BidDocument(project_id=project.id, bidder_name='甲公司', file_path=bid_file.name)
+    db.add(bid)
+    db.commit()
+
+    manager = PriceManager()
+    store = PriceCandidateStore(db, bid.id, document_hash(bid_file.name))
+    assert manager.resolve_best_price(PAGES, store=store) == 1280000.0
+
+    rows = store.load()
+    assert [(r.value, r.is_selected, r.exclusion_reason) for r in rows] == [
+        (1280000.0, True, None),
+        (50000.0, False, '附近出现保证金等排除关键词'),
+    ]
+
+    # 内容未变时不再提取
+    def fail(*args, **kwargs):
+        raise AssertionError('不应重新提取价格')
+
+    manager.extract_prices_from_content = fail
+    assert manager.resolve_best_price(PAGES, store=store) == 1280000.0
+
+    assert store.override(1250000.0, user='审核员') == 1250000.0
+    db.commit()
+    assert load_selected_prices(db, project.id) == {bid.id: 1250000.0}
+    assert store.override(None) == 1280000.0
+    db.commit()
+    assert load_selected_prices(db, project.id) == {bid.id: 1280000.0}
+
+    # 替换投标文件后旧候选不再生效
+    with open(bid_file.name, 'wb') as f:
+        f.write(b'version-2 with different size')
+    assert load_selected_prices(db, project.id) == {}
+    assert PriceCandidateStore(db, bid.id, document_hash(bid_file.name)).lookup() == (False, None)
+    assert db.query(PriceCandidate).count() == 2
+
+    os.unlink(bid_file.name)
+
+
+def test_stale_extractor_version_reextracted(db):
+    """
+    旧版本提取器保存的候选不再复用：重算前重新提取并更新分析结果的价格，人工指定的价格保留；
+    force 时当前版本的候选也重新提取
+    """
+    project = TenderProject(project_code='PC-2', name='提取器版本项目')
+    db.add(project)
+    db.commit()
+
+    pdf_path = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), '投标报价 投标总价：1,280,000.00元', fontname='china-s')
+    pdf.save(pdf_path)
+    pdf.close()
+    bid = BidDocument(project_id=project.id, bidder_name='甲公司', file_path=pdf_path)
+    db.add(bid)
+    db.commit()
+    db.add(AnalysisResult(project_id=project.id, bid_document_id=bid.id, bidder_name='甲公司', extracted_price=999.0))
+    db.commit()
+
+    old_store = PriceCandidateStore(db, bid.id, document_hash(pdf_path), extractor_version='0')
+    old_store.save([{'value': 999.0, 'page': 0, 'confidence': 50}], [], 999.0)
+    store = PriceCandidateStore(db, bid.id, document_hash(pdf_path))
+    assert store.lookup() == (False, None)
+
+    assert reextract_project_prices(db, project.id) == {bid.id: 1280000.0}
+    db.commit()
+    assert db.query(AnalysisResult.extracted_price).scalar() == 1280000.0
+    assert {row.extractor_version for row in db.query(PriceCandidate)} == {PriceManager.VERSION}
+    # 当前版本的候选不再重新提取
+    assert reextract_project_prices(db, project.id) == {}
+
+    store.override(1250000.0, user='审核员')
+    db.commit()
+    assert reextract_project_prices(db, project.id, force=True, save=False) == {bid.id: 1250000.0}
+    assert reextract_project_prices(db, project.id, force=True) == {bid.id: 1250000.0}
+    db.commit()
+    assert load_selected_prices(db, project.id) == {bid.id: 1250000.0}
+    assert [r.value for r in store.load() if r.source != 'manual'] == [1280000.0]
+
+    os.unlink(pdf_path)
+
+
+if __name__ == '__main__':
+    test_candidates_reused_and_overridden(memory_session())
+    test_stale_extractor_version_reextracted(memory_session())
+    print('价格候选存储测试通过!')
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试价格提取回归语料：真值生成与准确率基准
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from modules.enhanced_price_extractor import ChineseNumberConverter
+from modules.price_corpus import (
+    to_chinese_uppercase,
+    generate_case,
+    write_case_pdf,
+    run_corpus_benchmark,
+)
+
+
+def test_corpus_ground_truth():
+    """
+    大写金额可还原为真值；同一种子生成的语料相同；PDF页数与文本一致
+    """
+    converter = ChineseNumberConverter()
+    assert to_chinese_uppercase(1234500) == '壹佰贰拾叁万肆仟伍佰元整'
+    assert to_chinese_uppercase(10000500) == '壹仟万零伍佰元整'
+    for amount in (200000, 1000500, 3070000, 8999500, 20000001):
+        assert converter.chinese_to_number(to_chinese_uppercase(amount)[:-2]) == amount
+
+    case = generate_case('summary_table', seed=3, num_pages=12)
+    assert case == generate_case('summary_table', seed=3, num_pages=12)
+    assert f"{int(case['total']):,}.00" in case['pages'][case['summary_page']]
+
+    path = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+    write_case_pdf(case, path)
+    with fitz.open(path) as doc:
+        assert doc.page_count == 12
+        assert len(doc[case['summary_page']].find_tables().tables) == 1
+    os.unlink(path)
+
+
+def test_benchmark_accuracy_by_scenario():
+    """
+    一览表、保证金干扰、千分位、报价表格和OCR噪声情形全部选对价格，不误选保证金
+    """
+    stats = run_corpus_benchmark(cases_per_scenario=2, num_pages=15)
+    for scenario in ('summary_verified', 'deposit_decoy', 'separators', 'summary_table', 'ocr_noise'):
+        assert stats['scenarios'][scenario]['accuracy'] == 1.0, stats['failures']
+    assert stats['overall']['deposit_selected'] == 0
+    assert stats['overall']['extract_pages_per_sec'] > 0
+
+
+if __name__ == '__main__':
+    test_corpus_ground_truth()
+    test_benchmark_accuracy_by_scenario()
+    print('价格提取回归语料测试通过!')
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试价格分公式引擎：常见公式的编译与确定性计算
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.price_formula_engine import compile_price_formula
+from modules.price_score_calculator import PriceScoreCalculator
+
+
+PRICES = {'甲公司': 1000000, '乙公司': 1200000, '丙公司': 1500000}
+
+
+def test_compile_common_formulas():
+    """
+    最低价基准比值公式、平均价基准、偏离扣分与得分下限
+    """
+    lowest = compile_price_formula(
+        '满足招标文件要求且投标报价最低的投标报价为评标基准价，其价格分为满分。'
+        '其他投标人的价格分统一按照下列公式计算：投标报价得分＝（评标基准价/投标报价）*40%*100'
+    )
+    assert lowest.evaluate(PRICES, 40) == {'甲公司': 40.0, '乙公司': 33.33, '丙公司': 26.67}
+
+    average = compile_price_formula(
+        None, '价格分计算公式：评标基准价为各有效投标人投标报价的算术平均值，价格分=评标基准价/投标报价*价格分值'
+    )
+    # 基准价 = 1,233,333.33，低于基准价的报价得分超过满分时按满分计
+    assert average.evaluate(PRICES, 30) == {'甲公司': 30.0, '乙公司': 30.0, '丙公司': 24.67}
+
+    deviation = compile_price_formula(
+        '以有效投标报价的算术平均值的95%为评标基准价，等于评标基准价的得满分，'
+        '每高于评标基准价1%扣1分，每低于评标基准价1%扣0.5分，扣完为止'
+    )
+    scores = deviation.evaluate({'甲公司': 950000, '乙公司': 1000000, '丙公司': 1050000}, 30)
+    # 基准价 = 950,000
+    assert scores == {'甲公司': 30.0, '乙公司': 24.74, '丙公司': 19.47}
+
+    trimmed = compile_price_formula('去掉一个最高报价和一个最低报价后的平均值为评标基准价，每偏离基准价1%扣2分，最低得5分')
+    assert trimmed.evaluate(PRICES, 30) == {'甲公司': 5.0, '乙公司': 30.0, '丙公司': 5.0}
+
+    # 无法确定基准价或公式时交给AI处理
+    assert compile_price_formula('价格分=评标基准价/投标报价×30') is None
+    assert compile_price_formula('价格分由评委综合打分') is None
+
+
+def test_discount_only_from_benchmark_definition():
+    """
+    只有基准价定义中的“下浮N%”改变基准价，异常低价等预警条款中的下浮不影响得分
+    """
+    lowest = (
+        '满足招标文件要求且投标报价最低的投标报价为评标基准价，其价格分为满分。'
+        '其他投标人的价格分统一按照下列公式计算：投标报价得分＝（评标基准价/投标报价）*40%*100'
+    )
+    warned = compile_price_formula(lowest + '。投标报价低于评标基准价下浮20%的视为异常低价，须提供书面说明')
+    assert warned.benchmark_factor == 1.0
+    assert warned.evaluate(PRICES, 40) == {'甲公司': 40.0, '乙公司': 33.33, '丙公司': 26.67}
+
+    # 基准价 = 1,233,333.33 × 95%
+    for text in (
+        '评标基准价为有效投标报价的算术平均值下浮5%，价格分=评标基准价/投标报价×30',
+        '以有效投标报价算术平均值下浮5%作为评标基准价，价格分=评标基准价/投标报价×30',
+        '评标基准价＝有效投标报价算术平均值×（1－5%），价格分=评标基准价/投标报价×30',
+    ):
+        formula = compile_price_formula(text)
+        assert formula.evaluate(PRICES, 30) == {'甲公司': 30.0, '乙公司': 29.29, '丙公司': 23.43}
+
+
+def test_calculator_skips_ai_for_compiled_formula():
+    """
+    公式可编译时不调用AI大模型，无法编译时才回退到AI
+    """
+
+    class RecordingAI:
+        def __init__(self):
+            self.prompts = []
+
+        def analyze_text(self, prompt, cancel_token=None):
+            self.prompts.append(prompt)
+            return '{"甲公司": 10, "乙公司": 9, "丙公司": 8}'
+
+    calculator = PriceScoreCalculator()
+    calculator.ai_analyzer = RecordingAI()
+    formula_info = {
+        'formula': '投标报价得分＝（评标基准价/投标报价）×价格分值',
+        'description': '满足招标文件要求且投标报价最低的投标报价为评标基准价',
+    }
+    scores = calculator._calculate_price_scores(PRICES, 30, formula_info)
+    assert scores == {'甲公司': 30.0, '乙公司': 25.0, '丙公司': 20.0}
+    assert calculator.ai_analyzer.prompts == []
+
+    scores = calculator._calculate_price_scores(PRICES, 30, {'formula': '价格分由评委综合打分', 'description': ''})
+    assert scores == {'甲公司': 10.0, '乙公司': 9.0, '丙公司': 8.0}
+    assert len(calculator.ai_analyzer.prompts) == 1
+
+
+if __name__ == '__main__':
+    test_compile_common_formulas()
+    test_discount_only_from_benchmark_definition()
+    test_calculator_skips_ai_for_compiled_formula()
+    print('价格分公式引擎测试通过!')
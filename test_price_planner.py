@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试价格提取规划：章节索引、一览表提前结束与批量总价判断
+"""
+
+import sys
+import os
+import random
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.enhanced_price_extractor import EnhancedPriceExtractor
+from modules.price_extraction_planner import PriceSectionIndex, PriceExtractionPlanner
+from modules.price_manager import PriceManager
+from modules.price_reference import generate_bid_pages, legacy_select_best_price, random_token_pages
+
+
+def test_section_index_matches_identify_sections():
+    """
+    一次遍历得到的章节页与原来两次 _identify_sections 的结果相同，并合并出价格表页码区间
+    """
+    extractor = EnhancedPriceExtractor()
+    for seed in range(10):
+        pages = random_token_pages(seed) + ['价格文件', '价格一览表 报价部分', '无关内容']
+        index = PriceSectionIndex.build(pages)
+        assert index.summary_pages == extractor._identify_sections(
+            pages, ['投标一览表', '开标一览表', '价格一览表']
+        )
+        assert index.price_doc_pages == extractor._identify_sections(pages, ['价格文件', '报价部分'])
+
+    index = PriceSectionIndex.build(['价格文件', '开标一览表', '正文', '报价部分'])
+    assert index.price_table_ranges == [(0, 1), (3, 3)]
+
+
+def test_early_exit_selects_same_price():
+    """
+    一览表大小写金额一致时只扫描一览表页面，选出的价格与完整流程相同；
+    不一致时回退到全文提取
+    """
+    manager = PriceManager()
+    pages = generate_bid_pages(200, verified_summary=True)
+    prices = manager.extract_prices_from_content(pages)
+    assert manager.extraction_planner.last_early_exit
+    assert {p['page'] for p in prices} == {3}
+    assert manager.select_best_price(prices, pages) == legacy_select_best_price(pages)
+
+    pages = generate_bid_pages(200)
+    prices = manager.extract_prices_from_content(pages)
+    assert not manager.extraction_planner.last_early_exit
+    assert manager.select_best_price(prices, pages) == legacy_select_best_price(pages)
+
+
+def test_total_price_flags_match_per_candidate_check():
+    """
+    批量判断结果与逐个候选拼接上下文调用 _is_total_price_intelligent 相同
+    """
+    extractor = EnhancedPriceExtractor()
+    rng = random.Random(0)
+    for seed in range(10):
+        pages = random_token_pages(seed, num_pages=8) + ['合计 3000.0', '12.5', '小写 1,234.00']
+        prices = [
+            {'value': rng.choice([12.5, 3000.0, 1234.0, 50000.0, 3.0]), 'page': rng.randrange(len(pages))}
+            for _ in range(30)
+        ]
+        expected = []
+        for p in prices:
+            context = pages[p['page']]
+            if p['page'] + 1 < len(pages):
+                context += '\n' + pages[p['page'] + 1]
+            expected.append(extractor._is_total_price_intelligent(context, p['value']))
+        assert PriceExtractionPlanner.total_price_flags(prices, pages) == expected
+
+
+if __name__ == '__main__':
+    test_section_index_matches_identify_sections()
+    test_early_exit_selects_same_price()
+    test_total_price_flags_match_per_candidate_check()
+    print('价格提取规划测试通过!')
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预编译价格扫描引擎与原实现的提取结果完全一致
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.keyword_scanner import KeywordScanner
+from modules.enhanced_price_extractor import EnhancedPriceExtractor
+from modules.price_reference import (
+    LegacyEnhancedPriceExtractor,
+    generate_bid_pages,
+    random_token_pages,
+)
+
+
+def test_keyword_scanner_finds_overlapping_keywords():
+    """
+    重叠出现的关键词（投标保证金/保证金）都能用于窗口判断
+    """
+    hits = KeywordScanner(['投标保证金', '保证金']).scan('甲投标保证金乙')
+    assert hits.any_within(0, 7)
+    # 窗口从“标”开始：不完整包含“投标保证金”，但完整包含“保证金”
+    assert hits.any_within(2, 6)
+    assert not hits.any_within(2, 5)
+    assert not KeywordScanner([]).scan('保证金').any_within(0, 3)
+
+
+def test_scanner_matches_legacy_output():
+    """
+    随机构造的页面和模拟的400页投标文件上，新旧实现的结果逐项相同
+    """
+    legacy = LegacyEnhancedPriceExtractor()
+    current = EnhancedPriceExtractor()
+    for seed in range(20):
+        pages = random_token_pages(seed)
+        assert current.extract_enhanced_prices(pages) == legacy.extract_enhanced_prices(pages)
+
+    pages = generate_bid_pages(400)
+    assert current.extract_enhanced_prices(pages) == legacy.extract_enhanced_prices(pages)
+
+
+if __name__ == '__main__':
+    test_keyword_scanner_finds_overlapping_keywords()
+    test_scanner_matches_legacy_output()
+    print('价格扫描引擎测试通过!')
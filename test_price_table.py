@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试价格表格提取：表头定位金额列、合计行与大写金额交叉验证
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from modules.price_table_extractor import PriceTableExtractor
+from modules.price_manager import PriceManager
+from modules.price_extraction_planner import VERIFIED_SUMMARY_REASON, VERIFIED_TABLE_REASON
+
+
+def _make_pdf(page_tables):
+    """生成每页一个带边框表格的PDF，page_tables 为 [(标题, 行列表)]"""
+    doc = fitz.open()
+    for title, rows in page_tables:
+        page = doc.new_page()
+        page.insert_text((50, 80), title, fontname='china-s', fontsize=14)
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row):
+                rect = fitz.Rect(50 + c * 160, 100 + r * 30, 50 + (c + 1) * 160, 100 + (r + 1) * 30)
+                page.draw_rect(rect, color=(0, 0, 0), width=1)
+                page.insert_textbox(rect + (3, 5, -3, 0), cell, fontname='china-s', fontsize=9)
+    path = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+    doc.save(path)
+    doc.close()
+    with fitz.open(path) as saved:
+        pages = [page.get_text() for page in saved]
+    return path, pages
+
+
+def test_parse_quotation_tables():
+    """
+    多列报价表取合计行的总价列，键值表取“投标报价(小写)”，保证金行被排除
+    """
+    extractor = PriceTableExtractor('')
+    price = extractor.parse_table(
+        [
+            ['序号', '名称', '数量', '单价(元)', '金额(元)'],
+            ['1', '控制柜', '2', '60,000.00', '120,000.00'],
+            ['2', '电缆', '1', '1,114,500.00', '1,114,500.00'],
+            ['合计', '', '', '', '1,234,500.00'],
+            ['大写', '壹佰贰拾叁万肆仟伍佰元整', None, None, None],
+        ],
+        4,
+    )
+    assert price['value'] == 1234500.0
+    assert price['page'] == 4
+    assert price['confidence'] == 100
+
+    price = extractor.parse_table(
+        [
+            ['投标保证金', '￥50,000.00'],
+            ['投标报价（小写）', '￥1,234,500.00'],
+            ['投标报价（大写）', '壹佰万元整'],
+        ],
+        0,
+    )
+    assert price['value'] == 1234500.0
+    assert price['confidence'] == 90  # 大写金额不一致，不视为已验证
+
+    price = extractor.parse_table([['项目名称', '投标总价(万元)'], ['设备采购', '123.45']], 0)
+    assert price['value'] == 1234500.0
+    assert extractor.parse_table([['技术参数', '说明'], ['功率', '45kW']], 0) is None
+
+
+def test_table_price_used_before_text_scan():
+    """
+    只识别价格页中的表格；合计与大写一致时直接作为最佳价格，不再扫描全文
+    """
+    path, pages = _make_pdf(
+        [
+            ('技术方案', [['名称', '金额'], ['合计', '9,999,999.00']]),
+            (
+                '开标一览表',
+                [
+                    ['项目名称', '投标总价(元)', '工期'],
+                    ['设备采购', '1,234,500.00', '90天'],
+                    ['大写', '壹佰贰拾叁万肆仟伍佰元整', ''],
+                ],
+            ),
+        ]
+    )
+    try:
+        manager = PriceManager()
+        prices = manager.extract_prices_from_content(pages, pdf_path=path)
+        assert manager.extraction_planner.last_early_exit
+        assert [(p['value'], p['page'], p['source']) for p in prices] == [(1234500.0, 1, 'table')]
+        assert manager.select_best_price(prices, pages) == 1234500.0
+
+        # 未经大写校验的表格小计不抢先于大小写一致的一览表价格
+        candidates = [
+            {'value': 56000.0, 'page': 3, 'confidence': 90, 'reason': '价格表合计', 'source': 'table'},
+            {'value': 1234500.0, 'page': 1, 'confidence': 100, 'reason': VERIFIED_SUMMARY_REASON},
+        ]
+        assert manager.select_best_price(candidates, pages) == 1234500.0
+        candidates.append(
+            {'value': 1230000.0, 'page': 2, 'confidence': 100, 'reason': VERIFIED_TABLE_REASON, 'source': 'table'}
+        )
+        assert manager.select_best_price(candidates, pages) == 1230000.0
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_parse_quotation_tables()
+    test_table_price_used_before_text_scan()
+    print('价格表格提取测试通过!')
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试进度通道的合并写入效果
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import Base, AnalysisProgress
+from modules.progress_channel import ProgressChannel
+
+
+def _make_session_factory():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def test_progress_updates_are_coalesced():
+    """
+    同一投标文件的多次进度更新只在落库时写入最新快照
+    """
+    session_factory = _make_session_factory()
+    channel = ProgressChannel(session_factory=session_factory, flush_interval=60)
+
+    channel.report(1, 10, status='processing', bidder_name='测试公司')
+    for i in range(1, 21):
+        channel.report(1, 10, completed=i, total=20, current_rule=f'规则{i}')
+
+    db = session_factory()
+    try:
+        row = db.query(AnalysisProgress).filter_by(bid_document_id=1).one()
+        # 状态切换时立即落库，之后的规则进度尚未写入
+        assert row.snapshot['status'] == 'processing'
+        assert row.snapshot['progress_completed'] == 0
+    finally:
+        db.close()
+
+    written = channel.flush()
+    assert written == 1
+
+    db = session_factory()
+    try:
+        row = db.query(AnalysisProgress).filter_by(bid_document_id=1).one()
+        assert row.snapshot['progress_completed'] == 20
+        assert row.snapshot['current_rule'] == '规则20'
+        assert row.project_id == 10
+    finally:
+        db.close()
+
+    # 没有新的更新时不再写库
+    assert channel.flush() == 0
+    channel.close()
+
+
+def test_state_transition_flushes_immediately():
+    """
+    状态切换（如完成或出错）时立即同步写入快照
+    """
+    session_factory = _make_session_factory()
+    channel = ProgressChannel(session_factory=session_factory, flush_interval=60)
+
+    channel.report(2, 10, status='processing')
+    channel.report(2, 10, completed=3, total=5, partial_results=[{'score': 1}] * 8)
+    channel.report(2, 10, status='error', error_message='分析超时，请重试')
+
+    db = session_factory()
+    try:
+        snapshot = db.query(AnalysisProgress).filter_by(bid_document_id=2).one().snapshot
+        assert snapshot['status'] == 'error'
+        assert snapshot['error_message'] == '分析超时，请重试'
+        assert snapshot['progress_completed'] == 3
+        # 部分结果只保留前5条
+        assert len(snapshot['partial_analysis_results']) == 5
+    finally:
+        db.close()
+    channel.close()
+
+
+if __name__ == '__main__':
+    test_progress_updates_are_coalesced()
+    test_state_transition_flushes_immediately()
+    print('进度通道测试通过!')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试进度增量事件的生成与分发
+"""
+
+import sys
+import os
+import asyncio
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import Base
+from modules import progress_channel
+from modules.progress_channel import ProgressChannel
+from modules.progress_events import ProgressEventBus
+
+
+def test_report_publishes_only_changed_fields():
+    """
+    进度通道每次更新只推送发生变化的字段
+    """
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+    channel = ProgressChannel(
+        session_factory=sessionmaker(bind=engine), flush_interval=60
+    )
+
+    events = []
+    progress_channel.set_event_sink(events.append)
+    try:
+        channel.report(1, 10, status='processing', bidder_name='测试公司')
+        channel.report(1, 10, completed=3, total=8)
+    finally:
+        progress_channel.set_event_sink(None)
+        channel.close()
+
+    assert events[0]['project_id'] == 10
+    assert events[0]['bid_document_id'] == 1
+    assert events[0]['delta']['status'] == 'processing'
+    assert events[1]['delta'] == {'progress_completed': 3, 'progress_total': 8}
+
+
+def test_bus_delivers_events_per_project():
+    """
+    事件总线只把事件分发给订阅了对应项目的连接，并支持跨线程发布
+    """
+    bus = ProgressEventBus()
+
+    async def scenario():
+        subscriber = bus.subscribe(10)
+        other = bus.subscribe(11)
+        await asyncio.to_thread(
+            bus.publish, {'type': 'progress', 'project_id': 10, 'delta': {}}
+        )
+        event = await asyncio.wait_for(subscriber.queue.get(), timeout=1)
+        assert event['project_id'] == 10
+        assert other.queue.empty()
+        bus.unsubscribe(subscriber)
+        bus.unsubscribe(other)
+        assert bus.subscriber_count(10) == 0
+
+    asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    test_report_publishes_only_changed_fields()
+    test_bus_delivers_events_per_project()
+    print('进度事件测试通过!')
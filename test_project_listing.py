@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试项目列表：键集分页、服务端筛选、分组计数和全文索引搜索
+"""
+
+import sys
+import os
+import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import memory_session
+from modules.database import TenderProject, BidDocument, AnalysisResult
+from modules.project_listing import list_projects
+
+
+def _setup(search_index=True):
+    db = memory_session(search_index)
+    projects = [
+        ('LS-1', '智慧园区监控系统采购', 'completed', datetime.datetime(2024, 1, 5), ['成都建设集团', '眉山电子']),
+        ('LS-2', '办公家具采购', 'processing', datetime.datetime(2024, 2, 10), ['四川家具厂']),
+        ('LS-3', '智慧园区网络改造', 'completed', datetime.datetime(2024, 3, 15), []),
+        ('LS-4', '车辆配件采购', 'new', datetime.datetime(2024, 3, 20), ['成都建设集团']),
+    ]
+    for code, name, status, created_at, bidders in projects:
+        project = TenderProject(project_code=code, name=name, status=status, created_at=created_at)
+        db.add(project)
+        db.flush()
+        for bidder in bidders:
+            bid = BidDocument(project_id=project.id, bidder_name=bidder, file_path=f'{bidder}.pdf')
+            db.add(bid)
+            db.flush()
+            db.add(AnalysisResult(project_id=project.id, bid_document_id=bid.id, bidder_name=bidder))
+    db.commit()
+    return db
+
+
+def _codes(page):
+    return [item['project_code'] for item in page['items']]
+
+
+def test_keyset_pagination_and_filters():
+    """
+    按ID倒序分页，next_cursor 接着上一页；状态、日期筛选在服务端完成，计数与原接口一致
+    """
+    for search_index in (True, False):
+        db = _setup(search_index)
+        first = list_projects(db, limit=3)
+        assert _codes(first) == ['LS-4', 'LS-3', 'LS-2'] and first['has_more']
+        second = list_projects(db, limit=3, cursor=first['next_cursor'])
+        assert _codes(second) == ['LS-1'] and second['next_cursor'] is None and not second['has_more']
+
+        counts = {
+            item['project_code']: (item['bid_count'], item['result_count'])
+            for item in first['items'] + second['items']
+        }
+        assert counts == {'LS-1': (2, 2), 'LS-2': (1, 1), 'LS-3': (0, 0), 'LS-4': (1, 1)}
+
+        assert _codes(list_projects(db, statuses=['completed', 'new'])) == ['LS-4', 'LS-3', 'LS-1']
+        march = list_projects(db, created_from=datetime.date(2024, 3, 1), created_to=datetime.date(2024, 3, 15))
+        assert _codes(march) == ['LS-3']
+        # 短查询（少于3个字符）和未建全文索引时都用 LIKE
+        assert _codes(list_projects(db, q='园区', statuses=['completed'])) == ['LS-3', 'LS-1']
+        assert _codes(list_projects(db, bidder='成都建设')) == ['LS-4', 'LS-1']
+        assert _codes(list_projects(db, q='100%')) == []
+        db.close()
+
+
+def test_search_index_follows_writes():
+    """
+    全文索引由触发器同步：新增、改名、删除投标文件和项目后搜索结果随之变化
+    """
+    db = _setup()
+    assert _codes(list_projects(db, q='智慧园区')) == ['LS-3', 'LS-1']
+    assert _codes(list_projects(db, q='成都建设集团')) == ['LS-4', 'LS-1']
+    # 投标方筛选只匹配投标方名称
+    assert _codes(list_projects(db, bidder='家具采购')) == []
+    assert _codes(list_projects(db, bidder='四川家具')) == ['LS-2']
+
+    project = db.query(TenderProject).filter_by(project_code='LS-2').one()
+    project.name = '智慧园区家具采购'
+    db.add(BidDocument(project_id=project.id, bidder_name='华西智能科技', file_path='华西.pdf'))
+    db.query(BidDocument).filter_by(bidder_name='四川家具厂').delete()
+    db.commit()
+    assert _codes(list_projects(db, q='智慧园区')) == ['LS-3', 'LS-2', 'LS-1']
+    assert _codes(list_projects(db, bidder='四川家具')) == []
+    assert _codes(list_projects(db, q='华西智能', bidder='华西智能')) == ['LS-2']
+
+    db.query(BidDocument).filter_by(project_id=project.id).delete()
+    db.delete(project)
+    db.commit()
+    assert _codes(list_projects(db, q='智慧园区')) == ['LS-3', 'LS-1']
+    db.close()
+
+
+if __name__ == '__main__':
+    test_keyset_pagination_and_filters()
+    test_search_index_follows_writes()
+    print('项目列表测试通过!')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试项目汇总表物化：读取直接取保存的汇总，分数修改、价格分重算后刷新，规则替换后失效
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import memory_session
+from modules.database import (
+    TenderProject,
+    AnalysisResult,
+    ProjectSummary,
+    RuleScore,
+    ScoringRule,
+)
+from modules.project_summary import get_project_summary, refresh_project_summary
+from modules.price_score_calculator import PriceScoreCalculator
+from modules.rule_scores import replace_result_scores
+from modules.scoring_model import ProjectScoringModel
+from modules.scoring_rule_store import replace_project_rules
+
+
+def _setup(db):
+    project = TenderProject(project_code='PS-1', name='汇总表项目')
+    db.add(project)
+    db.commit()
+    db.add_all(
+        [
+            ScoringRule(project_id=project.id, Parent_Item_Name='技术', Child_Item_Name='技术方案', Child_max_score=30),
+            ScoringRule(
+                project_id=project.id,
+                Parent_Item_Name='价格分',
+                Parent_max_score=40,
+                is_price_criteria=True,
+                price_formula='投标报价得分＝（评标基准价/投标报价）×价格分值',
+                description='满足招标文件要求且投标报价最低的投标报价为评标基准价',
+            ),
+        ]
+    )
+    for bidder, tech, price in [('甲公司', 20, 1000000), ('乙公司', 25, 2000000)]:
+        result = AnalysisResult(
+            project_id=project.id, bidder_name=bidder, extracted_price=price, price_score=0, total_score=tech
+        )
+        db.add(result)
+        replace_result_scores(db, result, [{'Child_Item_Name': '技术方案', 'score': tech}])
+    db.commit()
+    return project.id
+
+
+def _ranking(summary):
+    return [(row['bidder_name'], row['scores'], row['total_score']) for row in summary['rows']]
+
+
+def test_summary_refreshed_on_write(db):
+    """
+    首次读取生成并保存；之后读取返回保存的汇总；分数修改和价格分重算后汇总随之刷新
+    """
+    project_id = _setup(db)
+    assert db.get(ProjectSummary, project_id) is None
+    summary = get_project_summary(db, project_id)
+    assert _ranking(summary) == [('乙公司', [25.0], 25.0), ('甲公司', [20.0], 20.0)]
+    assert db.get(ProjectSummary, project_id).bidder_count == 2
+
+    # 绕过写入路径修改得分：读取的仍是保存的汇总（不再重新查询组装）
+    db.query(RuleScore).update({'score': 0})
+    db.commit()
+    assert _ranking(get_project_summary(db, project_id))[0] == ('乙公司', [25.0], 25.0)
+    refresh_project_summary(db, project_id)
+
+    model = ProjectScoringModel.load(db, project_id)
+    ids = {row.bidder_name: row.result_id for row in model.rows.values()}
+    model.apply([{'result_id': ids['甲公司'], 'criteria_name': '技术方案', 'score': 28}])
+    model.flush(db)
+    assert _ranking(get_project_summary(db, project_id)) == [('甲公司', [28.0], 28.0), ('乙公司', [0.0], 0.0)]
+
+    assert PriceScoreCalculator(db_session=db).calculate_project_price_scores(project_id)
+    assert _ranking(get_project_summary(db, project_id)) == [('甲公司', [28.0], 68.0), ('乙公司', [0.0], 20.0)]
+
+
+def test_replacing_rules_invalidates_summary(db):
+    """
+    重新提取评分规则后删除保存的汇总，下次读取按新规则生成表头
+    """
+    project_id = _setup(db)
+    get_project_summary(db, project_id)
+    replace_project_rules(
+        db,
+        project_id,
+        [{'criteria_name': '技术', 'max_score': 30, 'children': [{'criteria_name': '实施方案', 'max_score': 30}]}],
+    )
+    assert db.get(ProjectSummary, project_id) is None
+    summary = get_project_summary(db, project_id)
+    assert summary['header_rows'][1] == [{'name': '实施方案', 'max_score': 30}]
+    assert _ranking(summary)[0][1] == [None]
+
+
+if __name__ == '__main__':
+    test_summary_refreshed_on_write(memory_session())
+    test_replacing_rules_invalidates_summary(memory_session())
+    print('项目汇总表测试通过!')
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试暂定价格分：所有投标方价格提取后、规则评分完成前提前计算价格分
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import memory_session
+from modules.database import TenderProject, BidDocument, AnalysisResult, ScoringRule
+from modules.price_score_calculator import PriceScoreCalculator
+
+
+def test_provisional_scores_wait_for_all_prices(db):
+    """
+    仍有投标方未提取到价格时不计算；出错的投标方不参与判断；
+    价格齐全后按暂定结果（尚无规则得分）计算价格分，且只计算一次
+    """
+    project = TenderProject(project_code='PP-1', name='暂定价格分项目')
+    db.add(project)
+    db.commit()
+    db.add(
+        ScoringRule(
+            project_id=project.id,
+            Parent_Item_Name='价格分',
+            Parent_max_score=30,
+            is_price_criteria=True,
+            price_formula='投标报价得分＝（评标基准价/投标报价）×价格分值',
+            description='满足招标文件要求且投标报价最低的投标报价为评标基准价',
+        )
+    )
+
+    bids = {}
+    for bidder, status in [('甲公司', 'processing'), ('乙公司', 'pending'), ('丙公司', 'error')]:
+        bids[bidder] = BidDocument(
+            project_id=project.id, bidder_name=bidder, processing_status=status
+        )
+        db.add(bids[bidder])
+    db.commit()
+
+    def save_price(bidder, price):
+        # 与分析器在价格提取后写入的暂定结果相同
+        bids[bidder].price_extracted = True
+        db.add(
+            AnalysisResult(
+                project_id=project.id,
+                bid_document_id=bids[bidder].id,
+                bidder_name=bidder,
+                extracted_price=price,
+                total_score=0,
+                price_score=0,
+            )
+        )
+        db.commit()
+
+    calculator = PriceScoreCalculator(db_session=db)
+    save_price('甲公司', 1000000)
+    assert not calculator.calculate_provisional_price_scores(project.id)
+    assert db.query(AnalysisResult).filter_by(bidder_name='甲公司').one().price_score == 0
+
+    save_price('乙公司', 1200000)
+    assert calculator.calculate_provisional_price_scores(project.id)
+    scores = {r.bidder_name: (r.price_score, r.total_score) for r in db.query(AnalysisResult)}
+    assert scores == {'甲公司': (30.0, 30.0), '乙公司': (25.0, 25.0)}
+    # 其他工作进程随后看到价格齐全时不再重复计算
+    assert not calculator.calculate_provisional_price_scores(project.id)
+
+
+if __name__ == '__main__':
+    test_provisional_scores_wait_for_all_prices(memory_session())
+    print('暂定价格分测试通过!')
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试接口查询计划审计：全部接口查询命中索引，旧库补建索引后同样通过
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+
+from conftest import memory_session
+from modules.database import Base, AnalysisResult
+from audit_query_plans import audit, explain, _FULL_SCAN_RE
+
+
+def test_api_queries_use_indexes(db):
+    """
+    接口查询都不做全表扫描；未建索引的过滤条件会被识别为全表扫描
+    """
+    report = audit()
+    assert report['failures'] == [], report['failures']
+    assert len(report['queries']) > 20
+
+    assert _FULL_SCAN_RE.match('SCAN analysis_result')
+    assert _FULL_SCAN_RE.match('SCAN TABLE analysis_result')
+    assert not _FULL_SCAN_RE.match('SCAN analysis_result USING INDEX ix_analysis_result_project_total')
+    assert not _FULL_SCAN_RE.match('SEARCH analysis_result USING INDEX ix_analysis_result_bid_document (bid_document_id=?)')
+
+    plan = explain(db.connection(), db.query(AnalysisResult).filter(AnalysisResult.bidder_name == '甲'))
+    assert any(_FULL_SCAN_RE.match(step) for step in plan)
+
+
+def test_existing_database_gets_indexes():
+    """
+    旧库（建表时没有这些索引）补建索引后审计通过
+    """
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'old.db')
+    try:
+        engine = create_engine(f'sqlite:///{path}')
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            for name in ('ix_analysis_result_project_total', 'ix_bid_document_project_status', 'ix_scoring_rule_project'):
+                conn.execute(text(f'DROP INDEX {name}'))
+        engine.dispose()
+
+        report = audit(path)
+        assert report['failures'] == []
+        with create_engine(f'sqlite:///{path}').connect() as conn:
+            names = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type='index'"))}
+        assert 'ix_analysis_result_project_total' in names
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_api_queries_use_indexes(memory_session())
+    test_existing_database_gets_indexes()
+    print('查询计划审计测试通过!')
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试规则级检查点：重新分析时跳过已完成的规则
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from modules.database import (
+    Base,
+    TenderProject,
+    BidDocument,
+    ScoringRule,
+    AnalysisResult,
+    RuleEvaluationCheckpoint,
+)
+from modules.intelligent_bid_analyzer import IntelligentBidAnalyzer
+from modules.incremental_analysis import plan_reanalysis, rebuild_scores_from_checkpoints
+from modules.rule_scores import load_detailed_scores
+
+
+PAGES = ('技术方案 说明', '售后服务 承诺', '业绩 清单')
+
+
+class CountingAIAnalyzer:
+    """记录调用次数的AI分析器，第 fail_on 次调用返回错误；scores 依次给出每次调用的分数"""
+
+    model = 'test-model'
+
+    def __init__(self, fail_on=None, scores=None):
+        self.calls = 0
+        self.fail_on = fail_on
+        self.scores = list(scores or [])
+
+    def analyze_text(self, prompt, cancel_token=None):
+        self.calls += 1
+        if self.fail_on == self.calls:
+            return 'Error: 模拟超时'
+        score = self.scores.pop(0) if self.scores else 4
+        return f'```json\n{{"score": {score}, "reason": "满足要求"}}\n```'
+
+
+def _setup(rules=(('技术部分', '技术方案'), ('技术部分', '售后服务'), ('技术部分', '业绩'))):
+    bid_file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+    bid_file.write(b'%PDF-1.4 test bid')
+    bid_file.close()
+
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    project = TenderProject(project_code='CP-001', name='检查点测试', status='processing')
+    db.add(project)
+    db.commit()
+    bid = BidDocument(
+        project_id=project.id,
+        bidder_name='测试公司',
+        file_path=bid_file.name,
+        processing_status='completed',
+    )
+    db.add(bid)
+    for parent, name in rules:
+        db.add(
+            ScoringRule(
+                project_id=project.id,
+                Parent_Item_Name=parent,
+                Child_Item_Name=name,
+                Child_max_score=5,
+                description=f'{name}评分',
+                is_price_criteria=False,
+            )
+        )
+    db.commit()
+    return db, project.id, bid.id
+
+
+def _analyze(db, project_id, bid_id, ai, pages=PAGES):
+    bid = db.query(BidDocument).filter(BidDocument.id == bid_id).one()
+    analyzer = IntelligentBidAnalyzer(
+        'tender.pdf',
+        bid.file_path,
+        db_session=db,
+        bid_document_id=bid_id,
+        project_id=project_id,
+        extracted_text=list(pages),
+    )
+    analyzer.ai_analyzer = ai
+    return analyzer.analyze()
+
+
+def test_resume_skips_completed_rules():
+    """
+    第一次分析中途AI失败的规则没有检查点，恢复时只重新分析这一条；
+    提交给AI的上下文变化后对应规则的检查点不再复用
+    """
+    db, project_id, bid_id = _setup()
+
+    first_ai = CountingAIAnalyzer(fail_on=2)
+    first = _analyze(db, project_id, bid_id, first_ai)
+    assert first_ai.calls == 3
+    assert first['total_score'] == 8
+    assert db.query(RuleEvaluationCheckpoint).count() == 2
+
+    second_ai = CountingAIAnalyzer()
+    second = _analyze(db, project_id, bid_id, second_ai)
+    assert second_ai.calls == 1
+    assert second['total_score'] == 12
+    assert db.query(RuleEvaluationCheckpoint).count() == 3
+
+    # 只有第一页变化，只影响上下文包含第一页的“技术方案”
+    third_ai = CountingAIAnalyzer()
+    _analyze(db, project_id, bid_id, third_ai, pages=('技术方案 说明（修订）', '售后服务 承诺', '业绩 清单'))
+    assert third_ai.calls == 1
+    assert db.query(RuleEvaluationCheckpoint).count() == 4
+    file_path = db.query(BidDocument).filter(BidDocument.id == bid_id).one().file_path
+    db.close()
+    os.unlink(file_path)
+
+
+def test_incremental_plan_after_rule_and_file_changes():
+    """
+    修改一条规则只使该规则过期；替换投标文件使该投标方全部规则过期
+    """
+    db, project_id, bid_id = _setup()
+    _analyze(db, project_id, bid_id, CountingAIAnalyzer())
+
+    plan = plan_reanalysis(db, project_id, 'test-model')
+    assert plan['stale_pairs'] == 0
+    assert plan['rebuild'] == [bid_id]
+
+    rule = db.query(ScoringRule).filter(ScoringRule.Child_Item_Name == '业绩').one()
+    rule.Child_max_score = 10
+    db.commit()
+    plan = plan_reanalysis(db, project_id, 'test-model')
+    assert plan['reanalyze'] == {bid_id: [rule.id]}
+
+    rule.Child_max_score = 5
+    db.commit()
+    bid = db.query(BidDocument).filter(BidDocument.id == bid_id).one()
+    assert rebuild_scores_from_checkpoints(db, bid, 'test-model', list(PAGES))
+
+    # 父项名称属于规则指纹，改名后该规则需要重新评估
+    rule.Parent_Item_Name = '商务部分'
+    db.commit()
+    plan = plan_reanalysis(db, project_id, 'test-model')
+    assert plan['reanalyze'] == {bid_id: [rule.id]}
+    assert not rebuild_scores_from_checkpoints(db, bid, 'test-model', list(PAGES))
+
+    with open(bid.file_path, 'ab') as f:
+        f.write(b' replaced')
+    plan = plan_reanalysis(db, project_id, 'test-model')
+    assert len(plan['reanalyze'][bid_id]) == 3
+    db.close()
+    os.unlink(bid.file_path)
+
+
+def test_same_child_rule_under_different_parents():
+    """
+    不同父项下名称、描述、满分相同的子项分别评估，重建明细时各自取自己的检查点
+    """
+    db, project_id, bid_id = _setup((('技术部分', '实施方案'), ('服务部分', '实施方案')))
+    ai = CountingAIAnalyzer(scores=[3, 5])
+    _analyze(db, project_id, bid_id, ai)
+    assert ai.calls == 2
+    assert plan_reanalysis(db, project_id, 'test-model')['rebuild'] == [bid_id]
+
+    bid = db.query(BidDocument).filter(BidDocument.id == bid_id).one()
+    assert rebuild_scores_from_checkpoints(db, bid, 'test-model', list(PAGES))
+    result = db.query(AnalysisResult).filter(AnalysisResult.bid_document_id == bid_id).one()
+    scores = {item['Parent_Item_Name']: item['score'] for item in load_detailed_scores(db, [result.id])[result.id]}
+    assert scores == {'技术部分': 3, '服务部分': 5}
+    file_path = bid.file_path
+    db.close()
+    os.unlink(file_path)
+
+
+if __name__ == '__main__':
+    test_resume_skips_completed_rules()
+    test_incremental_plan_after_rule_and_file_changes()
+    test_same_child_rule_under_different_parents()
+    print('规则检查点测试通过!')
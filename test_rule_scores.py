@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试规则得分表：旧JSON明细迁移、明细替换与分组求和
+"""
+
+import sys
+import os
+import json
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from conftest import memory_session
+from modules.database import TenderProject, AnalysisResult, RuleScore, ScoringRule, ensure_rule_score_key
+from modules.rule_scores import (
+    load_detailed_scores,
+    lookup_by_rule,
+    migrate_detailed_scores,
+    other_scores_totals,
+    project_score_matrix,
+    replace_result_scores,
+)
+
+
+def _setup(db):
+    project = TenderProject(project_code='RS-1', name='规则得分项目')
+    db.add(project)
+    db.commit()
+    db.add_all(
+        [
+            ScoringRule(project_id=project.id, Parent_Item_Name='技术', Child_Item_Name='技术方案', Child_max_score=30),
+            ScoringRule(project_id=project.id, Parent_Item_Name='商务', Child_Item_Name='业绩', Child_max_score=10),
+        ]
+    )
+    db.commit()
+    return project.id
+
+
+def test_migrate_legacy_blobs(db):
+    """
+    双重编码的JSON字符串、嵌套列表和旧的字典格式都迁移为规则得分行，原字段清空；无法解析的保留；可重复执行
+    """
+    project_id = _setup(db)
+    details = [
+        {'Child_Item_Name': '技术方案', 'max_score': 30, 'score': 25, 'reason': '方案完整', 'Parent_Item_Name': '技术'},
+        {'Child_Item_Name': '业绩', 'max_score': 10, 'score': 8, 'reason': '三项业绩', 'Parent_Item_Name': '商务'},
+    ]
+    blobs = {
+        '甲公司': json.dumps(details, ensure_ascii=False),
+        '乙公司': [{'criteria_name': '商务', 'children': [{'criteria_name': '业绩', 'score': 6}]}, {'criteria_name': '价格分', 'score': 30}],
+        '丙公司': {'技术方案': 20, '价格分': {'score': 35}},
+        '丁公司': '{损坏的数据',
+    }
+    for bidder, blob in blobs.items():
+        db.add(AnalysisResult(project_id=project_id, bidder_name=bidder, detailed_scores=blob, ai_model='qwen'))
+    db.commit()
+    ids = {r.bidder_name: r.id for r in db.query(AnalysisResult)}
+
+    assert migrate_detailed_scores(db, batch_size=2) == 3
+    assert migrate_detailed_scores(db) == 0
+    remaining = db.execute(text('SELECT bidder_name FROM analysis_result WHERE detailed_scores IS NOT NULL')).all()
+    assert [row[0] for row in remaining] == ['丁公司']
+
+    first = load_detailed_scores(db, [ids['甲公司']])[ids['甲公司']]
+    assert [(i['Child_Item_Name'], i['score'], i['reason'], i['model']) for i in first] == [
+        ('技术方案', 25, '方案完整', 'qwen'),
+        ('业绩', 8, '三项业绩', 'qwen'),
+    ]
+    rule_ids = dict(db.query(ScoringRule.Child_Item_Name, ScoringRule.id))
+    linked = db.query(RuleScore).filter_by(analysis_result_id=ids['甲公司'], criteria_name='业绩').one()
+    assert linked.scoring_rule_id == rule_ids['业绩']
+    second = load_detailed_scores(db, [ids['乙公司']])[ids['乙公司']]
+    assert second[0]['Parent_Item_Name'] == '商务' and second[1]['is_price_criteria']
+
+    assert other_scores_totals(db, project_id) == {ids['甲公司']: 33.0, ids['乙公司']: 6.0, ids['丙公司']: 20.0}
+    assert project_score_matrix(db, project_id)[ids['丙公司']] == {(None, '技术方案'): 20.0, (None, '价格分'): 35.0}
+
+
+def test_replace_result_scores(db):
+    """
+    重新分析时替换全部规则得分（同名评分项只保留第一条），未保存的结果先取得ID
+    """
+    project_id = _setup(db)
+    result = AnalysisResult(project_id=project_id, bidder_name='甲公司')
+    db.add(result)
+    assert replace_result_scores(db, result, [{'Child_Item_Name': '技术方案', 'score': 10}], model='m1') == 1
+    db.commit()
+
+    count = replace_result_scores(
+        db,
+        result,
+        [
+            {'Child_Item_Name': '业绩', 'score': 9},
+            {'Child_Item_Name': '技术方案', 'score': 28},
+            {'Child_Item_Name': '业绩', 'score': 1},
+        ],
+        model='m2',
+    )
+    db.commit()
+    assert count == 2
+    assert [(r.criteria_name, r.score, r.model, r.position) for r in result.rule_scores] == [
+        ('业绩', 9.0, 'm2', 0),
+        ('技术方案', 28.0, 'm2', 1),
+    ]
+    assert other_scores_totals(db, project_id) == {result.id: 37.0}
+
+
+def test_same_child_name_under_different_parents(db):
+    """
+    不同父项下的同名子项各保存一行：旧库按旧唯一约束建的表先重建，迁移后得分之和不丢项
+    """
+    project_id = _setup(db)
+    db.add(ScoringRule(project_id=project_id, Parent_Item_Name='技术', Child_Item_Name='业绩', Child_max_score=10))
+    db.commit()
+    # 模拟旧库：rule_score 表的唯一约束为 (analysis_result_id, criteria_name)
+    bind = db.get_bind()
+    ddl = db.execute(text("SELECT sql FROM sqlite_master WHERE name = 'rule_score'")).scalar()
+    db.execute(text('DROP TABLE rule_score'))
+    db.execute(text(ddl.replace('UNIQUE (analysis_result_id, position)', 'UNIQUE (analysis_result_id, criteria_name)')))
+    db.commit()
+    assert ensure_rule_score_key(bind)
+    assert not ensure_rule_score_key(bind)
+
+    details = [
+        {'Child_Item_Name': '业绩', 'score': 5, 'Parent_Item_Name': '商务'},
+        {'Child_Item_Name': '业绩', 'score': 8, 'Parent_Item_Name': '技术'},
+        {'Child_Item_Name': '技术方案', 'score': 10, 'Parent_Item_Name': '技术'},
+    ]
+    db.add(AnalysisResult(project_id=project_id, bidder_name='甲公司', detailed_scores=json.dumps(details)))
+    db.commit()
+    assert migrate_detailed_scores(db) == 1
+    result_id = db.query(AnalysisResult.id).scalar()
+
+    assert other_scores_totals(db, project_id) == {result_id: 23.0}
+    scores = project_score_matrix(db, project_id)[result_id]
+    assert lookup_by_rule(scores, '商务', '业绩') == 5.0 and lookup_by_rule(scores, '技术', '业绩') == 8.0
+    # 名称在多个父项下出现时不按名称猜测，唯一时可省略父项
+    assert lookup_by_rule(scores, None, '业绩') is None
+    assert lookup_by_rule(scores, None, '技术方案') == 10.0
+    rule_ids = {(r.Parent_Item_Name, r.Child_Item_Name): r.id for r in db.query(ScoringRule)}
+    linked = {(r.parent_name, r.criteria_name): r.scoring_rule_id for r in db.query(RuleScore)}
+    assert linked[('技术', '业绩')] == rule_ids[('技术', '业绩')]
+    assert linked[('商务', '业绩')] == rule_ids[('商务', '业绩')]
+
+
+if __name__ == '__main__':
+    test_migrate_legacy_blobs(memory_session())
+    test_replace_result_scores(memory_session())
+    test_same_child_name_under_different_parents(memory_session())
+    print('规则得分表测试通过!')
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试项目评分模型：分数修改的增量排名、试算与批量写回修改历史
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import memory_session
+from modules.database import (
+    TenderProject,
+    AnalysisResult,
+    RuleScore,
+    ScoringRule,
+    ScoreModificationHistory,
+)
+from modules.rule_scores import replace_result_scores
+from modules.scoring_model import ProjectScoringModel, ScoreEditError, ScoringModelCache
+
+
+def _setup(db):
+    project = TenderProject(project_code='SM-1', name='评分模型项目')
+    db.add(project)
+    db.commit()
+    db.add_all(
+        [
+            ScoringRule(project_id=project.id, Parent_Item_Name='技术', Child_Item_Name='技术方案', Child_max_score=30),
+            ScoringRule(project_id=project.id, Parent_Item_Name='商务', Child_Item_Name='业绩', Child_max_score=10),
+            ScoringRule(project_id=project.id, Parent_Item_Name='价格分', Parent_max_score=40, is_price_criteria=True),
+        ]
+    )
+    for bidder, tech, record, price in [('甲公司', 25, 8, 40), ('乙公司', 28, 9, 30), ('丙公司', 20, None, 35)]:
+        details = [{'Child_Item_Name': '技术方案', 'score': tech, 'reason': 'AI评分'}]
+        if record is not None:
+            details.append({'Child_Item_Name': '业绩', 'score': record, 'reason': 'AI评分'})
+        result = AnalysisResult(
+            project_id=project.id,
+            bidder_name=bidder,
+            price_score=price,
+            total_score=tech + (record or 0) + price,
+        )
+        db.add(result)
+        replace_result_scores(db, result, details, model='test')
+    db.commit()
+    return project.id
+
+
+def test_edits_rerank_and_persist(db):
+    """
+    试算不改变模型；应用修改后按差值更新总分和排名；写回时更新明细得分并记录修改历史
+    """
+    project_id = _setup(db)
+    model = ProjectScoringModel.load(db, project_id)
+    ids = {row.bidder_name: row.result_id for row in model.rows.values()}
+    assert [r['bidder_name'] for r in model.rankings()] == ['甲公司', '乙公司', '丙公司']
+
+    preview = model.what_if(
+        [
+            {'result_id': ids['丙公司'], 'criteria_name': '业绩', 'score': 10},
+            {'result_id': ids['丙公司'], 'criteria_name': '技术方案', 'score': 29},
+        ]
+    )
+    assert [(r['bidder_name'], r['total_score']) for r in preview][0] == ('丙公司', 74.0)
+    assert model.rankings()[0]['bidder_name'] == '甲公司'
+
+    try:
+        model.apply([{'result_id': ids['甲公司'], 'criteria_name': '技术方案', 'score': 31}])
+        assert False, '超出满分的修改应被拒绝'
+    except ScoreEditError:
+        pass
+    assert model.pending_count == 0
+
+    changed = model.apply(
+        [
+            {'result_id': ids['乙公司'], 'criteria_name': '价格分', 'score': 36},
+            {'result_id': ids['丙公司'], 'criteria_name': '业绩', 'score': 6, 'reason': '补充业绩证明'},
+        ],
+        modified_by='评委A',
+        reason='复核调整',
+    )
+    assert changed == [ids['乙公司'], ids['丙公司']]
+    assert [(r['bidder_name'], r['total_score']) for r in model.rankings()] == [
+        ('乙公司', 73.0),
+        ('甲公司', 73.0),
+        ('丙公司', 61.0),
+    ]
+    assert model.flush(db) == 2
+
+    db.expire_all()
+    third = db.query(AnalysisResult).filter_by(bidder_name='丙公司').one()
+    assert third.total_score == 61.0 and third.is_modified and third.modification_count == 1
+    added = db.query(RuleScore).filter_by(analysis_result_id=third.id, criteria_name='业绩').one()
+    assert (added.score, added.reason, added.position) == (6, '补充业绩证明', 1)
+    assert [item['Child_Item_Name'] for item in third.original_scores] == ['技术方案']
+    history = db.query(ScoreModificationHistory).order_by(ScoreModificationHistory.id).all()
+    assert [(h.criteria_name, h.original_score, h.new_score, h.modified_by) for h in history] == [
+        ('价格分', 30, 36, '评委A'),
+        ('业绩', None, 6, '评委A'),
+    ]
+    assert ProjectScoringModel.load(db, project_id).rankings() == model.rankings()
+
+
+def test_cache_reloads_after_external_change(db):
+    """
+    分析结果在模型之外被修改后，缓存的模型重新加载
+    """
+    project_id = _setup(db)
+    cache = ScoringModelCache()
+    model = cache.get(db, project_id)
+    assert cache.get(db, project_id) is model
+
+    db.query(AnalysisResult).filter_by(bidder_name='丙公司').update({'price_score': 40, 'total_score': 60})
+    db.commit()
+    reloaded = cache.get(db, project_id)
+    assert reloaded is not model
+    assert reloaded.rankings()[-1]['total_score'] == 60.0
+
+    # 评分规则的满分被修改后也重新加载，按新的满分校验
+    db.query(ScoringRule).filter_by(Child_Item_Name='业绩').update({'Child_max_score': 5})
+    db.commit()
+    model = cache.get(db, project_id)
+    assert model is not reloaded
+    first_id = db.query(AnalysisResult.id).filter_by(bidder_name='甲公司').scalar()
+    try:
+        model.apply([{'result_id': first_id, 'criteria_name': '业绩', 'score': 8}])
+        assert False, '超出新满分的修改应被拒绝'
+    except ScoreEditError:
+        pass
+
+
+def test_flush_keeps_scores_outside_current_rules(db):
+    """
+    不在当前评分规则中的规则得分（如规则重新提取前的评分项）仍计入写回的总分
+    """
+    project_id = _setup(db)
+    first = db.query(AnalysisResult).filter_by(bidder_name='甲公司').one()
+    db.add(
+        RuleScore(
+            analysis_result_id=first.id,
+            project_id=project_id,
+            parent_name='商务',
+            criteria_name='资质',
+            score=5,
+            position=2,
+        )
+    )
+    db.commit()
+    model = ProjectScoringModel.load(db, project_id)
+    assert model.rankings()[0]['total_score'] == 78.0
+
+    model.apply([{'result_id': first.id, 'criteria_name': '技术方案', 'score': 20}])
+    assert model.rankings()[0]['total_score'] == 73.0
+    model.flush(db)
+    db.expire_all()
+    assert db.get(AnalysisResult, first.id).total_score == 73.0
+
+
+if __name__ == '__main__':
+    test_edits_rerank_and_persist(memory_session())
+    test_cache_reloads_after_external_change(memory_session())
+    test_flush_keeps_scores_outside_current_rules(memory_session())
+    print('项目评分模型测试通过!')
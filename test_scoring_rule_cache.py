@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试评分规则缓存：相同内容的招标文件复用规则树，重新提取时绕过缓存
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import memory_session
+from modules.database import ScoringRuleCacheEntry
+from modules.scoring_rule_cache import ScoringRuleCache, extract_scoring_rules_cached
+from test_table_analyzer import _write_tender
+
+
+def test_rules_cached_by_content_hash(db):
+    """
+    首次提取写入缓存；重新上传（路径不同、内容相同）直接命中；refresh 时重新提取；
+    提取器版本变化后缓存失效
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        first = os.path.join(directory, 'tender.pdf')
+        _write_tender(first)
+        rules, from_cache = extract_scoring_rules_cached(db, first)
+        assert rules and not from_cache
+
+        reupload = os.path.join(directory, 'tender_round2.pdf')
+        shutil.copyfile(first, reupload)
+        cached, from_cache = extract_scoring_rules_cached(db, reupload)
+        assert from_cache and cached == rules
+        # 返回副本，调用方修改不影响缓存
+        cached[0]['criteria_name'] = '已修改'
+        assert extract_scoring_rules_cached(db, first)[0] == rules
+
+        refreshed, from_cache = extract_scoring_rules_cached(db, first, refresh=True)
+        assert not from_cache and refreshed == rules
+        entry = db.query(ScoringRuleCacheEntry).one()
+        assert entry.hit_count == 2 and entry.rule_count == len(rules)
+
+        assert ScoringRuleCache(db, extractor_version='next').get(entry.content_hash) is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_rules_cached_by_content_hash(memory_session())
+    print('评分规则缓存测试通过!')
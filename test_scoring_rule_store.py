@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试评分规则批量保存：规则树展开、与逐条保存结果一致、失败时保留原有规则
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import memory_session
+from modules.database import ScoringRule, TenderProject
+from modules.scoring_rule_store import flatten_rule_tree, replace_project_rules
+from benchmark_rule_persistence import generate_rule_tree, run_benchmark, stored_rules
+
+
+def test_flatten_and_replace():
+    """
+    价格规则和有子项的规则保存为父项行，子项行记录父项名称；替换失败时原有规则不变
+    """
+    tree = [
+        {'criteria_name': '价格分', 'max_score': 30, 'is_price_criteria': True, 'price_formula': 'F', 'children': []},
+        {
+            'criteria_name': '技术',
+            'max_score': 50,
+            'children': [
+                {'criteria_name': '方案', 'max_score': 30, 'description': '方案完整'},
+                {'criteria_name': '工艺', 'max_score': 20, 'children': [{'criteria_name': '焊接', 'max_score': 20}]},
+            ],
+        },
+        {'criteria_name': '业绩', 'max_score': 20},
+    ]
+    rows = flatten_rule_tree(7, tree)
+    assert [(r['Parent_Item_Name'], r['Child_Item_Name']) for r in rows] == [
+        ('价格分', None),
+        ('技术', None),
+        ('技术', '方案'),
+        ('工艺', None),
+        ('工艺', '焊接'),
+        (None, '业绩'),
+    ]
+    assert rows[0]['price_formula'] == 'F' and rows[2]['Child_max_score'] == 30
+    assert len({frozenset(r) for r in rows}) == 1
+
+    db = memory_session(autoflush=False)
+    project = TenderProject(project_code='RS-1', name='规则保存')
+    db.add(project)
+    db.commit()
+    assert replace_project_rules(db, project.id, tree) == 6
+    before = stored_rules(db, project.id)
+
+    try:
+        replace_project_rules(db, project.id, [{'criteria_name': '坏规则', 'max_score': object()}])
+        assert False, '无法写入的规则应抛出异常'
+    except Exception:
+        pass
+    assert stored_rules(db, project.id) == before
+    assert replace_project_rules(db, project.id, generate_rule_tree(50)) == 50
+    assert db.query(ScoringRule).filter(ScoringRule.project_id == project.id).count() == 50
+    db.close()
+
+
+def test_bulk_matches_legacy_rows():
+    """
+    200条规则批量插入与逐条保存写入的规则行完全相同
+    """
+    stats = run_benchmark(num_rules=200, repeats=1)
+    assert stats['rules'] == 200
+    assert stats['identical']
+
+
+if __name__ == '__main__':
+    test_flatten_and_replace()
+    test_bulk_matches_legacy_rows()
+    print('评分规则批量保存测试通过!')
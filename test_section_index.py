@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试章节索引：标题大纲、常用章节查找，以及评标章节提取和投标文件上下文回退
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.section_index import SectionIndex
+from modules.scoring_extractor.text_analyzer import TextAnalyzerMixin
+from modules.intelligent_bid_analyzer import IntelligentBidAnalyzer
+
+
+TENDER_PAGES = [
+    '目录\n第一章 投标人须知 ........ 2\n第三章 评标办法 ........ 4\n',
+    '第一章 投标人须知\n1. 总则\n1.1 项目概况\n本项目预算10.5万元，2024年10月开标。\n',
+    '二、资格审查\n投标人应具备相应资质。\n',
+    '第三章 评标办法\n一、评分标准\n（一）技术部分\n1. 技术方案（20分）\n'
+    + '方案完整、合理得20分。\n' * 80,
+    '第四章 合同条款\n1.1 合同文件\n',
+]
+
+
+def test_outline_and_named_sections():
+    """
+    目录行不作为标题；章节范围延伸到下一个同级或更高级标题；常用章节按名称直接取出
+    """
+    index = SectionIndex.from_pages(TENDER_PAGES)
+    titles = [(h.level, h.title) for h in index.headings]
+    assert titles == [
+        (1, '第一章 投标人须知'),
+        (4, '总则'),
+        (5, '项目概况'),
+        (2, '资格审查'),
+        (1, '第三章 评标办法'),
+        (2, '评分标准'),
+        (3, '技术部分'),
+        (4, '技术方案（20分）'),
+        (1, '第四章 合同条款'),
+        (5, '合同文件'),
+    ]
+    assert index.section('scoring').title == '第三章 评标办法'
+    assert index.section_pages('scoring') == (3, 3)
+    assert index.section_pages('qualification') == (2, 2)
+    assert index.section('price') is None
+    assert index.section_text('scoring').startswith('第三章 评标办法\n一、评分标准')
+    assert '合同' not in index.section_text('scoring')
+
+    offset = index.text.index('方案完整')
+    assert index.heading_at(offset).title == '技术方案（20分）'
+    assert index.page_of(offset) == 3
+    assert index.heading_at(index.text.index('1.1 合同文件') - 1).title == '第四章 合同条款'
+
+    section = TextAnalyzerMixin()._extract_scoring_section('\n'.join(TENDER_PAGES))
+    assert section.startswith('第三章 评标办法') and section.endswith('得20分。')
+    assert TextAnalyzerMixin()._extract_scoring_section('没有评分内容\n' * 100) == ''
+
+
+def test_bid_context_falls_back_to_parent_section():
+    """
+    投标文件正文没有规则关键词时，取以父项命名的章节开头几页作为上下文
+    """
+    pages = ['投标函', '目录', '三、商务部分', '公司简介', '合同清单', '附件']
+    analyzer = IntelligentBidAnalyzer('tender.pdf', 'bid.pdf', extracted_text=pages)
+    rule = SimpleNamespace(Child_Item_Name='售后服务网点', description='', Parent_Item_Name='商务部分')
+    context = analyzer._find_relevant_context_for_child_rule(rule, pages)
+    assert context.startswith('--- Pages 3-5 ---\n三、商务部分')
+
+    rule.Parent_Item_Name = '技术部分'
+    assert analyzer._find_relevant_context_for_child_rule(rule, pages) == '\n'.join(pages[:3])
+
+
+if __name__ == '__main__':
+    test_outline_and_named_sections()
+    test_bid_context_falls_back_to_parent_section()
+    print('章节索引测试通过!')
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试评分表识别：关键词候选页+跨页续表的两步识别、多进程分片识别与逐页识别结果一致
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from modules.table_analyzer import TableAnalyzer
+
+
+def _draw_table(page, rows, top=60):
+    widths = [40, 120, 300, 60]
+    for r, row in enumerate(rows):
+        x = 40
+        for c, cell in enumerate(row):
+            rect = fitz.Rect(x, top + r * 28, x + widths[c], top + (r + 1) * 28)
+            page.draw_rect(rect, color=(0, 0, 0), width=1)
+            page.insert_textbox(rect + (3, 5, -3, 0), cell, fontname='china-s', fontsize=9)
+            x += widths[c]
+
+
+def _write_tender(path):
+    doc = fitz.open()
+    for index in range(40):
+        page = doc.new_page()
+        page_num = index + 1
+        if page_num == 10:
+            rows = [['序号', '评价项目', '评价标准', '分值']]
+            rows += [[str(i), f'技术项{i}', f'满足要求得{i}分，否则不得分', str(i)] for i in range(1, 20)]
+            _draw_table(page, rows)
+        elif page_num in (11, 12):
+            start = 20 if page_num == 11 else 40
+            rows = [[str(i), f'商务项{i}', f'提供证明材料得{i % 5 + 1}分', str(i % 5 + 1)] for i in range(start, start + 10)]
+            _draw_table(page, rows)
+        elif page_num == 30:
+            rows = [['序号', '评价项目', '评价标准', '分值']]
+            rows += [[str(i), f'服务项{i}', f'响应及时得{i}分', str(i)] for i in range(1, 6)]
+            _draw_table(page, rows)
+        elif page_num == 25:
+            rows = [['序号', '货物名称', '数量', '单价']] + [[str(i), f'设备{i}', '1', '100'] for i in range(1, 6)]
+            _draw_table(page, rows)
+        else:
+            page.insert_text((50, 60), f'第{page_num}页 投标人须知正文', fontname='china-s', fontsize=11)
+    doc.save(path)
+    doc.close()
+
+
+def test_keyword_gated_matches_full_scan():
+    """
+    只识别候选页及续表页，合并后的评分表与逐页识别完全相同
+    """
+    path = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+    try:
+        _write_tender(path)
+        full = TableAnalyzer(path, full_scan=True, max_workers=1)
+        gated = TableAnalyzer(path, full_scan=False, max_workers=1)
+        full_tables = full.extract_and_merge_tables()
+        gated_tables = gated.extract_and_merge_tables()
+
+        assert len(full.scanned_pages) == 40
+        # 候选页10、30，续表页11、12，以及用来确认表格不再延续的第13、31页
+        assert gated.scanned_pages == [10, 11, 12, 13, 30, 31]
+        assert gated_tables == full_tables
+        assert [t['pages'] for t in gated_tables] == [[10, 11, 12], [30]]
+    finally:
+        os.unlink(path)
+
+
+def test_sharded_extraction_matches_serial():
+    """
+    页数太少时不分片；逐页识别切成多个分片由工作进程识别，按页码合并后结果与单进程相同
+    """
+    path = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+    try:
+        _write_tender(path)
+        serial = TableAnalyzer(path, full_scan=False, max_workers=1).extract_and_merge_tables()
+        sharded = TableAnalyzer(path, full_scan=False, max_workers=2)
+        assert sharded._shard_pages([10, 30]) == [[10, 30]]
+        assert [len(shard) for shard in sharded._shard_pages(list(range(1, 41)))] == [20, 20]
+        assert sharded.extract_and_merge_tables() == serial
+        assert sharded.scanned_pages == [10, 11, 12, 13, 30, 31]
+
+        full = TableAnalyzer(path, full_scan=True, max_workers=3)
+        assert full.extract_and_merge_tables() == serial
+        assert full.scanned_pages == list(range(1, 41))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_keyword_gated_matches_full_scan()
+    test_sharded_extraction_matches_serial()
+    print('评分表识别测试通过!')
@@ -7,12 +7,12 @@
 
 import sys
 import os
-import json
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.database import SessionLocal, TenderProject, BidDocument, ScoringRule, AnalysisResult
+from modules.rule_scores import load_detailed_scores
 
 def verify_price_scores():
     """
@@ -52,16 +52,12 @@ def verify_price_scores():
                 print(f"  价格分: {analysis_result.price_score}")
                 print(f"  提取价格: {analysis_result.extracted_price}")
                 
-                # 检查详细评分
-                if analysis_result.detailed_scores:
-                    try:
-                        scores = json.loads(analysis_result.detailed_scores) if isinstance(analysis_result.detailed_scores, str) else analysis_result.detailed_scores
-                        price_scores = [s for s in scores if s.get('is_price_criteria', False)]
-                        print(f"  价格评分项数量: {len(price_scores)}")
-                        for ps in price_scores:
-                            print(f"    价格评分项: {ps}")
-                    except Exception as e:
-                        print(f"  解析详细得分时出错: {e}")
+                # 检查详细评分（明细得分保存在 rule_score 表中）
+                scores = load_detailed_scores(session, [analysis_result.id])[analysis_result.id]
+                price_scores = [s for s in scores if s['is_price_criteria']]
+                print(f"  价格评分项数量: {len(price_scores)}")
+                for ps in price_scores:
+                    print(f"    价格评分项: {ps}")
             else:
                 print(f"  无分析结果")
         